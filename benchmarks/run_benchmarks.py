@@ -0,0 +1,300 @@
+from time import perf_counter
+from argparse import ArgumentParser, Namespace
+from json import dump as json_dump, load as json_load
+from platform import python_version, platform
+from subprocess import (
+    run as subprocess_run, PIPE, DEVNULL, CalledProcessError)
+from statistics import median
+from datetime import datetime, timezone
+from sys import path as sys_path, stdout as sys_stdout
+from os import pardir as os_pardir
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from typing import List, Dict, Optional, Callable, Any
+from tkinter import TclError
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from benchmarks.scenarios import Scenario, ScenariosContainer
+from engine.engine import GameEngine
+from engine.collisions_processor import CollisionsProcessor
+from engine.projectile_store import numpy
+from engine.game_objects import *
+from engine import ApplicationException
+from maps import GameMap
+from user_interface.render_snapshot import SnapshotExchange
+
+
+_KEY_CODE_D: int = 68
+_KEY_CODE_SPACE: int = 32
+
+# Benchmark gets fresh game map of scenario and gives function that is
+# timed. Preparations inside benchmark itself are not timed
+Benchmark = Callable[[GameMap], Callable[[], Any]]
+
+
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    rank: int = max(0, round(percentile / 100 * len(sorted_values)) - 1)
+
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def benchmark_update_map(game_map: GameMap) -> Callable[[], Any]:
+    return GameEngine(game_map, False, 0).update_map
+
+
+def benchmark_update_map_with_projectile_store(
+        game_map: GameMap) -> Callable[[], Any]:
+    return GameEngine(game_map, True, 0).update_map
+
+
+def benchmark_update_map_players_running(
+        game_map: GameMap) -> Callable[[], Any]:
+    """Every player holds 'D' and 'space': runs and jumps on its own"""
+    game_engine: GameEngine = GameEngine(game_map, False, 0)
+
+    for player_handle in game_engine.get_players_handles():
+        game_engine.get_player_controls(player_handle).set_input(
+            [_KEY_CODE_D, _KEY_CODE_SPACE], None)
+
+    return game_engine.update_map
+
+
+def benchmark_get_collisions(game_map: GameMap) -> Callable[[], Any]:
+    """One call per movable object. Player moves diagonally"""
+    collisions_processor: CollisionsProcessor = CollisionsProcessor(game_map)
+    player_moving_vector: Vector2D = Vector2D(5, 5)
+
+    def get_all_collisions():
+        for movable_object in game_map.movable_objects:
+            if isinstance(movable_object, ProjectileObject):
+                collisions_processor.get_collisions(
+                    movable_object, movable_object.moving_vector)
+            else:
+                collisions_processor.get_collisions(
+                    movable_object, player_moving_vector)
+
+    return get_all_collisions
+
+
+def benchmark_publish_render_snapshot(
+        game_map: GameMap) -> Callable[[], Any]:
+    """Game thread's part of rendering"""
+    snapshot_exchange: SnapshotExchange = SnapshotExchange()
+
+    return lambda: snapshot_exchange.publish_map(game_map)
+
+
+_offscreen_root: Optional[Any] = None
+
+
+def benchmark_draw_all_game_objects(game_map: GameMap) -> Callable[[], Any]:
+    """Draws into never shown canvas. Tk still needs display to start"""
+    from tkinter import Tk as tk_Tk, Canvas
+    from user_interface.game_ui import GameGUI
+
+    global _offscreen_root
+
+    if _offscreen_root is None:
+        _offscreen_root = tk_Tk()
+        _offscreen_root.withdraw()
+
+    offscreen_canvas: Canvas = Canvas(
+        _offscreen_root,
+        width=game_map.game_field_size.x,
+        height=game_map.game_field_size.y)
+
+    return GameGUI.GameObjectsDrawer(
+        offscreen_canvas, game_map).draw_all_game_objects
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    'update_map': benchmark_update_map,
+    'update_map_with_projectile_store':
+        benchmark_update_map_with_projectile_store,
+    'update_map_players_running': benchmark_update_map_players_running,
+    'get_collisions': benchmark_get_collisions,
+    'publish_render_snapshot': benchmark_publish_render_snapshot,
+    'draw_all_game_objects': benchmark_draw_all_game_objects}
+
+
+def run_benchmark(
+        benchmark_name: str,
+        scenario: Scenario,
+        repeats_count: int,
+        calls_count: int) -> Dict[str, Any]:
+    """Times [calls_count] calls on [repeats_count] fresh game maps
+
+    Projectiles fly away in about 50 game map updates, so every repeat starts
+    from freshly generated map and calls count should stay small
+    """
+    calls_durations: List[float] = []
+
+    for _ in range(repeats_count):
+        benchmarked_function: Callable[[], Any] = BENCHMARKS[
+            benchmark_name](ScenariosContainer.get_map(scenario))
+
+        for _ in range(calls_count):
+            call_start: float = perf_counter()
+
+            benchmarked_function()
+
+            calls_durations.append(perf_counter() - call_start)
+
+    calls_durations.sort()
+
+    return {
+        'benchmark': benchmark_name,
+        'scenario': scenario._asdict(),
+        'calls': len(calls_durations),
+        'mean_ms': sum(calls_durations) / len(calls_durations) * 1000,
+        'median_ms': median(calls_durations) * 1000,
+        'min_ms': calls_durations[0] * 1000,
+        'p95_ms': get_percentile(calls_durations, 95) * 1000,
+        'max_ms': calls_durations[-1] * 1000}
+
+
+def get_environment() -> Dict[str, Any]:
+    git_commit: Optional[str] = None
+
+    try:
+        git_commit = subprocess_run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os_path_dirname(os_path_abspath(__file__)),
+            stdout=PIPE,
+            stderr=DEVNULL,
+            check=True,
+            universal_newlines=True).stdout.strip()
+
+    except (OSError, CalledProcessError):
+        pass
+
+    return {
+        'git_commit': git_commit,
+        'python': python_version(),
+        'platform': platform(),
+        'numpy': None if numpy is None else numpy.__version__,
+        'time': datetime.now(timezone.utc).isoformat()}
+
+
+def run_benchmarks(
+        benchmarks_names: List[str],
+        scenarios: List[Scenario],
+        repeats_count: int,
+        calls_count: int) -> Dict[str, Any]:
+    """Gives JSON-compatible report. Unavailable benchmarks are skipped"""
+    results: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, str]] = []
+
+    for benchmark_name in benchmarks_names:
+        for scenario in scenarios:
+            try:
+                results.append(
+                    run_benchmark(
+                        benchmark_name,
+                        scenario,
+                        repeats_count,
+                        calls_count))
+
+            # No NumPy or no display for tkinter
+            except (ApplicationException, TclError) as occurred_exc:
+                skipped.append({
+                    'benchmark': benchmark_name,
+                    'reason': (
+                        occurred_exc.__class__.__name__
+                        + ': ' + str(occurred_exc))})
+
+                break
+
+    return {
+        'environment': get_environment(),
+        'results': results,
+        'skipped': skipped}
+
+
+def print_comparison(
+        baseline_report: Dict[str, Any], current_report: Dict[str, Any]):
+    """Prints current median to baseline median ratios. < 1 is speedup"""
+    baseline_medians: Dict[tuple, float] = {
+        (result['benchmark'], result['scenario']['name']):
+            result['median_ms']
+        for result in baseline_report['results']}
+
+    for result in current_report['results']:
+        result_key: tuple = (result['benchmark'], result['scenario']['name'])
+
+        if result_key in baseline_medians:
+            print('{:<34} {:<16} {:>10.4f} ms  x{:.2f}'.format(
+                result_key[0],
+                result_key[1],
+                result['median_ms'],
+                result['median_ms'] / baseline_medians[result_key]))
+
+
+def run_benchmarks_logic():
+    parser = ArgumentParser(
+        description='Times game engine and drawing on generated game maps')
+
+    parser.add_argument(
+        '-b', '--benchmark',
+        help='benchmark to run, can be repeated (default: all)',
+        action='append',
+        choices=list(BENCHMARKS))
+
+    parser.add_argument(
+        '-s', '--scenario',
+        help='scenario to run, can be repeated (default: all)',
+        action='append',
+        choices=[scenario.name for scenario in ScenariosContainer.SCENARIOS])
+
+    parser.add_argument(
+        '-r', '--repeats',
+        help='fresh game maps per scenario (default: 5)',
+        type=int,
+        default=5)
+
+    parser.add_argument(
+        '-c', '--calls',
+        help='timed calls per game map (default: 20)',
+        type=int,
+        default=20)
+
+    parser.add_argument(
+        '-o', '--output',
+        help='JSON report file (default: stdout)')
+
+    parser.add_argument(
+        '--compare',
+        help='JSON report of previous run to compare medians with',
+        metavar='BASELINE')
+
+    arguments: Namespace = parser.parse_args()
+
+    report: Dict[str, Any] = run_benchmarks(
+        arguments.benchmark or list(BENCHMARKS),
+        [ScenariosContainer.get_scenario(scenario_name)
+         for scenario_name in (
+             arguments.scenario
+             or [scenario.name
+                 for scenario in ScenariosContainer.SCENARIOS])],
+        arguments.repeats,
+        arguments.calls)
+
+    if arguments.output is None:
+        json_dump(report, sys_stdout, indent=2)
+        print()
+    else:
+        with open(arguments.output, 'w') as report_file:
+            json_dump(report, report_file, indent=2)
+
+    if arguments.compare is not None:
+        with open(arguments.compare, 'r') as baseline_file:
+            print_comparison(json_load(baseline_file), report)
+
+
+if __name__ == '__main__':
+    run_benchmarks_logic()
@@ -0,0 +1,103 @@
+from random import Random
+from math import pi, sin, cos
+from typing import NamedTuple
+
+from maps import GameMap, DEFAULT_RESOLUTION
+from engine.game_objects import *
+
+
+class Scenario(NamedTuple):
+    """Parameters of generated game map"""
+    name: str
+    platforms_count: int
+    projectiles_count: int
+    buffs_count: int
+    players_count: int
+
+    # Same seed gives the same game map
+    seed: int = 0
+
+
+class ScenariosContainer:
+    """Generates game maps in the manner of [RawMapsContainer]
+
+    Objects are scattered uniformly over default resolution game field.
+    First player is the main one
+    """
+    SCENARIOS: List[Scenario] = [
+        Scenario('empty', 0, 0, 0, 1),
+        Scenario('platforms_100', 100, 0, 0, 1),
+        Scenario('projectiles_200', 0, 200, 0, 1),
+        Scenario('mixed', 100, 200, 20, 1),
+        Scenario('mixed_dense', 500, 1000, 50, 1),
+
+        # Tick time growth by players count over 'mixed' objects
+        Scenario('players_1', 100, 200, 20, 1),
+        Scenario('players_4', 100, 200, 20, 4),
+        Scenario('players_16', 100, 200, 20, 16),
+        Scenario('players_64', 100, 200, 20, 64)]
+
+    @classmethod
+    def get_scenario(cls, scenario_name: str) -> Scenario:
+        for scenario in cls.SCENARIOS:
+            if scenario.name == scenario_name:
+                return scenario
+
+        raise ValueError('Unknown scenario: ' + scenario_name)
+
+    @staticmethod
+    def get_map(scenario: Scenario) -> GameMap:
+        random: Random = Random(scenario.seed)
+        field_width, field_height = DEFAULT_RESOLUTION
+
+        immovable_objects: List[ImmovableObject] = []
+        movable_objects: List[MovableObject] = []
+
+        for _ in range(scenario.platforms_count):
+            immovable_objects.append(
+                BasicPlatform(
+                    random.randint(40, 200),
+                    random.randint(10, 30),
+                    Vector2D(
+                        random.randint(0, field_width - 200),
+                        random.randint(0, field_height - 30))))
+
+        for buff_index in range(scenario.buffs_count):
+            buff_location: Vector2D = Vector2D(
+                random.randint(0, field_width - AbstractBuff.SIDE_LENGTH),
+                random.randint(0, field_height - AbstractBuff.SIDE_LENGTH))
+
+            if buff_index % 2 == 0:
+                immovable_objects.append(SpeedUpBuff(buff_location))
+            else:
+                immovable_objects.append(JumpHeightUpBuff(buff_location))
+
+        for _ in range(scenario.players_count):
+            movable_objects.append(
+                Player(
+                    Vector2D(
+                        random.randint(0, field_width - Player.SIDE_LENGTH),
+                        random.randint(
+                            0, field_height - Player.SIDE_LENGTH))))
+
+        for projectile_index in range(scenario.projectiles_count):
+            rotation_angle: float = random.uniform(0, 2 * pi)
+            moving_vector: Vector2D = Vector2D(
+                cos(rotation_angle) * ProjectileObject.PROJECTILE_SPEED,
+                sin(rotation_angle) * ProjectileObject.PROJECTILE_SPEED)
+            projectile_location: Vector2D = Vector2D(
+                random.uniform(0, field_width - 10),
+                random.uniform(0, field_height - 10))
+
+            if projectile_index % 2 == 0:
+                movable_objects.append(
+                    HandgunProjectile(moving_vector, projectile_location))
+            else:
+                movable_objects.append(
+                    MachineGunProjectile(moving_vector, projectile_location))
+
+        return GameMap(
+            Vector2D(field_width, field_height),
+            immovable_objects,
+            movable_objects,
+            False)
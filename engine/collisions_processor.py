@@ -1,21 +1,72 @@
-from typing import TypeVar
+from typing import TypeVar, Callable
+from math import sqrt
 from enum import Enum
 
 from maps import GameMap
 from engine.game_objects import *
+from engine.spatial_grid import SpatialGrid
+from engine.type_registry import TypeRegistry
 from engine import ApplicationException
 
 
 class CollisionsProcessor:
+    # Moving object's class -> method(self, moving_object, moving_vector)
+    MOVING_OBJECTS_CHECKS: TypeRegistry = TypeRegistry(
+        'moving objects checks')
+
+    # Collided object's class -> method(
+    #     self, player, moving_vector, collided_object, collided_index)
+    PLAYER_COLLISIONS_CHECKS: TypeRegistry = TypeRegistry(
+        'player collisions checks')
+
+    # Collided object's class -> method(
+    #     self, center_x, center_y, radius, moving_vector, collided_object)
+    # that gives time of projectile's impact or [None]. Projectiles fly
+    # through objects without check (e.g. buffs)
+    PROJECTILE_IMPACTS_CHECKS: TypeRegistry = TypeRegistry(
+        'projectile impacts checks')
+
+    # Projectile's class -> its circle diameter
+    PROJECTILES_CIRCLE_DIAMETERS: TypeRegistry = TypeRegistry(
+        'projectiles circle diameters')
+
     _game_map: GameMap
 
-    # Result list of collisions in current iteration
-    _result_collisions: List['Collision']
+    # 'Broad' phase index over immovable objects. Immovable objects do not
+    # move, so it is rebuilt only when game map gets other list of them (e.g.
+    # chunks streaming). Taken from game map if it came with one
+    _spatial_grid: SpatialGrid
+
+    # Reusable storage of collisions found by the last check
+    _collisions_buffer: 'CollisionsBuffer'
+
+    # Index of moving object in game map's movable objects for the last
+    # check. It is written into every collision record
+    _mover_index: int
+
+    # Totals for instrumentation. Plain additions are cheap enough to be
+    # always on
+    checks_count: int
+    collisions_count: int
 
     GameObject = TypeVar('GameObject', covariant=True)
 
     def __init__(self, input_map: GameMap):
         self._game_map = input_map
+        self._spatial_grid = self._get_spatial_grid()
+        self._collisions_buffer = CollisionsBuffer()
+        self._mover_index = -1
+
+        self.checks_count = 0
+        self.collisions_count = 0
+
+    def _get_spatial_grid(self) -> SpatialGrid:
+        if (self._game_map.spatial_grid is not None
+                and self._game_map.spatial_grid.objects
+                is self._game_map.immovable_objects):
+            return self._game_map.spatial_grid
+        else:
+            return SpatialGrid(self._game_map.immovable_objects)
 
     def get_collisions(
             self,
@@ -23,65 +74,115 @@ class CollisionsProcessor:
             moving_vector: Vector2D) -> List['Collision']:
         """Main collisions acquiring method
 
-        If there is no collisions then empty list is returned
+        If there is no collisions then empty list is returned. Compatibility
+        wrapper over [fill_collisions_buffer] that creates [Collision] view
+        for every found collision
         """
-        self._result_collisions = []
-
-        # Optimization: 'Middle' phase where every two objects' circles
-        #  collision is checked. Every game object have its circle that
-        #  contains this object. It is needed to compare square of sum of
-        #  two radiuses and sum of squares of vector between centers of two
-        #  circles. (Not root in second case for more performance)
+        collisions_buffer: CollisionsBuffer = self.fill_collisions_buffer(
+            moving_object, moving_vector)
 
-        # 'Narrow' phase with detailed check
-        if isinstance(moving_object, Player):
-            self._check_player_collisions(
+        return [
+            Collision(
                 moving_object,
-                moving_vector,
-                # Just all immovable_objects in case of no 'middle' phase
-                self._game_map.immovable_objects)
+                collisions_buffer.game_events[i],
+                self._get_collided_object(
+                    collisions_buffer.collided_indexes[i]))
+            for i in range(collisions_buffer.length)]
 
-        elif isinstance(moving_object, ProjectileObject):
-            self._check_projectile_collisions(
-                moving_object,
-                moving_vector,
-                # Just all immovable_objects in case of no 'middle' phase
-                self._game_map.immovable_objects)
+    def fill_collisions_buffer(
+            self,
+            moving_object: MovableObject,
+            moving_vector: Vector2D,
+            mover_index: int = -1) -> 'CollisionsBuffer':
+        """Allocation free collisions acquiring method
 
-        else:
+        Returned buffer is owned by collisions processor and is overwritten
+        by the next check so it must be processed right away
+        """
+        self._collisions_buffer.clear()
+        self._mover_index = mover_index
+
+        if self._spatial_grid.objects is not self._game_map.immovable_objects:
+            self._spatial_grid = self._get_spatial_grid()
+
+        moving_object_check: Optional[Callable] = (
+            self.MOVING_OBJECTS_CHECKS.get(moving_object.__class__))
+
+        if moving_object_check is None:
             raise CollisionsProcessorException(
                 'While processing [get_collisions] method, '
                 'got [moving_object] with unknown type: '
                 + moving_object.__class__.__name__)
 
-        return self._result_collisions
+        moving_object_check(self, moving_object, moving_vector)
+
+        self.checks_count += 1
+        self.collisions_count += self._collisions_buffer.length
+
+        return self._collisions_buffer
+
+    def _get_collided_object(
+            self, collided_index: int) -> Optional[ImmovableObject]:
+        if collided_index < 0:
+            return None
+        else:
+            return self._game_map.immovable_objects[collided_index]
+
+    def _add_collision(self, game_event: 'GameEvent', collided_index: int):
+        self._collisions_buffer.append(
+            game_event, self._mover_index, collided_index)
+
+    def _get_potentially_collided_indexes(
+            self,
+            location: Vector2D,
+            side_length: float,
+            moving_vector: Vector2D) -> List[int]:
+        """'Broad' phase
+
+        Square with given location and side length is swept along moving
+        vector and only indexes of immovable objects from overlapped grid
+        cells are returned
+        """
+        return self._spatial_grid.query_indexes(
+            min(location.x, location.x + moving_vector.x),
+            min(location.y, location.y + moving_vector.y),
+            max(location.x, location.x + moving_vector.x) + side_length,
+            max(location.y, location.y + moving_vector.y) + side_length)
+
+    @MOVING_OBJECTS_CHECKS.register(Player)
+    def _check_moving_player(self, player: Player, moving_vector: Vector2D):
+        # 'Narrow' phase with detailed check only for objects from grid
+        # cells that swept bounding box of moving object overlaps
+        self._check_player_collisions(
+            player,
+            moving_vector,
+            self._get_potentially_collided_indexes(
+                player.location, Player.SIDE_LENGTH, moving_vector))
 
     def _check_player_collisions(
             self,
             player: Player,
             moving_vector: Vector2D,
-            potentially_collided_objects: List[ImmovableObject]):
+            potentially_collided_indexes: List[int]):
         self._check_player_borders_collisions(
             player, moving_vector)
 
-        for game_object in potentially_collided_objects:
-            if game_object is player:
-                continue
+        for object_index in potentially_collided_indexes:
+            game_object: ImmovableObject = (
+                self._game_map.immovable_objects[object_index])
 
-            elif isinstance(game_object, AbstractBuff):
-                self._check_player_buff_collisions(
-                    player, moving_vector, game_object)
+            collision_check: Optional[Callable] = (
+                self.PLAYER_COLLISIONS_CHECKS.get(game_object.__class__))
 
-            elif isinstance(game_object, BasicPlatform):
-                self._check_player_basic_platform_collisions(
-                    player, moving_vector, game_object)
-
-            else:
+            if collision_check is None:
                 raise CollisionsProcessorException(
                     "While processing [_check_player_collisions] method, "
                     "got [some_object] with unknown type: "
                     + game_object.__class__.__name__)
 
+            collision_check(
+                self, player, moving_vector, game_object, object_index)
+
     def _check_player_borders_collisions(
             self,
             player: Player,
@@ -89,28 +190,26 @@ class CollisionsProcessor:
         # Horizontal
         if (player.location.x + Player.SIDE_LENGTH
                 + moving_vector.x > self._game_map.game_field_size.x):
-            self._result_collisions.append(
-                Collision(player, GameEvent.PLAYER_BORDERS_RIGHT, None))
+            self._add_collision(GameEvent.PLAYER_BORDERS_RIGHT, -1)
 
         elif player.location.x + moving_vector.x < 0:
-            self._result_collisions.append(
-                Collision(player, GameEvent.PLAYER_BORDERS_LEFT, None))
+            self._add_collision(GameEvent.PLAYER_BORDERS_LEFT, -1)
 
         # Vertical
         if (player.location.y + Player.SIDE_LENGTH
                 + moving_vector.y > self._game_map.game_field_size.y):
-            self._result_collisions.append(
-                Collision(player, GameEvent.PLAYER_BORDERS_BOTTOM, None))
+            self._add_collision(GameEvent.PLAYER_BORDERS_BOTTOM, -1)
 
         elif player.location.y + moving_vector.y < 0:
-            self._result_collisions.append(
-                Collision(player, GameEvent.PLAYER_BORDERS_TOP, None))
+            self._add_collision(GameEvent.PLAYER_BORDERS_TOP, -1)
 
+    @PLAYER_COLLISIONS_CHECKS.register(AbstractBuff)
     def _check_player_buff_collisions(
             self,
             player: Player,
             moving_vector: Vector2D,
-            buff: AbstractBuff):
+            buff: AbstractBuff,
+            buff_index: int):
         player_new_left_border: float = player.location.x + moving_vector.x
         player_new_right_border: float = (
             player.location.x
@@ -129,14 +228,15 @@ class CollisionsProcessor:
                 and player_new_top_border
                 <= buff.location.y + AbstractBuff.SIDE_LENGTH
                 and not buff.is_charging()):
-            self._result_collisions.append(
-                Collision(player, GameEvent.PLAYER_BUFF, buff))
+            self._add_collision(GameEvent.PLAYER_BUFF, buff_index)
 
+    @PLAYER_COLLISIONS_CHECKS.register(BasicPlatform)
     def _check_player_basic_platform_collisions(
             self,
             player: Player,
             moving_vector: Vector2D,
-            basic_platform: BasicPlatform):
+            basic_platform: BasicPlatform,
+            basic_platform_index: int):
         player_new_left_border: float = player.location.x + moving_vector.x
         player_new_right_border: float = (
             player.location.x
@@ -159,39 +259,31 @@ class CollisionsProcessor:
                     <= basic_platform.location.y
                     <= player_new_bottom_border
                     <= basic_platform.location.y + basic_platform.height):
-                self._result_collisions.append(
-                    Collision(
-                        player,
-                        GameEvent.PLAYER_BOTTOM_BASIC_PLATFORM,
-                        basic_platform))
+                self._add_collision(
+                    GameEvent.PLAYER_BOTTOM_BASIC_PLATFORM,
+                    basic_platform_index)
 
             elif (basic_platform.location.y <= player_new_top_border
                     <= basic_platform.location.y + basic_platform.height
                     <= player.location.y):
-                self._result_collisions.append(
-                    Collision(
-                        player,
-                        GameEvent.PLAYER_TOP_BASIC_PLATFORM,
-                        basic_platform))
+                self._add_collision(
+                    GameEvent.PLAYER_TOP_BASIC_PLATFORM,
+                    basic_platform_index)
 
             elif (player.location.x + Player.SIDE_LENGTH
                     <= basic_platform.location.x <= player_new_right_border
                     <= basic_platform.location.x
                     + basic_platform.width):
-                self._result_collisions.append(
-                    Collision(
-                        player,
-                        GameEvent.PLAYER_RIGHT_BASIC_PLATFORM,
-                        basic_platform))
+                self._add_collision(
+                    GameEvent.PLAYER_RIGHT_BASIC_PLATFORM,
+                    basic_platform_index)
 
             elif (basic_platform.location.x <= player_new_left_border
                     <= basic_platform.location.x + basic_platform.width
                     <= player.location.x):
-                self._result_collisions.append(
-                    Collision(
-                        player,
-                        GameEvent.PLAYER_LEFT_BASIC_PLATFORM,
-                        basic_platform))
+                self._add_collision(
+                    GameEvent.PLAYER_LEFT_BASIC_PLATFORM,
+                    basic_platform_index)
             else:
                 # This case fires when basic platform is way too small in
                 # comparison with player
@@ -207,66 +299,308 @@ class CollisionsProcessor:
 
                 if (min_borders_gap == player_new_right_border
                         - basic_platform.location.x):
-                    self._result_collisions.append(
-                        Collision(
-                            player,
-                            GameEvent.PLAYER_RIGHT_BASIC_PLATFORM,
-                            basic_platform))
+                    self._add_collision(
+                        GameEvent.PLAYER_RIGHT_BASIC_PLATFORM,
+                        basic_platform_index)
                 elif (min_borders_gap == player_new_left_border
                         - basic_platform.location.x - basic_platform.width):
-                    self._result_collisions.append(
-                        Collision(
-                            player,
-                            GameEvent.PLAYER_LEFT_BASIC_PLATFORM,
-                            basic_platform))
+                    self._add_collision(
+                        GameEvent.PLAYER_LEFT_BASIC_PLATFORM,
+                        basic_platform_index)
                 elif (min_borders_gap == player_new_bottom_border
                       - basic_platform.location.y):
-                    self._result_collisions.append(
-                        Collision(
-                            player,
-                            GameEvent.PLAYER_BOTTOM_BASIC_PLATFORM,
-                            basic_platform))
+                    self._add_collision(
+                        GameEvent.PLAYER_BOTTOM_BASIC_PLATFORM,
+                        basic_platform_index)
                 else:
-                    self._result_collisions.append(
-                        Collision(
-                            player,
-                            GameEvent.PLAYER_TOP_BASIC_PLATFORM,
-                            basic_platform))
+                    self._add_collision(
+                        GameEvent.PLAYER_TOP_BASIC_PLATFORM,
+                        basic_platform_index)
+
+    @MOVING_OBJECTS_CHECKS.register(ProjectileObject)
+    def _check_moving_projectile(
+            self, projectile: ProjectileObject, moving_vector: Vector2D):
+        circle_diameter: int = self._get_projectile_circle_diameter(
+            projectile)
+
+        self._check_projectile_collisions(
+            projectile,
+            circle_diameter,
+            moving_vector,
+            self._get_potentially_collided_indexes(
+                projectile.location, circle_diameter, moving_vector))
 
     def _check_projectile_collisions(
             self,
             projectile: ProjectileObject,
-            # moving_vector
-            _: Vector2D,
-            # potentially_collided_objects
-            __: List[ImmovableObject]):
-        self._check_projectile_borders_collisions(projectile)
-
-    def _check_projectile_borders_collisions(
-            self, projectile: ProjectileObject):
-        if (isinstance(projectile, HandgunProjectile)
-                or isinstance(projectile, MachineGunProjectile)):
-            circle_diameter: int = projectile.CIRCLE_DIAMETER
-        else:
+            circle_diameter: int,
+            moving_vector: Vector2D,
+            potentially_collided_indexes: List[int]):
+        self._check_projectile_borders_collisions(
+            projectile, circle_diameter)
+
+        self._check_projectile_basic_platform_collisions(
+            projectile,
+            circle_diameter,
+            moving_vector,
+            potentially_collided_indexes)
+
+    PROJECTILES_CIRCLE_DIAMETERS.add(
+        HandgunProjectile, HandgunProjectile.CIRCLE_DIAMETER)
+    PROJECTILES_CIRCLE_DIAMETERS.add(
+        MachineGunProjectile, MachineGunProjectile.CIRCLE_DIAMETER)
+
+    @classmethod
+    def _get_projectile_circle_diameter(
+            cls, projectile: ProjectileObject) -> int:
+        circle_diameter: Optional[int] = (
+            cls.PROJECTILES_CIRCLE_DIAMETERS.get(projectile.__class__))
+
+        if circle_diameter is None:
             raise CollisionsProcessorException(
                 '[projectile] has unknown type: '
                 + projectile.__class__.__name__)
 
+        return circle_diameter
+
+    def _check_projectile_borders_collisions(
+            self, projectile: ProjectileObject, circle_diameter: int):
         if (projectile.location.y + circle_diameter <= 0  # Borders' top
             or projectile.location.y
                 >= self._game_map.game_field_size.y  # Borders' bottom
             or projectile.location.x + circle_diameter <= 0  # Borders' left
             or projectile.location.x
                 >= self._game_map.game_field_size.x):  # Borders' right
-            self._result_collisions.append(
-                Collision(projectile, GameEvent.PROJECTILE_IS_OUT, None))
+            self._add_collision(GameEvent.PROJECTILE_IS_OUT, -1)
+
+    def _check_projectile_basic_platform_collisions(
+            self,
+            projectile: ProjectileObject,
+            circle_diameter: int,
+            moving_vector: Vector2D,
+            potentially_collided_indexes: List[int]):
+        """Continuous (swept) circle against platforms check
+
+        Projectile may move further than its diameter in one iteration so
+        simple overlap check would miss thin platforms. Instead, time of
+        impact along [moving_vector] is calculated analytically and only the
+        first hit platform is reported
+        """
+        radius: float = circle_diameter / 2
+        center_x: float = projectile.location.x + radius
+        center_y: float = projectile.location.y + radius
+
+        first_impact_time: Optional[float] = None
+        first_hit_platform_index: int = -1
+
+        for object_index in potentially_collided_indexes:
+            game_object: ImmovableObject = (
+                self._game_map.immovable_objects[object_index])
+            impact_check: Optional[Callable] = (
+                self.PROJECTILE_IMPACTS_CHECKS.get(game_object.__class__))
+
+            if impact_check is None:
+                continue
+
+            impact_time: Optional[float] = impact_check(
+                self, center_x, center_y, radius, moving_vector, game_object)
+
+            if (impact_time is not None
+                    and (first_impact_time is None
+                         or impact_time < first_impact_time)):
+                first_impact_time = impact_time
+                first_hit_platform_index = object_index
+
+        if first_hit_platform_index >= 0:
+            self._add_collision(
+                GameEvent.PROJECTILE_BASIC_PLATFORM, first_hit_platform_index)
+
+    @PROJECTILE_IMPACTS_CHECKS.register(BasicPlatform)
+    def _get_basic_platform_impact_time(
+            self,
+            center_x: float,
+            center_y: float,
+            radius: float,
+            moving_vector: Vector2D,
+            basic_platform: BasicPlatform) -> Optional[float]:
+        return self._get_moving_circle_rectangle_impact_time(
+            center_x,
+            center_y,
+            radius,
+            moving_vector,
+            basic_platform.location.x,
+            basic_platform.location.y,
+            basic_platform.location.x + basic_platform.width,
+            basic_platform.location.y + basic_platform.height)
+
+    @classmethod
+    def _get_moving_circle_rectangle_impact_time(
+            cls,
+            center_x: float,
+            center_y: float,
+            radius: float,
+            moving_vector: Vector2D,
+            left: float,
+            top: float,
+            right: float,
+            bottom: float) -> Optional[float]:
+        """Gives first time in [0, 1] when moving circle touches rectangle
+
+        Circle touches rectangle when its center touches rectangle expanded
+        by radius with rounded corners. Such figure is union of two crossed
+        rectangles and four corner circles so time of impact is minimum of
+        center's segment entry times into these six figures. If there is no
+        impact then [None] is returned
+        """
+        # Early exit: rounded figure lies inside fully expanded rectangle
+        if cls._get_segment_rectangle_entry_time(
+                center_x, center_y, moving_vector,
+                left - radius, top - radius,
+                right + radius, bottom + radius) is None:
+            return None
+
+        entry_times: List[Optional[float]] = [
+            cls._get_segment_rectangle_entry_time(
+                center_x, center_y, moving_vector,
+                left - radius, top, right + radius, bottom),
+            cls._get_segment_rectangle_entry_time(
+                center_x, center_y, moving_vector,
+                left, top - radius, right, bottom + radius)]
+
+        for corner_x, corner_y in (
+                (left, top), (right, top), (left, bottom), (right, bottom)):
+            entry_times.append(cls._get_segment_circle_entry_time(
+                center_x, center_y, moving_vector,
+                corner_x, corner_y, radius))
+
+        return min(
+            (entry_time for entry_time in entry_times
+             if entry_time is not None),
+            default=None)
+
+    @staticmethod
+    def _get_segment_rectangle_entry_time(
+            start_x: float,
+            start_y: float,
+            moving_vector: Vector2D,
+            left: float,
+            top: float,
+            right: float,
+            bottom: float) -> Optional[float]:
+        """Slabs method for segment [start, start + moving_vector]
+
+        Returns 0 if segment starts inside rectangle
+        """
+        entry_time: float = 0
+        exit_time: float = 1
+
+        for start, delta, slab_min, slab_max in (
+                (start_x, moving_vector.x, left, right),
+                (start_y, moving_vector.y, top, bottom)):
+            if delta == 0:
+                if not slab_min <= start <= slab_max:
+                    return None
+            else:
+                slab_entry_time: float = (slab_min - start) / delta
+                slab_exit_time: float = (slab_max - start) / delta
+
+                if slab_entry_time > slab_exit_time:
+                    slab_entry_time, slab_exit_time = (
+                        slab_exit_time, slab_entry_time)
+
+                entry_time = max(entry_time, slab_entry_time)
+                exit_time = min(exit_time, slab_exit_time)
+
+                if entry_time > exit_time:
+                    return None
+
+        return entry_time
+
+    @staticmethod
+    def _get_segment_circle_entry_time(
+            start_x: float,
+            start_y: float,
+            moving_vector: Vector2D,
+            circle_center_x: float,
+            circle_center_y: float,
+            radius: float) -> Optional[float]:
+        """Solves |start + t * moving_vector - center| = radius for t
+
+        Returns 0 if segment starts inside circle
+        """
+        relative_x: float = start_x - circle_center_x
+        relative_y: float = start_y - circle_center_y
+
+        # Quadratic equation: a * t^2 + 2 * b * t + c = 0
+        c: float = relative_x ** 2 + relative_y ** 2 - radius ** 2
+
+        if c <= 0:
+            return 0
+
+        a: float = moving_vector.x ** 2 + moving_vector.y ** 2
+        b: float = relative_x * moving_vector.x + relative_y * moving_vector.y
+
+        # Not moving or moving away from circle
+        if a == 0 or b >= 0:
+            return None
+
+        discriminant: float = b ** 2 - a * c
+
+        if discriminant < 0:
+            return None
+
+        entry_time: float = (-b - sqrt(discriminant)) / a
+
+        return entry_time if entry_time <= 1 else None
+
+
+class CollisionsBuffer:
+    """Preallocated storage of collision records
+
+    Every record is (game event, mover index, collided index) in parallel
+    lists. Collided index is index in game map's immovable objects or -1 if
+    there is no collided object (e.g. game field's borders). Buffer is
+    reused between checks: [clear] only resets length and lists grow only
+    when there is more collisions than ever before
+    """
+    _INITIAL_CAPACITY: int = 16
+
+    game_events: List[Optional['GameEvent']]
+    mover_indexes: List[int]
+    collided_indexes: List[int]
+
+    # Number of actual records. Records after it are garbage
+    length: int
+
+    def __init__(self):
+        self.game_events = [None] * self._INITIAL_CAPACITY
+        self.mover_indexes = [-1] * self._INITIAL_CAPACITY
+        self.collided_indexes = [-1] * self._INITIAL_CAPACITY
+
+        self.length = 0
+
+    def clear(self):
+        self.length = 0
+
+    def append(
+            self,
+            game_event: 'GameEvent',
+            mover_index: int,
+            collided_index: int):
+        if self.length == len(self.game_events):
+            self.game_events.extend([None] * self.length)
+            self.mover_indexes.extend([-1] * self.length)
+            self.collided_indexes.extend([-1] * self.length)
+
+        self.game_events[self.length] = game_event
+        self.mover_indexes[self.length] = mover_index
+        self.collided_indexes[self.length] = collided_index
 
-    # Improvement: [_check_circle_projectile_basic_platform_collisions]
-    def _check_projectile_basic_platform_collisions(self):
-        pass
+        self.length += 1
 
 
 class Collision:
+    """Compatibility view of one [CollisionsBuffer] record"""
     # Improvement: Is this field really needed? Game engine always knows
     #  what object was moving when it asks for collisions
     _moving_object: MovableObject
@@ -319,7 +653,7 @@ class GameEvent(Enum):
     PLAYER_BUFF = object()
 
     PROJECTILE_IS_OUT = object()
-    # Improvement: PROJECTILE_BASIC_PLATFORM = object()
+    PROJECTILE_BASIC_PLATFORM = object()
 
 
 class CollisionsProcessorException(ApplicationException):
@@ -1,23 +1,72 @@
 from typing import Set, Callable
-from enum import Enum
 from math import sqrt, sin, cos
-from threading import Lock
-from random import uniform as random_uniform
+from random import Random
+from struct import Struct, error as StructError
 
 from maps import GameMap
 from engine.game_objects import *
 from engine.collisions_processor import (
-    CollisionsProcessor, Collision, GameEvent)
+    CollisionsProcessor, CollisionsBuffer, GameEvent)
+from engine.projectile_store import ProjectileStore, numpy
+from engine.entity_store import EntityHandle
+from engine.type_registry import TypeRegistry
+from engine.instrumentation import TickInstrumentation
+from engine.player_controls import (
+    Weapon,
+    PlayerControls,
+    pack_players_controls,
+    unpack_players_controls)
+from engine.world_snapshot import (
+    WorldSnapshot,
+    WorldSnapshotsRing,
+    WorldSnapshotException,
+    get_buffs_indexes,
+    pack_game_map_state,
+    unpack_game_map_state)
 from engine import ApplicationException
 from user_interface import EventListener
 
 
-# Improvement: ACTUALLY, GameEngine use EventListener methods ONLY for
-#  adding keycodes into [_keys_pressed]. It would be more logical if
-#  [_StateUpdater] and [_GameObjectsSpawner] have these interface
-#  implemented
+# GameEngine uses EventListener methods ONLY for passing input into main
+# player's controls. Other players' controls are got by
+# [get_player_controls]
 class GameEngine(EventListener):
-    class _StateUpdater(EventListener):
+    # World snapshot, little-endian. Game map state follows engine state:
+    #
+    #   header:           map updates count (Q), main player slot (I),
+    #                     main player generation (I)
+    #   players controls: see [pack_players_controls]
+    #   random state:     internal state words (625I), gauss next is given
+    #                     (B), gauss next (d)
+    #   game map:         see [pack_game_map_state]
+    _SNAPSHOT_HEADER: Struct = Struct('<QII')
+    _RANDOM_STATE: Struct = Struct('<625IBd')
+
+    class _StateUpdater:
+        # Movable object's class -> method(self, movable_object, mover_index)
+        MOVABLE_OBJECTS_UPDATERS: TypeRegistry = TypeRegistry(
+            'movable objects updaters')
+
+        # Immovable object's class -> method(self, immovable_object). Objects
+        # without updater (e.g. platforms) are static
+        IMMOVABLE_OBJECTS_UPDATERS: TypeRegistry = TypeRegistry(
+            'immovable objects updaters')
+
+        # Collided object's class (NoneType for game field's borders) ->
+        # method(self, player, player_controls, game_event, collided_object,
+        # move_vector)
+        PLAYER_COLLISIONS_PROCESSORS: TypeRegistry = TypeRegistry(
+            'player collisions processors')
+
+        # Collided object's class (NoneType for game field's borders) ->
+        # method(self, projectile, game_event, collided_object)
+        PROJECTILE_COLLISIONS_PROCESSORS: TypeRegistry = TypeRegistry(
+            'projectile collisions processors')
+
+        # Buff's class -> method(self, player_controls) that applies buff's
+        # effect
+        BUFFS_EFFECTS: TypeRegistry = TypeRegistry('buffs effects')
+
         # Improvement: Relocate some global vars from here to game
         #  objects' classes. E.g., [_PLAYER_MOVE_SPEED] -> [Player]
 
@@ -28,434 +77,583 @@ class GameEngine(EventListener):
         _KEY_CODE_D: int = 68
         _KEY_CODE_SPACE: int = 32
 
-        # Improvement: Add lock because 'set' operation below is NOT
-        #  atomic! Note that it is NOT needed to pass lock into gui,
-        #  because gui already invokes methods here. Right here,
-        #  in [EventListener] implementation, lock should be used
-        _keys_pressed: Set[int]
-
-        # Constant move speed with global multiplier
+        # Constant move speed with player's multiplier
         _PLAYER_MOVE_SPEED: int = 6
-        _PMS_gb_multiplier: float
 
         _GRAVITY_ACCELERATION: Vector2D = Vector2D(0, 2.5)
         _MAX_VERTICAL_VELOCITY: float = 12
 
-        # Constant initial jump velocity with global multiplier
+        # Constant initial jump velocity with player's multiplier
         _INITIAL_JUMP_VELOCITY: float = -25
-        _IJV_gb_multiplier: float
 
         _collisions_processor: CollisionsProcessor
 
         _game_map: GameMap
 
-        # If so then main [Player] can jump
-        #
-        # Optimization: When [Player] is on the ground then no
-        #  collisions with the ground should be initiated
-        _player_is_on_the_ground: bool
-
-        _vertical_velocity: float
+        # Shared with engine
+        _players_controls: Dict[EntityHandle, PlayerControls]
 
         _get_game_loop_iterations_count: Callable[[], int]
 
         def __init__(self, game_engine: 'GameEngine'):
             self._game_map = game_engine._game_map
-            self._keys_pressed = game_engine._keys_pressed
+            self._players_controls = game_engine._players_controls
             self._collisions_processor = CollisionsProcessor(
                 game_engine._game_map)
 
-            self._player_is_on_the_ground = False
-            self._vertical_velocity = 0
-
-            self._PMS_gb_multiplier = 1
-            self._IJV_gb_multiplier = 1
-
             self._get_game_loop_iterations_count = (
                 game_engine.get_map_updates_count)
 
         def update_movable_objects_states(self):
-            self._refresh_global_movement_multipliers()
+            for mover_index, movable_object in enumerate(
+                    self._game_map.movable_objects):
+                movable_object_updater: Optional[Callable] = (
+                    self.MOVABLE_OBJECTS_UPDATERS.get(
+                        movable_object.__class__))
 
-            for movable_object in self._game_map.movable_objects:
-                if isinstance(movable_object, Player):
-                    self._update_player_state(movable_object)
+                # Objects of unknown types are not updated
+                if movable_object_updater is not None:
+                    movable_object_updater(self, movable_object, mover_index)
 
-                elif isinstance(movable_object, ProjectileObject):
-                    self._update_projectile_state(movable_object)
+                # Actual removal is done once per iteration by spawner
+                if movable_object.should_be_despawned:
+                    self._game_map.movable_objects.schedule_removal(
+                        mover_index)
 
-                else:
-                    GameEngineException(
-                        "While processing [update_movable_objects_states] "
-                        "method, got [movable_object] with unknown type: "
-                        + movable_object.__class__.__name__)
+            if self._game_map.projectile_store is not None:
+                self._game_map.projectile_store.update()
 
+        @MOVABLE_OBJECTS_UPDATERS.register(ProjectileObject)
         def _update_projectile_state(
-                self, projectile: ProjectileObject):  # pragma: no cover
-            collisions: List[Collision] = (
-                self._collisions_processor.get_collisions(
-                    projectile, projectile.moving_vector))
-
-            for collision in collisions:
-                self._process_projectile_collision(projectile, collision)
+                self,
+                projectile: ProjectileObject,
+                mover_index: int):  # pragma: no cover
+            collisions_buffer: CollisionsBuffer = (
+                self._collisions_processor.fill_collisions_buffer(
+                    projectile, projectile.moving_vector, mover_index))
+
+            for i in range(collisions_buffer.length):
+                self._process_projectile_collision(
+                    projectile,
+                    collisions_buffer.game_events[i],
+                    self._get_collided_object(
+                        collisions_buffer.collided_indexes[i]))
 
             if not projectile.should_be_despawned:
                 projectile.location += projectile.moving_vector
 
-        @staticmethod
-        def _process_projectile_collision(
+        def _get_collided_object(
+                self, collided_index: int) -> Optional[ImmovableObject]:
+            if collided_index < 0:
+                return None
+            else:
+                return self._game_map.immovable_objects[collided_index]
+
+        def _process_projectile_collision(  # pragma: no cover
+                self,
                 projectile: ProjectileObject,
-                collision: Collision):  # pragma: no cover
-            if collision.collided_object is None:
-                if collision.game_event is GameEvent.PROJECTILE_IS_OUT:
-                    projectile.should_be_despawned = True
-                else:
-                    raise GameEngineException(
-                        '[_process_projectile_collision] switch got '
-                        'wrong [collision]',
-                        '[collided_object] -> [None]',
-                        '(UNKNOWN) [game_event] -> '
-                        + '[' + collision.game_event.name + ']')
+                game_event: GameEvent,
+                collided_object: Optional[ImmovableObject]):
+            collision_processor: Optional[Callable] = (
+                self.PROJECTILE_COLLISIONS_PROCESSORS.get(
+                    collided_object.__class__))
 
-            else:
+            if collision_processor is None:
                 raise GameEngineException(
                     '[_process_projectile_collision] switch got '
                     'wrong [collision]',
                     '(UNKNOWN) [collided_object] -> '
-                    + '[' + collision.collided_object.__class__.__name__
+                    + '[' + collided_object.__class__.__name__
                     + ']')
 
-        def _refresh_global_movement_multipliers(self):
-            self._PMS_gb_multiplier = self._IJV_gb_multiplier = 1
+            collision_processor(self, projectile, game_event, collided_object)
 
-        def _update_player_state(self, player: Player):  # pragma: no cover
-            self._check_player_buffs(player)
+        @PROJECTILE_COLLISIONS_PROCESSORS.register(type(None))
+        def _process_projectile_borders_collision(
+                self,
+                projectile: ProjectileObject,
+                game_event: GameEvent,
+                # collided_object
+                _: None):  # pragma: no cover
+            if game_event is GameEvent.PROJECTILE_IS_OUT:
+                projectile.should_be_despawned = True
+            else:
+                raise GameEngineException(
+                    '[_process_projectile_collision] switch got '
+                    'wrong [collision]',
+                    '[collided_object] -> [None]',
+                    '(UNKNOWN) [game_event] -> '
+                    + '[' + game_event.name + ']')
+
+        @PROJECTILE_COLLISIONS_PROCESSORS.register(BasicPlatform)
+        def _process_projectile_basic_platform_collision(
+                self,
+                projectile: ProjectileObject,
+                game_event: GameEvent,
+                # collided_object
+                _: BasicPlatform):  # pragma: no cover
+            if game_event is GameEvent.PROJECTILE_BASIC_PLATFORM:
+                projectile.should_be_despawned = True
+            else:
+                raise GameEngineException(
+                    '[_process_projectile_collision] switch got '
+                    'wrong [collision]',
+                    '[collided_object] -> [BasicPlatform]',
+                    '(UNKNOWN) [game_event] -> '
+                    + '[' + game_event.name + ']')
+
+        @MOVABLE_OBJECTS_UPDATERS.register(Player)
+        def _update_player_state(
+                self, player: Player, mover_index: int):  # pragma: no cover
+            player_controls: PlayerControls = self._get_player_controls(
+                mover_index)
+
+            self._check_player_buffs(player, player_controls)
 
-            # Copy in case if '_keys_pressed' will be modified during check
-            keys_pressed_copy: Set[int] = set(self._keys_pressed)
+            # Copy in case if keys will be modified during check
+            keys_pressed_copy: Set[int] = set(player_controls.keys_pressed)
             player_move_vector: Vector2D = Vector2D(0, 0)
 
             player_move_vector.x += self._get_horizontal_velocity(
-                keys_pressed_copy)
+                player_controls, keys_pressed_copy)
             player_move_vector.y += self._get_vertical_velocity(
-                keys_pressed_copy)
+                player_controls, keys_pressed_copy)
 
             if player_move_vector.x != 0 or player_move_vector.y != 0:
-                player_collisions: List[Collision] = (
-                    self._collisions_processor.get_collisions(
-                        player, player_move_vector))
+                collisions_buffer: CollisionsBuffer = (
+                    self._collisions_processor.fill_collisions_buffer(
+                        player, player_move_vector, mover_index))
 
-                for collision in player_collisions:
+                for i in range(collisions_buffer.length):
                     self._process_player_collision(
-                        player, collision, player_move_vector)
+                        player,
+                        player_controls,
+                        collisions_buffer.game_events[i],
+                        self._get_collided_object(
+                            collisions_buffer.collided_indexes[i]),
+                        player_move_vector)
 
                 if player_move_vector.y != 0:
-                    self._player_is_on_the_ground = False
+                    player_controls.is_on_the_ground = False
 
                 player.location += player_move_vector
 
+        def _get_player_controls(self, mover_index: int) -> PlayerControls:
+            """Controls of player are made on its first update if player was
+            added to game map not by engine
+            """
+            player_handle: EntityHandle = (
+                self._game_map.movable_objects.get_handle(mover_index))
+            player_controls: Optional[PlayerControls] = (
+                self._players_controls.get(player_handle))
+
+            if player_controls is None:
+                player_controls = PlayerControls()
+
+                self._players_controls[player_handle] = player_controls
+
+            return player_controls
+
         def _process_player_collision(
                 self,
                 player: Player,
-                collision: Collision,
+                player_controls: PlayerControls,
+                game_event: GameEvent,
+                collided_object: Optional[ImmovableObject],
                 player_move_vector: Vector2D):  # pragma: no cover
-            if collision.collided_object is None:
-                if (collision.game_event
-                        is GameEvent.PLAYER_BORDERS_RIGHT):
-                    player_move_vector.x = 0
-                    player.location.x = (
-                        self._game_map.game_field_size.x
-                        # '+ 1' for closest to border drawing
-                        - Player.SIDE_LENGTH + 1)
-
-                elif (collision.game_event
-                      is GameEvent.PLAYER_BORDERS_LEFT):
-                    player_move_vector.x = 0
-                    player.location.x = 0
-
-                elif (collision.game_event
-                      is GameEvent.PLAYER_BORDERS_BOTTOM):
-                    player_move_vector.y = 0
-
-                    # Teleport Player close to game borders
-                    player.location.y = (
-                        self._game_map.game_field_size.y
-                        - Player.SIDE_LENGTH + 1)
-
-                    self._player_is_on_the_ground = True
-
-                elif (collision.game_event
-                      is GameEvent.PLAYER_BORDERS_TOP):
-                    player_move_vector.y = 0
-                    player.location.y = 0
-
-                else:
-                    raise PlayerCollisionsSwitchError(
-                        '[collided_object] is [None], [game_event] is '
-                        'unknown',
-                        collision.game_event.name)
-
-            elif isinstance(collision.collided_object, AbstractBuff):
-                if collision.game_event is GameEvent.PLAYER_BUFF:
-                    collision.collided_object.capture_this_buff(
-                        self._get_game_loop_iterations_count(),
-                        player)
-                else:
-                    raise PlayerCollisionsSwitchError(
-                        '[collided_object] is instance of [AbstractBuff], '
-                        '[game_event] is unknown',
-                        collision.game_event.name)
-
-            elif isinstance(collision.collided_object, BasicPlatform):
-                if (collision.game_event
-                        is GameEvent.PLAYER_TOP_BASIC_PLATFORM):
-                    player_move_vector.y = 0
-
-                    player.location.y = (
-                        collision.collided_object.location.y
-                        + collision.collided_object.height + 1)
-
-                elif (collision.game_event
-                        is GameEvent.PLAYER_BOTTOM_BASIC_PLATFORM):
-                    player_move_vector.y = 0
-
-                    player.location.y = (
-                        collision.collided_object.location.y
-                        - Player.SIDE_LENGTH - 1)
-
-                    self._player_is_on_the_ground = True
-
-                elif (collision.game_event
-                        is GameEvent.PLAYER_RIGHT_BASIC_PLATFORM):
-                    player_move_vector.x = 0
-
-                    player.location.x = (
-                        collision.collided_object.location.x
-                        - Player.SIDE_LENGTH - 1)
-
-                elif (collision.game_event
-                        is GameEvent.PLAYER_LEFT_BASIC_PLATFORM):
-                    player_move_vector.x = 0
-
-                    player.location.x = (
-                        collision.collided_object.location.x
-                        + collision.collided_object.width + 1)
-
-                else:
-                    raise PlayerCollisionsSwitchError(
-                        '[collided_object] is instance of [BasicPlatform],'
-                        '[game_event] is unknown',
-                        collision.game_event.name)
+            collision_processor: Optional[Callable] = (
+                self.PLAYER_COLLISIONS_PROCESSORS.get(
+                    collided_object.__class__))
 
-            else:
+            if collision_processor is None:
                 raise PlayerCollisionsSwitchError(
                     "[collided_object] is unknown",
-                    collision.collided_object.__class__.__name__)
+                    collided_object.__class__.__name__)
 
-        def _check_player_buffs(self, player: Player):
-            for buff in player.current_buffs:
-                if isinstance(buff, SpeedUpBuff):
-                    self._PMS_gb_multiplier = 2
+            collision_processor(
+                self,
+                player,
+                player_controls,
+                game_event,
+                collided_object,
+                player_move_vector)
+
+        @PLAYER_COLLISIONS_PROCESSORS.register(type(None))
+        def _process_player_borders_collision(
+                self,
+                player: Player,
+                player_controls: PlayerControls,
+                game_event: GameEvent,
+                # collided_object
+                _: None,
+                player_move_vector: Vector2D):  # pragma: no cover
+            if (game_event
+                    is GameEvent.PLAYER_BORDERS_RIGHT):
+                player_move_vector.x = 0
+                player.location.x = (
+                    self._game_map.game_field_size.x
+                    # '+ 1' for closest to border drawing
+                    - Player.SIDE_LENGTH + 1)
+
+            elif (game_event
+                  is GameEvent.PLAYER_BORDERS_LEFT):
+                player_move_vector.x = 0
+                player.location.x = 0
+
+            elif (game_event
+                  is GameEvent.PLAYER_BORDERS_BOTTOM):
+                player_move_vector.y = 0
+
+                # Teleport Player close to game borders
+                player.location.y = (
+                    self._game_map.game_field_size.y
+                    - Player.SIDE_LENGTH + 1)
+
+                player_controls.is_on_the_ground = True
+
+            elif (game_event
+                  is GameEvent.PLAYER_BORDERS_TOP):
+                player_move_vector.y = 0
+                player.location.y = 0
+
+            else:
+                raise PlayerCollisionsSwitchError(
+                    '[collided_object] is [None], [game_event] is '
+                    'unknown',
+                    game_event.name)
+
+        @PLAYER_COLLISIONS_PROCESSORS.register(AbstractBuff)
+        def _process_player_buff_collision(
+                self,
+                player: Player,
+                # player_controls
+                __: PlayerControls,
+                game_event: GameEvent,
+                buff: AbstractBuff,
+                # player_move_vector
+                _: Vector2D):  # pragma: no cover
+            if game_event is GameEvent.PLAYER_BUFF:
+                # Buff may be shared with game map template
+                buff = self._game_map.get_writable_immovable_object(buff)
+
+                buff.capture_this_buff(
+                    self._get_game_loop_iterations_count(),
+                    player)
+
+                # Captured buff is hidden while charging
+                self._game_map.invalidate_static_layer()
+            else:
+                raise PlayerCollisionsSwitchError(
+                    '[collided_object] is instance of [AbstractBuff], '
+                    '[game_event] is unknown',
+                    game_event.name)
+
+        @PLAYER_COLLISIONS_PROCESSORS.register(BasicPlatform)
+        def _process_player_basic_platform_collision(
+                self,
+                player: Player,
+                player_controls: PlayerControls,
+                game_event: GameEvent,
+                basic_platform: BasicPlatform,
+                player_move_vector: Vector2D):  # pragma: no cover
+            if (game_event
+                    is GameEvent.PLAYER_TOP_BASIC_PLATFORM):
+                player_move_vector.y = 0
+
+                player.location.y = (
+                    basic_platform.location.y
+                    + basic_platform.height + 1)
+
+            elif (game_event
+                    is GameEvent.PLAYER_BOTTOM_BASIC_PLATFORM):
+                player_move_vector.y = 0
+
+                player.location.y = (
+                    basic_platform.location.y
+                    - Player.SIDE_LENGTH - 1)
+
+                player_controls.is_on_the_ground = True
+
+            elif (game_event
+                    is GameEvent.PLAYER_RIGHT_BASIC_PLATFORM):
+                player_move_vector.x = 0
+
+                player.location.x = (
+                    basic_platform.location.x
+                    - Player.SIDE_LENGTH - 1)
 
-                elif isinstance(buff, JumpHeightUpBuff):
-                    self._IJV_gb_multiplier = 1.5
+            elif (game_event
+                    is GameEvent.PLAYER_LEFT_BASIC_PLATFORM):
+                player_move_vector.x = 0
 
-                else:
+                player.location.x = (
+                    basic_platform.location.x
+                    + basic_platform.width + 1)
+
+            else:
+                raise PlayerCollisionsSwitchError(
+                    '[collided_object] is instance of [BasicPlatform],'
+                    '[game_event] is unknown',
+                    game_event.name)
+
+        def _check_player_buffs(
+                self, player: Player, player_controls: PlayerControls):
+            """Sets player's multipliers by its current buffs"""
+            player_controls.move_speed_multiplier = 1
+            player_controls.jump_velocity_multiplier = 1
+
+            for buff in player.current_buffs:
+                buff_effect: Optional[Callable] = self.BUFFS_EFFECTS.get(
+                    buff.__class__)
+
+                if buff_effect is None:
                     raise GameEngineException(
                         "[_check_player_buffs] method got [buff] with "
                         "unknown type: " + buff.__class__.__name__)
 
+                buff_effect(self, player_controls)
+
+        @BUFFS_EFFECTS.register(SpeedUpBuff)
+        def _apply_speed_up_buff(self, player_controls: PlayerControls):
+            player_controls.move_speed_multiplier = 2
+
+        @BUFFS_EFFECTS.register(JumpHeightUpBuff)
+        def _apply_jump_height_up_buff(
+                self, player_controls: PlayerControls):
+            player_controls.jump_velocity_multiplier = 1.5
+
         def _get_horizontal_velocity(
-                self, keys_pressed: Set[int]) -> float:
+                self,
+                player_controls: PlayerControls,
+                keys_pressed: Set[int]) -> float:
             """Method gets player's current horizontal velocity"""
             input_move_vector: Vector2D = Vector2D(0, 0)
 
             if self._KEY_CODE_A in keys_pressed:
                 input_move_vector.x += (
-                    -self._PLAYER_MOVE_SPEED * self._PMS_gb_multiplier)
+                    -self._PLAYER_MOVE_SPEED
+                    * player_controls.move_speed_multiplier)
 
             if self._KEY_CODE_D in keys_pressed:
                 input_move_vector.x += (
-                    self._PLAYER_MOVE_SPEED * self._PMS_gb_multiplier)
+                    self._PLAYER_MOVE_SPEED
+                    * player_controls.move_speed_multiplier)
 
             return input_move_vector.x
 
-        def _get_vertical_velocity(self, keys_pressed: Set[int]) -> float:
+        def _get_vertical_velocity(
+                self,
+                player_controls: PlayerControls,
+                keys_pressed: Set[int]) -> float:
             """Method calculates current player's vertical velocity"""
             if (
                     self._KEY_CODE_SPACE not in keys_pressed
-                    and self._player_is_on_the_ground):
-                self._vertical_velocity = self._GRAVITY_ACCELERATION.y
+                    and player_controls.is_on_the_ground):
+                player_controls.vertical_velocity = (
+                    self._GRAVITY_ACCELERATION.y)
             elif (
                     self._KEY_CODE_SPACE in keys_pressed
-                    and self._player_is_on_the_ground):
-                self._vertical_velocity = (
-                    self._INITIAL_JUMP_VELOCITY * self._IJV_gb_multiplier)
-                self._player_is_on_the_ground = False
-
-            elif (self._vertical_velocity + self._GRAVITY_ACCELERATION.y
+                    and player_controls.is_on_the_ground):
+                player_controls.vertical_velocity = (
+                    self._INITIAL_JUMP_VELOCITY
+                    * player_controls.jump_velocity_multiplier)
+                player_controls.is_on_the_ground = False
+
+            elif (player_controls.vertical_velocity
+                  + self._GRAVITY_ACCELERATION.y
                   < self._MAX_VERTICAL_VELOCITY):
-                self._vertical_velocity += self._GRAVITY_ACCELERATION.y
+                player_controls.vertical_velocity += (
+                    self._GRAVITY_ACCELERATION.y)
 
             else:
-                self._vertical_velocity = self._MAX_VERTICAL_VELOCITY
+                player_controls.vertical_velocity = (
+                    self._MAX_VERTICAL_VELOCITY)
 
-            return self._vertical_velocity
+            return player_controls.vertical_velocity
 
         def update_immovable_objects_states(self):  # pragma: no cover
             for immovable_object in self._game_map.immovable_objects:
-                if isinstance(immovable_object, AbstractBuff):
-                    self._update_buff_state(immovable_object)
+                immovable_object_updater: Optional[Callable] = (
+                    self.IMMOVABLE_OBJECTS_UPDATERS.get(
+                        immovable_object.__class__))
 
-                else:
-                    GameEngineException(
-                        "[update_immovable_objects_states] method got "
-                        "[immovable_object] with unknown type: "
-                        + immovable_object.__class__.__name__)
+                if immovable_object_updater is not None:
+                    immovable_object_updater(self, immovable_object)
 
+        @IMMOVABLE_OBJECTS_UPDATERS.register(AbstractBuff)
         def _update_buff_state(self, buff: AbstractBuff):
+            buff_was_charging: bool = buff.is_charging()
+
             buff.check_buff_expiration(
                 self._get_game_loop_iterations_count())
 
-    class _GameObjectsSpawner(EventListener):
-        """Spawns AND despawns game objects"""
-        class _Weapons(Enum):
-            Handgun: int = 1
-            MachineGun: int = 2
-
-        _KEY_CODE_1: int = 49
-        _KEY_CODE_2: int = 50
+            if buff.is_charging() != buff_was_charging:
+                self._game_map.invalidate_static_layer()
 
+    class _GameObjectsSpawner:
+        """Spawns AND despawns game objects"""
         _game_map: GameMap
 
         _get_game_loop_iterations_count: Callable[[], int]
 
-        # lmb (left mouse button) tkinter event
-        _lmb_event: Optional
-        _lmb_event_lock: Lock
+        # Shared with engine
+        _players_controls: Dict[EntityHandle, PlayerControls]
 
-        _selected_weapon: _Weapons
+        # Machine gun scatter. Seeded for replays
+        _random: Random
 
-        # One click = one projectile from handgun
-        _handgun_can_fire: bool
+        # Total for instrumentation. Plain addition is cheap enough to be
+        # always on
+        spawned_objects_count: int
 
         def __init__(self, game_engine: 'GameEngine'):
             self._game_map = game_engine._game_map
             self._get_game_loop_iterations_count = (
                 game_engine.get_map_updates_count)
+            self._players_controls = game_engine._players_controls
+            self._random = game_engine._random
 
-            self._lmb_event_lock = Lock()
-            self._lmb_event = None
+            self.spawned_objects_count = 0
 
-            self._selected_weapon = self._Weapons.Handgun
+        def spawn_player_projectiles(self):
+            """Every player fires by its own controls
 
-            self._handgun_can_fire = True
+            Players fire in order of their controls, so machine gun scatter
+            is the same in replays
+            """
+            for player_handle, player_controls in (
+                    self._players_controls.items()):
+                current_lmb_event = player_controls.get_lmb_event()
 
-        def lmb_event_happened(self, event):  # pragma: no cover
-            with self._lmb_event_lock:
-                self._lmb_event = event
+                if current_lmb_event is None:
+                    continue
 
-        def key_pressed(self, key_code: int):  # pragma: no cover
-            if key_code == self._KEY_CODE_1:
-                self._selected_weapon = self._Weapons.Handgun
+                player: Optional[Player] = self._game_map.movable_objects.get(
+                    player_handle)
 
-            elif key_code == self._KEY_CODE_2:
-                self._selected_weapon = self._Weapons.MachineGun
+                # Player is removed from game map
+                if player is not None:
+                    self._spawn_player_projectile(
+                        player, player_controls, current_lmb_event)
 
-        def spawn_player_projectiles(self):
-            with self._lmb_event_lock:
-                current_lmb_event = self._lmb_event
-
-            if current_lmb_event is not None:
-                moving_unit_vector: Vector2D = (
-                    self._get_player_hand_cursor_unit_vector(
-                        Vector2D(
-                            current_lmb_event.x, current_lmb_event.y)))
-                spawn_multiplier: float = 20
-                spawn_location: Vector2D = Vector2D(
-                    self._game_map.movable_objects[0].location.x
-                    + Player.HAND_LOCATION.x
-                    + moving_unit_vector.x * spawn_multiplier,
-                    self._game_map.movable_objects[0].location.y
-                    + Player.HAND_LOCATION.y
-                    + moving_unit_vector.y * spawn_multiplier)
-
-                if self._selected_weapon is self._Weapons.Handgun:
-                    if current_lmb_event.type.name == 'ButtonRelease':
-                        self._handgun_can_fire = True
-
-                    elif (current_lmb_event.type.name == 'ButtonPress'
-                            and self._handgun_can_fire):
-                        moving_vector: Vector2D = Vector2D(
-                            moving_unit_vector.x
-                            * ProjectileObject.PROJECTILE_SPEED,
-                            moving_unit_vector.y
-                            * ProjectileObject.PROJECTILE_SPEED)
-
-                        self._game_map.movable_objects.append(
-                            HandgunProjectile(
-                                moving_vector, spawn_location))
-
-                        self._handgun_can_fire = False
-
-                elif self._selected_weapon is self._Weapons.MachineGun:
-                    if (current_lmb_event.type.name
-                            in ['ButtonPress', 'Motion']):
-                        moving_vector: Vector2D = Vector2D(0, 0)
-
-                        # In radians
-                        rotation_angle: float = random_uniform(
-                            -MachineGunProjectile.ANGLE_SCATTER_RADIUS,
-                            MachineGunProjectile.ANGLE_SCATTER_RADIUS)
-
-                        moving_vector.x = (
-                            cos(rotation_angle)
-                            * moving_unit_vector.x
-                            * ProjectileObject.PROJECTILE_SPEED
-                            - sin(rotation_angle)
-                            * moving_unit_vector.y
-                            * ProjectileObject.PROJECTILE_SPEED)
-
-                        moving_vector.y = (
-                            sin(rotation_angle)
-                            * moving_unit_vector.x
-                            * ProjectileObject.PROJECTILE_SPEED
-                            + cos(rotation_angle)
-                            * moving_unit_vector.y
-                            * ProjectileObject.PROJECTILE_SPEED)
-
-                        self._game_map.movable_objects.append(
-                            MachineGunProjectile(
-                                moving_vector, spawn_location))
+        def _spawn_player_projectile(
+                self,
+                player: Player,
+                player_controls: PlayerControls,
+                current_lmb_event):
+            moving_unit_vector: Optional[Vector2D] = (
+                self._get_player_hand_cursor_unit_vector(
+                    player,
+                    Vector2D(current_lmb_event.x, current_lmb_event.y)))
+
+            # Cursor right on player's hand gives no direction, so nothing
+            # is fired. Released button still recharges handgun
+            if moving_unit_vector is None:
+                if (player_controls.selected_weapon is Weapon.Handgun
+                        and current_lmb_event.type.name == 'ButtonRelease'):
+                    player_controls.handgun_can_fire = True
+
+                return
+
+            spawn_multiplier: float = 20
+            spawn_location: Vector2D = Vector2D(
+                player.location.x
+                + Player.HAND_LOCATION.x
+                + moving_unit_vector.x * spawn_multiplier,
+                player.location.y
+                + Player.HAND_LOCATION.y
+                + moving_unit_vector.y * spawn_multiplier)
+
+            if player_controls.selected_weapon is Weapon.Handgun:
+                if current_lmb_event.type.name == 'ButtonRelease':
+                    player_controls.handgun_can_fire = True
+
+                elif (current_lmb_event.type.name == 'ButtonPress'
+                        and player_controls.handgun_can_fire):
+                    moving_vector: Vector2D = Vector2D(
+                        moving_unit_vector.x
+                        * ProjectileObject.PROJECTILE_SPEED,
+                        moving_unit_vector.y
+                        * ProjectileObject.PROJECTILE_SPEED)
+
+                    self._spawn_projectile(
+                        HandgunProjectile(
+                            moving_vector, spawn_location))
+
+                    player_controls.handgun_can_fire = False
+
+            elif player_controls.selected_weapon is Weapon.MachineGun:
+                if (current_lmb_event.type.name
+                        in ['ButtonPress', 'Motion']):
+                    moving_vector: Vector2D = Vector2D(0, 0)
+
+                    # In radians
+                    rotation_angle: float = self._random.uniform(
+                        -MachineGunProjectile.ANGLE_SCATTER_RADIUS,
+                        MachineGunProjectile.ANGLE_SCATTER_RADIUS)
+
+                    moving_vector.x = (
+                        cos(rotation_angle)
+                        * moving_unit_vector.x
+                        * ProjectileObject.PROJECTILE_SPEED
+                        - sin(rotation_angle)
+                        * moving_unit_vector.y
+                        * ProjectileObject.PROJECTILE_SPEED)
+
+                    moving_vector.y = (
+                        sin(rotation_angle)
+                        * moving_unit_vector.x
+                        * ProjectileObject.PROJECTILE_SPEED
+                        + cos(rotation_angle)
+                        * moving_unit_vector.y
+                        * ProjectileObject.PROJECTILE_SPEED)
+
+                    self._spawn_projectile(
+                        MachineGunProjectile(
+                            moving_vector, spawn_location))
+
+        def _spawn_projectile(self, projectile: ProjectileObject):
+            self.spawned_objects_count += 1
+
+            if self._game_map.projectile_store is not None:
+                self._game_map.projectile_store.add(projectile)
+            else:
+                self._game_map.movable_objects.append(projectile)
 
+        @staticmethod
         def _get_player_hand_cursor_unit_vector(
-                self, cursor_location: Vector2D) -> Vector2D:
+                player: Player,
+                cursor_location: Vector2D) -> Optional[Vector2D]:
+            """[None] if cursor is right on player's hand"""
             abs_player_hand_location: Vector2D = (
-                self._game_map.movable_objects[0].location
-                + Player.HAND_LOCATION)
+                player.location + Player.HAND_LOCATION)
 
             non_unit_vector: Vector2D = (
                 cursor_location - abs_player_hand_location)
             non_unit_vector_length: float = sqrt(
                 non_unit_vector.x ** 2 + non_unit_vector.y ** 2)
 
+            if non_unit_vector_length == 0:
+                return None
+
             return Vector2D(
                 non_unit_vector.x / non_unit_vector_length,
                 non_unit_vector.y / non_unit_vector_length)
 
         def check_movable_objects_for_despawning(self):
-            i: int = 0
-
-            while i < len(self._game_map.movable_objects):
-                movable_object: MovableObject = (
-                    self._game_map.movable_objects[i])
-
-                if movable_object.should_be_despawned:
-                    self._game_map.movable_objects.remove(movable_object)
-                else:
-                    i += 1
-
-    _keys_pressed: Set[int]
+            """Removes objects scheduled for despawning in this iteration
+
+            O(despawned objects count) because of swap-removes inside
+            generational store. Controls of despawned players are dropped
+            too, their handles are stale forever
+            """
+            if self._game_map.movable_objects.compact() > 0:
+                for player_handle in [
+                        player_handle
+                        for player_handle in self._players_controls
+                        if self._game_map.movable_objects.get(
+                            player_handle) is None]:
+                    del self._players_controls[player_handle]
 
     # Not seconds because of possible lags. If lags are presented then all game
     # model will work fine and consistently without leaps that can occur
@@ -472,60 +670,407 @@ class GameEngine(EventListener):
     _state_updater: _StateUpdater
     _game_objects_spawner: _GameObjectsSpawner
 
-    def __init__(self, input_game_map: GameMap):
-        self._game_loop_iterations_count = 0
+    # [Player] that is controlled by keys and mouse
+    _main_player_handle: EntityHandle
 
-        self._keys_pressed = set()
-        self._lmb_pressed_event = None
+    # Input and movement state of every player, in order of players' adding.
+    # Shared with state updater and spawner
+    _players_controls: Dict[EntityHandle, PlayerControls]
+
+    # The only source of randomness in game model. Same seed and same inputs
+    # on the same ticks give the same game
+    _random: Random
+
+    # [None] if disabled. Not instrumented updates do NOT measure anything
+    _instrumentation: Optional[TickInstrumentation]
+
+    # [None] if disabled. Otherwise snapshot is taken after every update
+    _world_snapshots: Optional[WorldSnapshotsRing]
+
+    # Buffs indexes are cached for the immovable objects list they were got
+    # from. The list is replaced, e.g., by chunks streaming
+    _snapshot_immovable_objects: Optional[List[ImmovableObject]]
+    _snapshot_buffs_indexes: List[int]
+
+    def __init__(
+            self,
+            input_game_map: GameMap,
+            input_use_projectile_store: bool = False,
+            input_random_seed: Optional[int] = None):
+        """[input_use_projectile_store] turns on NumPy projectiles processing
+
+        [input_random_seed] is [None] for seeding from system sources
+        """
+        self._random = Random(input_random_seed)
+
+        self._players_controls = {}
 
         self._map_updates_count = 0
 
+        self._instrumentation = None
+
+        self._world_snapshots = None
+        self._snapshot_immovable_objects = None
+        self._snapshot_buffs_indexes = []
+
         self._game_map = input_game_map
 
+        if input_use_projectile_store:
+            self._init_projectile_store()
+
         self._state_updater = self._StateUpdater(self)
         self._game_objects_spawner = self._GameObjectsSpawner(self)
 
-        # If game map without movable objects is given then engine spawns
-        # player on (0, 0) coordinates
-        if len(self._game_map.movable_objects) == 0:
-            self._game_map.movable_objects.append(Player(Vector2D(0, 0)))
+        self._init_main_player_handle()
+        self._init_players_controls()
+
+    def _init_main_player_handle(self):
+        """Main player is the first [Player] in movable objects
+
+        If game map without players is given then engine spawns player on
+        (0, 0) coordinates
+        """
+        for dense_index in range(len(self._game_map.movable_objects)):
+            if isinstance(self._game_map.movable_objects[dense_index], Player):
+                self._main_player_handle = (
+                    self._game_map.movable_objects.get_handle(dense_index))
+
+                return
+
+        self._main_player_handle = self._game_map.movable_objects.add(
+            Player(Vector2D(0, 0)))
+
+    def _init_players_controls(self):
+        """Every [Player] of game map gets controls"""
+        for dense_index in range(len(self._game_map.movable_objects)):
+            if isinstance(self._game_map.movable_objects[dense_index], Player):
+                self._players_controls[
+                    self._game_map.movable_objects.get_handle(dense_index)] = (
+                    PlayerControls())
+
+    def _init_projectile_store(self):
+        """Moves all projectiles of game map into projectile store"""
+        if numpy is None:
+            raise GameEngineException(
+                'Projectile store is requested but NumPy is not installed')
+
+        self._game_map.projectile_store = ProjectileStore(
+            self._game_map.game_field_size,
+            self._game_map.immovable_objects)
+
+        for dense_index in range(len(self._game_map.movable_objects)):
+            movable_object: MovableObject = (
+                self._game_map.movable_objects[dense_index])
+
+            if isinstance(movable_object, ProjectileObject):
+                self._game_map.projectile_store.add(movable_object)
+                self._game_map.movable_objects.schedule_removal(dense_index)
+
+        self._game_map.movable_objects.compact()
 
     def key_pressed(self, key_code: int):  # pragma: no cover
-        """Adds pressed key to 'keysPressed' set
+        """Passes pressed key to main player's controls
 
         GUI thread invokes this method
         """
-        self._keys_pressed.add(key_code)
+        main_player_controls: Optional[PlayerControls] = (
+            self._players_controls.get(self._main_player_handle))
+
+        # Despawned main player has no controls
+        if main_player_controls is not None:
+            main_player_controls.key_pressed(key_code)
 
     def key_released(self, key_code: int):  # pragma: no cover
-        """Subtracts pressed key from 'keysPressed' set
+        """Passes released key to main player's controls
 
         GUI thread invokes this method
         """
-        self._keys_pressed.discard(key_code)
+        main_player_controls: Optional[PlayerControls] = (
+            self._players_controls.get(self._main_player_handle))
+
+        if main_player_controls is not None:
+            main_player_controls.key_released(key_code)
+
+    def lmb_event_happened(self, event):  # pragma: no cover
+        main_player_controls: Optional[PlayerControls] = (
+            self._players_controls.get(self._main_player_handle))
 
-    # Now there is only one main instance of [Player] that can move
-    # and do stuff! It's always first element in [movable_objects] array
+        if main_player_controls is not None:
+            main_player_controls.lmb_event_happened(event)
+
+    # Every [Player] moves and fires by its own controls. Keys and mouse
+    # control main one, see [get_main_player]
     def update_map(self):  # pragma: no cover
-        """Main update method that should be invoked from the gameloop"""
+        """Main update method that should be invoked from the gameloop
+
+        Phases are timed only if instrumentation is enabled
+        """
+        # Instrumentation may be switched by other thread during update
+        instrumentation: Optional[TickInstrumentation] = (
+            self._instrumentation)
+
+        if instrumentation is not None:
+            totals_before: Tuple[int, int, int, int] = (
+                self._get_instrumentation_totals())
+
+            instrumentation.start_tick()
+
+        if self._game_map.chunks_streamer is not None:
+            self._game_map.chunks_streamer.update(self._game_map)
+
+        self._end_phase(instrumentation, 'stream_chunks')
+
         # Improvement: Is this place optimal for player's projectiles
         #  spawning?
         self._game_objects_spawner.spawn_player_projectiles()
 
+        self._end_phase(instrumentation, 'spawn_player_projectiles')
+
         # Improvement:
         #  self._state_updater.update_interface_objects_states()
 
         self._state_updater.update_immovable_objects_states()
 
+        self._end_phase(instrumentation, 'update_immovable_objects')
+
         self._state_updater.update_movable_objects_states()
 
+        self._end_phase(instrumentation, 'update_movable_objects')
+
         # Improvement: Is this place optimal for deletion checking?
         self._game_objects_spawner.check_movable_objects_for_despawning()
 
+        self._end_phase(instrumentation, 'despawn_movable_objects')
+
         self._map_updates_count += 1
 
+        if self._world_snapshots is not None:
+            self._world_snapshots.add(self.capture_world_snapshot())
+
+        self._end_phase(instrumentation, 'capture_world_snapshot')
+
+        if instrumentation is not None:
+            instrumentation.end_tick()
+
+            self._increase_counters(instrumentation, totals_before)
+
+    @staticmethod
+    def _end_phase(
+            instrumentation: Optional[TickInstrumentation],
+            phase_name: str):
+        """Phase marker of [update_map]. Does nothing if not instrumented"""
+        if instrumentation is not None:
+            instrumentation.end_phase(phase_name)
+
+    def _get_instrumentation_totals(self) -> Tuple[int, int, int, int]:
+        """Collision checks, collisions, spawned objects and objects counts"""
+        collisions_processor: CollisionsProcessor = (
+            self._state_updater._collisions_processor)
+
+        return (
+            collisions_processor.checks_count,
+            collisions_processor.collisions_count,
+            self._game_objects_spawner.spawned_objects_count,
+            self._get_objects_count())
+
+    def _increase_counters(
+            self,
+            instrumentation: TickInstrumentation,
+            totals_before: Tuple[int, int, int, int]):
+        (checks_count_before,
+         collisions_count_before,
+         spawned_objects_count_before,
+         objects_count_before) = totals_before
+        (checks_count,
+         collisions_count,
+         spawned_objects_count,
+         objects_count) = self._get_instrumentation_totals()
+
+        spawned_objects_count -= spawned_objects_count_before
+
+        instrumentation.increase_counter(
+            'collision_checks', checks_count - checks_count_before)
+        instrumentation.increase_counter(
+            'collisions', collisions_count - collisions_count_before)
+        instrumentation.increase_counter(
+            'spawned_objects', spawned_objects_count)
+
+        # Projectile store despawns during movable objects update
+        instrumentation.increase_counter(
+            'despawned_objects',
+            objects_count_before + spawned_objects_count - objects_count)
+
+    def _get_objects_count(self) -> int:
+        """Movable objects count including stored projectiles"""
+        if self._game_map.projectile_store is None:
+            return len(self._game_map.movable_objects)
+        else:
+            return (
+                len(self._game_map.movable_objects)
+                + len(self._game_map.projectile_store))
+
+    def enable_instrumentation(
+            self,
+            histogram_capacity: int = 1024) -> TickInstrumentation:
+        """Starts timing of every next update. Gives collected data holder
+
+        Histograms keep last [histogram_capacity] updates
+        """
+        self._instrumentation = TickInstrumentation(histogram_capacity)
+
+        return self._instrumentation
+
+    def disable_instrumentation(self):
+        self._instrumentation = None
+
+    def get_instrumentation(self) -> Optional[TickInstrumentation]:
+        return self._instrumentation
+
+    def _get_snapshot_buffs_indexes(self) -> List[int]:
+        if (self._snapshot_immovable_objects
+                is not self._game_map.immovable_objects):
+            self._snapshot_immovable_objects = (
+                self._game_map.immovable_objects)
+            self._snapshot_buffs_indexes = get_buffs_indexes(
+                self._game_map.immovable_objects)
+
+        return self._snapshot_buffs_indexes
+
+    def capture_world_snapshot(self) -> WorldSnapshot:
+        """Packs whole simulation state between updates
+
+        Restored snapshot continues the game exactly as it was going from
+        the moment of capture. Immovable objects except buffs' state are NOT
+        captured, so snapshot is restorable only on the same game map. For
+        chunked maps it means the same resident chunks
+        """
+        _, random_internal_state, gauss_next = self._random.getstate()
+
+        return WorldSnapshot(
+            self._map_updates_count,
+            b''.join((
+                self._SNAPSHOT_HEADER.pack(
+                    self._map_updates_count,
+                    self._main_player_handle.slot,
+                    self._main_player_handle.generation),
+                pack_players_controls(self._players_controls),
+                self._RANDOM_STATE.pack(
+                    *random_internal_state,
+                    gauss_next is not None,
+                    0.0 if gauss_next is None else gauss_next),
+                pack_game_map_state(
+                    self._game_map, self._get_snapshot_buffs_indexes()))))
+
+    def restore_world_snapshot(self, snapshot: WorldSnapshot):
+        """Sets state captured by [capture_world_snapshot]
+
+        References to movable objects (e.g. main player) and to players'
+        controls that were got before restoring are stale, handles are valid
+        """
+        state: memoryview = memoryview(snapshot.data)
+
+        try:
+            (map_updates_count,
+             main_player_slot,
+             main_player_generation) = self._SNAPSHOT_HEADER.unpack_from(
+                state)
+
+            players_controls, random_state_offset = unpack_players_controls(
+                state, self._SNAPSHOT_HEADER.size)
+
+            random_state: Tuple = self._RANDOM_STATE.unpack_from(
+                state, random_state_offset)
+        except StructError:
+            raise WorldSnapshotException('World snapshot is too short')
+
+        # Game map is restored first: it can fail on wrong snapshot
+        unpack_game_map_state(
+            self._game_map,
+            self._get_snapshot_buffs_indexes(),
+            state,
+            random_state_offset + self._RANDOM_STATE.size)
+
+        self._map_updates_count = map_updates_count
+        self._main_player_handle = EntityHandle(
+            main_player_slot, main_player_generation)
+
+        # Dict is shared with state updater and spawner
+        self._players_controls.clear()
+        self._players_controls.update(players_controls)
+
+        # Random is shared with spawner
+        self._random.setstate((
+            3,
+            random_state[:-2],
+            random_state[-1] if random_state[-2] else None))
+
+    def enable_world_snapshots(
+            self, ring_capacity: int = 128) -> WorldSnapshotsRing:
+        """Starts capturing of snapshot after every update
+
+        Current state is captured at once, so it is reachable by [rollback]
+        """
+        self._world_snapshots = WorldSnapshotsRing(ring_capacity)
+        self._world_snapshots.add(self.capture_world_snapshot())
+
+        return self._world_snapshots
+
+    def disable_world_snapshots(self):
+        self._world_snapshots = None
+
+    def get_world_snapshots(self) -> Optional[WorldSnapshotsRing]:
+        return self._world_snapshots
+
+    def rollback(self, tick: int):
+        """Restores snapshot of [tick] from ring. Newer ones are discarded"""
+        if self._world_snapshots is None:
+            raise GameEngineException('World snapshots are not enabled')
+
+        snapshot: Optional[WorldSnapshot] = self._world_snapshots.get(tick)
+
+        if snapshot is None:
+            raise GameEngineException(
+                'No world snapshot for tick: ' + str(tick))
+
+        self.restore_world_snapshot(snapshot)
+        self._world_snapshots.discard_newer(tick)
+
     def get_event_listeners(self) -> List[EventListener]:
-        return [self, self._state_updater, self._game_objects_spawner]
+        return [self]
+
+    def get_main_player(self) -> Player:
+        return self._game_map.movable_objects.get(self._main_player_handle)
+
+    def add_player(self, location: Vector2D) -> EntityHandle:
+        """Spawns player with its own controls. Gives player's handle"""
+        player_handle: EntityHandle = self._game_map.movable_objects.add(
+            Player(location))
+
+        self._players_controls[player_handle] = PlayerControls()
+
+        return player_handle
+
+    def get_player_controls(
+            self, player_handle: EntityHandle) -> PlayerControls:
+        player_controls: Optional[PlayerControls] = (
+            self._players_controls.get(player_handle))
+
+        if player_controls is None:
+            raise GameEngineException(
+                'No player controls for handle: ' + str(player_handle))
+
+        return player_controls
+
+    def get_players_handles(self) -> List[EntityHandle]:
+        """Handles of players that have controls, in order of their adding
+
+        Player that is added to game map not by engine gets controls on its
+        first update
+        """
+        return list(self._players_controls)
+
+    def get_game_map(self) -> GameMap:
+        return self._game_map
 
     def get_map_updates_count(self) -> int:
         return self._map_updates_count
@@ -0,0 +1,172 @@
+from typing import (
+    TypeVar, Generic, List, Optional, Iterator, Iterable, NamedTuple, Tuple)
+
+
+StoredObject = TypeVar('StoredObject')
+
+
+class EntityHandle(NamedTuple):
+    """Stable reference to object inside [GenerationalStore]
+
+    Slot is reused after object removal but generation is increased, so old
+    handles of removed objects never point to new objects
+    """
+    slot: int
+    generation: int
+
+
+class GenerationalStore(Generic[StoredObject]):
+    """Dense list of objects with stable generational handles
+
+    Objects are kept in dense list for fast iteration. Removal moves the last
+    object into the place of removed one (swap-remove), so it is O(1) but
+    order of objects is NOT preserved. Slots of removed objects go to free
+    list and are reused by next additions.
+
+    Removals during iteration should be scheduled with [schedule_removal]
+    and applied once with [compact]: removing k objects is O(k)
+    """
+    _objects: List[StoredObject]
+
+    # Dense index -> slot
+    _dense_slots: List[int]
+
+    # Slot -> dense index. -1 if slot is free
+    _slot_dense_indexes: List[int]
+    _slot_generations: List[int]
+    _free_slots: List[int]
+
+    _pending_removals: List[EntityHandle]
+
+    def __init__(self, input_objects: Iterable[StoredObject] = ()):
+        self._objects = []
+        self._dense_slots = []
+        self._slot_dense_indexes = []
+        self._slot_generations = []
+        self._free_slots = []
+        self._pending_removals = []
+
+        for stored_object in input_objects:
+            self.add(stored_object)
+
+    def add(self, stored_object: StoredObject) -> EntityHandle:
+        if len(self._free_slots) > 0:
+            slot: int = self._free_slots.pop()
+        else:
+            slot = len(self._slot_generations)
+
+            self._slot_generations.append(0)
+            self._slot_dense_indexes.append(-1)
+
+        self._slot_dense_indexes[slot] = len(self._objects)
+        self._objects.append(stored_object)
+        self._dense_slots.append(slot)
+
+        return EntityHandle(slot, self._slot_generations[slot])
+
+    # List-like name for code that treats movable objects as list
+    append = add
+
+    def get(self, handle: EntityHandle) -> Optional[StoredObject]:
+        """Gives [None] if object of given handle is already removed"""
+        if (handle.slot < len(self._slot_generations)
+                and self._slot_generations[handle.slot] == handle.generation
+                and self._slot_dense_indexes[handle.slot] >= 0):
+            return self._objects[self._slot_dense_indexes[handle.slot]]
+        else:
+            return None
+
+    def get_handle(self, dense_index: int) -> EntityHandle:
+        slot: int = self._dense_slots[dense_index]
+
+        return EntityHandle(slot, self._slot_generations[slot])
+
+    def remove(self, handle: EntityHandle):
+        """Immediate swap-remove. Does nothing for stale handle"""
+        if self.get(handle) is None:
+            return
+
+        dense_index: int = self._slot_dense_indexes[handle.slot]
+        last_dense_index: int = len(self._objects) - 1
+
+        if dense_index != last_dense_index:
+            moved_slot: int = self._dense_slots[last_dense_index]
+
+            self._objects[dense_index] = self._objects[last_dense_index]
+            self._dense_slots[dense_index] = moved_slot
+            self._slot_dense_indexes[moved_slot] = dense_index
+
+        self._objects.pop()
+        self._dense_slots.pop()
+
+        self._slot_dense_indexes[handle.slot] = -1
+        self._slot_generations[handle.slot] += 1
+        self._free_slots.append(handle.slot)
+
+    def schedule_removal(self, dense_index: int):
+        """Removal that is safe during iteration. See [compact]"""
+        self._pending_removals.append(self.get_handle(dense_index))
+
+    def compact(self) -> int:
+        """Applies all scheduled removals. Gives number of removed objects
+
+        Handle scheduled twice is removed once: second removal is stale
+        """
+        removals_count: int = 0
+
+        for handle in self._pending_removals:
+            if self.get(handle) is not None:
+                self.remove(handle)
+
+                removals_count += 1
+
+        self._pending_removals.clear()
+
+        return removals_count
+
+    def get_slots_state(self) -> Tuple[List[int], List[int], List[int]]:
+        """Dense slots, slots generations and free slots
+
+        Together with objects they are the whole store state between
+        iterations. Lists are store's own and must NOT be modified
+        """
+        return self._dense_slots, self._slot_generations, self._free_slots
+
+    def set_state(
+            self,
+            objects: List[StoredObject],
+            dense_slots: List[int],
+            slot_generations: List[int],
+            free_slots: List[int]):
+        """Restores state given by [get_slots_state] with its objects
+
+        Objects must be in dense order: [objects[i]] takes [dense_slots[i]]
+        """
+        self._objects = objects
+        self._dense_slots = dense_slots
+        self._slot_generations = slot_generations
+        self._free_slots = free_slots
+        self._pending_removals = []
+
+        self._slot_dense_indexes = [-1] * len(slot_generations)
+
+        for dense_index, slot in enumerate(dense_slots):
+            self._slot_dense_indexes[slot] = dense_index
+
+    def clear(self):
+        for dense_index in range(len(self._objects) - 1, -1, -1):
+            self.remove(self.get_handle(dense_index))
+
+        self._pending_removals.clear()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self) -> Iterator[StoredObject]:
+        return iter(self._objects)
+
+    def __getitem__(self, dense_index: int) -> StoredObject:
+        return self._objects[dense_index]
+
+    def __repr__(self) -> str:
+        return f'GenerationalStore({self._objects!r})'
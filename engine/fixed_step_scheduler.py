@@ -0,0 +1,155 @@
+from time import perf_counter, sleep as time_sleep
+from typing import Callable, Optional, Any
+
+from engine import ApplicationException
+
+
+class FixedStepScheduler:
+    """Fixed timestep game loop on monotonic clock
+
+    Real time goes to accumulator and every whole tick duration in it is one
+    game map update, so game model always runs at tick rate speed no matter
+    how long rendering takes. If updates fall behind then several updates
+    are made in a row with only one render after them (frame skipping).
+
+    Catching up is bounded: if more than [max_catch_up_ticks] are due at once
+    (e.g. after system hang) then extra ticks are dropped instead of
+    freezing the game with a long series of updates
+    """
+    # Float error of accumulated time. Without it tick may be due by time
+    # to next tick but not by accumulator, and loop would spin without
+    # sleeping
+    _TIME_EPSILON: float = 1e-9
+
+    _tick_duration: float
+    _max_catch_up_ticks: int
+
+    _clock: Callable[[], float]
+    _sleep: Callable[[float], Any]
+
+    _last_time: float
+    # Real time that is not simulated yet, in seconds
+    _accumulator: float
+
+    _ticks_count: int
+    _rendered_frames_count: int
+    _dropped_ticks_count: int
+
+    def __init__(
+            self,
+            input_tick_rate: float = 60,
+            input_max_catch_up_ticks: int = 5,
+            input_clock: Callable[[], float] = perf_counter,
+            input_sleep: Callable[[float], Any] = time_sleep):
+        """[input_clock] must be monotonic. Clock and sleep are for tests"""
+        if input_tick_rate <= 0:
+            raise FixedStepSchedulerException(
+                'Tick rate must be positive: ' + str(input_tick_rate))
+
+        if input_max_catch_up_ticks < 1:
+            raise FixedStepSchedulerException(
+                'At least one tick must be allowed per loop iteration: '
+                + str(input_max_catch_up_ticks))
+
+        self._tick_duration = 1 / input_tick_rate
+        self._max_catch_up_ticks = input_max_catch_up_ticks
+
+        self._clock = input_clock
+        self._sleep = input_sleep
+
+        self._ticks_count = 0
+        self._rendered_frames_count = 0
+        self._dropped_ticks_count = 0
+
+        self.reset()
+
+    def reset(self):
+        """Forgets elapsed time. The first tick is due right away"""
+        self._last_time = self._clock()
+        self._accumulator = self._tick_duration
+
+    def get_due_ticks(self) -> int:
+        """Takes elapsed time into account and gives ticks to update now"""
+        current_time: float = self._clock()
+
+        self._accumulator += current_time - self._last_time
+        self._last_time = current_time
+
+        due_ticks: int = int(
+            (self._accumulator + self._TIME_EPSILON) // self._tick_duration)
+
+        if due_ticks > self._max_catch_up_ticks:
+            self._dropped_ticks_count += due_ticks - self._max_catch_up_ticks
+
+            # Backlog is dropped, not kept for later bursts: the next tick
+            # is due in whole tick duration
+            self._accumulator = 0.0
+            due_ticks = self._max_catch_up_ticks
+        else:
+            self._accumulator = max(
+                0.0, self._accumulator - due_ticks * self._tick_duration)
+
+        return due_ticks
+
+    def get_time_to_next_tick(self) -> float:
+        return max(
+            0.0,
+            self._tick_duration - self._accumulator
+            - (self._clock() - self._last_time))
+
+    def run(
+            self,
+            update: Callable[[], Any],
+            render: Optional[Callable[[], Any]] = None,
+            ticks_count: Optional[int] = None) -> int:
+        """Calls [update] every tick and [render] after each batch of ticks
+
+        Runs forever if [ticks_count] is [None]. Gives made updates count
+        """
+        made_ticks_count: int = 0
+
+        self.reset()
+
+        while ticks_count is None or made_ticks_count < ticks_count:
+            due_ticks: int = self.get_due_ticks()
+
+            if ticks_count is not None:
+                due_ticks = min(due_ticks, ticks_count - made_ticks_count)
+
+            for _ in range(due_ticks):
+                update()
+
+            made_ticks_count += due_ticks
+            self._ticks_count += due_ticks
+
+            if due_ticks > 0 and render is not None:
+                render()
+
+                self._rendered_frames_count += 1
+
+            time_to_next_tick: float = self.get_time_to_next_tick()
+
+            if time_to_next_tick > 0:
+                self._sleep(time_to_next_tick)
+
+        return made_ticks_count
+
+    @property
+    def tick_rate(self) -> float:
+        return 1 / self._tick_duration
+
+    @property
+    def ticks_count(self) -> int:
+        return self._ticks_count
+
+    @property
+    def rendered_frames_count(self) -> int:
+        return self._rendered_frames_count
+
+    @property
+    def dropped_ticks_count(self) -> int:
+        return self._dropped_ticks_count
+
+
+class FixedStepSchedulerException(ApplicationException):
+    pass
@@ -1,29 +1,141 @@
-from dataclasses import dataclass, field as dataclass_field
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple, Any
 
 
-@dataclass
-class Vector2D:
+class _SlottedObject:
+    """Base for game classes with [__slots__]
+
+    Slots make objects compact and remove per instance [__dict__]. Game maps
+    pickled before slots (when game classes were dataclasses) have
+    [__dict__] as objects' state so [__setstate__] accepts it too. State keys
+    that are not slots anymore (e.g. old class constants) are skipped
+    """
+    __slots__ = ()
+
+    # Class -> names of all slots in its MRO
+    _all_slots_cache: Dict[type, Tuple[str, ...]] = dict()
+
+    @classmethod
+    def _get_all_slots(cls) -> Tuple[str, ...]:
+        all_slots: Optional[Tuple[str, ...]] = (
+            _SlottedObject._all_slots_cache.get(cls))
+
+        if all_slots is None:
+            all_slots = tuple(
+                slot_name
+                for parent_class in reversed(cls.__mro__)
+                for slot_name in parent_class.__dict__.get('__slots__', ()))
+
+            _SlottedObject._all_slots_cache[cls] = all_slots
+
+        return all_slots
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            slot_name: getattr(self, slot_name)
+            for slot_name in self._get_all_slots()
+            if hasattr(self, slot_name)}
+
+    def copy(self):
+        """Copy that can be changed without changing this object
+
+        Vectors and lists in slots are copied, other values are shared
+        """
+        object_copy = self.__class__.__new__(self.__class__)
+
+        for slot_name in self._get_all_slots():
+            if hasattr(self, slot_name):
+                slot_value = getattr(self, slot_name)
+
+                if slot_value.__class__ is Vector2D:
+                    slot_value = Vector2D(slot_value.x, slot_value.y)
+                elif slot_value.__class__ is list:
+                    slot_value = list(slot_value)
+
+                object.__setattr__(object_copy, slot_name, slot_value)
+
+        return object_copy
+
+    def __setstate__(self, state):
+        # Default pickling of slotted objects gives (dict, slots) tuple
+        if isinstance(state, tuple):
+            dict_state, slots_state = state
+
+            state = dict(dict_state or {})
+            state.update(slots_state or {})
+
+        all_slots: Tuple[str, ...] = self._get_all_slots()
+
+        for name, value in state.items():
+            if name in all_slots:
+                object.__setattr__(self, name, value)
+
+
+class Vector2D(_SlottedObject):
     """Vector of two coordinates: X, Y
 
     All positions or position modifiers in game should be vectors of two
-    coordinates
+    coordinates. [+=] and [-=] modify vector in place so moving of game
+    objects does not create new vectors
     """
+    __slots__ = ('x', 'y')
+
     x: float
     y: float
 
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+    def __repr__(self) -> str:
+        return f'Vector2D(x={self.x!r}, y={self.y!r})'
+
+    def __eq__(self, other):
+        if other.__class__ is not Vector2D:
+            return NotImplemented
+
+        return self.x == other.x and self.y == other.y
+
+    # Vector is mutable
+    __hash__ = None
+
     def __add__(self, other: 'Vector2D'):
         return Vector2D(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other: 'Vector2D'):
         return Vector2D(self.x - other.x, self.y - other.y)
 
+    def __iadd__(self, other: 'Vector2D'):
+        self.x += other.x
+        self.y += other.y
+
+        return self
+
+    def __isub__(self, other: 'Vector2D'):
+        self.x -= other.x
+        self.y -= other.y
+
+        return self
+
+
+class GameObject(_SlottedObject):
+    """Game objects are compared by identity, not by fields' values"""
+    __slots__ = ('location', 'should_be_despawned')
 
-@dataclass
-class GameObject:
     # Left top pixel location
     location: 'Vector2D'
-    should_be_despawned: bool = dataclass_field(default=False)
+    should_be_despawned: bool
+
+    def __init__(
+            self,
+            location: 'Vector2D',
+            should_be_despawned: bool = False):
+        self.location = location
+        self.should_be_despawned = should_be_despawned
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(location={self.location!r}, '
+            f'should_be_despawned={self.should_be_despawned!r})')
 
 
 class ImmovableObject(GameObject):
@@ -34,20 +146,38 @@ class ImmovableObject(GameObject):
     2. Immovable objects
     3. Movable objects
     """
-    pass
+    __slots__ = ()
 
 
-@dataclass
 class AbstractBuff(ImmovableObject):
+    __slots__ = (
+        '_recharge_time',
+        '_is_charging',
+        '_charge_time_start',
+        '_player_captor')
+
     # Buff is a square
     SIDE_LENGTH: int = 25
 
     # Time in game loop iterations
-    _recharge_time: int = dataclass_field(default=200)
+    _recharge_time: int
+
+    _is_charging: bool
+    _charge_time_start: int
+    _player_captor: Optional['Player']
+
+    def __init__(
+            self,
+            location: 'Vector2D',
+            should_be_despawned: bool = False,
+            recharge_time: int = 200):
+        super().__init__(location, should_be_despawned)
+
+        self._recharge_time = recharge_time
 
-    _is_charging: bool = dataclass_field(default=False)
-    _charge_time_start: int = dataclass_field(default=0)
-    _player_captor: Optional['Player'] = dataclass_field(default=None)
+        self._is_charging = False
+        self._charge_time_start = 0
+        self._player_captor = None
 
     def capture_this_buff(
             self,
@@ -70,14 +200,28 @@ class AbstractBuff(ImmovableObject):
     def is_charging(self):
         return self._is_charging
 
+    def get_charging_state(self) -> Tuple[bool, int, Optional['Player']]:
+        """Charging flag, charge start time and player captor"""
+        return self._is_charging, self._charge_time_start, self._player_captor
+
+    def set_charging_state(
+            self,
+            is_charging: bool,
+            charge_time_start: int,
+            player_captor: Optional['Player']):
+        """For state restoring. Player's buffs list is NOT changed here"""
+        self._is_charging = is_charging
+        self._charge_time_start = charge_time_start
+        self._player_captor = player_captor
+
 
 class SpeedUpBuff(AbstractBuff):
     """Increase move speed of Player"""
-    pass
+    __slots__ = ()
 
 
 class JumpHeightUpBuff(AbstractBuff):
-    pass
+    __slots__ = ()
 
 
 class BasicPlatform(ImmovableObject):
@@ -96,6 +240,8 @@ class BasicPlatform(ImmovableObject):
     #  OR
     #  Create new basic platform every time when size is changing in process
     #  of mouse motion?
+    __slots__ = ('width', 'height')
+
     width: int
     height: int
 
@@ -114,23 +260,33 @@ class MovableObject(GameObject):
     2. Immovable objects
     3. Movable objects
     """
+    __slots__ = ()
 
 
-@dataclass
 class Player(MovableObject):
+    __slots__ = ('current_buffs',)
+
     # If player on (0, 0) location
     HAND_LOCATION: 'Vector2D' = Vector2D(30, 22)
 
     # Player is a square
     SIDE_LENGTH: int = 45
 
-    current_buffs: List[AbstractBuff] = dataclass_field(default_factory=list)
+    current_buffs: List[AbstractBuff]
+
+    def __init__(
+            self,
+            location: 'Vector2D',
+            should_be_despawned: bool = False,
+            current_buffs: Optional[List[AbstractBuff]] = None):
+        super().__init__(location, should_be_despawned)
+
+        self.current_buffs = [] if current_buffs is None else current_buffs
 
 
-# Improvement: Would be better, I think, add "dataclass" decorator back.
-#  Anyway compiler do not want correctly highlight actual parameters in
-#  constructor -_-
 class ProjectileObject(MovableObject):
+    __slots__ = ('_moving_vector',)
+
     PROJECTILE_SPEED: int = 20  # TODO: Optimize this
 
     _moving_vector: 'Vector2D'
@@ -152,6 +308,8 @@ class HandgunProjectile(ProjectileObject):
 
     Small sized circle that just flies forward with average speed
     """
+    __slots__ = ()
+
     CIRCLE_DIAMETER: int = 7
 
 
@@ -161,6 +319,8 @@ class MachineGunProjectile(ProjectileObject):
     Average sized circle that flies forward with high speed with a chance of
     firing projectile with some angle from actual cursor direction
     """
+    __slots__ = ()
+
     # Angle can scatter in this abs radius of radians from zero
     ANGLE_SCATTER_RADIUS: float = 0.0349066  # = 2 degrees
 
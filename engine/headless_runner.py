@@ -0,0 +1,281 @@
+from time import perf_counter
+from argparse import ArgumentParser, Namespace
+from typing import List, Optional, Iterable, NamedTuple, Any, TextIO
+from sys import exit as sys_exit, stdout as sys_stdout
+
+from maps import GameMap, load_game_map
+from engine.engine import GameEngine
+from engine.player_controls import LmbEvent, LmbEventType
+from engine.fixed_step_scheduler import FixedStepScheduler
+from engine import ApplicationException
+
+
+class ScriptedInput(NamedTuple):
+    """Input that is given to all event listeners before update of [tick]
+
+    [listener_method] is name of [EventListener] method. [argument] is key
+    code or [LmbEvent]
+    """
+    tick: int
+    listener_method: str
+    argument: Any
+
+
+class RunReport(NamedTuple):
+    ticks_count: int
+    elapsed_seconds: float
+
+    @property
+    def ticks_per_second(self) -> float:
+        if self.elapsed_seconds == 0:
+            return float('inf')
+
+        return self.ticks_count / self.elapsed_seconds
+
+
+class HeadlessRunner:
+    """Steps game engine without any GUI
+
+    Game map updates go one after another as fast as CPU allows or, if tick
+    rate is given, on fixed timesteps of [FixedStepScheduler].
+    Scripted inputs replace GUI bindings: they reach the same event
+    listeners in the same order
+    """
+    LISTENER_METHODS: Iterable[str] = (
+        'key_pressed', 'key_released', 'lmb_event_happened')
+
+    _game_engine: GameEngine
+
+    # Sorted by tick. Inputs of ticks that are already updated are skipped
+    _scripted_inputs: List[ScriptedInput]
+    _next_input_index: int
+
+    def __init__(
+            self,
+            input_game_engine: GameEngine,
+            input_scripted_inputs: Iterable[ScriptedInput] = ()):
+        self._game_engine = input_game_engine
+
+        self._scripted_inputs = sorted(
+            input_scripted_inputs,
+            key=lambda scripted_input: scripted_input.tick)
+        self._next_input_index = 0
+
+        for scripted_input in self._scripted_inputs:
+            if scripted_input.listener_method not in self.LISTENER_METHODS:
+                raise HeadlessRunnerException(
+                    'Unknown listener method in scripted input: '
+                    + str(scripted_input))
+
+    def run(
+            self,
+            ticks_count: int,
+            tick_rate: Optional[float] = None) -> RunReport:
+        """Makes [ticks_count] game map updates
+
+        [tick_rate] is updates per second. [None] means no time alignment
+        """
+        if tick_rate is not None and tick_rate <= 0:
+            raise HeadlessRunnerException(
+                'Tick rate must be positive: ' + str(tick_rate))
+
+        run_start: float = perf_counter()
+
+        if tick_rate is None:
+            for _ in range(ticks_count):
+                self._update_map()
+        else:
+            FixedStepScheduler(tick_rate).run(
+                self._update_map, ticks_count=ticks_count)
+
+        return RunReport(ticks_count, perf_counter() - run_start)
+
+    def _update_map(self):
+        self._feed_scripted_inputs()
+
+        self._game_engine.update_map()
+
+    def _feed_scripted_inputs(self):
+        current_tick: int = self._game_engine.get_map_updates_count()
+
+        while (self._next_input_index < len(self._scripted_inputs)
+                and self._scripted_inputs[self._next_input_index].tick
+                <= current_tick):
+            scripted_input: ScriptedInput = (
+                self._scripted_inputs[self._next_input_index])
+
+            self._next_input_index += 1
+
+            if scripted_input.tick < current_tick:
+                continue
+
+            for event_listener in self._game_engine.get_event_listeners():
+                getattr(event_listener, scripted_input.listener_method)(
+                    scripted_input.argument)
+
+
+def parse_scripted_inputs(inputs_file: TextIO) -> List[ScriptedInput]:
+    """Parses text script of inputs
+
+    One input per line, empty lines and lines after '#' are skipped:
+        <tick> key_pressed <key code>
+        <tick> key_released <key code>
+        <tick> lmb_event_happened <ButtonPress|ButtonRelease|Motion> <x> <y>
+    """
+    scripted_inputs: List[ScriptedInput] = []
+
+    for line_number, line in enumerate(inputs_file, 1):
+        line_parts: List[str] = line.split('#')[0].split()
+
+        if len(line_parts) == 0:
+            continue
+
+        try:
+            if line_parts[1] == 'lmb_event_happened':
+                argument: Any = LmbEvent(
+                    float(line_parts[3]),
+                    float(line_parts[4]),
+                    LmbEventType[line_parts[2]])
+            else:
+                argument = int(line_parts[2])
+
+            scripted_inputs.append(
+                ScriptedInput(int(line_parts[0]), line_parts[1], argument))
+
+        except (IndexError, KeyError, ValueError):
+            raise HeadlessRunnerException(
+                'Wrong scripted input on line '
+                + str(line_number) + ': ' + line.rstrip())
+
+    return scripted_inputs
+
+
+def run_headless_logic():
+    parser = ArgumentParser(
+        description='Runs game without GUI and reports ticks per second')
+
+    parser.add_argument(
+        'map_name',
+        help='raw map name in format "raw <name>" or map file name from '
+             '"maps" folder. Can be omitted for replays',
+        nargs='?')
+
+    parser.add_argument(
+        '-t', '--ticks',
+        help='number of game map updates (default: 600 or all recorded '
+             'ticks for replays)',
+        type=int)
+
+    parser.add_argument(
+        '-r', '--tick-rate',
+        help='game map updates per second (default: as fast as possible)',
+        type=float)
+
+    # Scripted inputs would silently replace recorded ones
+    inputs_group = parser.add_mutually_exclusive_group()
+
+    inputs_group.add_argument(
+        '-i', '--inputs',
+        help='text file with scripted inputs')
+
+    inputs_group.add_argument(
+        '--replay',
+        help="input recording made by 'launcher.py --record'",
+        metavar='FILE')
+
+    parser.add_argument(
+        '--seed',
+        help="random seed of game (default: random or recorded one)",
+        type=int)
+
+    parser.add_argument(
+        '--stats',
+        help="time game map updates and dump statistics into given JSON "
+             "file ('-' for stdout)",
+        metavar='FILE')
+
+    parser.add_argument(
+        '--projectile-store',
+        help="process projectiles with NumPy arrays (NumPy is required)",
+        action='store_true')
+
+    arguments: Namespace = parser.parse_args()
+
+    # Imported here because recording module depends on this one
+    from engine.input_recording import InputRecording, read_input_recording
+
+    try:
+        map_name: Optional[str] = arguments.map_name
+        ticks_count: Optional[int] = arguments.ticks
+        random_seed: Optional[int] = arguments.seed
+        scripted_inputs: List[ScriptedInput] = []
+
+        if arguments.replay is not None:
+            with open(arguments.replay, 'rb') as recording_file:
+                input_recording: InputRecording = read_input_recording(
+                    recording_file)
+
+            scripted_inputs = input_recording.scripted_inputs
+
+            if map_name is None:
+                map_name = input_recording.map_name
+
+            if ticks_count is None:
+                ticks_count = input_recording.ticks_count
+
+            # Truncated recording is replayed up to its last input
+            if ticks_count is None and len(scripted_inputs) > 0:
+                ticks_count = scripted_inputs[-1].tick + 1
+
+            if random_seed is None:
+                random_seed = input_recording.random_seed
+
+        if map_name is None:
+            raise HeadlessRunnerException('Map name is required')
+
+        if ticks_count is None:
+            ticks_count = 600
+
+        if arguments.inputs is not None:
+            with open(arguments.inputs, 'r') as inputs_file:
+                scripted_inputs = parse_scripted_inputs(inputs_file)
+
+        game_map: GameMap = load_game_map(map_name)
+
+        game_engine: GameEngine = GameEngine(
+            game_map, arguments.projectile_store, random_seed)
+
+        if arguments.stats is not None:
+            game_engine.enable_instrumentation()
+
+        run_report: RunReport = HeadlessRunner(
+            game_engine, scripted_inputs).run(
+                ticks_count, arguments.tick_rate)
+
+        if arguments.stats == '-':
+            game_engine.get_instrumentation().dump(sys_stdout)
+            print()
+
+        elif arguments.stats is not None:
+            with open(arguments.stats, 'w') as stats_file:
+                game_engine.get_instrumentation().dump(stats_file)
+
+    except (ApplicationException, OSError) as occurred_exc:
+        sys_exit(
+            "\n"
+            + occurred_exc.__class__.__name__
+            + ": "
+            + str(occurred_exc))
+
+    print(
+        'Ticks: {}, seconds: {:.3f}, ticks per second: {:.1f}'.format(
+            run_report.ticks_count,
+            run_report.elapsed_seconds,
+            run_report.ticks_per_second))
+    print(
+        'Main player location: '
+        + str(game_engine.get_main_player().location))
+
+
+class HeadlessRunnerException(ApplicationException):
+    pass
@@ -0,0 +1,235 @@
+from struct import Struct, error as StructError
+from threading import Lock
+from argparse import ArgumentTypeError
+from typing import List, Tuple, Dict, BinaryIO, NamedTuple, Optional, Any
+
+from engine.engine import GameEngine
+from engine.headless_runner import ScriptedInput
+from engine.player_controls import LmbEvent, LmbEventType
+from engine import ApplicationException
+from user_interface import EventListener
+
+
+# Binary format, little-endian:
+#
+#   header:  magic 'SQIR', version (B), random seed (Q), map name length (H),
+#            map name in utf-8
+#   records: tick (I), record kind (B), payload of record kind:
+#            key pressed / key released: key code (H)
+#            lmb event: event type (B), x (f), y (f)
+#            end: no payload, tick is count of recorded ticks
+_MAGIC: bytes = b'SQIR'
+_VERSION: int = 1
+
+_HEADER: Struct = Struct('<4sBQH')
+# Recorded seeds are in [0, MAX_RANDOM_SEED]
+MAX_RANDOM_SEED: int = 2 ** 64 - 1
+
+_RECORD_HEAD: Struct = Struct('<IB')
+_KEY_PAYLOAD: Struct = Struct('<H')
+_LMB_PAYLOAD: Struct = Struct('<Bff')
+
+_END_RECORD: int = 0
+_KEY_PRESSED_RECORD: int = 1
+_KEY_RELEASED_RECORD: int = 2
+_LMB_EVENT_RECORD: int = 3
+
+_RECORDS_KINDS: Dict[str, int] = {
+    'key_pressed': _KEY_PRESSED_RECORD,
+    'key_released': _KEY_RELEASED_RECORD,
+    'lmb_event_happened': _LMB_EVENT_RECORD}
+_LISTENER_METHODS: Dict[int, str] = {
+    record_kind: listener_method
+    for listener_method, record_kind in _RECORDS_KINDS.items()}
+
+
+class InputRecording(NamedTuple):
+    random_seed: int
+    map_name: str
+    scripted_inputs: List[ScriptedInput]
+
+    # [None] if recording was not closed properly
+    ticks_count: Optional[int]
+
+
+class InputRecorder(EventListener):
+    """Stands between GUI and game engine and logs all inputs
+
+    GUI thread events are queued and given to engine's event listeners only
+    at the start of [update_map]. So every input reaches engine on the tick
+    it is recorded with, which makes replays exact. Game loop must call
+    [update_map] of recorder instead of engine's one
+    """
+    _game_engine: GameEngine
+    _recording_stream: BinaryIO
+
+    # (listener method, argument) from GUI thread
+    _queued_inputs: List[Tuple[str, Any]]
+    _queued_inputs_lock: Lock
+
+    _recording_lock: Lock
+    _is_closed: bool
+
+    def __init__(
+            self,
+            input_game_engine: GameEngine,
+            input_recording_stream: BinaryIO,
+            input_random_seed: int,
+            input_map_name: str):
+        """[input_random_seed] must be the seed of [input_game_engine]"""
+        if not 0 <= input_random_seed <= MAX_RANDOM_SEED:
+            raise InputRecordingException(
+                'Got random seed out of [0, MAX_RANDOM_SEED] in process of '
+                'input recorder init: ' + str(input_random_seed))
+
+        self._game_engine = input_game_engine
+        self._recording_stream = input_recording_stream
+
+        self._queued_inputs = []
+        self._queued_inputs_lock = Lock()
+
+        self._recording_lock = Lock()
+        self._is_closed = False
+
+        map_name_bytes: bytes = input_map_name.encode('utf-8')
+
+        self._recording_stream.write(
+            _HEADER.pack(
+                _MAGIC, _VERSION, input_random_seed, len(map_name_bytes)))
+        self._recording_stream.write(map_name_bytes)
+
+    def key_pressed(self, key_code: int):  # pragma: no cover
+        self._queue_input('key_pressed', key_code)
+
+    def key_released(self, key_code: int):  # pragma: no cover
+        self._queue_input('key_released', key_code)
+
+    def lmb_event_happened(self, event):  # pragma: no cover
+        # Tkinter event is copied: only these fields are used by engine
+        self._queue_input(
+            'lmb_event_happened',
+            LmbEvent(event.x, event.y, LmbEventType[event.type.name]))
+
+    def _queue_input(self, listener_method: str, argument: Any):
+        with self._queued_inputs_lock:
+            self._queued_inputs.append((listener_method, argument))
+
+    def update_map(self):
+        with self._queued_inputs_lock:
+            current_inputs: List[Tuple[str, Any]] = self._queued_inputs
+            self._queued_inputs = []
+
+        current_tick: int = self._game_engine.get_map_updates_count()
+
+        with self._recording_lock:
+            if not self._is_closed:
+                for listener_method, argument in current_inputs:
+                    self._write_input(current_tick, listener_method, argument)
+
+        for listener_method, argument in current_inputs:
+            for event_listener in self._game_engine.get_event_listeners():
+                getattr(event_listener, listener_method)(argument)
+
+        self._game_engine.update_map()
+
+    def _write_input(self, tick: int, listener_method: str, argument: Any):
+        record_kind: int = _RECORDS_KINDS[listener_method]
+
+        self._recording_stream.write(_RECORD_HEAD.pack(tick, record_kind))
+
+        if record_kind == _LMB_EVENT_RECORD:
+            self._recording_stream.write(
+                _LMB_PAYLOAD.pack(
+                    argument.type.value, argument.x, argument.y))
+        else:
+            self._recording_stream.write(_KEY_PAYLOAD.pack(argument))
+
+    def close(self):
+        """Writes end of recording. Does NOT close recording stream"""
+        with self._recording_lock:
+            if not self._is_closed:
+                self._recording_stream.write(
+                    _RECORD_HEAD.pack(
+                        self._game_engine.get_map_updates_count(),
+                        _END_RECORD))
+                self._recording_stream.flush()
+
+                self._is_closed = True
+
+
+def parse_random_seed(seed: str) -> int:
+    """Argument type of recordable random seed for [ArgumentParser]"""
+    try:
+        random_seed: int = int(seed)
+    except ValueError:
+        raise ArgumentTypeError('invalid int value: ' + repr(seed))
+
+    if not 0 <= random_seed <= MAX_RANDOM_SEED:
+        raise ArgumentTypeError(
+            'seed must be in [0, {}]: {}'.format(MAX_RANDOM_SEED, seed))
+
+    return random_seed
+
+
+def read_input_recording(recording_stream: BinaryIO) -> InputRecording:
+    """Reads whole recording made by [InputRecorder]"""
+    recording_bytes: bytes = recording_stream.read()
+
+    if len(recording_bytes) < _HEADER.size:
+        raise InputRecordingException('Recording is too short')
+
+    magic, version, random_seed, map_name_length = _HEADER.unpack_from(
+        recording_bytes)
+
+    if magic != _MAGIC or version != _VERSION:
+        raise InputRecordingException(
+            'Not an input recording or unknown version', magic, version)
+
+    offset: int = _HEADER.size
+    map_name: str = recording_bytes[
+        offset:offset + map_name_length].decode('utf-8')
+    offset += map_name_length
+
+    scripted_inputs: List[ScriptedInput] = []
+    ticks_count: Optional[int] = None
+
+    try:
+        while offset < len(recording_bytes):
+            tick, record_kind = _RECORD_HEAD.unpack_from(
+                recording_bytes, offset)
+            offset += _RECORD_HEAD.size
+
+            if record_kind == _END_RECORD:
+                ticks_count = tick
+
+                break
+
+            elif record_kind == _LMB_EVENT_RECORD:
+                event_type, x, y = _LMB_PAYLOAD.unpack_from(
+                    recording_bytes, offset)
+                offset += _LMB_PAYLOAD.size
+
+                argument: Any = LmbEvent(x, y, LmbEventType(event_type))
+
+            elif record_kind in _LISTENER_METHODS:
+                argument = _KEY_PAYLOAD.unpack_from(
+                    recording_bytes, offset)[0]
+                offset += _KEY_PAYLOAD.size
+
+            else:
+                raise InputRecordingException(
+                    'Unknown record kind', record_kind, offset)
+
+            scripted_inputs.append(
+                ScriptedInput(tick, _LISTENER_METHODS[record_kind], argument))
+
+    except StructError:
+        # Truncated recording (e.g. game was killed): everything before
+        # broken record is replayed
+        pass
+
+    return InputRecording(random_seed, map_name, scripted_inputs, ticks_count)
+
+
+class InputRecordingException(ApplicationException):
+    pass
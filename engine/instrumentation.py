@@ -0,0 +1,159 @@
+from json import dump as json_dump
+from time import perf_counter
+from typing import List, Dict, TextIO, Any
+
+from engine import ApplicationException
+
+
+class RollingHistogram:
+    """Keeps last [capacity] values for percentiles
+
+    Values go to ring buffer, so adding is O(1) and memory is bounded.
+    Percentiles are computed on request by sorting the buffer
+    """
+    _values: List[float]
+    _next_index: int
+
+    # All values ever added, not only kept ones
+    _count: int
+
+    def __init__(self, input_capacity: int = 1024):
+        if input_capacity <= 0:
+            raise InstrumentationException(
+                'Histogram capacity must be positive: '
+                + str(input_capacity))
+
+        self._values = [0.0] * input_capacity
+        self._next_index = 0
+        self._count = 0
+
+    def add(self, value: float):
+        self._values[self._next_index] = value
+
+        self._next_index += 1
+        if self._next_index == len(self._values):
+            self._next_index = 0
+
+        self._count += 1
+
+    def get_kept_values(self) -> List[float]:
+        if self._count < len(self._values):
+            return self._values[:self._count]
+        else:
+            return list(self._values)
+
+    def get_percentile(self, percentile: float) -> float:
+        """Nearest-rank percentile of kept values. 0 if there are none"""
+        kept_values: List[float] = sorted(self.get_kept_values())
+
+        if len(kept_values) == 0:
+            return 0.0
+
+        rank: int = max(0, round(percentile / 100 * len(kept_values)) - 1)
+
+        return kept_values[min(rank, len(kept_values) - 1)]
+
+    def get_summary(self) -> Dict[str, float]:
+        kept_values: List[float] = self.get_kept_values()
+
+        return {
+            'count': self._count,
+            'p50': self.get_percentile(50),
+            'p95': self.get_percentile(95),
+            'p99': self.get_percentile(99),
+            'max': max(kept_values, default=0.0)}
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+
+class TickInstrumentation:
+    """Per-phase durations and counters of game map updates
+
+    Durations are in seconds and kept in rolling histograms, counters are
+    totals since instrumentation start. Game engine fills it only when
+    instrumentation is enabled, otherwise updates are not timed at all.
+
+    Tick is timed by markers: every phase lasts from the end of the previous
+    one, so phases cover whole tick
+    """
+    PHASES: List[str] = [
+        'stream_chunks',
+        'spawn_player_projectiles',
+        'update_immovable_objects',
+        'update_movable_objects',
+        'despawn_movable_objects',
+        'capture_world_snapshot',
+        'tick']
+
+    COUNTERS: List[str] = [
+        'collision_checks',
+        'collisions',
+        'spawned_objects',
+        'despawned_objects']
+
+    _phases_histograms: Dict[str, RollingHistogram]
+    _counters: Dict[str, int]
+
+    # [perf_counter] values of current tick's start and of current phase's
+    # start
+    _tick_start: float
+    _phase_start: float
+
+    def __init__(self, input_histogram_capacity: int = 1024):
+        self._phases_histograms = {
+            phase_name: RollingHistogram(input_histogram_capacity)
+            for phase_name in self.PHASES}
+        self._counters = dict.fromkeys(self.COUNTERS, 0)
+
+        self._tick_start = self._phase_start = 0.0
+
+    def start_tick(self):
+        self._tick_start = self._phase_start = perf_counter()
+
+    def end_phase(self, phase_name: str):
+        """Next phase starts right now"""
+        phase_end: float = perf_counter()
+
+        self._phases_histograms[phase_name].add(phase_end - self._phase_start)
+        self._phase_start = phase_end
+
+    def end_tick(self):
+        self._phases_histograms['tick'].add(perf_counter() - self._tick_start)
+
+    def add_phase_duration(self, phase_name: str, duration: float):
+        self._phases_histograms[phase_name].add(duration)
+
+    def increase_counter(self, counter_name: str, amount: int = 1):
+        self._counters[counter_name] += amount
+
+    def get_phase_histogram(self, phase_name: str) -> RollingHistogram:
+        return self._phases_histograms[phase_name]
+
+    def get_counter(self, counter_name: str) -> int:
+        return self._counters[counter_name]
+
+    def get_report(self) -> Dict[str, Any]:
+        """JSON-compatible summary. Durations are in milliseconds"""
+        phases_report: Dict[str, Dict[str, float]] = {}
+
+        for phase_name, phase_histogram in self._phases_histograms.items():
+            phase_summary: Dict[str, float] = phase_histogram.get_summary()
+
+            phases_report[phase_name] = {
+                summary_key: (
+                    summary_value if summary_key == 'count'
+                    else summary_value * 1000)
+                for summary_key, summary_value in phase_summary.items()}
+
+        return {
+            'phases_ms': phases_report,
+            'counters': dict(self._counters)}
+
+    def dump(self, output_stream: TextIO):
+        json_dump(self.get_report(), output_stream, indent=2)
+
+
+class InstrumentationException(ApplicationException):
+    pass
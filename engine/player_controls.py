@@ -0,0 +1,235 @@
+from enum import Enum
+from threading import Lock
+from struct import Struct, error as StructError
+from typing import Set, Iterable, NamedTuple
+from array import array
+
+from engine.game_objects import *
+from engine.entity_store import EntityHandle
+from engine.world_snapshot import WorldSnapshotException
+from user_interface import EventListener
+
+
+class LmbEventType(Enum):
+    """Names are the same as in tkinter's [EventType]"""
+    ButtonPress: int = 4
+    ButtonRelease: int = 5
+    Motion: int = 6
+
+
+class LmbEvent(NamedTuple):
+    """Replacement of tkinter lmb (left mouse button) event
+
+    Engine uses only these fields of tkinter event
+    """
+    x: float
+    y: float
+    type: LmbEventType
+
+
+class Weapon(Enum):
+    Handgun: int = 1
+    MachineGun: int = 2
+
+
+class PlayerControls(EventListener):
+    """Input and movement state of one player
+
+    Every player that engine simulates has its own controls, so players
+    move, jump and fire independently. Controls are event listener: GUI,
+    replays and network server give players' input to them
+    """
+    _KEY_CODE_1: int = 49
+    _KEY_CODE_2: int = 50
+
+    # Improvement: Add lock because 'set' operation below is NOT
+    #  atomic! Note that it is NOT needed to pass lock into gui,
+    #  because gui already invokes methods here. Right here,
+    #  in [EventListener] implementation, lock should be used
+    keys_pressed: Set[int]
+
+    # lmb (left mouse button) tkinter event. [None] until the first one
+    _lmb_event: Optional[Any]
+    _lmb_event_lock: Lock
+
+    selected_weapon: Weapon
+
+    # One click = one projectile from handgun
+    handgun_can_fire: bool
+
+    # If so then player can jump
+    #
+    # Optimization: When [Player] is on the ground then no
+    #  collisions with the ground should be initiated
+    is_on_the_ground: bool
+
+    vertical_velocity: float
+
+    # Global multipliers of move speed and initial jump velocity. Player's
+    # buffs set them on every update
+    move_speed_multiplier: float
+    jump_velocity_multiplier: float
+
+    def __init__(self):
+        self.keys_pressed = set()
+
+        self._lmb_event = None
+        self._lmb_event_lock = Lock()
+
+        self.selected_weapon = Weapon.Handgun
+        self.handgun_can_fire = True
+
+        self.is_on_the_ground = False
+        self.vertical_velocity = 0
+
+        self.move_speed_multiplier = 1
+        self.jump_velocity_multiplier = 1
+
+    def key_pressed(self, key_code: int):  # pragma: no cover
+        """GUI thread invokes this method"""
+        self.keys_pressed.add(key_code)
+
+        if key_code == self._KEY_CODE_1:
+            self.selected_weapon = Weapon.Handgun
+
+        elif key_code == self._KEY_CODE_2:
+            self.selected_weapon = Weapon.MachineGun
+
+    def key_released(self, key_code: int):  # pragma: no cover
+        """GUI thread invokes this method"""
+        self.keys_pressed.discard(key_code)
+
+    def lmb_event_happened(self, event):  # pragma: no cover
+        with self._lmb_event_lock:
+            self._lmb_event = event
+
+    def set_input(self, keys_pressed: Iterable[int], lmb_event: Optional):
+        """Sets whole input state as if its changes were happened
+
+        [None] lmb event keeps the current one
+        """
+        keys_pressed = set(keys_pressed)
+
+        for key_code in self.keys_pressed - keys_pressed:
+            self.key_released(key_code)
+
+        for key_code in keys_pressed - self.keys_pressed:
+            self.key_pressed(key_code)
+
+        if lmb_event is not None:
+            self.lmb_event_happened(lmb_event)
+
+    def get_lmb_event(self) -> Optional:
+        with self._lmb_event_lock:
+            return self._lmb_event
+
+
+# Players' controls in world snapshot, little-endian:
+#
+#   header:       controls count (I)
+#   controls:     player's slot (I), player's generation (I),
+#                 vertical velocity (d), player is on the ground (B),
+#                 selected weapon (B), handgun can fire (B),
+#                 lmb event type (B, 0 if no event), keys pressed count (I),
+#                 lmb event x (d), lmb event y (d)
+#   key pressed:  key code (I), after every controls
+#
+# Multipliers are not packed: buffs set them on every update
+_CONTROLS_HEADER: Struct = Struct('<I')
+_CONTROLS_RECORD: Struct = Struct('<IIdBBBBIdd')
+
+
+def pack_players_controls(
+        players_controls: Dict[EntityHandle, PlayerControls]) -> bytes:
+    packed_controls: List[bytes] = [
+        _CONTROLS_HEADER.pack(len(players_controls))]
+
+    for player_handle, player_controls in players_controls.items():
+        lmb_event = player_controls.get_lmb_event()
+
+        if lmb_event is None:
+            lmb_event_type: int = 0
+            lmb_event_x = lmb_event_y = 0.0
+        else:
+            # tkinter events are captured by their types' names too
+            lmb_event_type = LmbEventType[lmb_event.type.name].value
+            lmb_event_x, lmb_event_y = lmb_event.x, lmb_event.y
+
+        keys_pressed: List[int] = list(player_controls.keys_pressed)
+
+        packed_controls.append(
+            _CONTROLS_RECORD.pack(
+                player_handle.slot,
+                player_handle.generation,
+                player_controls.vertical_velocity,
+                player_controls.is_on_the_ground,
+                player_controls.selected_weapon.value,
+                player_controls.handgun_can_fire,
+                lmb_event_type,
+                len(keys_pressed),
+                lmb_event_x,
+                lmb_event_y))
+        packed_controls.append(array('I', keys_pressed).tobytes())
+
+    return b''.join(packed_controls)
+
+
+def unpack_players_controls(
+        state: memoryview,
+        offset: int) -> Tuple[Dict[EntityHandle, PlayerControls], int]:
+    """Gives controls packed by [pack_players_controls] and offset after
+    them
+    """
+    players_controls: Dict[EntityHandle, PlayerControls] = {}
+
+    try:
+        controls_count, = _CONTROLS_HEADER.unpack_from(state, offset)
+        offset += _CONTROLS_HEADER.size
+
+        for _ in range(controls_count):
+            (player_slot,
+             player_generation,
+             vertical_velocity,
+             is_on_the_ground,
+             selected_weapon,
+             handgun_can_fire,
+             lmb_event_type,
+             keys_pressed_count,
+             lmb_event_x,
+             lmb_event_y) = _CONTROLS_RECORD.unpack_from(state, offset)
+            offset += _CONTROLS_RECORD.size
+
+            keys_pressed: array = array('I')
+            keys_pressed_end: int = (
+                offset + keys_pressed_count * keys_pressed.itemsize)
+
+            if keys_pressed_end > len(state):
+                raise WorldSnapshotException(
+                    'World snapshot is too short')
+
+            keys_pressed.frombytes(state[offset:keys_pressed_end])
+            offset = keys_pressed_end
+
+            player_controls: PlayerControls = PlayerControls()
+
+            player_controls.keys_pressed.update(keys_pressed)
+            player_controls.vertical_velocity = vertical_velocity
+            player_controls.is_on_the_ground = bool(is_on_the_ground)
+            player_controls.selected_weapon = Weapon(selected_weapon)
+            player_controls.handgun_can_fire = bool(handgun_can_fire)
+
+            if lmb_event_type != 0:
+                player_controls.lmb_event_happened(
+                    LmbEvent(
+                        lmb_event_x,
+                        lmb_event_y,
+                        LmbEventType(lmb_event_type)))
+
+            players_controls[
+                EntityHandle(player_slot, player_generation)] = (
+                player_controls)
+
+    except (StructError, ValueError):
+        raise WorldSnapshotException('World snapshot is too short')
+
+    return players_controls, offset
@@ -0,0 +1,542 @@
+from typing import Tuple, Dict
+from struct import Struct
+
+from engine.game_objects import *
+from engine.spatial_grid import SpatialGrid
+from engine import ApplicationException
+
+# NumPy is optional: without it projectiles are processed as ordinary
+# movable objects
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class ProjectileView:
+    """Read only projectile-like view of one store row
+
+    Has the same fields that drawing methods use so GUI can draw stored
+    projectiles exactly like [ProjectileObject] instances
+    """
+    __slots__ = ('location', 'moving_vector', 'projectile_type', 'view_id')
+
+    location: Vector2D
+    moving_vector: Vector2D
+    projectile_type: type
+
+    # Unique for every projectile that was ever added into store
+    view_id: int
+
+    def __init__(
+            self,
+            input_location: Vector2D,
+            input_moving_vector: Vector2D,
+            input_projectile_type: type,
+            input_view_id: int):
+        self.location = input_location
+        self.moving_vector = input_moving_vector
+        self.projectile_type = input_projectile_type
+        self.view_id = input_view_id
+
+
+class ProjectileStore:
+    """Structure of arrays for all projectiles of game map
+
+    Locations, moving vectors, diameters and alive flags of projectiles are
+    kept in NumPy arrays, so movement, game field's borders despawning and
+    platforms hitting are vectorized steps over all projectiles at once.
+    Dead rows are compacted once per update so live projectiles are always
+    [0, len(store)) rows
+
+    Platforms are immovable, so 'broad' phase grid over them is converted
+    into flat arrays once on init: [_cell_starts] and [_cell_counts] of every
+    grid cell point into [_cell_platforms] array of platforms' indexes
+    """
+    _INITIAL_CAPACITY: int = 64
+
+    # Index in this tuple is projectile type code in [_type_codes]
+    _PROJECTILE_TYPES: Tuple[type, ...] = (
+        HandgunProjectile, MachineGunProjectile)
+
+    # Used rows count and next view id
+    _STATE_HEADER: Struct = Struct('<QQ')
+
+    _game_field_size: Vector2D
+
+    _count: int
+    _next_view_id: int
+
+    # Rows [0, _count) are used, rest is preallocated capacity
+    _locations: 'numpy.ndarray'
+    _moving_vectors: 'numpy.ndarray'
+    _diameters: 'numpy.ndarray'
+    _alive: 'numpy.ndarray'
+    _type_codes: 'numpy.ndarray'
+    _view_ids: 'numpy.ndarray'
+
+    # Rows of (left, top, right, bottom)
+    _platforms_bounds: 'numpy.ndarray'
+
+    _cell_size: int
+    _first_cell_x: int
+    _first_cell_y: int
+    _cells_width: int
+    _cells_height: int
+    _cell_starts: 'numpy.ndarray'
+    _cell_counts: 'numpy.ndarray'
+    _cell_platforms: 'numpy.ndarray'
+
+    def __init__(
+            self,
+            input_game_field_size: Vector2D,
+            input_immovable_objects: List[ImmovableObject],
+            input_cell_size: int = SpatialGrid.DEFAULT_CELL_SIZE):
+        if numpy is None:
+            raise ProjectileStoreException(
+                'NumPy is required for projectile store')
+
+        self._game_field_size = input_game_field_size
+
+        self._count = 0
+        self._next_view_id = 0
+
+        self._locations = numpy.zeros((self._INITIAL_CAPACITY, 2))
+        self._moving_vectors = numpy.zeros((self._INITIAL_CAPACITY, 2))
+        self._diameters = numpy.zeros(self._INITIAL_CAPACITY)
+        self._alive = numpy.zeros(self._INITIAL_CAPACITY, dtype=bool)
+        self._type_codes = numpy.zeros(
+            self._INITIAL_CAPACITY, dtype=numpy.int8)
+        self._view_ids = numpy.zeros(
+            self._INITIAL_CAPACITY, dtype=numpy.int64)
+
+        self.set_immovable_objects(input_immovable_objects, input_cell_size)
+
+    def set_immovable_objects(
+            self,
+            immovable_objects: List[ImmovableObject],
+            cell_size: int = SpatialGrid.DEFAULT_CELL_SIZE):
+        """Must be called when game map gets other immovable objects"""
+        self._init_platforms_grid(
+            [immovable_object for immovable_object in immovable_objects
+             if isinstance(immovable_object, BasicPlatform)],
+            cell_size)
+
+    def _init_platforms_grid(
+            self, platforms: List[BasicPlatform], cell_size: int):
+        spatial_grid: SpatialGrid = SpatialGrid(platforms, cell_size)
+
+        self._cell_size = cell_size
+
+        self._platforms_bounds = numpy.array(
+            [[min(platform.location.x, platform.location.x + platform.width),
+              min(platform.location.y, platform.location.y + platform.height),
+              max(platform.location.x, platform.location.x + platform.width),
+              max(platform.location.y, platform.location.y + platform.height)]
+             for platform in platforms],
+            dtype=float).reshape(-1, 4)
+
+        cells: Dict[Tuple[int, int], List[int]] = spatial_grid.cells
+
+        if len(cells) == 0:
+            self._first_cell_x = self._first_cell_y = 0
+            self._cells_width = self._cells_height = 0
+            self._cell_starts = numpy.zeros(0, dtype=numpy.int64)
+            self._cell_counts = numpy.zeros(0, dtype=numpy.int64)
+            self._cell_platforms = numpy.zeros(0, dtype=numpy.int64)
+
+            return
+
+        self._first_cell_x = min(cell_x for cell_x, _ in cells)
+        self._first_cell_y = min(cell_y for _, cell_y in cells)
+        self._cells_width = (
+            max(cell_x for cell_x, _ in cells) - self._first_cell_x + 1)
+        self._cells_height = (
+            max(cell_y for _, cell_y in cells) - self._first_cell_y + 1)
+
+        self._cell_starts = numpy.zeros(
+            self._cells_width * self._cells_height, dtype=numpy.int64)
+        self._cell_counts = numpy.zeros(
+            self._cells_width * self._cells_height, dtype=numpy.int64)
+        cell_platforms: List[int] = []
+
+        for (cell_x, cell_y), platforms_indexes in cells.items():
+            flat_cell_index: int = (
+                (cell_x - self._first_cell_x) * self._cells_height
+                + cell_y - self._first_cell_y)
+
+            self._cell_starts[flat_cell_index] = len(cell_platforms)
+            self._cell_counts[flat_cell_index] = len(platforms_indexes)
+            cell_platforms.extend(platforms_indexes)
+
+        self._cell_platforms = numpy.array(cell_platforms, dtype=numpy.int64)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, projectile: ProjectileObject):
+        """Copies given projectile into store"""
+        if projectile.__class__ not in self._PROJECTILE_TYPES:
+            raise ProjectileStoreException(
+                '[projectile] has unknown type: '
+                + projectile.__class__.__name__)
+
+        if self._count == len(self._alive):
+            self._grow()
+
+        row: int = self._count
+
+        self._locations[row] = projectile.location.x, projectile.location.y
+        self._moving_vectors[row] = (
+            projectile.moving_vector.x, projectile.moving_vector.y)
+        self._diameters[row] = projectile.CIRCLE_DIAMETER
+        self._alive[row] = not projectile.should_be_despawned
+        self._type_codes[row] = self._PROJECTILE_TYPES.index(
+            projectile.__class__)
+        self._view_ids[row] = self._next_view_id
+
+        self._next_view_id += 1
+        self._count += 1
+
+    def _grow(self):
+        """Doubles capacity of every array"""
+        self._locations = numpy.concatenate(
+            (self._locations, numpy.zeros_like(self._locations)))
+        self._moving_vectors = numpy.concatenate(
+            (self._moving_vectors, numpy.zeros_like(self._moving_vectors)))
+        self._diameters = numpy.concatenate(
+            (self._diameters, numpy.zeros_like(self._diameters)))
+        self._alive = numpy.concatenate(
+            (self._alive, numpy.zeros_like(self._alive)))
+        self._type_codes = numpy.concatenate(
+            (self._type_codes, numpy.zeros_like(self._type_codes)))
+        self._view_ids = numpy.concatenate(
+            (self._view_ids, numpy.zeros_like(self._view_ids)))
+
+    def update(self):
+        """One game loop iteration for all stored projectiles
+
+        Same rules as for [ProjectileObject]: projectile that is out of game
+        field's borders or hits platform on its way is despawned, others are
+        moved by their moving vectors
+        """
+        count: int = self._count
+
+        if count == 0:
+            return
+
+        locations: 'numpy.ndarray' = self._locations[:count]
+        diameters: 'numpy.ndarray' = self._diameters[:count]
+        alive: 'numpy.ndarray' = self._alive[:count]
+
+        # Game field's borders
+        alive &= ~(
+            (locations[:, 1] + diameters <= 0)
+            | (locations[:, 1] >= self._game_field_size.y)
+            | (locations[:, 0] + diameters <= 0)
+            | (locations[:, 0] >= self._game_field_size.x))
+
+        # Platforms
+        alive &= ~self._get_platforms_hits(count)
+
+        # Movement. Dead rows are moved too but they are compacted below
+        locations += self._moving_vectors[:count]
+
+        if not alive.all():
+            self._compact()
+
+    def _compact(self):
+        """Moves alive rows to the beginning of arrays keeping order"""
+        alive_rows: 'numpy.ndarray' = numpy.flatnonzero(
+            self._alive[:self._count])
+        alive_count: int = len(alive_rows)
+
+        for array in (
+                self._locations,
+                self._moving_vectors,
+                self._diameters,
+                self._alive,
+                self._type_codes,
+                self._view_ids):
+            array[:alive_count] = array[alive_rows]
+
+        self._count = alive_count
+
+    def _get_platforms_hits(self, count: int) -> 'numpy.ndarray':
+        """Gives flags of projectiles that hit any platform on their way"""
+        hits: 'numpy.ndarray' = numpy.zeros(count, dtype=bool)
+
+        if len(self._cell_platforms) == 0:
+            return hits
+
+        locations: 'numpy.ndarray' = self._locations[:count]
+        moving_vectors: 'numpy.ndarray' = self._moving_vectors[:count]
+        diameters: 'numpy.ndarray' = self._diameters[:count]
+
+        # 'Broad' phase: cells of swept bounding boxes
+        first_cells_x: 'numpy.ndarray' = numpy.floor(
+            numpy.minimum(
+                locations[:, 0], locations[:, 0] + moving_vectors[:, 0])
+            / self._cell_size).astype(numpy.int64) - self._first_cell_x
+        last_cells_x: 'numpy.ndarray' = numpy.floor(
+            (numpy.maximum(
+                locations[:, 0], locations[:, 0] + moving_vectors[:, 0])
+             + diameters)
+            / self._cell_size).astype(numpy.int64) - self._first_cell_x
+        first_cells_y: 'numpy.ndarray' = numpy.floor(
+            numpy.minimum(
+                locations[:, 1], locations[:, 1] + moving_vectors[:, 1])
+            / self._cell_size).astype(numpy.int64) - self._first_cell_y
+        last_cells_y: 'numpy.ndarray' = numpy.floor(
+            (numpy.maximum(
+                locations[:, 1], locations[:, 1] + moving_vectors[:, 1])
+             + diameters)
+            / self._cell_size).astype(numpy.int64) - self._first_cell_y
+
+        pairs_projectiles: List['numpy.ndarray'] = []
+        pairs_platforms: List['numpy.ndarray'] = []
+
+        # Swept boxes are usually smaller than cell so there are only few
+        # cells offsets. Every offset is processed for all projectiles at once
+        for offset_x in range(int((last_cells_x - first_cells_x).max()) + 1):
+            for offset_y in range(
+                    int((last_cells_y - first_cells_y).max()) + 1):
+                cells_x: 'numpy.ndarray' = first_cells_x + offset_x
+                cells_y: 'numpy.ndarray' = first_cells_y + offset_y
+
+                projectiles_indexes: 'numpy.ndarray' = numpy.flatnonzero(
+                    (cells_x <= last_cells_x)
+                    & (cells_y <= last_cells_y)
+                    & (cells_x >= 0) & (cells_x < self._cells_width)
+                    & (cells_y >= 0) & (cells_y < self._cells_height))
+
+                flat_cells_indexes: 'numpy.ndarray' = (
+                    cells_x[projectiles_indexes] * self._cells_height
+                    + cells_y[projectiles_indexes])
+                cells_counts: 'numpy.ndarray' = self._cell_counts[
+                    flat_cells_indexes]
+                pairs_count: int = int(cells_counts.sum())
+
+                if pairs_count == 0:
+                    continue
+
+                # Every projectile is paired with every platform of its cell
+                pairs_offsets: 'numpy.ndarray' = (
+                    numpy.arange(pairs_count)
+                    - numpy.repeat(
+                        numpy.cumsum(cells_counts) - cells_counts,
+                        cells_counts))
+
+                pairs_projectiles.append(
+                    numpy.repeat(projectiles_indexes, cells_counts))
+                pairs_platforms.append(self._cell_platforms[
+                    numpy.repeat(
+                        self._cell_starts[flat_cells_indexes], cells_counts)
+                    + pairs_offsets])
+
+        if len(pairs_projectiles) == 0:
+            return hits
+
+        projectiles_indexes: 'numpy.ndarray' = numpy.concatenate(
+            pairs_projectiles)
+        platforms_bounds: 'numpy.ndarray' = self._platforms_bounds[
+            numpy.concatenate(pairs_platforms)]
+
+        # 'Narrow' phase for all pairs at once
+        radiuses: 'numpy.ndarray' = diameters[projectiles_indexes] / 2
+
+        hits[projectiles_indexes[self._get_segments_rounded_rectangles_hits(
+            locations[projectiles_indexes, 0] + radiuses,
+            locations[projectiles_indexes, 1] + radiuses,
+            moving_vectors[projectiles_indexes, 0],
+            moving_vectors[projectiles_indexes, 1],
+            radiuses,
+            platforms_bounds[:, 0],
+            platforms_bounds[:, 1],
+            platforms_bounds[:, 2],
+            platforms_bounds[:, 3])]] = True
+
+        return hits
+
+    @classmethod
+    def _get_segments_rounded_rectangles_hits(
+            cls,
+            starts_x: 'numpy.ndarray',
+            starts_y: 'numpy.ndarray',
+            moves_x: 'numpy.ndarray',
+            moves_y: 'numpy.ndarray',
+            radiuses: 'numpy.ndarray',
+            lefts: 'numpy.ndarray',
+            tops: 'numpy.ndarray',
+            rights: 'numpy.ndarray',
+            bottoms: 'numpy.ndarray') -> 'numpy.ndarray':
+        """Vectorized version of swept circle against rectangle check
+
+        Rectangle expanded by radius with rounded corners is union of two
+        crossed rectangles and four corner circles (see
+        [CollisionsProcessor._get_moving_circle_rectangle_impact_time])
+        """
+        hits: 'numpy.ndarray' = (
+            cls._get_segments_rectangles_hits(
+                starts_x, starts_y, moves_x, moves_y,
+                lefts - radiuses, tops, rights + radiuses, bottoms)
+            | cls._get_segments_rectangles_hits(
+                starts_x, starts_y, moves_x, moves_y,
+                lefts, tops - radiuses, rights, bottoms + radiuses))
+
+        for corners_x, corners_y in (
+                (lefts, tops), (rights, tops),
+                (lefts, bottoms), (rights, bottoms)):
+            hits |= cls._get_segments_circles_hits(
+                starts_x, starts_y, moves_x, moves_y,
+                corners_x, corners_y, radiuses)
+
+        return hits
+
+    @staticmethod
+    def _get_segments_rectangles_hits(
+            starts_x: 'numpy.ndarray',
+            starts_y: 'numpy.ndarray',
+            moves_x: 'numpy.ndarray',
+            moves_y: 'numpy.ndarray',
+            lefts: 'numpy.ndarray',
+            tops: 'numpy.ndarray',
+            rights: 'numpy.ndarray',
+            bottoms: 'numpy.ndarray') -> 'numpy.ndarray':
+        """Vectorized slabs method"""
+        entry_times: 'numpy.ndarray' = numpy.zeros(len(starts_x))
+        exit_times: 'numpy.ndarray' = numpy.ones(len(starts_x))
+
+        for starts, moves, slabs_min, slabs_max in (
+                (starts_x, moves_x, lefts, rights),
+                (starts_y, moves_y, tops, bottoms)):
+            not_moving: 'numpy.ndarray' = moves == 0
+            inside_slabs: 'numpy.ndarray' = (
+                (slabs_min <= starts) & (starts <= slabs_max))
+            safe_moves: 'numpy.ndarray' = numpy.where(not_moving, 1, moves)
+
+            slabs_entry_times: 'numpy.ndarray' = (
+                (slabs_min - starts) / safe_moves)
+            slabs_exit_times: 'numpy.ndarray' = (
+                (slabs_max - starts) / safe_moves)
+
+            entry_times = numpy.maximum(entry_times, numpy.where(
+                not_moving,
+                numpy.where(inside_slabs, -numpy.inf, numpy.inf),
+                numpy.minimum(slabs_entry_times, slabs_exit_times)))
+            exit_times = numpy.minimum(exit_times, numpy.where(
+                not_moving,
+                numpy.where(inside_slabs, numpy.inf, -numpy.inf),
+                numpy.maximum(slabs_entry_times, slabs_exit_times)))
+
+        return entry_times <= exit_times
+
+    @staticmethod
+    def _get_segments_circles_hits(
+            starts_x: 'numpy.ndarray',
+            starts_y: 'numpy.ndarray',
+            moves_x: 'numpy.ndarray',
+            moves_y: 'numpy.ndarray',
+            centers_x: 'numpy.ndarray',
+            centers_y: 'numpy.ndarray',
+            radiuses: 'numpy.ndarray') -> 'numpy.ndarray':
+        """Segment hits circle if its closest point is not farther than radius
+        """
+        moves_lengths_squares: 'numpy.ndarray' = moves_x ** 2 + moves_y ** 2
+
+        closest_points_times: 'numpy.ndarray' = numpy.clip(
+            ((centers_x - starts_x) * moves_x
+             + (centers_y - starts_y) * moves_y)
+            / numpy.where(
+                moves_lengths_squares == 0, 1, moves_lengths_squares),
+            0,
+            1)
+
+        return (
+            (starts_x + closest_points_times * moves_x - centers_x) ** 2
+            + (starts_y + closest_points_times * moves_y - centers_y) ** 2
+            <= radiuses ** 2)
+
+    def get_rows(
+            self) -> Tuple['numpy.ndarray', 'numpy.ndarray', 'numpy.ndarray',
+                           'numpy.ndarray']:
+        """Locations, moving vectors, type codes and view ids of live rows
+
+        Arrays are views of store's ones and must NOT be modified. Type code
+        is index in [get_projectile_types]
+        """
+        return (
+            self._locations[:self._count],
+            self._moving_vectors[:self._count],
+            self._type_codes[:self._count],
+            self._view_ids[:self._count])
+
+    @classmethod
+    def get_projectile_types(cls) -> Tuple[type, ...]:
+        return cls._PROJECTILE_TYPES
+
+    def get_views(self) -> List[ProjectileView]:
+        """Gives views of live projectiles for drawing"""
+        locations: List[List[float]] = self._locations[:self._count].tolist()
+        moving_vectors: List[List[float]] = (
+            self._moving_vectors[:self._count].tolist())
+        type_codes: List[int] = self._type_codes[:self._count].tolist()
+        view_ids: List[int] = self._view_ids[:self._count].tolist()
+
+        return [
+            ProjectileView(
+                Vector2D(*locations[row]),
+                Vector2D(*moving_vectors[row]),
+                self._PROJECTILE_TYPES[type_codes[row]],
+                view_ids[row])
+            for row in range(self._count)]
+
+    def get_state(self) -> bytes:
+        """Packs used rows of all arrays and view ids counter
+
+        Platforms grid is NOT packed: it is given by game map
+        """
+        count: int = self._count
+
+        return b''.join((
+            self._STATE_HEADER.pack(count, self._next_view_id),
+            self._locations[:count].tobytes(),
+            self._moving_vectors[:count].tobytes(),
+            self._diameters[:count].tobytes(),
+            self._alive[:count].tobytes(),
+            self._type_codes[:count].tobytes(),
+            self._view_ids[:count].tobytes()))
+
+    def set_state(self, state: bytes):
+        """Restores rows packed by [get_state]"""
+        count, self._next_view_id = self._STATE_HEADER.unpack_from(state)
+
+        while len(self._alive) < count:
+            self._grow()
+
+        offset: int = self._STATE_HEADER.size
+
+        for array in (
+                self._locations,
+                self._moving_vectors,
+                self._diameters,
+                self._alive,
+                self._type_codes,
+                self._view_ids):
+            rows_size: int = count * array[0].nbytes
+
+            array[:count] = numpy.frombuffer(
+                state, array.dtype, count * array[0].size, offset).reshape(
+                (count,) + array.shape[1:])
+
+            offset += rows_size
+
+        if offset != len(state):
+            raise ProjectileStoreException(
+                'Projectile store state has wrong size', len(state))
+
+        self._count = count
+
+
+class ProjectileStoreException(ApplicationException):
+    pass
@@ -0,0 +1,236 @@
+from math import floor
+from typing import Dict, Tuple, Set, Callable
+
+from engine.game_objects import *
+from engine.type_registry import TypeRegistry
+from engine import ApplicationException
+
+
+# Immovable object's class -> function(immovable_object) that gives its
+# (left, top, right, bottom) borders
+IMMOVABLE_OBJECTS_BOUNDS: TypeRegistry = TypeRegistry(
+    'immovable objects bounds')
+
+
+def get_immovable_object_bounds(
+        immovable_object: ImmovableObject) -> (
+        Tuple[float, float, float, float]):
+    """Gives (left, top, right, bottom) borders of immovable object"""
+    bounds_getter: Optional[Callable] = IMMOVABLE_OBJECTS_BOUNDS.get(
+        immovable_object.__class__)
+
+    if bounds_getter is None:
+        raise SpatialGridException(
+            'While processing [get_immovable_object_bounds] method, '
+            'got [immovable_object] with unknown type: '
+            + immovable_object.__class__.__name__)
+
+    return bounds_getter(immovable_object)
+
+
+@IMMOVABLE_OBJECTS_BOUNDS.register(BasicPlatform)
+def _get_basic_platform_bounds(
+        basic_platform: BasicPlatform) -> Tuple[float, float, float, float]:
+    # Negative sizes are possible only inside map editor but bounds should
+    # be correct anyway
+    return (
+        min(basic_platform.location.x,
+            basic_platform.location.x + basic_platform.width),
+        min(basic_platform.location.y,
+            basic_platform.location.y + basic_platform.height),
+        max(basic_platform.location.x,
+            basic_platform.location.x + basic_platform.width),
+        max(basic_platform.location.y,
+            basic_platform.location.y + basic_platform.height))
+
+
+@IMMOVABLE_OBJECTS_BOUNDS.register(AbstractBuff)
+def _get_buff_bounds(buff: AbstractBuff) -> Tuple[float, float, float, float]:
+    return (
+        buff.location.x,
+        buff.location.y,
+        buff.location.x + AbstractBuff.SIDE_LENGTH,
+        buff.location.y + AbstractBuff.SIDE_LENGTH)
+
+
+class SpatialGrid:
+    """Uniform grid over immovable objects for 'broad' collisions phase
+
+    Every object is registered in every cell that its bounding box overlaps.
+    Bounds are inclusive on both sides so objects that only touch query
+    rectangle are returned too (narrow phase checks are inclusive as well).
+
+    Query results keep order of source list: order of collisions processing
+    must not depend on grid layout.
+
+    Grid is not limited to immovable objects: any objects can be indexed if
+    function that gives their bounds is given
+    """
+    DEFAULT_CELL_SIZE: int = 64
+
+    _cell_size: int
+
+    # Cell coordinates -> sorted indexes of objects in [_objects]
+    _cells: Dict[Tuple[int, int], List[int]]
+
+    _objects: List[ImmovableObject]
+
+    # Object -> (left, top, right, bottom)
+    _get_bounds: Callable[[Any], Tuple[float, float, float, float]]
+
+    def __init__(
+            self,
+            input_objects: List[ImmovableObject],
+            input_cell_size: int = DEFAULT_CELL_SIZE,
+            input_get_bounds: Callable[
+                [Any], Tuple[float, float, float, float]] = (
+                get_immovable_object_bounds)):
+        if input_cell_size <= 0:
+            raise SpatialGridException(
+                'Got non-positive cell size in process of spatial grid init: '
+                + str(input_cell_size))
+
+        self._cell_size = input_cell_size
+        self._get_bounds = input_get_bounds
+
+        self.rebuild(input_objects)
+
+    @classmethod
+    def from_cells(
+            cls,
+            input_objects: List[ImmovableObject],
+            input_cell_size: int,
+            input_cells: Dict[Tuple[int, int], List[int]]) -> 'SpatialGrid':
+        """Grid with already computed cells, e.g. from binary map file
+
+        Cells must be the ones that [rebuild] gives for the same objects
+        """
+        if input_cell_size <= 0:
+            raise SpatialGridException(
+                'Got non-positive cell size in process of spatial grid init: '
+                + str(input_cell_size))
+
+        spatial_grid: SpatialGrid = cls.__new__(cls)
+
+        spatial_grid._cell_size = input_cell_size
+        spatial_grid._get_bounds = get_immovable_object_bounds
+        spatial_grid._objects = input_objects
+        spatial_grid._cells = input_cells
+
+        return spatial_grid
+
+    @classmethod
+    def from_points(
+            cls,
+            input_points: List[Tuple[float, float]],
+            input_cell_size: int = DEFAULT_CELL_SIZE) -> 'SpatialGrid':
+        """Grid over (x, y) points. Faster than giving points' bounds
+
+        Every point is in exactly one cell, so grid is made with one pass
+        """
+        if input_cell_size <= 0:
+            raise SpatialGridException(
+                'Got non-positive cell size in process of spatial grid init: '
+                + str(input_cell_size))
+
+        spatial_grid: SpatialGrid = cls.__new__(cls)
+
+        spatial_grid._cell_size = input_cell_size
+        spatial_grid._get_bounds = lambda point: point + point
+        spatial_grid._objects = input_points
+        spatial_grid._cells = dict()
+
+        cells: Dict[Tuple[int, int], List[int]] = spatial_grid._cells
+
+        for point_index, (x, y) in enumerate(input_points):
+            cell_key: Tuple[int, int] = (
+                floor(x / input_cell_size), floor(y / input_cell_size))
+            cell: Optional[List[int]] = cells.get(cell_key)
+
+            if cell is None:
+                cells[cell_key] = [point_index]
+            else:
+                cell.append(point_index)
+
+        return spatial_grid
+
+    def rebuild(self, input_objects: List[ImmovableObject]):
+        """Registers all given objects from scratch
+
+        Should be invoked only when immovable geometry is changed
+        """
+        self._objects = input_objects
+        self._cells = dict()
+
+        for object_index in range(len(input_objects)):
+            left, top, right, bottom = self._get_bounds(
+                input_objects[object_index])
+
+            for cell_x in range(
+                    floor(left / self._cell_size),
+                    floor(right / self._cell_size) + 1):
+                for cell_y in range(
+                        floor(top / self._cell_size),
+                        floor(bottom / self._cell_size) + 1):
+                    self._cells.setdefault(
+                        (cell_x, cell_y), []).append(object_index)
+
+    @property
+    def cell_size(self) -> int:
+        return self._cell_size
+
+    @property
+    def cells(self) -> Dict[Tuple[int, int], List[int]]:
+        return self._cells
+
+    @property
+    def objects(self) -> List[ImmovableObject]:
+        return self._objects
+
+    def query_indexes(
+            self,
+            left: float,
+            top: float,
+            right: float,
+            bottom: float) -> List[int]:
+        """Gives ascending indexes of objects that may touch given rectangle
+
+        Result may contain objects that do not touch rectangle (objects from
+        the same cells) but never misses touching ones. Result must NOT be
+        modified: it may be grid's own cell list
+        """
+        first_cell_x: int = floor(left / self._cell_size)
+        last_cell_x: int = floor(right / self._cell_size)
+        first_cell_y: int = floor(top / self._cell_size)
+        last_cell_y: int = floor(bottom / self._cell_size)
+
+        # Optimization: Moving objects are usually smaller than cell so in
+        #  most cases there is only one cell and no deduplication is needed
+        if first_cell_x == last_cell_x and first_cell_y == last_cell_y:
+            return self._cells.get((first_cell_x, first_cell_y), [])
+
+        found_indexes: Set[int] = set()
+
+        for cell_x in range(first_cell_x, last_cell_x + 1):
+            for cell_y in range(first_cell_y, last_cell_y + 1):
+                cell: Optional[List[int]] = self._cells.get((cell_x, cell_y))
+
+                if cell is not None:
+                    found_indexes.update(cell)
+
+        return sorted(found_indexes)
+
+    def query(
+            self,
+            left: float,
+            top: float,
+            right: float,
+            bottom: float) -> List[ImmovableObject]:
+        """Same as [query_indexes] but gives objects themselves"""
+        return [
+            self._objects[object_index]
+            for object_index in self.query_indexes(left, top, right, bottom)]
+
+
+class SpatialGridException(ApplicationException):
+    pass
@@ -0,0 +1,67 @@
+from typing import Dict, Callable, Any, Optional
+
+
+class TypeRegistry:
+    """Maps game object classes to their handlers instead of isinstance chains
+
+    Handlers are registered for classes (possibly abstract ones) and looked
+    up by concrete class of object. Concrete class is resolved only once:
+    its MRO is walked on the first lookup and result is cached, so every next
+    lookup is a single dict lookup.
+
+    New game object kinds register their handlers themselves:
+
+        @GameEngine._StateUpdater.MOVABLE_OBJECTS_UPDATERS.register(NewKind)
+        def update_new_kind(state_updater, new_kind, mover_index): ...
+    """
+    _name: str
+
+    _registered: Dict[type, Any]
+
+    # Concrete class -> resolved handler or [None] if there is no handler
+    _resolved: Dict[type, Optional[Any]]
+
+    def __init__(self, input_name: str):
+        self._name = input_name
+
+        self._registered = dict()
+        self._resolved = dict()
+
+    def register(self, object_type: type) -> Callable[[Any], Any]:
+        """Decorator that registers handler and returns it unchanged"""
+        def decorator(handler: Any) -> Any:
+            self.add(object_type, handler)
+
+            return handler
+
+        return decorator
+
+    def add(self, object_type: type, handler: Any):
+        self._registered[object_type] = handler
+
+        # Subclasses of [object_type] may be resolved to other handlers
+        self._resolved.clear()
+
+    def get(self, object_type: type) -> Optional[Any]:
+        """Gives handler of the closest registered class in MRO or [None]"""
+        try:
+            return self._resolved[object_type]
+        except KeyError:
+            return self._resolve(object_type)
+
+    def _resolve(self, object_type: type) -> Optional[Any]:
+        handler: Optional[Any] = None
+
+        for parent_class in object_type.__mro__:
+            if parent_class in self._registered:
+                handler = self._registered[parent_class]
+
+                break
+
+        self._resolved[object_type] = handler
+
+        return handler
+
+    @property
+    def name(self) -> str:
+        return self._name
@@ -0,0 +1,306 @@
+from array import array
+from collections import deque
+from struct import Struct, error as StructError
+from typing import NamedTuple, Deque
+
+from maps import GameMap
+from engine.game_objects import *
+from engine import ApplicationException
+
+
+class WorldSnapshot(NamedTuple):
+    """Whole simulation state right after [tick] map updates"""
+    tick: int
+    data: bytes
+
+
+# Game map state, little-endian. All sections follow each other, their sizes
+# are given by header counts:
+#
+#   header:            movable objects count (I), slots count (I),
+#                      free slots count (I), buffs count (I),
+#                      projectile store state size (I)
+#   movable object:    type code (B), padding (7x), x (d), y (d),
+#                      moving vector x (d), moving vector y (d)
+#   dense slot:        slot (I) of every movable object
+#   slot generation:   generation (I) of every slot
+#   free slot:         slot (I)
+#   buff:              is charging (B), padding (3x), charge time start (I),
+#                      captor's movable object index (i), -1 if no captor
+#   projectile store:  see [ProjectileStore.get_state]
+_MAP_STATE_HEADER: Struct = Struct('<IIIII')
+_MOVABLE_RECORD: Struct = Struct('<B7xdddd')
+_BUFF_RECORD: Struct = Struct('<B3xIi')
+_SLOT_SIZE: int = array('I').itemsize
+
+# Index in this tuple is movable object's type code. Snapshots are never
+# stored in files so codes are free to change
+_MOVABLE_TYPES: Tuple[type, ...] = (
+    Player, HandgunProjectile, MachineGunProjectile)
+_MOVABLE_TYPES_CODES: Dict[type, int] = {
+    movable_type: type_code
+    for type_code, movable_type in enumerate(_MOVABLE_TYPES)}
+
+
+def get_buffs_indexes(
+        immovable_objects: List[ImmovableObject]) -> List[int]:
+    """Indexes of buffs. Only buffs have changing state among immovables"""
+    return [
+        immovable_index
+        for immovable_index, immovable_object in enumerate(immovable_objects)
+        if isinstance(immovable_object, AbstractBuff)]
+
+
+def _get_movable_record(movable_object: MovableObject) -> bytes:
+    type_code: Optional[int] = _MOVABLE_TYPES_CODES.get(
+        movable_object.__class__)
+
+    if type_code is None:
+        raise WorldSnapshotException(
+            'Movable object cannot be snapshotted: '
+            + movable_object.__class__.__name__)
+
+    if movable_object.__class__ is Player:
+        return _MOVABLE_RECORD.pack(
+            type_code,
+            movable_object.location.x,
+            movable_object.location.y,
+            0,
+            0)
+    else:
+        return _MOVABLE_RECORD.pack(
+            type_code,
+            movable_object.location.x,
+            movable_object.location.y,
+            movable_object.moving_vector.x,
+            movable_object.moving_vector.y)
+
+
+def pack_game_map_state(game_map: GameMap, buffs_indexes: List[int]) -> bytes:
+    """Packs everything that changes while game goes
+
+    Immovable objects except buffs' charging state are NOT packed: they are
+    the same for all snapshots of one game map. [buffs_indexes] are given
+    by [get_buffs_indexes] for current immovable objects
+    """
+    movable_objects: List[MovableObject] = list(game_map.movable_objects)
+    dense_slots, slot_generations, free_slots = (
+        game_map.movable_objects.get_slots_state())
+
+    # Made only if some buff is charging
+    movable_indexes: Optional[Dict[int, int]] = None
+    buffs_records: List[bytes] = []
+
+    for buff_index in buffs_indexes:
+        is_charging, charge_time_start, player_captor = (
+            game_map.immovable_objects[buff_index].get_charging_state())
+        captor_index: int = -1
+
+        if is_charging:
+            if movable_indexes is None:
+                movable_indexes = {
+                    id(movable_object): movable_index
+                    for movable_index, movable_object
+                    in enumerate(movable_objects)}
+
+            captor_index = movable_indexes.get(id(player_captor), -1)
+
+            if captor_index < 0:
+                raise WorldSnapshotException(
+                    'Captor of charging buff is not on game map')
+
+        buffs_records.append(
+            _BUFF_RECORD.pack(is_charging, charge_time_start, captor_index))
+
+    if game_map.projectile_store is None:
+        projectile_store_state: bytes = b''
+    else:
+        projectile_store_state = game_map.projectile_store.get_state()
+
+    return b''.join((
+        _MAP_STATE_HEADER.pack(
+            len(movable_objects),
+            len(slot_generations),
+            len(free_slots),
+            len(buffs_indexes),
+            len(projectile_store_state)),
+        b''.join(map(_get_movable_record, movable_objects)),
+        array('I', dense_slots).tobytes(),
+        array('I', slot_generations).tobytes(),
+        array('I', free_slots).tobytes(),
+        b''.join(buffs_records),
+        projectile_store_state))
+
+
+def _make_movable_object(
+        type_code: int,
+        x: float,
+        y: float,
+        moving_vector_x: float,
+        moving_vector_y: float) -> MovableObject:
+    if type_code >= len(_MOVABLE_TYPES):
+        raise WorldSnapshotException(
+            'Unknown movable object type code: ' + str(type_code))
+
+    elif _MOVABLE_TYPES[type_code] is Player:
+        return Player(Vector2D(x, y))
+
+    else:
+        return _MOVABLE_TYPES[type_code](
+            Vector2D(moving_vector_x, moving_vector_y), Vector2D(x, y))
+
+
+def _unpack_slots(state: memoryview, offset: int, count: int) -> List[int]:
+    slots: array = array('I')
+
+    slots.frombytes(state[offset:offset + count * _SLOT_SIZE])
+
+    return slots.tolist()
+
+
+def unpack_game_map_state(
+        game_map: GameMap,
+        buffs_indexes: List[int],
+        state: memoryview,
+        offset: int = 0):
+    """Restores state packed by [pack_game_map_state] into [game_map]
+
+    Movable objects are made anew, so old references to them become stale
+    while their handles stay valid. Buffs are made writable only if their
+    charging state differs, so unchanged buffs stay shared with template
+    """
+    try:
+        (movable_objects_count,
+         slots_count,
+         free_slots_count,
+         buffs_count,
+         projectile_store_state_size) = _MAP_STATE_HEADER.unpack_from(
+            state, offset)
+
+    except StructError:
+        raise WorldSnapshotException('Game map state is too short')
+
+    if buffs_count != len(buffs_indexes):
+        raise WorldSnapshotException(
+            'Game map state is packed for other immovable objects',
+            buffs_count,
+            len(buffs_indexes))
+
+    if ((projectile_store_state_size > 0)
+            != (game_map.projectile_store is not None)):
+        raise WorldSnapshotException(
+            'Game map state and game map differ in projectile store usage')
+
+    movable_objects_offset: int = offset + _MAP_STATE_HEADER.size
+    dense_slots_offset: int = (
+        movable_objects_offset
+        + movable_objects_count * _MOVABLE_RECORD.size)
+    slot_generations_offset: int = (
+        dense_slots_offset + movable_objects_count * _SLOT_SIZE)
+    free_slots_offset: int = (
+        slot_generations_offset + slots_count * _SLOT_SIZE)
+    buffs_offset: int = free_slots_offset + free_slots_count * _SLOT_SIZE
+    projectile_store_offset: int = (
+        buffs_offset + buffs_count * _BUFF_RECORD.size)
+
+    if (len(state)
+            != projectile_store_offset + projectile_store_state_size):
+        raise WorldSnapshotException(
+            'Game map state size does not match its header', len(state))
+
+    movable_objects: List[MovableObject] = [
+        _make_movable_object(*record)
+        for record in _MOVABLE_RECORD.iter_unpack(
+            state[movable_objects_offset:dense_slots_offset])]
+
+    game_map.movable_objects.set_state(
+        movable_objects,
+        _unpack_slots(state, dense_slots_offset, movable_objects_count),
+        _unpack_slots(state, slot_generations_offset, slots_count),
+        _unpack_slots(state, free_slots_offset, free_slots_count))
+
+    static_layer_is_changed: bool = False
+
+    for buff_index, (is_charging, charge_time_start, captor_index) in zip(
+            buffs_indexes,
+            _BUFF_RECORD.iter_unpack(
+                state[buffs_offset:projectile_store_offset])):
+        buff: AbstractBuff = game_map.immovable_objects[buff_index]
+
+        # Charge start time and captor mean nothing for not charging buffs
+        if not is_charging and not buff.is_charging():
+            continue
+
+        static_layer_is_changed |= bool(is_charging) != buff.is_charging()
+
+        buff = game_map.get_writable_immovable_object(buff)
+
+        if is_charging:
+            player_captor: Player = movable_objects[captor_index]
+
+            buff.set_charging_state(True, charge_time_start, player_captor)
+
+            player_captor.current_buffs.append(buff)
+        else:
+            buff.set_charging_state(False, charge_time_start, None)
+
+    if game_map.projectile_store is not None:
+        game_map.projectile_store.set_state(
+            state[projectile_store_offset:])
+
+    if static_layer_is_changed:
+        game_map.invalidate_static_layer()
+
+
+class WorldSnapshotsRing:
+    """Last [capacity] snapshots that are reachable by their ticks
+
+    Ticks of added snapshots should grow. Adding snapshot with tick that is
+    not newer than the latest one discards snapshots from that tick on:
+    after rollback the game goes another way
+    """
+    _snapshots: Deque[WorldSnapshot]
+    _snapshots_by_ticks: Dict[int, WorldSnapshot]
+
+    def __init__(self, input_capacity: int):
+        if input_capacity < 1:
+            raise WorldSnapshotException(
+                'Snapshots ring capacity must be positive', input_capacity)
+
+        self._snapshots = deque(maxlen=input_capacity)
+        self._snapshots_by_ticks = {}
+
+    @property
+    def capacity(self) -> int:
+        return self._snapshots.maxlen
+
+    def add(self, snapshot: WorldSnapshot):
+        """Oldest snapshot is dropped if ring is full"""
+        self.discard_newer(snapshot.tick - 1)
+
+        if len(self._snapshots) == self._snapshots.maxlen:
+            del self._snapshots_by_ticks[self._snapshots[0].tick]
+
+        self._snapshots.append(snapshot)
+        self._snapshots_by_ticks[snapshot.tick] = snapshot
+
+    def get(self, tick: int) -> Optional[WorldSnapshot]:
+        return self._snapshots_by_ticks.get(tick)
+
+    def get_latest(self) -> Optional[WorldSnapshot]:
+        if len(self._snapshots) == 0:
+            return None
+        else:
+            return self._snapshots[-1]
+
+    def discard_newer(self, tick: int):
+        """Removes snapshots with ticks greater than [tick]"""
+        while len(self._snapshots) > 0 and self._snapshots[-1].tick > tick:
+            del self._snapshots_by_ticks[self._snapshots.pop().tick]
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+
+class WorldSnapshotException(ApplicationException):
+    pass
@@ -1,12 +1,23 @@
 from copy import deepcopy
 from typing import Tuple
+from pickle import load as pickle_load
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
 
 from engine.game_objects import *
+from engine.projectile_store import ProjectileStore
+from engine.entity_store import GenerationalStore
+from engine.spatial_grid import SpatialGrid
 from engine import ApplicationException
 
 
 DEFAULT_RESOLUTION: Tuple[int, int] = (1000, 700)
 
+BINARY_MAP_EXTENSION: str = '.sqbm'
+CHUNKED_MAP_EXTENSION: str = '.sqcm'
+
 
 class GameMap:
     """
@@ -22,40 +33,226 @@ class GameMap:
 
     # Improvement: interface_objects: List[InterfaceObject]
     immovable_objects: List[ImmovableObject]
-    movable_objects: List[MovableObject]
+
+    # Movable objects are spawned and despawned all the time so they are
+    # kept in generational store with O(1) removal and stable handles.
+    # Order of movable objects is NOT preserved on despawning
+    movable_objects: GenerationalStore[MovableObject]
+
+    # If engine keeps projectiles in NumPy arrays then they are here and NOT
+    # in [movable_objects]. Class level default for maps pickled without
+    # this field
+    projectile_store: Optional[ProjectileStore] = None
+
+    # Increases on every change of immovable objects' look: buff charging
+    # state flip or geometry edit. Renderers redraw immovable objects only
+    # when it changes. Class level default for maps pickled without it
+    static_layer_version: int = 0
+
+    # Stable ids of immovable objects in order of [immovable_objects], e.g.
+    # for network sync. [None] if index of object is its id: the list is
+    # never replaced by other objects. Class level default for other maps
+    immovable_objects_ids: Optional[List[int]] = None
+
+    # 'Broad' phase index that came with map file. Collisions processor
+    # uses it only while it indexes current [immovable_objects] list,
+    # otherwise builds its own. Class level default for pickled maps
+    spatial_grid: Optional[SpatialGrid] = None
+
+    # Only for maps that are streamed by chunks: game engine updates it
+    # every tick. Class level default for other maps
+    chunks_streamer: Optional['ChunkedMapStreamer'] = None
+
+    # Only for maps made by template: immovable objects (and their list)
+    # are template's ones until they are changed. Class level default for
+    # other maps
+    _template: Optional['GameMapTemplate'] = None
 
     def __init__(
             self,
             input_game_field_size: Vector2D,
             input_immovable_objects: List[ImmovableObject],
-            input_movable_objects: List[MovableObject]):
+            input_movable_objects: List[MovableObject],
+            input_copy_objects: bool = True):
+        """Game objects are deep copied unless [input_copy_objects] is False
+
+        Objects that nobody else refers to (e.g. just loaded from file) need
+        no copying
+        """
         if input_game_field_size.x < 0 or input_game_field_size.y < 0:
             raise ApplicationException(
                 'Got negative game field size in process of game map init: '
                 + str(input_game_field_size))
 
-        self.game_field_size = deepcopy(input_game_field_size)
-        self.immovable_objects = deepcopy(input_immovable_objects)
-        self.movable_objects = deepcopy(input_movable_objects)
+        if input_copy_objects:
+            self.game_field_size = deepcopy(input_game_field_size)
+            self.immovable_objects = deepcopy(input_immovable_objects)
+            self.movable_objects = GenerationalStore(
+                deepcopy(input_movable_objects))
+        else:
+            self.game_field_size = input_game_field_size
+            self.immovable_objects = input_immovable_objects
+            self.movable_objects = GenerationalStore(input_movable_objects)
+
+    def __getstate__(self) -> dict:
+        """Template is not pickled: unpickled map shares nothing"""
+        state: dict = dict(self.__dict__)
+        state.pop('_template', None)
+
+        return state
+
+    def __setstate__(self, state: dict):
+        """Maps pickled before generational store have list of movables"""
+        self.__dict__.update(state)
+
+        if not isinstance(self.movable_objects, GenerationalStore):
+            self.movable_objects = GenerationalStore(self.movable_objects)
+
+    def invalidate_static_layer(self):
+        """Must be called after every change of immovable objects"""
+        self.static_layer_version += 1
+
+    def get_writable_immovable_object(
+            self, immovable_object: ImmovableObject) -> ImmovableObject:
+        """Gives immovable object of this map that can be changed
+
+        Object that is shared with template is copied right here. Must be
+        used before every change of immovable object in game (e.g. buff
+        capture)
+        """
+        if self._template is None:
+            return immovable_object
+
+        object_index: Optional[int] = self._template.get_immovable_index(
+            immovable_object)
+
+        if (object_index is None
+                or self.immovable_objects[object_index]
+                is not immovable_object):
+            return immovable_object
+
+        if self.immovable_objects is self._template.immovable_objects:
+            # The same objects in the same order, so grid cells are shared
+            self.immovable_objects = list(self.immovable_objects)
+            self.spatial_grid = SpatialGrid.from_cells(
+                self.immovable_objects,
+                self._template.spatial_grid.cell_size,
+                self._template.spatial_grid.cells)
+
+        object_copy: ImmovableObject = immovable_object.copy()
+        self.immovable_objects[object_index] = object_copy
+
+        return object_copy
+
+    def replace_immovable_objects(
+            self,
+            immovable_objects: List[ImmovableObject],
+            spatial_grid: Optional[SpatialGrid] = None,
+            immovable_objects_ids: Optional[List[int]] = None):
+        """Immovable objects are taken without copying"""
+        self.immovable_objects = immovable_objects
+        self.spatial_grid = spatial_grid
+        self.immovable_objects_ids = immovable_objects_ids
+        self._template = None
+
+        if self.projectile_store is not None:
+            self.projectile_store.set_immovable_objects(immovable_objects)
+
+        self.invalidate_static_layer()
 
     def remove_all_game_objects(self):
-        self.immovable_objects = []
-        self.movable_objects = []
+        self.movable_objects = GenerationalStore()
+
+        self.replace_immovable_objects([])
 
     def set(self, input_game_map: 'GameMap'):
+        """Takes game objects of [input_game_map] without copying
+
+        [input_game_map] must not be used after that
+        """
         self.movable_objects = input_game_map.movable_objects
-        self.immovable_objects = input_game_map.immovable_objects
+
+        self.replace_immovable_objects(
+            input_game_map.immovable_objects,
+            input_game_map.spatial_grid,
+            input_game_map.immovable_objects_ids)
+
+        self._template = input_game_map._template
+
+
+class GameMapTemplate:
+    """Source of many game maps with shared static geometry
+
+    Game maps made by template share its game field size, immovable objects
+    list and 'broad' phase grid, so making game map costs only copying of
+    movable objects. Immovable object is copied by game map only when it is
+    changed (see [GameMap.get_writable_immovable_object]).
+
+    Template itself is never changed
+    """
+    _game_field_size: Vector2D
+    _immovable_objects: List[ImmovableObject]
+    _movable_objects: List[MovableObject]
+
+    _spatial_grid: SpatialGrid
+
+    # id(immovable object) -> its index
+    _immovable_indexes: Dict[int, int]
+
+    def __init__(self, input_game_map: GameMap):
+        """Game objects of [input_game_map] are deep copied once"""
+        self._game_field_size = deepcopy(input_game_map.game_field_size)
+        self._immovable_objects = deepcopy(input_game_map.immovable_objects)
+        self._movable_objects = deepcopy(
+            list(input_game_map.movable_objects))
+
+        self._spatial_grid = SpatialGrid(self._immovable_objects)
+
+        self._immovable_indexes = {
+            id(immovable_object): object_index
+            for object_index, immovable_object in enumerate(
+                self._immovable_objects)}
+
+    def make_game_map(self) -> GameMap:
+        game_map: GameMap = GameMap(
+            self._game_field_size,
+            self._immovable_objects,
+            [movable_object.copy()
+             for movable_object in self._movable_objects],
+            False)
+
+        game_map.spatial_grid = self._spatial_grid
+        game_map._template = self
+
+        return game_map
+
+    def get_immovable_index(
+            self, immovable_object: ImmovableObject) -> Optional[int]:
+        """[None] if object is not template's one"""
+        return self._immovable_indexes.get(id(immovable_object))
+
+    @property
+    def immovable_objects(self) -> List[ImmovableObject]:
+        return self._immovable_objects
+
+    @property
+    def spatial_grid(self) -> SpatialGrid:
+        return self._spatial_grid
 
 
 class RawMapsContainer:
-    """Contains maps initializations via code"""
+    """Contains maps initializations via code
+
+    Every call makes new game objects, so game map does not copy them
+    """
     @staticmethod
     def get_map_1() -> GameMap:
         """One player only"""
         return GameMap(
             Vector2D(*DEFAULT_RESOLUTION),
             [],
-            [Player(Vector2D(10, 10))])
+            [Player(Vector2D(10, 10))],
+            False)
 
     @staticmethod
     def get_map_2() -> GameMap:
@@ -65,7 +262,8 @@ class RawMapsContainer:
             [BasicPlatform(200, 30, Vector2D(400, 600)),  # Center
              BasicPlatform(20, 100, Vector2D(0, 600)),  # Left
              BasicPlatform(20, 100, Vector2D(980, 600))],  # Right
-            [Player(Vector2D(101, 101))])
+            [Player(Vector2D(101, 101))],
+            False)
 
     @staticmethod
     def get_map_3() -> GameMap:
@@ -74,7 +272,8 @@ class RawMapsContainer:
             Vector2D(*DEFAULT_RESOLUTION),
             [SpeedUpBuff(Vector2D(500, 550)),
              JumpHeightUpBuff(Vector2D(800, 550))],
-            [Player(Vector2D(0, 0))])
+            [Player(Vector2D(0, 0))],
+            False)
 
     @staticmethod
     def get_map_4() -> GameMap:
@@ -84,4 +283,77 @@ class RawMapsContainer:
             [],
             [Player(Vector2D(0, 0)),
              HandgunProjectile(Vector2D(0, 0), Vector2D(10, 10)),
-             MachineGunProjectile(Vector2D(0, 0), Vector2D(100, 10))])
+             MachineGunProjectile(Vector2D(0, 0), Vector2D(100, 10))],
+            False)
+
+    @staticmethod
+    def get_map_5() -> GameMap:
+        """Arena four times wider than window, seen through camera"""
+        game_field_size: Vector2D = Vector2D(4000, 1400)
+
+        # Floor, walls and ledges that go up and down along the arena
+        immovable_objects: List[ImmovableObject] = [
+            BasicPlatform(4000, 30, Vector2D(0, 1370)),
+            BasicPlatform(20, 1370, Vector2D(0, 0)),
+            BasicPlatform(20, 1370, Vector2D(3980, 0))]
+
+        for ledge_index in range(19):
+            immovable_objects.append(
+                BasicPlatform(
+                    160,
+                    20,
+                    Vector2D(
+                        100 + ledge_index * 200,
+                        1250 - (ledge_index % 5) * 110)))
+
+        immovable_objects += [
+            SpeedUpBuff(Vector2D(1000, 1300)),
+            JumpHeightUpBuff(Vector2D(3000, 1300))]
+
+        return GameMap(
+            game_field_size,
+            immovable_objects,
+            [Player(Vector2D(100, 1300))],
+            False)
+
+
+def load_game_map(map_name: str) -> GameMap:
+    """Loads raw, binary, chunked or pickled game map
+
+    Raw maps names have format: "raw <name>". Non raw maps are loaded from
+    "maps" folder. Maps with [BINARY_MAP_EXTENSION] are binary ones, with
+    [CHUNKED_MAP_EXTENSION] are chunked ones, others are pickled
+    """
+    if map_name.startswith('raw '):
+        try:
+            return getattr(
+                RawMapsContainer, 'get_map_' + map_name.split(' ')[1])()
+
+        except AttributeError:
+            raise GameMapException('Wrong raw map name: ' + map_name)
+
+    map_path: str = os_path_join(
+        os_path_dirname(os_path_abspath(__file__)), map_name)
+
+    if map_name.endswith(BINARY_MAP_EXTENSION):
+        # Binary map module needs this one
+        from maps.binary_map import load_binary_map
+
+        return load_binary_map(map_path)
+
+    elif map_name.endswith(CHUNKED_MAP_EXTENSION):
+        from maps.chunked_map import load_chunked_map
+
+        return load_chunked_map(map_path)
+    else:
+        try:
+            with open(map_path, 'rb') as map_file_handle:
+                return pickle_load(map_file_handle)
+
+        except OSError as occurred_err:
+            raise GameMapException(
+                'Cannot open file: ' + map_name, *occurred_err.args)
+
+
+class GameMapException(ApplicationException):
+    pass
@@ -0,0 +1,387 @@
+from io import BytesIO
+from struct import Struct, error as StructError
+from argparse import ArgumentParser, Namespace
+from pickle import dump as pickle_dump, load as pickle_load
+from sys import path as sys_path
+from os import pardir as os_pardir
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from typing import BinaryIO, Callable
+
+try:
+    from maps import GameMap
+except ModuleNotFoundError:
+    sys_path.append(os_path_join(
+        os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+    from maps import GameMap
+finally:
+    from engine.game_objects import *
+    from engine.spatial_grid import SpatialGrid
+    from engine.type_registry import TypeRegistry
+    from engine import ApplicationException
+
+
+# Binary map format, little-endian. All sections follow each other, their
+# sizes are given by header counts. Records have fixed size so any record
+# is reachable by its index and doubles are aligned by 8 bytes:
+#
+#   header:           magic 'SQBM', version (H), reserved (H),
+#                     game field width (d), game field height (d),
+#                     immovable objects count (I), movable objects count (I),
+#                     grid cell size (I), grid cells count (I),
+#                     grid cells indexes count (I), reserved (I)
+#   immovable object: type code (B), padding (3x), width (i), height (i),
+#                     buff recharge time (I), x (d), y (d)
+#   movable object:   type code (B), padding (7x), x (d), y (d),
+#                     moving vector x (d), moving vector y (d)
+#   grid cell:        cell x (i), cell y (i), first index (I), count (I).
+#                     Cells are sorted by coordinates
+#   grid cell index:  immovable object index (I). Cell's indexes are
+#                     ascending
+_MAGIC: bytes = b'SQBM'
+_VERSION: int = 1
+
+_HEADER: Struct = Struct('<4sHxxddIIIIIxxxx')
+_IMMOVABLE_RECORD: Struct = Struct('<BxxxiiIdd')
+_MOVABLE_RECORD: Struct = Struct('<B7xdddd')
+_GRID_CELL_RECORD: Struct = Struct('<iiII')
+_GRID_INDEX_SIZE: int = 4
+
+# Type codes must never change: they are stored in files
+_TYPES_CODES: Dict[type, int] = {
+    BasicPlatform: 1,
+    SpeedUpBuff: 2,
+    JumpHeightUpBuff: 3,
+    Player: 4,
+    HandgunProjectile: 5,
+    MachineGunProjectile: 6}
+_CODES_TYPES: Dict[int, type] = {
+    type_code: object_type
+    for object_type, type_code in _TYPES_CODES.items()}
+
+# Game object's class -> function(game_object) that gives record fields
+# after type code
+IMMOVABLE_RECORDS_FIELDS: TypeRegistry = TypeRegistry(
+    'immovable records fields')
+MOVABLE_RECORDS_FIELDS: TypeRegistry = TypeRegistry('movable records fields')
+
+
+@IMMOVABLE_RECORDS_FIELDS.register(BasicPlatform)
+def _get_basic_platform_fields(basic_platform: BasicPlatform) -> tuple:
+    return (
+        basic_platform.width,
+        basic_platform.height,
+        0,
+        basic_platform.location.x,
+        basic_platform.location.y)
+
+
+@IMMOVABLE_RECORDS_FIELDS.register(AbstractBuff)
+def _get_buff_fields(buff: AbstractBuff) -> tuple:
+    return (
+        AbstractBuff.SIDE_LENGTH,
+        AbstractBuff.SIDE_LENGTH,
+        buff._recharge_time,
+        buff.location.x,
+        buff.location.y)
+
+
+@MOVABLE_RECORDS_FIELDS.register(Player)
+def _get_player_fields(player: Player) -> tuple:
+    return player.location.x, player.location.y, 0, 0
+
+
+@MOVABLE_RECORDS_FIELDS.register(ProjectileObject)
+def _get_projectile_fields(projectile: ProjectileObject) -> tuple:
+    return (
+        projectile.location.x,
+        projectile.location.y,
+        projectile.moving_vector.x,
+        projectile.moving_vector.y)
+
+
+def _get_type_code(game_object: GameObject) -> int:
+    type_code: Optional[int] = _TYPES_CODES.get(game_object.__class__)
+
+    if type_code is None:
+        raise BinaryMapException(
+            'Game object cannot be saved to binary map: '
+            + game_object.__class__.__name__)
+
+    return type_code
+
+
+def save_binary_map(
+        game_map: GameMap,
+        output_stream: BinaryIO,
+        cell_size: int = SpatialGrid.DEFAULT_CELL_SIZE):
+    """Writes game map with 'broad' phase index of its immovable objects
+
+    Only map as it is designed is saved: buffs' charging state, players'
+    buffs and projectiles from projectile store are not
+    """
+    spatial_grid: SpatialGrid = SpatialGrid(
+        game_map.immovable_objects, cell_size)
+    sorted_cells: List[Tuple[Tuple[int, int], List[int]]] = sorted(
+        spatial_grid.cells.items())
+    movable_objects: List[MovableObject] = list(game_map.movable_objects)
+
+    output_stream.write(
+        _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            game_map.game_field_size.x,
+            game_map.game_field_size.y,
+            len(game_map.immovable_objects),
+            len(movable_objects),
+            cell_size,
+            len(sorted_cells),
+            sum(len(cell) for _, cell in sorted_cells)))
+
+    for immovable_object in game_map.immovable_objects:
+        get_fields: Optional[Callable] = IMMOVABLE_RECORDS_FIELDS.get(
+            immovable_object.__class__)
+
+        output_stream.write(
+            _IMMOVABLE_RECORD.pack(
+                _get_type_code(immovable_object),
+                *get_fields(immovable_object)))
+
+    for movable_object in movable_objects:
+        get_fields = MOVABLE_RECORDS_FIELDS.get(movable_object.__class__)
+
+        output_stream.write(
+            _MOVABLE_RECORD.pack(
+                _get_type_code(movable_object),
+                *get_fields(movable_object)))
+
+    first_index: int = 0
+
+    for (cell_x, cell_y), cell in sorted_cells:
+        output_stream.write(
+            _GRID_CELL_RECORD.pack(cell_x, cell_y, first_index, len(cell)))
+
+        first_index += len(cell)
+
+    for _, cell in sorted_cells:
+        output_stream.write(
+            Struct('<' + str(len(cell)) + 'I').pack(*cell))
+
+
+def _make_immovable_object(
+        type_code: int,
+        width: int,
+        height: int,
+        recharge_time: int,
+        x: float,
+        y: float) -> ImmovableObject:
+    object_type: Optional[type] = _CODES_TYPES.get(type_code)
+
+    if object_type is BasicPlatform:
+        return BasicPlatform(width, height, Vector2D(x, y))
+
+    elif object_type is not None and issubclass(object_type, AbstractBuff):
+        return object_type(Vector2D(x, y), recharge_time=recharge_time)
+
+    else:
+        raise BinaryMapException(
+            'Unknown immovable object type code: ' + str(type_code))
+
+
+def _make_movable_object(
+        type_code: int,
+        x: float,
+        y: float,
+        moving_vector_x: float,
+        moving_vector_y: float) -> MovableObject:
+    object_type: Optional[type] = _CODES_TYPES.get(type_code)
+
+    if object_type is Player:
+        return Player(Vector2D(x, y))
+
+    elif (object_type is not None
+            and issubclass(object_type, ProjectileObject)):
+        return object_type(
+            Vector2D(moving_vector_x, moving_vector_y), Vector2D(x, y))
+
+    else:
+        raise BinaryMapException(
+            'Unknown movable object type code: ' + str(type_code))
+
+
+def get_immovable_objects_count(map_buffer: memoryview) -> int:
+    """Reads only header of binary map"""
+    try:
+        magic, version, _, _, immovable_objects_count, *_ = (
+            _HEADER.unpack_from(map_buffer))
+
+    except StructError:
+        raise BinaryMapException('Binary map is too short')
+
+    if magic != _MAGIC or version != _VERSION:
+        raise BinaryMapException(
+            'Not a binary map or unknown version', magic, version)
+
+    return immovable_objects_count
+
+
+def read_binary_map(map_buffer: memoryview) -> GameMap:
+    """Makes game map from binary map bytes
+
+    Records are unpacked section by section, and grid cells come ready from
+    file instead of being computed from objects. Every record is made into
+    object right away: engine updates every immovable object each tick, so
+    objects made on demand would be made on the first tick anyway
+    """
+    try:
+        (magic,
+         version,
+         game_field_width,
+         game_field_height,
+         immovable_objects_count,
+         movable_objects_count,
+         cell_size,
+         cells_count,
+         cells_indexes_count) = _HEADER.unpack_from(map_buffer)
+
+    except StructError:
+        raise BinaryMapException('Binary map is too short')
+
+    if magic != _MAGIC or version != _VERSION:
+        raise BinaryMapException(
+            'Not a binary map or unknown version', magic, version)
+
+    immovable_objects_offset: int = _HEADER.size
+    movable_objects_offset: int = (
+        immovable_objects_offset
+        + immovable_objects_count * _IMMOVABLE_RECORD.size)
+    cells_offset: int = (
+        movable_objects_offset + movable_objects_count * _MOVABLE_RECORD.size)
+    cells_indexes_offset: int = (
+        cells_offset + cells_count * _GRID_CELL_RECORD.size)
+
+    if (len(map_buffer)
+            != cells_indexes_offset + cells_indexes_count * _GRID_INDEX_SIZE):
+        raise BinaryMapException(
+            'Binary map size does not match its header', len(map_buffer))
+
+    # Records are unpacked before objects are made: if making fails then
+    # no views of buffer (e.g. mapped chunked map) are left in traceback
+    immovable_records: List[tuple] = list(_IMMOVABLE_RECORD.iter_unpack(
+        map_buffer[immovable_objects_offset:movable_objects_offset]))
+    movable_records: List[tuple] = list(_MOVABLE_RECORD.iter_unpack(
+        map_buffer[movable_objects_offset:cells_offset]))
+
+    immovable_objects: List[ImmovableObject] = [
+        _make_immovable_object(*record) for record in immovable_records]
+    movable_objects: List[MovableObject] = [
+        _make_movable_object(*record) for record in movable_records]
+
+    cells_indexes: Tuple[int, ...] = Struct(
+        '<' + str(cells_indexes_count) + 'I').unpack_from(
+        map_buffer, cells_indexes_offset)
+
+    # Wrong indexes would break collisions finding much later than loading
+    if cells_indexes and max(cells_indexes) >= immovable_objects_count:
+        raise BinaryMapException(
+            'Grid cell index is out of immovable objects',
+            max(cells_indexes))
+
+    cells_records: List[tuple] = list(_GRID_CELL_RECORD.iter_unpack(
+        map_buffer[cells_offset:cells_indexes_offset]))
+
+    cells: Dict[Tuple[int, int], List[int]] = {}
+
+    for cell_x, cell_y, first_index, indexes_count in cells_records:
+        if first_index + indexes_count > cells_indexes_count:
+            raise BinaryMapException(
+                'Grid cell indexes are out of grid cells indexes',
+                cell_x,
+                cell_y)
+
+        cells[(cell_x, cell_y)] = list(
+            cells_indexes[first_index:first_index + indexes_count])
+
+    # Objects are just made, so nothing to copy
+    game_map: GameMap = GameMap(
+        Vector2D(game_field_width, game_field_height),
+        immovable_objects,
+        movable_objects,
+        False)
+    game_map.spatial_grid = SpatialGrid.from_cells(
+        immovable_objects, cell_size, cells)
+
+    return game_map
+
+
+def load_binary_map(map_path: str) -> GameMap:
+    """Reads whole binary map file at once
+
+    Every record is read anyway, so file is not mapped into memory
+    """
+    try:
+        with open(map_path, 'rb') as map_file_handle:
+            map_bytes: bytes = map_file_handle.read()
+
+    except OSError as occurred_err:
+        raise BinaryMapException(
+            'Cannot open file: ' + map_path, *occurred_err.args)
+
+    return read_binary_map(memoryview(map_bytes))
+
+
+def convert_pickle_to_binary_map(pickle_map_path: str, binary_map_path: str):
+    with open(pickle_map_path, 'rb') as pickle_map_file:
+        game_map: GameMap = pickle_load(pickle_map_file)
+
+    binary_map_bytes: BytesIO = BytesIO()
+    save_binary_map(game_map, binary_map_bytes)
+
+    with open(binary_map_path, 'wb') as binary_map_file:
+        binary_map_file.write(binary_map_bytes.getvalue())
+
+
+def convert_binary_to_pickle_map(binary_map_path: str, pickle_map_path: str):
+    game_map: GameMap = load_binary_map(binary_map_path)
+
+    # Index is rebuilt on loading of pickled map
+    game_map.spatial_grid = None
+
+    with open(pickle_map_path, 'wb') as pickle_map_file:
+        pickle_dump(game_map, pickle_map_file)
+
+
+def convert_map_logic():
+    parser = ArgumentParser(
+        description='Converts game maps between pickle and binary formats')
+
+    parser.add_argument(
+        'direction',
+        help='conversion direction',
+        choices=['to-binary', 'to-pickle'])
+    parser.add_argument('source', help='map file to convert')
+    parser.add_argument('destination', help='converted map file')
+
+    arguments: Namespace = parser.parse_args()
+
+    try:
+        if arguments.direction == 'to-binary':
+            convert_pickle_to_binary_map(
+                arguments.source, arguments.destination)
+        else:
+            convert_binary_to_pickle_map(
+                arguments.source, arguments.destination)
+
+    except (ApplicationException, OSError) as occurred_exc:
+        parser.exit(1, 'Cannot convert map: ' + str(occurred_exc) + '\n')
+
+
+class BinaryMapException(ApplicationException):
+    pass
+
+
+if __name__ == '__main__':
+    convert_map_logic()
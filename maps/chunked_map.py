@@ -0,0 +1,461 @@
+from collections import OrderedDict
+from io import BytesIO
+from math import floor
+from mmap import mmap, ACCESS_READ
+from struct import Struct, error as StructError
+from argparse import ArgumentParser, Namespace
+from pickle import load as pickle_load
+from sys import path as sys_path
+from os import pardir as os_pardir
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from typing import BinaryIO, Set, Iterable
+
+try:
+    from maps import GameMap, BINARY_MAP_EXTENSION
+except ModuleNotFoundError:
+    sys_path.append(os_path_join(
+        os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+    from maps import GameMap, BINARY_MAP_EXTENSION
+finally:
+    from maps.binary_map import (
+        save_binary_map,
+        read_binary_map,
+        load_binary_map,
+        get_immovable_objects_count)
+    from engine.game_objects import *
+    from engine.spatial_grid import SpatialGrid, get_immovable_object_bounds
+    from engine import ApplicationException
+
+
+# Chunked map format, little-endian. Game field is split into square
+# chunks. Every chunk and the rest of map are stored as binary maps (see
+# [maps.binary_map]), so chunk is read by itself:
+#
+#   header:      magic 'SQCM', version (H), reserved (H),
+#                game field width (d), game field height (d),
+#                chunk size (I), object reach in chunks (I),
+#                global part size (I), chunks count (I)
+#   global part: binary map with movable objects only
+#   chunk:       chunk x (i), chunk y (i), binary map offset from file
+#                start (Q), binary map size (Q). Chunks are sorted by
+#                coordinates
+#   chunks' binary maps with immovable objects only
+#
+# Immovable object belongs to the chunk of its left top corner. Object
+# reach is how many chunks to the right and to the bottom the biggest
+# object spans beyond its own chunk
+_MAGIC: bytes = b'SQCM'
+_VERSION: int = 1
+
+_HEADER: Struct = Struct('<4sHxxddIIII')
+_CHUNK_RECORD: Struct = Struct('<iiQQ')
+
+DEFAULT_CHUNK_SIZE: int = 1024
+
+
+def _get_chunk(x: float, y: float, chunk_size: int) -> Tuple[int, int]:
+    return floor(x / chunk_size), floor(y / chunk_size)
+
+
+def save_chunked_map(
+        game_map: GameMap,
+        output_stream: BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE):
+    if chunk_size <= 0:
+        raise ChunkedMapException(
+            'Chunk size must be positive: ' + str(chunk_size))
+
+    chunks: Dict[Tuple[int, int], List[ImmovableObject]] = dict()
+    object_reach: int = 0
+
+    for immovable_object in game_map.immovable_objects:
+        left, top, right, bottom = get_immovable_object_bounds(
+            immovable_object)
+        chunk_x, chunk_y = _get_chunk(left, top, chunk_size)
+        last_chunk_x, last_chunk_y = _get_chunk(right, bottom, chunk_size)
+
+        chunks.setdefault((chunk_x, chunk_y), []).append(immovable_object)
+
+        object_reach = max(
+            object_reach, last_chunk_x - chunk_x, last_chunk_y - chunk_y)
+
+    global_part_stream: BytesIO = BytesIO()
+    save_binary_map(
+        GameMap(
+            game_map.game_field_size,
+            [],
+            list(game_map.movable_objects),
+            False),
+        global_part_stream)
+
+    chunks_binary_maps: List[Tuple[Tuple[int, int], bytes]] = []
+
+    for chunk_coordinates in sorted(chunks):
+        chunk_stream: BytesIO = BytesIO()
+        save_binary_map(
+            GameMap(
+                game_map.game_field_size,
+                chunks[chunk_coordinates],
+                [],
+                False),
+            chunk_stream)
+
+        chunks_binary_maps.append(
+            (chunk_coordinates, chunk_stream.getvalue()))
+
+    output_stream.write(
+        _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            game_map.game_field_size.x,
+            game_map.game_field_size.y,
+            chunk_size,
+            object_reach,
+            len(global_part_stream.getvalue()),
+            len(chunks_binary_maps)))
+    output_stream.write(global_part_stream.getvalue())
+
+    binary_map_offset: int = (
+        _HEADER.size
+        + len(global_part_stream.getvalue())
+        + len(chunks_binary_maps) * _CHUNK_RECORD.size)
+
+    for (chunk_x, chunk_y), chunk_binary_map in chunks_binary_maps:
+        output_stream.write(
+            _CHUNK_RECORD.pack(
+                chunk_x, chunk_y, binary_map_offset, len(chunk_binary_map)))
+
+        binary_map_offset += len(chunk_binary_map)
+
+    for _, chunk_binary_map in chunks_binary_maps:
+        output_stream.write(chunk_binary_map)
+
+
+class ChunkedMapStreamer:
+    """Keeps only chunks around players in game map
+
+    Chunks within load radius of every player's chunk are resident. Chunks
+    that are not needed anymore stay resident until there are more than
+    [max_resident_chunks] of them, then least recently needed ones are
+    evicted. Chunks with charging buffs are never evicted: players keep
+    references to captured buffs.
+
+    Game map's immovable objects are resident ones only, so collisions
+    processor and drawer see nothing else. Evicted chunk is read from file
+    again when it is needed again
+    """
+    DEFAULT_LOAD_RADIUS: int = 1
+    DEFAULT_MAX_RESIDENT_CHUNKS: int = 32
+
+    _map_mmap: mmap
+
+    _chunk_size: int
+    _object_reach: int
+
+    # Chunk coordinates -> (binary map offset, binary map size, id of
+    # chunk's first immovable object). Ids go on through chunks in their
+    # order, so object's id is stable while its chunk is evicted and loaded
+    # again
+    _chunks_locations: Dict[Tuple[int, int], Tuple[int, int, int]]
+
+    # Chunk coordinates -> its immovable objects. The first one is the
+    # least recently needed
+    _resident_chunks: 'OrderedDict[Tuple[int, int], List[ImmovableObject]]'
+
+    _load_radius: int
+    _max_resident_chunks: int
+
+    # Players' chunks and chunks around them on the last update
+    _focus_chunks: Set[Tuple[int, int]]
+    _needed_chunks: Set[Tuple[int, int]]
+
+    loaded_chunks_count: int
+    evicted_chunks_count: int
+
+    def __init__(
+            self,
+            input_map_mmap: mmap,
+            input_chunk_size: int,
+            input_object_reach: int,
+            input_chunks_locations: Dict[
+                Tuple[int, int], Tuple[int, int, int]],
+            input_load_radius: int = DEFAULT_LOAD_RADIUS,
+            input_max_resident_chunks: int = DEFAULT_MAX_RESIDENT_CHUNKS):
+        """Streamer owns [input_map_mmap] and closes it in [close]"""
+        if input_load_radius < 0 or input_max_resident_chunks < 1:
+            raise ChunkedMapException(
+                'Wrong load radius or resident chunks limit',
+                input_load_radius,
+                input_max_resident_chunks)
+
+        self._map_mmap = input_map_mmap
+
+        self._chunk_size = input_chunk_size
+        self._object_reach = input_object_reach
+        self._chunks_locations = input_chunks_locations
+
+        self._resident_chunks = OrderedDict()
+
+        self._load_radius = input_load_radius
+        self._max_resident_chunks = input_max_resident_chunks
+
+        self._focus_chunks = set()
+        self._needed_chunks = set()
+
+        self.loaded_chunks_count = 0
+        self.evicted_chunks_count = 0
+
+    def get_needed_chunks(
+            self,
+            focus_chunks: Iterable[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """Existing chunks whose objects may be within load radius"""
+        needed_chunks: Set[Tuple[int, int]] = set()
+
+        for chunk_x, chunk_y in focus_chunks:
+            # Objects of chunks to the left and to the top may reach here
+            for needed_x in range(
+                    chunk_x - self._load_radius - self._object_reach,
+                    chunk_x + self._load_radius + 1):
+                for needed_y in range(
+                        chunk_y - self._load_radius - self._object_reach,
+                        chunk_y + self._load_radius + 1):
+                    if (needed_x, needed_y) in self._chunks_locations:
+                        needed_chunks.add((needed_x, needed_y))
+
+        return needed_chunks
+
+    def update(self, game_map: GameMap) -> bool:
+        """Loads and evicts chunks around game map's players
+
+        Gives [True] if game map got other immovable objects
+        """
+        focus_chunks: Set[Tuple[int, int]] = {
+            _get_chunk(
+                movable_object.location.x + Player.SIDE_LENGTH / 2,
+                movable_object.location.y + Player.SIDE_LENGTH / 2,
+                self._chunk_size)
+            for movable_object in game_map.movable_objects
+            if isinstance(movable_object, Player)}
+
+        # Players are in the same chunks mostly
+        if focus_chunks == self._focus_chunks:
+            return False
+
+        self._focus_chunks = focus_chunks
+
+        needed_chunks: Set[Tuple[int, int]] = self.get_needed_chunks(
+            focus_chunks)
+        self._needed_chunks = needed_chunks
+
+        resident_chunks_are_changed: bool = False
+
+        for chunk_coordinates in sorted(needed_chunks):
+            if chunk_coordinates in self._resident_chunks:
+                self._resident_chunks.move_to_end(chunk_coordinates)
+            else:
+                self._resident_chunks[chunk_coordinates] = self._load_chunk(
+                    chunk_coordinates)
+
+                resident_chunks_are_changed = True
+
+        if self._evict_chunks():
+            resident_chunks_are_changed = True
+
+        if resident_chunks_are_changed:
+            self._set_resident_objects(game_map)
+
+        return resident_chunks_are_changed
+
+    def _load_chunk(
+            self,
+            chunk_coordinates: Tuple[int, int]) -> List[ImmovableObject]:
+        offset, size, _ = self._chunks_locations[chunk_coordinates]
+
+        with memoryview(self._map_mmap) as map_buffer:
+            with map_buffer[offset:offset + size] as chunk_buffer:
+                chunk_map: GameMap = read_binary_map(chunk_buffer)
+
+        self.loaded_chunks_count += 1
+
+        return chunk_map.immovable_objects
+
+    def _evict_chunks(self) -> bool:
+        """Evicts least recently needed chunks above the limit"""
+        evicted_chunks: List[Tuple[int, int]] = []
+        excess_count: int = (
+            len(self._resident_chunks) - self._max_resident_chunks)
+
+        for chunk_coordinates, chunk_objects in self._resident_chunks.items():
+            if len(evicted_chunks) >= excess_count:
+                break
+
+            if (chunk_coordinates not in self._needed_chunks
+                    and not any(
+                        isinstance(chunk_object, AbstractBuff)
+                        and chunk_object.is_charging()
+                        for chunk_object in chunk_objects)):
+                evicted_chunks.append(chunk_coordinates)
+
+        for chunk_coordinates in evicted_chunks:
+            del self._resident_chunks[chunk_coordinates]
+
+        self.evicted_chunks_count += len(evicted_chunks)
+
+        return len(evicted_chunks) > 0
+
+    def _set_resident_objects(self, game_map: GameMap):
+        # Order of chunks is fixed so the same resident chunks always give
+        # the same order of collisions processing
+        immovable_objects: List[ImmovableObject] = []
+        immovable_objects_ids: List[int] = []
+
+        for chunk_coordinates in sorted(self._resident_chunks):
+            chunk_objects: List[ImmovableObject] = self._resident_chunks[
+                chunk_coordinates]
+            first_id: int = self._chunks_locations[chunk_coordinates][2]
+
+            immovable_objects.extend(chunk_objects)
+            immovable_objects_ids.extend(
+                range(first_id, first_id + len(chunk_objects)))
+
+        game_map.replace_immovable_objects(
+            immovable_objects,
+            SpatialGrid(immovable_objects),
+            immovable_objects_ids)
+
+    @property
+    def resident_chunks(self) -> List[Tuple[int, int]]:
+        return list(self._resident_chunks)
+
+    @property
+    def chunks_count(self) -> int:
+        return len(self._chunks_locations)
+
+    def close(self):
+        self._map_mmap.close()
+
+
+def load_chunked_map(
+        map_path: str,
+        load_radius: int = ChunkedMapStreamer.DEFAULT_LOAD_RADIUS,
+        max_resident_chunks: int = (
+            ChunkedMapStreamer.DEFAULT_MAX_RESIDENT_CHUNKS)) -> GameMap:
+    """Gives game map with chunks around its players only
+
+    Game engine streams the other chunks with game map's chunks streamer
+    """
+    try:
+        with open(map_path, 'rb') as map_file_handle:
+            try:
+                map_mmap: mmap = mmap(
+                    map_file_handle.fileno(), 0, access=ACCESS_READ)
+
+            # Empty files cannot be mapped
+            except ValueError:
+                raise ChunkedMapException('Chunked map is empty: ' + map_path)
+
+    except OSError as occurred_err:
+        raise ChunkedMapException(
+            'Cannot open file: ' + map_path, *occurred_err.args)
+
+    try:
+        (magic,
+         version,
+         _,
+         _,
+         chunk_size,
+         object_reach,
+         global_part_size,
+         chunks_count) = _HEADER.unpack_from(map_mmap)
+
+        if magic != _MAGIC or version != _VERSION:
+            raise ChunkedMapException(
+                'Not a chunked map or unknown version', magic, version)
+
+        if chunk_size <= 0:
+            raise ChunkedMapException(
+                'Chunked map has non-positive chunk size', chunk_size)
+
+        chunks_offset: int = _HEADER.size + global_part_size
+        chunks_locations: Dict[Tuple[int, int], Tuple[int, int, int]] = (
+            dict())
+        first_id: int = 0
+
+        for chunk_index in range(chunks_count):
+            chunk_x, chunk_y, offset, size = _CHUNK_RECORD.unpack_from(
+                map_mmap, chunks_offset + chunk_index * _CHUNK_RECORD.size)
+
+            if offset + size > len(map_mmap):
+                raise ChunkedMapException(
+                    'Chunk is out of chunked map file', chunk_x, chunk_y)
+
+            chunks_locations[(chunk_x, chunk_y)] = (offset, size, first_id)
+
+            with memoryview(map_mmap) as map_buffer:
+                with map_buffer[offset:offset + size] as chunk_buffer:
+                    first_id += get_immovable_objects_count(chunk_buffer)
+
+        with memoryview(map_mmap) as map_buffer:
+            with map_buffer[_HEADER.size:chunks_offset] as global_part_buffer:
+                game_map: GameMap = read_binary_map(global_part_buffer)
+
+    except StructError:
+        map_mmap.close()
+
+        raise ChunkedMapException('Chunked map is too short')
+
+    except ApplicationException:
+        map_mmap.close()
+
+        raise
+
+    game_map.chunks_streamer = ChunkedMapStreamer(
+        map_mmap,
+        chunk_size,
+        object_reach,
+        chunks_locations,
+        load_radius,
+        max_resident_chunks)
+    game_map.chunks_streamer.update(game_map)
+
+    return game_map
+
+
+def convert_to_chunked_map_logic():
+    parser = ArgumentParser(
+        description='Splits pickled or binary game map into chunks')
+
+    parser.add_argument('source', help='map file to split')
+    parser.add_argument('destination', help='chunked map file')
+    parser.add_argument(
+        '--chunk-size',
+        help='chunk side in pixels (default: {})'.format(DEFAULT_CHUNK_SIZE),
+        type=int,
+        default=DEFAULT_CHUNK_SIZE)
+
+    arguments: Namespace = parser.parse_args()
+
+    try:
+        if arguments.source.endswith(BINARY_MAP_EXTENSION):
+            game_map: GameMap = load_binary_map(arguments.source)
+        else:
+            with open(arguments.source, 'rb') as source_file:
+                game_map = pickle_load(source_file)
+
+        with open(arguments.destination, 'wb') as destination_file:
+            save_chunked_map(game_map, destination_file, arguments.chunk_size)
+
+    except (ApplicationException, OSError) as occurred_exc:
+        parser.exit(1, 'Cannot split map: ' + str(occurred_exc) + '\n')
+
+
+class ChunkedMapException(ApplicationException):
+    pass
+
+
+if __name__ == '__main__':
+    convert_to_chunked_map_logic()
@@ -11,20 +11,22 @@ from os.path import (
     abspath as os_path_abspath,
     pardir as os_pardir)
 from pickle import dump as pickle_dump, load as pickle_load
+from io import BytesIO
 from typing import Dict, Callable
 
 try:
-    from maps import GameMap, DEFAULT_RESOLUTION
+    from maps import GameMap, DEFAULT_RESOLUTION, BINARY_MAP_EXTENSION
 except ModuleNotFoundError:
     sys_path.append(os_path_join(
         os_path_dirname(os_path_abspath(__file__)), os_pardir))
 
-    from maps import GameMap, DEFAULT_RESOLUTION
+    from maps import GameMap, DEFAULT_RESOLUTION, BINARY_MAP_EXTENSION
 finally:
     from engine import ApplicationException
     from engine.game_objects import *
     from engine.engine import EventListener
     from user_interface.game_ui import GameGUI
+    from maps.binary_map import save_binary_map, load_binary_map
 
 
 class MapEditor(tk_Frame):
@@ -110,13 +112,24 @@ class MapEditor(tk_Frame):
         self._save_button.configure(command=self._save_button_command)
 
     def _save_button_command(self):
+        """Binary map is saved if file name has binary map extension"""
         if self._save_filename_entry.get() != '':
+            # Map is serialized before file is opened: failed saving must
+            # not truncate existing map
+            map_bytes: BytesIO = BytesIO()
+
+            if self._save_filename_entry.get().endswith(
+                    BINARY_MAP_EXTENSION):
+                save_binary_map(self._game_map, map_bytes)
+            else:
+                pickle_dump(self._game_map, map_bytes)
+
             with open(self._save_filename_entry.get(), 'wb') as file_handle:
-                pickle_dump(self._game_map, file_handle)
+                file_handle.write(map_bytes.getvalue())
 
-                self._game_map.remove_all_game_objects()
+            self._game_map.remove_all_game_objects()
 
-                self._game_gui.render()
+            self._game_gui.render()
 
     def _init_loading_widgets(self):
         self._load_filename_entry = tk_Entry(master=self)
@@ -127,7 +140,13 @@ class MapEditor(tk_Frame):
         self._load_button.configure(command=self._load_button_command)
 
     def _load_button_command(self):
-        if self._load_filename_entry.get() != '':
+        if self._load_filename_entry.get().endswith(BINARY_MAP_EXTENSION):
+            self._game_map.set(
+                load_binary_map(self._load_filename_entry.get()))
+
+            self._game_gui.render()
+
+        elif self._load_filename_entry.get() != '':
             with open(self._load_filename_entry.get(), 'rb') as file_handle:
                 self._game_map.set(pickle_load(file_handle))
 
@@ -171,6 +190,8 @@ class MapEditor(tk_Frame):
                     self._game_map.immovable_objects.append(
                         globals()[button_name](Vector2D(event.x, event.y)))
 
+                self._game_map.invalidate_static_layer()
+
                 self._game_gui.render()
 
     def _change_basic_platform_size(self, event):
@@ -187,6 +208,8 @@ class MapEditor(tk_Frame):
                 event.y
                 - self._creating_basic_platform.location.y)
 
+            self._game_map.invalidate_static_layer()
+
             self._game_gui.render()
 
     def _finish_basic_platform_creation(self, _):
@@ -203,6 +226,8 @@ class MapEditor(tk_Frame):
 
                 self._creating_basic_platform.height *= -1
 
+            self._game_map.invalidate_static_layer()
+
             self._creating_basic_platform = None
 
     # Improvement: [_move_game_object] method
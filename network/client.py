@@ -0,0 +1,326 @@
+from asyncio import (
+    DatagramProtocol,
+    DatagramTransport,
+    Future,
+    Event,
+    get_running_loop,
+    wait_for,
+    shield as asyncio_shield,
+    sleep as asyncio_sleep,
+    TimeoutError as AsyncioTimeoutError)
+from typing import Iterable
+
+from maps import GameMap
+from engine.game_objects import *
+from engine.player_controls import LmbEvent
+from engine import ApplicationException
+from network.protocol import (
+    ACCEPT_PACKET,
+    STATE_PACKET,
+    ClientInput,
+    ServerAccept,
+    ProtocolException,
+    get_packet_kind,
+    pack_connect,
+    pack_disconnect,
+    pack_input,
+    pack_acknowledgement,
+    unpack_accept)
+from network.delta_encoding import (
+    ServerState, DeltaDecoder, DeltaEncodingException, get_record_location)
+from network.prediction import InputPredictor
+
+Address = Tuple[str, int]
+
+
+class _ClientProtocol(DatagramProtocol):
+    _game_client: 'GameClient'
+
+    def __init__(self, input_game_client: 'GameClient'):
+        self._game_client = input_game_client
+
+    def datagram_received(self, data: bytes, address: Address):
+        self._game_client.receive_packet(data)
+
+    def error_received(self, occurred_exc: Exception):
+        # Server is not reachable now. Connection timeout handles it
+        pass
+
+
+class GameClient:
+    """UDP client of [GameServer]
+
+    Input state is sent on every change. It is sent again if server's state
+    does not acknowledge it yet, packet may be lost. Every decoded state is
+    acknowledged, so server encodes next states against it.
+
+    With input predictor client's player moves at once: input is sent every
+    local tick and applied locally, server's states reconcile prediction
+    """
+    CONNECT_ATTEMPTS_COUNT: int = 10
+    CONNECT_ATTEMPT_TIMEOUT_SECONDS: float = 0.2
+
+    # [None] if not connected
+    _transport: Optional[DatagramTransport]
+
+    # [None] until connect attempt
+    _accept_future: Optional[Future]
+    _server_accept: Optional[ServerAccept]
+
+    # Set on every received state
+    _state_received: Event
+
+    _delta_decoder: DeltaDecoder
+
+    # [None] if client does not predict
+    _input_predictor: Optional[InputPredictor]
+
+    _latest_input: ClientInput
+    _latest_state: Optional[ServerState]
+
+    _received_states_count: int
+    _wrong_packets_count: int
+
+    def __init__(self, input_predictor: Optional[InputPredictor] = None):
+        self._transport = None
+
+        self._accept_future = None
+        self._server_accept = None
+
+        self._state_received = Event()
+
+        self._delta_decoder = DeltaDecoder()
+
+        self._input_predictor = input_predictor
+
+        self._latest_input = ClientInput(0, frozenset(), None)
+        self._latest_state = None
+
+        self._received_states_count = 0
+        self._wrong_packets_count = 0
+
+    async def connect(self, server_address: Address) -> ServerAccept:
+        """Connect packet is repeated until server accepts client"""
+        self._transport, _ = (
+            await get_running_loop().create_datagram_endpoint(
+                lambda: _ClientProtocol(self), remote_addr=server_address))
+
+        self._accept_future = get_running_loop().create_future()
+
+        for _ in range(self.CONNECT_ATTEMPTS_COUNT):
+            self._transport.sendto(pack_connect())
+
+            try:
+                self._server_accept = await wait_for(
+                    # Future itself must survive timeout of attempt
+                    asyncio_shield(self._accept_future),
+                    self.CONNECT_ATTEMPT_TIMEOUT_SECONDS)
+
+                return self._server_accept
+
+            except AsyncioTimeoutError:
+                pass
+
+        self.close()
+
+        raise GameClientException(
+            'Server does not answer', *server_address)
+
+    def close(self):
+        """Tells server about leaving. Server drops silent clients anyway"""
+        if self._transport is not None:
+            self._transport.sendto(pack_disconnect())
+            self._transport.close()
+
+            self._transport = None
+
+    def send_input(
+            self,
+            keys_pressed: Iterable[int],
+            lmb_event: Optional[LmbEvent] = None) -> int:
+        """Sends whole input state. Gives its sequence
+
+        Predicting client must send input every local tick: every input is
+        one local tick
+        """
+        keys_pressed = frozenset(keys_pressed)
+
+        if self._input_predictor is None:
+            input_sequence: int = self._latest_input.sequence + 1
+        else:
+            input_sequence = self._input_predictor.apply_input(keys_pressed)
+
+        self._latest_input = ClientInput(
+            input_sequence, keys_pressed, lmb_event)
+
+        self._send_latest_input()
+
+        return self._latest_input.sequence
+
+    def _send_latest_input(self):
+        if self._transport is not None:
+            self._transport.sendto(pack_input(self._latest_input))
+
+    def receive_packet(self, packet: bytes):
+        """Called by event loop"""
+        packet_kind: int = get_packet_kind(packet)
+
+        try:
+            if packet_kind == STATE_PACKET:
+                server_state: Optional[ServerState] = (
+                    self._delta_decoder.decode(packet))
+
+                # Baseline of state is already forgotten
+                if server_state is not None:
+                    self._receive_state(server_state)
+
+            elif (packet_kind == ACCEPT_PACKET
+                    and self._accept_future is not None
+                    and not self._accept_future.done()):
+                self._accept_future.set_result(unpack_accept(packet))
+
+            else:
+                self._wrong_packets_count += 1
+
+        except (ProtocolException, DeltaEncodingException):
+            self._wrong_packets_count += 1
+
+    def _receive_state(self, server_state: ServerState):
+        # Reordered old states are ignored
+        if (self._latest_state is not None
+                and server_state.tick <= self._latest_state.tick):
+            return
+
+        self._latest_state = server_state
+        self._received_states_count += 1
+
+        if self._transport is not None:
+            self._transport.sendto(pack_acknowledgement(server_state.tick))
+
+        if self._input_predictor is None:
+            if server_state.input_sequence < self._latest_input.sequence:
+                self._send_latest_input()
+
+        # Predicting client sends input every tick anyway
+        elif self._server_accept is not None:
+            player_location: Optional[Tuple[float, float]] = (
+                get_player_location(
+                    server_state, self._server_accept.player_entity_id))
+
+            if player_location is not None:
+                self._input_predictor.reconcile(
+                    server_state.input_sequence,
+                    server_state.input_repeats_count,
+                    *player_location,
+                    server_state.player_movement)
+
+        self._state_received.set()
+
+    async def wait_for_state(
+            self,
+            min_tick: int = 0,
+            timeout: float = 1.0) -> ServerState:
+        """Waits for state of [min_tick] or newer one"""
+        try:
+            while (self._latest_state is None
+                    or self._latest_state.tick < min_tick):
+                self._state_received.clear()
+
+                await wait_for(self._state_received.wait(), timeout)
+
+        except AsyncioTimeoutError:
+            raise GameClientException(
+                'No state from server for tick: ' + str(min_tick))
+
+        return self._latest_state
+
+    @property
+    def latest_state(self) -> Optional[ServerState]:
+        return self._latest_state
+
+    @property
+    def server_accept(self) -> Optional[ServerAccept]:
+        return self._server_accept
+
+    @property
+    def received_states_count(self) -> int:
+        return self._received_states_count
+
+    @property
+    def input_predictor(self) -> Optional[InputPredictor]:
+        return self._input_predictor
+
+
+def get_player_location(
+        server_state: ServerState,
+        player_entity_id: int) -> Optional[Tuple[float, float]]:
+    """[None] if player is not in state"""
+    record: Optional[Tuple[int, ...]] = server_state.snapshot.get(
+        player_entity_id)
+
+    if record is None:
+        return None
+
+    return get_record_location(record, server_state.tick)
+
+
+async def run_loopback_client(
+        server_address: Address,
+        seconds: float,
+        game_map: Optional[GameMap] = None) -> Optional[ServerState]:
+    """Holds 'D' key for [seconds] and prints received states count
+
+    With [game_map] client predicts its player's movement over that map:
+    input is sent every tick of server's tick rate
+    """
+    key_code_d: int = 68
+
+    game_client: GameClient = GameClient(
+        None if game_map is None else InputPredictor(game_map))
+    server_accept: ServerAccept = await game_client.connect(server_address)
+
+    print(
+        'Loopback client is connected, its player entity id: '
+        + str(server_accept.player_entity_id))
+
+    if game_client.input_predictor is None:
+        game_client.send_input([key_code_d])
+
+        await asyncio_sleep(seconds)
+    else:
+        loop_end: float = get_running_loop().time() + seconds
+        tick_duration: float = 1 / server_accept.tick_rate
+
+        while get_running_loop().time() < loop_end:
+            game_client.send_input([key_code_d])
+
+            await asyncio_sleep(tick_duration)
+
+    game_client.close()
+
+    print(
+        'Loopback client received states: '
+        + str(game_client.received_states_count))
+
+    if game_client.latest_state is not None:
+        player_location: Optional[Tuple[float, float]] = get_player_location(
+            game_client.latest_state, server_accept.player_entity_id)
+
+        if player_location is not None:
+            print('Player location: ({:.1f}, {:.1f})'.format(
+                *player_location))
+
+    if game_client.input_predictor is not None:
+        print(
+            'Predicted location: ({:.1f}, {:.1f}), corrections: {}, '
+            'replayed inputs: {}, repeated inputs: {}'.format(
+                *game_client.input_predictor.predicted_location,
+                game_client.input_predictor.corrections_count,
+                game_client.input_predictor.replayed_inputs_count,
+                game_client.input_predictor.repeated_inputs_count))
+
+    return game_client.latest_state
+
+
+class GameClientException(ApplicationException):
+    pass
@@ -0,0 +1,626 @@
+from struct import Struct, error as StructError
+from typing import NamedTuple, FrozenSet
+
+from maps import GameMap
+from engine.game_objects import *
+from engine.projectile_store import ProjectileStore, numpy
+from engine.entity_store import EntityHandle
+from engine.type_registry import TypeRegistry
+from engine.world_snapshot import get_buffs_indexes
+from engine import ApplicationException
+from network.protocol import STATE_PACKET
+
+# Entity id -> (type code, quantized fields...). Equal records mean equal
+# states, so changes are found by records comparison
+NetworkSnapshot = Dict[int, Tuple[int, ...]]
+
+# Locations are sent as integer counts of this quantum
+POSITION_QUANTUM: float = 1 / 8
+
+# Projectiles' locations are extrapolated by moving vectors, so these are
+# much finer: error grows with every tick of flight
+MOVING_VECTOR_QUANTUM: float = 1 / 1024
+
+# Two high bits of entity id are its kind:
+#   0: movable object, slot (16 bits) and generation (14 bits) of its handle
+#   1: buff, its stable id (see [GameMap.immovable_objects_ids])
+#   2: stored projectile, its view id (30 bits)
+#
+# Slots and buffs' ids that do not fit are errors, not aliases of other
+# entities
+_ENTITY_ID_BITS: int = 30
+_MOVABLE_SLOT_BITS: int = 16
+_BUFF_ENTITY: int = 1 << _ENTITY_ID_BITS
+_STORED_PROJECTILE_ENTITY: int = 2 << _ENTITY_ID_BITS
+
+# Index in these tuples is type code. Fields are sent after entity id and
+# type code in this order and formats:
+#   player:      x (i), y (i)
+#   projectile:  origin x (i), origin y (i), moving vector x (i) and y (i),
+#                origin tick (I)
+#   buff:        x (i), y (i), is charging (B)
+#
+# Projectiles fly straight with constant speed, so location of any tick is
+# given by location of the tick projectile was first sent on. Their records
+# never change and are sent only once
+OBJECT_TYPES: Tuple[type, ...] = (
+    Player,
+    HandgunProjectile,
+    MachineGunProjectile,
+    SpeedUpBuff,
+    JumpHeightUpBuff)
+_FIELDS_FORMATS: Tuple[str, ...] = (
+    'ii', 'iiiiI', 'iiiiI', 'iiB', 'iiB')
+
+_TYPES_CODES: Dict[type, int] = {
+    object_type: type_code
+    for type_code, object_type in enumerate(OBJECT_TYPES)}
+_PROJECTILES_TYPES_CODES: FrozenSet[int] = frozenset(
+    type_code for type_code, object_type in enumerate(OBJECT_TYPES)
+    if issubclass(object_type, ProjectileObject))
+
+# Game object's class -> function(game_object, tick) that gives quantized
+# fields
+NETWORK_FIELDS: TypeRegistry = TypeRegistry('network fields')
+
+
+@NETWORK_FIELDS.register(Player)
+def _get_player_fields(player: Player, _: int) -> Tuple[int, ...]:
+    return (
+        round(player.location.x / POSITION_QUANTUM),
+        round(player.location.y / POSITION_QUANTUM))
+
+
+@NETWORK_FIELDS.register(ProjectileObject)
+def _get_projectile_fields(
+        projectile: ProjectileObject, tick: int) -> Tuple[int, ...]:
+    return (
+        round(projectile.location.x / POSITION_QUANTUM),
+        round(projectile.location.y / POSITION_QUANTUM),
+        round(projectile.moving_vector.x / MOVING_VECTOR_QUANTUM),
+        round(projectile.moving_vector.y / MOVING_VECTOR_QUANTUM),
+        tick)
+
+
+@NETWORK_FIELDS.register(AbstractBuff)
+def _get_buff_fields(buff: AbstractBuff, _: int) -> Tuple[int, ...]:
+    return (
+        round(buff.location.x / POSITION_QUANTUM),
+        round(buff.location.y / POSITION_QUANTUM),
+        buff.is_charging())
+
+
+# State packet, little-endian:
+#
+#   header:  packet kind (B), tick (I), baseline tick (i, -1 if none),
+#            last applied input sequence (I), its repeats count (I),
+#            vertical velocity (d) and is on the ground (B) of client's
+#            player, spawns count (H), changes count (H), despawns count (H)
+#   spawn:   entity id (I), type code (B), all fields of type
+#   change:  entity id (I), changed fields mask (B), changed fields.
+#            Bit i of mask is field i of type
+#   despawn: entity id (I)
+#
+# Baseline is snapshot that client acknowledged. Client has it, so only
+# difference from it is sent. Entity that changed its type is spawned again.
+# Movement state of client's player is not part of snapshot: only its own
+# client needs it
+_STATE_HEADER: Struct = Struct('<BIiIIdBHHH')
+_RECORD_HEAD: Struct = Struct('<IB')
+_DESPAWN: Struct = Struct('<I')
+
+NO_BASELINE_TICK: int = -1
+
+_SPAWNS_STRUCTS: Tuple[Struct, ...] = tuple(
+    Struct('<IB' + fields_formats) for fields_formats in _FIELDS_FORMATS)
+
+# (type code, changed fields mask) -> (change struct, indexes of changed
+# fields in record). Filled on demand
+_CHANGES_STRUCTS: Dict[Tuple[int, int], Tuple[Struct, Tuple[int, ...]]] = {}
+
+
+def _get_change_struct(
+        type_code: int, fields_mask: int) -> Tuple[Struct, Tuple[int, ...]]:
+    try:
+        return _CHANGES_STRUCTS[type_code, fields_mask]
+    except KeyError:
+        pass
+
+    fields_formats: str = _FIELDS_FORMATS[type_code]
+    changed_fields: List[int] = [
+        field_index for field_index in range(len(fields_formats))
+        if fields_mask & (1 << field_index)]
+
+    if len(changed_fields) == 0 or fields_mask >> len(fields_formats):
+        raise DeltaEncodingException(
+            'Wrong changed fields mask', type_code, fields_mask)
+
+    change_struct: Tuple[Struct, Tuple[int, ...]] = (
+        Struct('<IB' + ''.join(
+            fields_formats[field_index] for field_index in changed_fields)),
+        # Fields go after type code in records
+        tuple(field_index + 1 for field_index in changed_fields))
+
+    _CHANGES_STRUCTS[type_code, fields_mask] = change_struct
+
+    return change_struct
+
+
+def get_movable_entity_id(handle: EntityHandle) -> int:
+    """Entity id of movable object of given handle"""
+    if handle.slot >> _MOVABLE_SLOT_BITS:
+        raise DeltaEncodingException(
+            'Movable object slot does not fit entity id', handle.slot)
+
+    return handle.slot | (handle.generation & 0x3FFF) << _MOVABLE_SLOT_BITS
+
+
+def get_record_location(
+        record: Tuple[int, ...], tick: int) -> Tuple[float, float]:
+    """Dequantized location of object on [tick]
+
+    Projectiles' locations are extrapolated from their origins
+    """
+    x: float = record[1] * POSITION_QUANTUM
+    y: float = record[2] * POSITION_QUANTUM
+
+    if record[0] in _PROJECTILES_TYPES_CODES:
+        flight_ticks: int = tick - record[5]
+
+        x += record[3] * MOVING_VECTOR_QUANTUM * flight_ticks
+        y += record[4] * MOVING_VECTOR_QUANTUM * flight_ticks
+
+    return x, y
+
+
+class ObjectState(NamedTuple):
+    entity_id: int
+    object_type: type
+    x: float
+    y: float
+
+    # Only buffs can charge
+    is_charging: bool
+
+
+class PlayerMovement(NamedTuple):
+    """Movement state of player that its location does not give"""
+    vertical_velocity: float
+    is_on_the_ground: bool
+
+
+# Movement state of new player. It is sent if client's player is despawned
+NO_PLAYER_MOVEMENT: PlayerMovement = PlayerMovement(0.0, False)
+
+
+class ServerState(NamedTuple):
+    """Decoded world state after [tick] updates
+
+    [input_sequence] is sequence of the last input of receiving client that
+    was applied before this state. Server repeats applied input every tick
+    until newer one comes, [input_repeats_count] is count of such ticks.
+    [player_movement] is movement state of receiving client's player
+    """
+    tick: int
+    input_sequence: int
+    snapshot: NetworkSnapshot
+    input_repeats_count: int = 0
+    player_movement: PlayerMovement = NO_PLAYER_MOVEMENT
+
+    def get_objects_states(self) -> List[ObjectState]:
+        """Dequantized states. Projectiles' locations are extrapolated"""
+        objects_states: List[ObjectState] = []
+
+        for entity_id, record in self.snapshot.items():
+            object_type: type = OBJECT_TYPES[record[0]]
+            x, y = get_record_location(record, self.tick)
+
+            objects_states.append(
+                ObjectState(
+                    entity_id,
+                    object_type,
+                    x,
+                    y,
+                    issubclass(object_type, AbstractBuff)
+                    and bool(record[3])))
+
+        return objects_states
+
+
+class NetworkSnapshotMaker:
+    """Makes network snapshots of game map
+
+    Snapshot is made once per tick and shared by all clients' encoders.
+    Records of projectiles are made only when projectiles are seen first
+    time, later they are taken from previous snapshot
+    """
+    _game_map: GameMap
+
+    # Entity id -> record of projectiles from previous snapshot
+    _projectiles_records: NetworkSnapshot
+
+    # Buffs indexes and their entities ids are cached for the immovable
+    # objects list they were got from
+    _buffs_immovable_objects: Optional[List[ImmovableObject]]
+    _buffs_indexes: List[int]
+    _buffs_entities_ids: List[int]
+
+    def __init__(self, input_game_map: GameMap):
+        self._game_map = input_game_map
+
+        self._projectiles_records = {}
+
+        self._buffs_immovable_objects = None
+        self._buffs_indexes = []
+        self._buffs_entities_ids = []
+
+    def make_snapshot(self, tick: int) -> NetworkSnapshot:
+        """[tick] is count of game map updates made"""
+        snapshot: NetworkSnapshot = {}
+        projectiles_records: NetworkSnapshot = {}
+
+        self._add_movable_objects(snapshot, projectiles_records, tick)
+        self._add_buffs(snapshot, tick)
+
+        if self._game_map.projectile_store is not None:
+            self._add_stored_projectiles(snapshot, projectiles_records, tick)
+
+        self._projectiles_records = projectiles_records
+
+        return snapshot
+
+    def _add_movable_objects(
+            self,
+            snapshot: NetworkSnapshot,
+            projectiles_records: NetworkSnapshot,
+            tick: int):
+        dense_slots, slot_generations, _ = (
+            self._game_map.movable_objects.get_slots_state())
+        previous_projectiles_records: NetworkSnapshot = (
+            self._projectiles_records)
+
+        for movable_object, slot in zip(
+                self._game_map.movable_objects, dense_slots):
+            # Same as [get_movable_entity_id] without handle making
+            if slot >> _MOVABLE_SLOT_BITS:
+                raise DeltaEncodingException(
+                    'Movable object slot does not fit entity id', slot)
+
+            entity_id: int = (
+                slot | (slot_generations[slot] & 0x3FFF) << _MOVABLE_SLOT_BITS)
+            record: Optional[Tuple[int, ...]] = (
+                previous_projectiles_records.get(entity_id))
+
+            if record is None:
+                type_code: Optional[int] = _TYPES_CODES.get(
+                    movable_object.__class__)
+
+                # Objects of unknown types are not sent
+                if type_code is None:
+                    continue
+
+                record = (type_code,) + NETWORK_FIELDS.get(
+                    movable_object.__class__)(movable_object, tick)
+
+                if isinstance(movable_object, ProjectileObject):
+                    projectiles_records[entity_id] = record
+            else:
+                projectiles_records[entity_id] = record
+
+            snapshot[entity_id] = record
+
+    def _add_buffs(self, snapshot: NetworkSnapshot, tick: int):
+        immovable_objects: List[ImmovableObject] = (
+            self._game_map.immovable_objects)
+
+        if self._buffs_immovable_objects is not immovable_objects:
+            self._buffs_immovable_objects = immovable_objects
+            self._buffs_indexes = get_buffs_indexes(immovable_objects)
+            self._buffs_entities_ids = self._get_buffs_entities_ids()
+
+        for buff_index, entity_id in zip(
+                self._buffs_indexes, self._buffs_entities_ids):
+            buff: AbstractBuff = immovable_objects[buff_index]
+
+            snapshot[entity_id] = (
+                (_TYPES_CODES[buff.__class__],)
+                + _get_buff_fields(buff, tick))
+
+    def _get_buffs_entities_ids(self) -> List[int]:
+        """Buff is the same entity while streamed map reloads its chunk"""
+        immovable_objects_ids: Optional[List[int]] = (
+            self._game_map.immovable_objects_ids)
+
+        if immovable_objects_ids is None:
+            buffs_ids: List[int] = self._buffs_indexes
+        else:
+            buffs_ids = [
+                immovable_objects_ids[buff_index]
+                for buff_index in self._buffs_indexes]
+
+        for buff_id in buffs_ids:
+            if buff_id >> _ENTITY_ID_BITS:
+                raise DeltaEncodingException(
+                    'Buff id does not fit entity id', buff_id)
+
+        return [_BUFF_ENTITY | buff_id for buff_id in buffs_ids]
+
+    def _add_stored_projectiles(
+            self,
+            snapshot: NetworkSnapshot,
+            projectiles_records: NetworkSnapshot,
+            tick: int):
+        """New projectiles' records are quantized by NumPy all at once"""
+        projectile_store: ProjectileStore = self._game_map.projectile_store
+        locations, moving_vectors, type_codes, view_ids = (
+            projectile_store.get_rows())
+        previous_projectiles_records: NetworkSnapshot = (
+            self._projectiles_records)
+
+        entities_ids: List[int] = (
+            (view_ids & ((1 << _ENTITY_ID_BITS) - 1))
+            | _STORED_PROJECTILE_ENTITY).tolist()
+        new_rows: List[int] = [
+            row for row, entity_id in enumerate(entities_ids)
+            if entity_id not in previous_projectiles_records]
+
+        if len(new_rows) > 0:
+            network_type_codes: List[int] = [
+                _TYPES_CODES[projectile_type]
+                for projectile_type
+                in projectile_store.get_projectile_types()]
+
+            projectiles_records.update(
+                zip(
+                    [entities_ids[row] for row in new_rows],
+                    zip(
+                        [network_type_codes[type_code]
+                         for type_code in type_codes[new_rows].tolist()],
+                        *numpy.rint(
+                            locations[new_rows] / POSITION_QUANTUM).astype(
+                            numpy.int64).T.tolist(),
+                        *numpy.rint(
+                            moving_vectors[new_rows]
+                            / MOVING_VECTOR_QUANTUM).astype(
+                            numpy.int64).T.tolist(),
+                        [tick] * len(new_rows))))
+
+        for entity_id in entities_ids:
+            record: Optional[Tuple[int, ...]] = (
+                previous_projectiles_records.get(entity_id))
+
+            if record is None:
+                record = projectiles_records[entity_id]
+            else:
+                projectiles_records[entity_id] = record
+
+            snapshot[entity_id] = record
+
+
+def encode_state(
+        tick: int,
+        input_sequence: int,
+        snapshot: NetworkSnapshot,
+        baseline_tick: int = NO_BASELINE_TICK,
+        baseline: Optional[NetworkSnapshot] = None,
+        input_repeats_count: int = 0,
+        player_movement: PlayerMovement = NO_PLAYER_MOVEMENT) -> bytes:
+    """Packs difference between [snapshot] and [baseline] into packet"""
+    if baseline is None:
+        baseline = {}
+
+    spawns: List[bytes] = []
+    changes: List[bytes] = []
+
+    for entity_id, record in snapshot.items():
+        baseline_record: Optional[Tuple[int, ...]] = baseline.get(entity_id)
+
+        if baseline_record is None or baseline_record[0] != record[0]:
+            spawns.append(_SPAWNS_STRUCTS[record[0]].pack(entity_id, *record))
+
+        elif baseline_record != record:
+            fields_mask: int = 0
+            changed_fields: List[int] = []
+
+            for field_index in range(1, len(record)):
+                if record[field_index] != baseline_record[field_index]:
+                    fields_mask |= 1 << (field_index - 1)
+                    changed_fields.append(record[field_index])
+
+            changes.append(
+                _get_change_struct(record[0], fields_mask)[0].pack(
+                    entity_id, fields_mask, *changed_fields))
+
+    despawns: List[int] = [
+        entity_id for entity_id in baseline if entity_id not in snapshot]
+
+    return b''.join((
+        _STATE_HEADER.pack(
+            STATE_PACKET,
+            tick,
+            baseline_tick,
+            input_sequence,
+            input_repeats_count,
+            player_movement.vertical_velocity,
+            player_movement.is_on_the_ground,
+            len(spawns),
+            len(changes),
+            len(despawns)),
+        b''.join(spawns),
+        b''.join(changes),
+        Struct('<' + str(len(despawns)) + 'I').pack(*despawns)))
+
+
+def get_state_baseline_tick(packet: bytes) -> int:
+    try:
+        return _STATE_HEADER.unpack_from(packet)[2]
+
+    except StructError:
+        raise DeltaEncodingException('State packet is too short')
+
+
+def decode_state(packet: bytes, baseline: NetworkSnapshot) -> ServerState:
+    """[baseline] is snapshot of tick given by [get_state_baseline_tick]"""
+    try:
+        (_,
+         tick,
+         _,
+         input_sequence,
+         input_repeats_count,
+         vertical_velocity,
+         is_on_the_ground,
+         spawns_count,
+         changes_count,
+         despawns_count) = _STATE_HEADER.unpack_from(packet)
+
+        snapshot: NetworkSnapshot = dict(baseline)
+        offset: int = _STATE_HEADER.size
+
+        for _ in range(spawns_count):
+            entity_id, type_code = _RECORD_HEAD.unpack_from(packet, offset)
+            spawn_struct: Struct = _SPAWNS_STRUCTS[type_code]
+
+            snapshot[entity_id] = spawn_struct.unpack_from(packet, offset)[1:]
+            offset += spawn_struct.size
+
+        for _ in range(changes_count):
+            entity_id, fields_mask = _RECORD_HEAD.unpack_from(packet, offset)
+            record: List[int] = list(snapshot[entity_id])
+            change_struct, changed_fields = _get_change_struct(
+                record[0], fields_mask)
+
+            for field_index, field_value in zip(
+                    changed_fields,
+                    change_struct.unpack_from(packet, offset)[2:]):
+                record[field_index] = field_value
+
+            snapshot[entity_id] = tuple(record)
+            offset += change_struct.size
+
+        if len(packet) != offset + despawns_count * _DESPAWN.size:
+            raise DeltaEncodingException(
+                'State packet size does not match its header', len(packet))
+
+        for entity_id, in _DESPAWN.iter_unpack(packet[offset:]):
+            del snapshot[entity_id]
+
+    except (StructError, IndexError, KeyError):
+        raise DeltaEncodingException('Wrong state packet')
+
+    return ServerState(
+        tick,
+        input_sequence,
+        snapshot,
+        input_repeats_count,
+        PlayerMovement(vertical_velocity, bool(is_on_the_ground)))
+
+
+class DeltaEncoder:
+    """Server side encoder of one client
+
+    Every state is encoded against the newest snapshot that client
+    acknowledged. Sent snapshots are kept until newer one is acknowledged,
+    at most [MAX_KEPT_SNAPSHOTS] of them. If acknowledged snapshot is lost
+    then whole state is sent
+    """
+    MAX_KEPT_SNAPSHOTS: int = 64
+
+    # Tick -> snapshot, in ticks order
+    _sent_snapshots: Dict[int, NetworkSnapshot]
+    _acknowledged_tick: int
+
+    def __init__(self):
+        self._sent_snapshots = {}
+        self._acknowledged_tick = NO_BASELINE_TICK
+
+    def acknowledge(self, tick: int):
+        """Unknown and old ticks are ignored: acks may be reordered"""
+        if tick <= self._acknowledged_tick or tick not in self._sent_snapshots:
+            return
+
+        self._acknowledged_tick = tick
+
+        # Older snapshots are never baselines again
+        for sent_tick in list(self._sent_snapshots):
+            if sent_tick >= tick:
+                break
+
+            del self._sent_snapshots[sent_tick]
+
+    def encode(
+            self,
+            tick: int,
+            input_sequence: int,
+            snapshot: NetworkSnapshot,
+            input_repeats_count: int = 0,
+            player_movement: PlayerMovement = NO_PLAYER_MOVEMENT) -> bytes:
+        """[snapshot] must NOT be modified after encoding"""
+        baseline: Optional[NetworkSnapshot] = self._sent_snapshots.get(
+            self._acknowledged_tick)
+
+        state_packet: bytes = encode_state(
+            tick,
+            input_sequence,
+            snapshot,
+            NO_BASELINE_TICK if baseline is None else self._acknowledged_tick,
+            baseline,
+            input_repeats_count,
+            player_movement)
+
+        self._sent_snapshots[tick] = snapshot
+
+        if len(self._sent_snapshots) > self.MAX_KEPT_SNAPSHOTS:
+            del self._sent_snapshots[next(iter(self._sent_snapshots))]
+
+        return state_packet
+
+    @property
+    def acknowledged_tick(self) -> int:
+        return self._acknowledged_tick
+
+
+class DeltaDecoder:
+    """Client side decoder
+
+    Decoded snapshots are kept as possible baselines, at most
+    [MAX_KEPT_SNAPSHOTS] of them. State with unknown baseline cannot be
+    decoded and is skipped: the next one is encoded against acknowledged
+    snapshot
+    """
+    MAX_KEPT_SNAPSHOTS: int = 64
+
+    # Tick -> snapshot, in ticks order
+    _snapshots: Dict[int, NetworkSnapshot]
+    _latest_tick: int
+
+    def __init__(self):
+        self._snapshots = {}
+        self._latest_tick = NO_BASELINE_TICK
+
+    def decode(self, state_packet: bytes) -> Optional[ServerState]:
+        """[None] if baseline of state is unknown"""
+        baseline_tick: int = get_state_baseline_tick(state_packet)
+
+        if baseline_tick == NO_BASELINE_TICK:
+            baseline: Optional[NetworkSnapshot] = {}
+        else:
+            baseline = self._snapshots.get(baseline_tick)
+
+            if baseline is None:
+                return None
+
+        server_state: ServerState = decode_state(state_packet, baseline)
+
+        # Reordered old states are decoded but not kept
+        if server_state.tick > self._latest_tick:
+            self._latest_tick = server_state.tick
+            self._snapshots[server_state.tick] = server_state.snapshot
+
+            if len(self._snapshots) > self.MAX_KEPT_SNAPSHOTS:
+                del self._snapshots[next(iter(self._snapshots))]
+
+        return server_state
+
+
+class DeltaEncodingException(ApplicationException):
+    pass
@@ -0,0 +1,155 @@
+from typing import Set
+
+from maps import DEFAULT_RESOLUTION
+from engine.game_objects import *
+from engine.spatial_grid import SpatialGrid
+from engine import ApplicationException
+from network.delta_encoding import NetworkSnapshot, get_record_location
+
+
+class InterestGrid:
+    """Spatial query over entities of one network snapshot
+
+    Grid is made once per tick and shared by all clients' areas of
+    interest, as snapshot itself is. Entities are points: their sizes are
+    covered by areas' margins
+    """
+    DEFAULT_CELL_SIZE: int = 256
+
+    _snapshot: NetworkSnapshot
+
+    # Entity id -> dequantized location on snapshot's tick
+    _locations: Dict[int, Tuple[float, float]]
+
+    _entities_ids: List[int]
+    _spatial_grid: SpatialGrid
+
+    def __init__(
+            self,
+            input_snapshot: NetworkSnapshot,
+            input_tick: int,
+            input_cell_size: int = DEFAULT_CELL_SIZE):
+        self._snapshot = input_snapshot
+        self._locations = {
+            entity_id: get_record_location(record, input_tick)
+            for entity_id, record in input_snapshot.items()}
+
+        self._entities_ids = list(self._locations)
+
+        # Grid gives indexes of locations, ids are mapped back on query
+        self._spatial_grid = SpatialGrid.from_points(
+            list(self._locations.values()), input_cell_size)
+
+    def query(
+            self,
+            left: float,
+            top: float,
+            right: float,
+            bottom: float) -> List[int]:
+        """Gives ids of entities inside given rectangle, bounds inclusive"""
+        found_ids: List[int] = []
+        locations: List[Tuple[float, float]] = self._spatial_grid.objects
+
+        for entity_index in self._spatial_grid.query_indexes(
+                left, top, right, bottom):
+            x, y = locations[entity_index]
+
+            if left <= x <= right and top <= y <= bottom:
+                found_ids.append(self._entities_ids[entity_index])
+
+        return found_ids
+
+    def get_location(self, entity_id: int) -> Tuple[float, float]:
+        return self._locations[entity_id]
+
+    @property
+    def snapshot(self) -> NetworkSnapshot:
+        return self._snapshot
+
+
+class AreaOfInterest:
+    """Entities that one client is sent
+
+    Entity enters area when it is inside client's view expanded by
+    [margin]. It leaves area only when it is further than [hysteresis] out
+    of that. So entity on the border does not flicker: every flicker is
+    despawn and spawn again in client's delta
+    """
+    DEFAULT_MARGIN: float = 128
+    DEFAULT_HYSTERESIS: float = 64
+
+    # Half sizes of view expanded by margin
+    _half_width: float
+    _half_height: float
+
+    _hysteresis: float
+
+    # Ids of entities that are in area now
+    _entities_ids: Set[int]
+
+    def __init__(
+            self,
+            input_view_size: Tuple[float, float] = DEFAULT_RESOLUTION,
+            input_margin: float = DEFAULT_MARGIN,
+            input_hysteresis: float = DEFAULT_HYSTERESIS):
+        if input_view_size[0] <= 0 or input_view_size[1] <= 0:
+            raise InterestManagementException(
+                'Got non-positive view size in process of area of interest '
+                'init: ' + str(input_view_size))
+
+        if input_margin < 0 or input_hysteresis < 0:
+            raise InterestManagementException(
+                'Got negative margin or hysteresis in process of area of '
+                'interest init: ' + str((input_margin, input_hysteresis)))
+
+        self._half_width = input_view_size[0] / 2 + input_margin
+        self._half_height = input_view_size[1] / 2 + input_margin
+        self._hysteresis = input_hysteresis
+
+        self._entities_ids = set()
+
+    def filter_snapshot(
+            self,
+            interest_grid: InterestGrid,
+            center_x: float,
+            center_y: float) -> NetworkSnapshot:
+        """Part of grid's snapshot around view centered on given point
+
+        Cost depends on count of entities around view, not on whole
+        snapshot's size
+        """
+        left: float = center_x - self._half_width
+        top: float = center_y - self._half_height
+        right: float = center_x + self._half_width
+        bottom: float = center_y + self._half_height
+
+        previous_entities_ids: Set[int] = self._entities_ids
+        entities_ids: Set[int] = set()
+
+        # Entities between inner and outer rectangles stay only if they
+        # were in area already
+        for entity_id in interest_grid.query(
+                left - self._hysteresis,
+                top - self._hysteresis,
+                right + self._hysteresis,
+                bottom + self._hysteresis):
+            if entity_id in previous_entities_ids:
+                entities_ids.add(entity_id)
+            else:
+                x, y = interest_grid.get_location(entity_id)
+
+                if left <= x <= right and top <= y <= bottom:
+                    entities_ids.add(entity_id)
+
+        self._entities_ids = entities_ids
+
+        snapshot: NetworkSnapshot = interest_grid.snapshot
+
+        return {entity_id: snapshot[entity_id] for entity_id in entities_ids}
+
+    def __len__(self) -> int:
+        return len(self._entities_ids)
+
+
+class InterestManagementException(ApplicationException):
+    pass
@@ -0,0 +1,298 @@
+from typing import FrozenSet, Iterable
+
+from maps import GameMap
+from engine.game_objects import *
+from engine.engine import GameEngine
+from engine.entity_store import EntityHandle
+from engine.player_controls import PlayerControls
+from engine import ApplicationException
+from network.delta_encoding import POSITION_QUANTUM, PlayerMovement
+
+
+class InputPredictor:
+    """Client side prediction of client's own player movement
+
+    Local engine simulates only player over game map's immovable objects:
+    movement depends only on keys and map. Every input is applied at once
+    as one local tick.
+
+    Inputs that server has not applied yet are kept with predicted states,
+    at most [window] of them. When server's state of some input comes,
+    prediction of that input is checked. Mispredicted state is replaced by
+    server's one, location and movement state both, and pending inputs are
+    replayed over it, so replay is never longer than window.
+
+    Server repeats applied input every tick until newer one comes. Such
+    repeats are inserted into local ticks right after their input, and
+    pending inputs are replayed after them, as server applies them
+    """
+    DEFAULT_WINDOW: int = 64
+
+    # Predicted location may differ from server's one only by quantization
+    _TOLERANCE: float = POSITION_QUANTUM / 2
+
+    # Vertical velocity is sent as is, so it differs only by rounding
+    _VELOCITY_TOLERANCE: float = 1e-9
+
+    _game_engine: GameEngine
+    _player_handle: EntityHandle
+    _window: int
+
+    _latest_sequence: int
+
+    # Input sequence -> keys pressed of input that server has not applied
+    # yet, in sequences order
+    _pending_inputs: Dict[int, FrozenSet[int]]
+
+    # Input sequence -> local tick of pending input
+    _inputs_ticks: Dict[int, int]
+
+    # Input sequence -> predicted player location and movement state after
+    # pending input
+    _predicted_states: Dict[int, Tuple[float, float, PlayerMovement]]
+
+    _acknowledged_sequence: int
+    _acknowledged_repeats_count: int
+
+    # Local tick of the latest acknowledged state. [None] if inputs right
+    # after it are forgotten: its repeats cannot be inserted then
+    _acknowledged_tick: Optional[int]
+
+    _corrections_count: int
+    _replayed_inputs_count: int
+    _repeated_inputs_count: int
+
+    def __init__(
+            self,
+            input_game_map: GameMap,
+            input_window: int = DEFAULT_WINDOW):
+        """Player of local engine is the first player of [input_game_map]"""
+        if input_window <= 0:
+            raise InputPredictorException(
+                'Got non-positive window in process of input predictor init: '
+                + str(input_window))
+
+        self._game_engine = GameEngine(
+            GameMap(
+                input_game_map.game_field_size,
+                input_game_map.immovable_objects,
+                [movable_object
+                 for movable_object in input_game_map.movable_objects
+                 if isinstance(movable_object, Player)][:1]))
+        self._player_handle = self._game_engine.get_players_handles()[0]
+        self._window = input_window
+
+        # Predicted states by local ticks. Snapshot of the tick before the
+        # oldest pending input is needed too
+        self._game_engine.enable_world_snapshots(input_window + 1)
+
+        self._latest_sequence = 0
+
+        self._pending_inputs = {}
+        self._inputs_ticks = {}
+        self._predicted_states = {}
+
+        self._acknowledged_sequence = 0
+        self._acknowledged_repeats_count = 0
+        self._acknowledged_tick = 0
+
+        self._corrections_count = 0
+        self._replayed_inputs_count = 0
+        self._repeated_inputs_count = 0
+
+    def apply_input(self, keys_pressed: Iterable[int]) -> int:
+        """Makes local tick with given input. Gives input's sequence
+
+        The oldest pending input is forgotten if window is full: server
+        does not answer for too long
+        """
+        keys_pressed = frozenset(keys_pressed)
+
+        self._get_player_controls().set_input(keys_pressed, None)
+        self._game_engine.update_map()
+
+        self._latest_sequence += 1
+
+        self._pending_inputs[self._latest_sequence] = keys_pressed
+        self._inputs_ticks[self._latest_sequence] = (
+            self._game_engine.get_map_updates_count())
+        self._predicted_states[self._latest_sequence] = (
+            self._get_player_state())
+
+        if len(self._pending_inputs) > self._window:
+            self._forget_pending_input(next(iter(self._pending_inputs)))
+
+            self._acknowledged_tick = None
+
+        return self._latest_sequence
+
+    def reconcile(
+            self,
+            input_sequence: int,
+            input_repeats_count: int,
+            x: float,
+            y: float,
+            player_movement: PlayerMovement) -> bool:
+        """Checks prediction by server's player state after given input
+
+        Server's state is given after input and its repeats. Gives [True]
+        if prediction is corrected. Old and unknown inputs are ignored
+        """
+        if input_sequence == self._acknowledged_sequence:
+            if (input_repeats_count <= self._acknowledged_repeats_count
+                    or self._acknowledged_tick is None):
+                return False
+
+            input_tick: int = self._acknowledged_tick
+            new_repeats_count: int = (
+                input_repeats_count - self._acknowledged_repeats_count)
+
+        else:
+            known_input_tick: Optional[int] = self._inputs_ticks.get(
+                input_sequence)
+
+            if (input_sequence < self._acknowledged_sequence
+                    or known_input_tick is None):
+                return False
+
+            input_tick = known_input_tick
+            new_repeats_count = input_repeats_count
+
+        if new_repeats_count == 0:
+            predicted_state: Tuple[float, float, PlayerMovement] = (
+                self._predicted_states[input_sequence])
+        else:
+            # Repeats are made by restored controls: they keep keys of
+            # repeated input
+            self._game_engine.rollback(input_tick)
+
+            for _ in range(new_repeats_count):
+                self._game_engine.update_map()
+
+            predicted_state = self._get_player_state()
+
+        # Applied inputs are never replayed again
+        for pending_sequence in list(self._pending_inputs):
+            if pending_sequence > input_sequence:
+                break
+
+            self._forget_pending_input(pending_sequence)
+
+        self._acknowledged_sequence = input_sequence
+        self._acknowledged_repeats_count = input_repeats_count
+
+        is_mispredicted: bool = not self._is_predicted(
+            predicted_state, x, y, player_movement)
+
+        if new_repeats_count == 0:
+            if not is_mispredicted:
+                self._acknowledged_tick = input_tick
+
+                return False
+
+            self._game_engine.rollback(input_tick)
+
+        if is_mispredicted:
+            self._set_player_state(x, y, player_movement)
+
+            self._corrections_count += 1
+
+        self._acknowledged_tick = self._game_engine.get_map_updates_count()
+        self._repeated_inputs_count += new_repeats_count
+
+        self._replay_pending_inputs()
+
+        return is_mispredicted
+
+    def _is_predicted(
+            self,
+            predicted_state: Tuple[float, float, PlayerMovement],
+            x: float,
+            y: float,
+            player_movement: PlayerMovement) -> bool:
+        predicted_x, predicted_y, predicted_movement = predicted_state
+
+        return (
+            abs(predicted_x - x) <= self._TOLERANCE
+            and abs(predicted_y - y) <= self._TOLERANCE
+            and abs(predicted_movement.vertical_velocity
+                    - player_movement.vertical_velocity)
+            <= self._VELOCITY_TOLERANCE
+            and predicted_movement.is_on_the_ground
+            == player_movement.is_on_the_ground)
+
+    def _set_player_state(
+            self, x: float, y: float, player_movement: PlayerMovement):
+        """Snapshot of current tick is replaced: server's state is the
+        right one if its repeats are inserted later
+        """
+        player: Player = self._game_engine.get_main_player()
+        player.location.x = x
+        player.location.y = y
+
+        player_controls: PlayerControls = self._get_player_controls()
+        player_controls.vertical_velocity = player_movement.vertical_velocity
+        player_controls.is_on_the_ground = player_movement.is_on_the_ground
+
+        self._game_engine.get_world_snapshots().add(
+            self._game_engine.capture_world_snapshot())
+
+    def _replay_pending_inputs(self):
+        for pending_sequence, keys_pressed in self._pending_inputs.items():
+            self._get_player_controls().set_input(keys_pressed, None)
+            self._game_engine.update_map()
+
+            self._inputs_ticks[pending_sequence] = (
+                self._game_engine.get_map_updates_count())
+            self._predicted_states[pending_sequence] = (
+                self._get_player_state())
+
+        self._replayed_inputs_count += len(self._pending_inputs)
+
+    def _forget_pending_input(self, input_sequence: int):
+        del self._pending_inputs[input_sequence]
+        del self._inputs_ticks[input_sequence]
+        del self._predicted_states[input_sequence]
+
+    def _get_player_controls(self) -> PlayerControls:
+        # Controls are replaced by rollback, so they are got every time
+        return self._game_engine.get_player_controls(self._player_handle)
+
+    def _get_player_state(self) -> Tuple[float, float, PlayerMovement]:
+        player: Player = self._game_engine.get_main_player()
+        player_controls: PlayerControls = self._get_player_controls()
+
+        return (
+            player.location.x,
+            player.location.y,
+            PlayerMovement(
+                player_controls.vertical_velocity,
+                player_controls.is_on_the_ground))
+
+    @property
+    def predicted_location(self) -> Tuple[float, float]:
+        """Player location after the latest applied input"""
+        player: Player = self._game_engine.get_main_player()
+
+        return player.location.x, player.location.y
+
+    @property
+    def pending_inputs_count(self) -> int:
+        return len(self._pending_inputs)
+
+    @property
+    def corrections_count(self) -> int:
+        return self._corrections_count
+
+    @property
+    def replayed_inputs_count(self) -> int:
+        return self._replayed_inputs_count
+
+    @property
+    def repeated_inputs_count(self) -> int:
+        """Server's repeats of inputs that are inserted into local ticks"""
+        return self._repeated_inputs_count
+
+
+class InputPredictorException(ApplicationException):
+    pass
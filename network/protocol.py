@@ -0,0 +1,159 @@
+from struct import Struct, error as StructError
+from math import isfinite
+from typing import NamedTuple, FrozenSet
+
+from engine.game_objects import *
+from engine.player_controls import LmbEvent, LmbEventType
+from engine import ApplicationException
+
+
+# UDP packets, little-endian. Every packet starts with packet kind (B):
+#
+#   connect (client):          no payload
+#   disconnect (client):       no payload
+#   input (client):            input sequence (I),
+#                              lmb event type (B, 0 if none),
+#                              keys pressed count (B), lmb x (f), lmb y (f),
+#                              key codes (H each)
+#   acknowledgement (client):  tick (I) of received state
+#   accept (server):           tick rate (f), entity id (I) of client's
+#                              player
+#   state (server):            see [network.delta_encoding]
+#
+# Input packets carry whole input state, not key events, so lost packet is
+# fixed by the next one
+CONNECT_PACKET: int = 1
+DISCONNECT_PACKET: int = 2
+INPUT_PACKET: int = 3
+ACCEPT_PACKET: int = 4
+STATE_PACKET: int = 5
+ACKNOWLEDGEMENT_PACKET: int = 6
+
+_PACKET_KIND: Struct = Struct('<B')
+_INPUT_HEADER: Struct = Struct('<BIBBff')
+_KEY_CODE: Struct = Struct('<H')
+_ACCEPT: Struct = Struct('<BfI')
+_ACKNOWLEDGEMENT: Struct = Struct('<BI')
+
+# Input packets have at most this many keys pressed
+MAX_KEYS_PRESSED_COUNT: int = 16
+
+
+class ClientInput(NamedTuple):
+    """Input state of client. Newer inputs have greater sequences"""
+    sequence: int
+    keys_pressed: FrozenSet[int]
+    lmb_event: Optional[LmbEvent]
+
+
+class ServerAccept(NamedTuple):
+    tick_rate: float
+
+    # Every client controls its own player, see [network.delta_encoding]
+    player_entity_id: int
+
+
+def get_packet_kind(packet: bytes) -> int:
+    """0 for empty packet"""
+    if len(packet) == 0:
+        return 0
+
+    return packet[0]
+
+
+def pack_connect() -> bytes:
+    return _PACKET_KIND.pack(CONNECT_PACKET)
+
+
+def pack_disconnect() -> bytes:
+    return _PACKET_KIND.pack(DISCONNECT_PACKET)
+
+
+def pack_input(client_input: ClientInput) -> bytes:
+    if len(client_input.keys_pressed) > MAX_KEYS_PRESSED_COUNT:
+        raise ProtocolException(
+            'Too many keys pressed', len(client_input.keys_pressed))
+
+    if client_input.lmb_event is None:
+        lmb_event_type: int = 0
+        lmb_x = lmb_y = 0.0
+    else:
+        lmb_event_type = client_input.lmb_event.type.value
+        lmb_x, lmb_y = client_input.lmb_event.x, client_input.lmb_event.y
+
+    return _INPUT_HEADER.pack(
+        INPUT_PACKET,
+        client_input.sequence,
+        lmb_event_type,
+        len(client_input.keys_pressed),
+        lmb_x,
+        lmb_y) + b''.join(
+        _KEY_CODE.pack(key_code) for key_code in client_input.keys_pressed)
+
+
+def unpack_input(packet: bytes) -> ClientInput:
+    try:
+        (_,
+         sequence,
+         lmb_event_type,
+         keys_pressed_count,
+         lmb_x,
+         lmb_y) = _INPUT_HEADER.unpack_from(packet)
+
+        if (len(packet)
+                != _INPUT_HEADER.size + keys_pressed_count * _KEY_CODE.size):
+            raise ProtocolException(
+                'Input packet size does not match its header', len(packet))
+
+        keys_pressed: FrozenSet[int] = frozenset(
+            key_code for key_code, in _KEY_CODE.iter_unpack(
+                packet[_INPUT_HEADER.size:]))
+
+        if lmb_event_type == 0:
+            lmb_event: Optional[LmbEvent] = None
+
+        # Non-finite coordinates cannot be placed on game field
+        elif not (isfinite(lmb_x) and isfinite(lmb_y)):
+            raise ProtocolException(
+                'Input packet lmb coordinates are not finite', lmb_x, lmb_y)
+
+        else:
+            lmb_event = LmbEvent(lmb_x, lmb_y, LmbEventType(lmb_event_type))
+
+    except (StructError, ValueError):
+        raise ProtocolException('Wrong input packet')
+
+    return ClientInput(sequence, keys_pressed, lmb_event)
+
+
+def pack_accept(server_accept: ServerAccept) -> bytes:
+    return _ACCEPT.pack(
+        ACCEPT_PACKET,
+        server_accept.tick_rate,
+        server_accept.player_entity_id)
+
+
+def unpack_accept(packet: bytes) -> ServerAccept:
+    try:
+        _, tick_rate, player_entity_id = _ACCEPT.unpack(packet)
+
+    except StructError:
+        raise ProtocolException('Wrong accept packet')
+
+    return ServerAccept(tick_rate, player_entity_id)
+
+
+def pack_acknowledgement(tick: int) -> bytes:
+    return _ACKNOWLEDGEMENT.pack(ACKNOWLEDGEMENT_PACKET, tick)
+
+
+def unpack_acknowledgement(packet: bytes) -> int:
+    try:
+        return _ACKNOWLEDGEMENT.unpack(packet)[1]
+
+    except StructError:
+        raise ProtocolException('Wrong acknowledgement packet')
+
+
+class ProtocolException(ApplicationException):
+    pass
@@ -0,0 +1,677 @@
+from asyncio import (
+    DatagramProtocol,
+    DatagramTransport,
+    get_running_loop,
+    sleep as asyncio_sleep,
+    run as asyncio_run,
+    gather as asyncio_gather)
+from time import perf_counter
+from traceback import print_exc
+from argparse import ArgumentParser, Namespace
+from json import dumps as json_dumps
+from sys import path as sys_path, exit as sys_exit
+from os import pardir as os_pardir
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from collections import deque
+from typing import Set, Deque, Any
+
+try:
+    from maps import GameMap, DEFAULT_RESOLUTION, load_game_map
+except ModuleNotFoundError:
+    sys_path.append(os_path_join(
+        os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+    from maps import GameMap, DEFAULT_RESOLUTION, load_game_map
+finally:
+    from engine.game_objects import *
+    from engine.engine import GameEngine, GameEngineException
+    from engine.entity_store import EntityHandle
+    from engine.player_controls import (
+        LmbEvent, LmbEventType, PlayerControls)
+    from engine.fixed_step_scheduler import FixedStepScheduler
+    from engine.instrumentation import RollingHistogram
+    from engine import ApplicationException
+    from network.protocol import (
+        CONNECT_PACKET,
+        DISCONNECT_PACKET,
+        INPUT_PACKET,
+        ACKNOWLEDGEMENT_PACKET,
+        ClientInput,
+        ServerAccept,
+        ProtocolException,
+        get_packet_kind,
+        unpack_input,
+        unpack_acknowledgement,
+        pack_accept)
+    from network.delta_encoding import (
+        NetworkSnapshot,
+        PlayerMovement,
+        NO_PLAYER_MOVEMENT,
+        NetworkSnapshotMaker,
+        DeltaEncoder,
+        get_movable_entity_id)
+    from network.interest_management import InterestGrid, AreaOfInterest
+
+Address = Tuple[str, int]
+
+
+class _ClientConnection:
+    """Server side state of one client
+
+    Received inputs are queued and applied one per tick in sequences order,
+    as client made them. So client that predicts its movement tick by tick
+    is simulated the same way. If queue is empty then applied input is
+    repeated, client is told how many times. Queue is short: lagging
+    client's oldest inputs are dropped
+    """
+    MAX_QUEUED_INPUTS_COUNT: int = 8
+
+    address: Address
+
+    # Player that client's input controls
+    player_handle: EntityHandle
+
+    # Received but not applied yet inputs, in sequences order
+    queued_inputs: Deque[ClientInput]
+
+    # [None] until the first input is applied
+    applied_input: Optional[ClientInput]
+
+    # Ticks that applied input was repeated on after its own tick
+    applied_input_repeats_count: int
+
+    # Tick of the last received packet. Silent clients are dropped
+    last_packet_tick: int
+
+    delta_encoder: DeltaEncoder
+
+    # [None] if client is sent whole world
+    area_of_interest: Optional[AreaOfInterest]
+
+    # Center of client's view. The last known one stays after client's
+    # player is despawned
+    interest_center: Tuple[float, float]
+
+    def __init__(
+            self,
+            input_address: Address,
+            input_player_handle: EntityHandle,
+            input_tick: int,
+            input_area_of_interest: Optional[AreaOfInterest],
+            input_interest_center: Tuple[float, float]):
+        self.address = input_address
+        self.player_handle = input_player_handle
+        self.queued_inputs = deque()
+        self.applied_input = None
+        self.applied_input_repeats_count = 0
+        self.last_packet_tick = input_tick
+        self.delta_encoder = DeltaEncoder()
+        self.area_of_interest = input_area_of_interest
+        self.interest_center = input_interest_center
+
+    def get_input_sequence(self) -> int:
+        """Sequence of applied input"""
+        if self.applied_input is None:
+            return 0
+        else:
+            return self.applied_input.sequence
+
+    def queue_input(self, client_input: ClientInput):
+        """Reordered old inputs are ignored"""
+        if len(self.queued_inputs) == 0:
+            latest_sequence: int = self.get_input_sequence()
+        else:
+            latest_sequence = self.queued_inputs[-1].sequence
+
+        if client_input.sequence > latest_sequence:
+            self.queued_inputs.append(client_input)
+
+            if len(self.queued_inputs) > self.MAX_QUEUED_INPUTS_COUNT:
+                self.queued_inputs.popleft()
+
+    def apply_next_input(self) -> bool:
+        """Gives [True] if applied input is changed
+
+        Applied input stays the same and is repeated if queue is empty
+        """
+        if len(self.queued_inputs) > 0:
+            self.applied_input = self.queued_inputs.popleft()
+            self.applied_input_repeats_count = 0
+
+            return True
+
+        if self.applied_input is not None:
+            self.applied_input_repeats_count += 1
+
+        return False
+
+
+class _ServerProtocol(DatagramProtocol):
+    _game_server: 'GameServer'
+
+    def __init__(self, input_game_server: 'GameServer'):
+        self._game_server = input_game_server
+
+    def datagram_received(self, data: bytes, address: Address):
+        self._game_server.receive_packet(data, address)
+
+    def error_received(self, occurred_exc: Exception):
+        # E.g., ICMP 'port unreachable' after client's exit. Silent clients
+        # are dropped by timeout anyway
+        pass
+
+
+class GameServer:
+    """Authoritative game server over UDP on asyncio event loop
+
+    Only server steps game engine. Received packets just queue clients'
+    inputs, inputs are applied at the start of the tick and state is
+    broadcast after the tick. UDP sending never blocks, so event loop
+    is busy only with ticks themselves.
+
+    Every client controls its own player. Players of game map are given
+    to clients in order of connection, then new players are spawned where
+    main player was at server's start. Player of gone client stays in game
+    and is given to the next connected client.
+
+    Every client is sent only entities around its view, so state size
+    depends on density of objects around player, not on map size
+    """
+    MAX_CLIENTS_COUNT: int = 64
+
+    # Clients without packets for this time are dropped
+    CLIENT_TIMEOUT_SECONDS: float = 5
+
+    _game_engine: GameEngine
+    _snapshot_maker: NetworkSnapshotMaker
+    _scheduler: FixedStepScheduler
+    _client_timeout_ticks: int
+
+    # [None] if every client is sent whole world
+    _interest_view_size: Optional[Tuple[float, float]]
+
+    # Location of new players
+    _spawn_location: Vector2D
+
+    # [None] until [start]
+    _transport: Optional[DatagramTransport]
+
+    # In order of connection
+    _clients: Dict[Address, _ClientConnection]
+
+    # Durations of whole server ticks and of their state broadcasts, in
+    # seconds
+    _ticks_histogram: RollingHistogram
+    _broadcasts_histogram: RollingHistogram
+
+    _ticks_count: int
+
+    # Ticks where game engine failed. Such ticks are not broadcast
+    _failed_ticks_count: int
+
+    _received_packets_count: int
+    _wrong_packets_count: int
+    _sent_bytes_count: int
+
+    def __init__(
+            self,
+            input_game_engine: GameEngine,
+            input_tick_rate: float = 60,
+            input_histogram_capacity: int = 1024,
+            input_interest_view_size: Optional[Tuple[float, float]] = (
+                DEFAULT_RESOLUTION)):
+        self._game_engine = input_game_engine
+        self._snapshot_maker = NetworkSnapshotMaker(
+            input_game_engine.get_game_map())
+        self._scheduler = FixedStepScheduler(input_tick_rate)
+        self._client_timeout_ticks = int(
+            self.CLIENT_TIMEOUT_SECONDS * input_tick_rate)
+        self._interest_view_size = input_interest_view_size
+
+        main_player: Player = input_game_engine.get_main_player()
+        self._spawn_location = Vector2D(
+            main_player.location.x, main_player.location.y)
+
+        self._transport = None
+
+        self._clients = {}
+
+        self._ticks_histogram = RollingHistogram(input_histogram_capacity)
+        self._broadcasts_histogram = RollingHistogram(
+            input_histogram_capacity)
+
+        self._ticks_count = 0
+        self._failed_ticks_count = 0
+        self._received_packets_count = 0
+        self._wrong_packets_count = 0
+        self._sent_bytes_count = 0
+
+    async def start(
+            self, host: str = '127.0.0.1', port: int = 0) -> Address:
+        """Binds UDP socket. Gives bound address: [port] 0 is any free"""
+        self._transport, _ = (
+            await get_running_loop().create_datagram_endpoint(
+                lambda: _ServerProtocol(self), local_addr=(host, port)))
+
+        return self._transport.get_extra_info('sockname')[:2]
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+            self._transport = None
+
+    async def run(self, ticks_count: Optional[int] = None) -> int:
+        """Makes ticks on fixed timesteps. Runs forever if [None] is given
+
+        Event loop gets control between ticks, so packets are received then
+        """
+        if self._transport is None:
+            raise GameServerException('Server is not started')
+
+        made_ticks_count: int = 0
+
+        self._scheduler.reset()
+
+        while ticks_count is None or made_ticks_count < ticks_count:
+            due_ticks: int = self._scheduler.get_due_ticks()
+
+            if ticks_count is not None:
+                due_ticks = min(due_ticks, ticks_count - made_ticks_count)
+
+            for _ in range(due_ticks):
+                self._make_tick()
+
+            made_ticks_count += due_ticks
+
+            await asyncio_sleep(self._scheduler.get_time_to_next_tick())
+
+        return made_ticks_count
+
+    def receive_packet(self, packet: bytes, address: Address):
+        """Called by event loop. Must be fast: tick is NOT made here"""
+        self._received_packets_count += 1
+
+        packet_kind: int = get_packet_kind(packet)
+        client: Optional[_ClientConnection] = self._clients.get(address)
+
+        if packet_kind == CONNECT_PACKET:
+            self._connect_client(address)
+
+        elif client is None:
+            self._wrong_packets_count += 1
+
+        elif packet_kind == INPUT_PACKET:
+            try:
+                client_input: ClientInput = unpack_input(packet)
+
+            except ProtocolException:
+                self._wrong_packets_count += 1
+
+                return
+
+            client.last_packet_tick = self._get_tick()
+            client.queue_input(client_input)
+
+        elif packet_kind == ACKNOWLEDGEMENT_PACKET:
+            try:
+                client.delta_encoder.acknowledge(
+                    unpack_acknowledgement(packet))
+
+            except ProtocolException:
+                self._wrong_packets_count += 1
+
+                return
+
+            client.last_packet_tick = self._get_tick()
+
+        elif packet_kind == DISCONNECT_PACKET:
+            self._disconnect_client(address)
+
+        else:
+            self._wrong_packets_count += 1
+
+    def _connect_client(self, address: Address):
+        client: Optional[_ClientConnection] = self._clients.get(address)
+
+        # Repeated connect packet is answered again: accept may be lost
+        if client is None:
+            if len(self._clients) == self.MAX_CLIENTS_COUNT:
+                return
+
+            client = _ClientConnection(
+                address,
+                self._get_free_player_handle(),
+                self._get_tick(),
+                None if self._interest_view_size is None
+                else AreaOfInterest(self._interest_view_size),
+                (self._spawn_location.x + Player.SIDE_LENGTH / 2,
+                 self._spawn_location.y + Player.SIDE_LENGTH / 2))
+
+            self._clients[address] = client
+
+        client.last_packet_tick = self._get_tick()
+
+        self._send(
+            pack_accept(
+                ServerAccept(
+                    self._scheduler.tick_rate,
+                    get_movable_entity_id(client.player_handle))),
+            address)
+
+    def _get_free_player_handle(self) -> EntityHandle:
+        """Player that no client controls. New one is spawned if needed"""
+        taken_handles: Set[EntityHandle] = {
+            client.player_handle for client in self._clients.values()}
+
+        for player_handle in self._game_engine.get_players_handles():
+            if player_handle not in taken_handles:
+                return player_handle
+
+        return self._game_engine.add_player(
+            Vector2D(self._spawn_location.x, self._spawn_location.y))
+
+    def _disconnect_client(self, address: Address):
+        client: _ClientConnection = self._clients.pop(address)
+
+        # Player must not run or shoot forever with input of gone client
+        player_controls: Optional[PlayerControls] = (
+            self._get_player_controls(client.player_handle))
+
+        if player_controls is None:
+            return
+
+        released_lmb_event: Optional[LmbEvent] = (
+            player_controls.get_lmb_event())
+
+        if (released_lmb_event is not None
+                and released_lmb_event.type is not (
+                    LmbEventType.ButtonRelease)):
+            released_lmb_event = released_lmb_event._replace(
+                type=LmbEventType.ButtonRelease)
+
+        player_controls.set_input((), released_lmb_event)
+
+    def _get_player_controls(
+            self, player_handle: EntityHandle) -> Optional[PlayerControls]:
+        """[None] if player is despawned: its controls are dropped"""
+        try:
+            return self._game_engine.get_player_controls(player_handle)
+
+        except GameEngineException:
+            return None
+
+    def _get_tick(self) -> int:
+        return self._game_engine.get_map_updates_count()
+
+    def _make_tick(self):
+        tick_start: float = perf_counter()
+
+        for client in self._clients.values():
+            if client.apply_next_input():
+                player_controls: Optional[PlayerControls] = (
+                    self._get_player_controls(client.player_handle))
+
+                if player_controls is None:
+                    continue
+
+                player_controls.set_input(
+                    client.applied_input.keys_pressed,
+                    client.applied_input.lmb_event)
+
+        # One remote input must not stop game of every client. Engine
+        # continues from the state that failed update left
+        try:
+            self._game_engine.update_map()
+
+        except Exception:
+            self._failed_ticks_count += 1
+
+            print_exc()
+
+            return
+
+        broadcast_start: float = perf_counter()
+
+        self._drop_silent_clients()
+        self._broadcast_state()
+
+        tick_end: float = perf_counter()
+
+        self._ticks_count += 1
+        self._ticks_histogram.add(tick_end - tick_start)
+        self._broadcasts_histogram.add(tick_end - broadcast_start)
+
+    def _drop_silent_clients(self):
+        current_tick: int = self._get_tick()
+
+        for client in list(self._clients.values()):
+            if (current_tick - client.last_packet_tick
+                    > self._client_timeout_ticks):
+                self._disconnect_client(client.address)
+
+    def _broadcast_state(self):
+        if len(self._clients) == 0:
+            return
+
+        tick: int = self._get_tick()
+
+        # Snapshot and its grid are made once, every client gets its own
+        # delta of it
+        snapshot: NetworkSnapshot = self._snapshot_maker.make_snapshot(tick)
+
+        if self._interest_view_size is not None:
+            interest_grid: InterestGrid = InterestGrid(snapshot, tick)
+
+        for client in self._clients.values():
+            if client.area_of_interest is None:
+                client_snapshot: NetworkSnapshot = snapshot
+            else:
+                client_snapshot = client.area_of_interest.filter_snapshot(
+                    interest_grid, *self._get_interest_center(client))
+
+            self._send(
+                client.delta_encoder.encode(
+                    tick,
+                    client.get_input_sequence(),
+                    client_snapshot,
+                    client.applied_input_repeats_count,
+                    self._get_player_movement(client)),
+                client.address)
+
+    def _get_player_movement(
+            self, client: _ClientConnection) -> PlayerMovement:
+        """Client's prediction needs whole movement state of its player"""
+        player_controls: Optional[PlayerControls] = (
+            self._get_player_controls(client.player_handle))
+
+        if player_controls is None:
+            return NO_PLAYER_MOVEMENT
+
+        return PlayerMovement(
+            player_controls.vertical_velocity,
+            player_controls.is_on_the_ground)
+
+    def _get_interest_center(
+            self, client: _ClientConnection) -> Tuple[float, float]:
+        """Every client watches its own player
+
+        Client of despawned player keeps watching where player was
+        """
+        player: Optional[Player] = (
+            self._game_engine.get_game_map().movable_objects.get(
+                client.player_handle))
+
+        if player is not None:
+            client.interest_center = (
+                player.location.x + Player.SIDE_LENGTH / 2,
+                player.location.y + Player.SIDE_LENGTH / 2)
+
+        return client.interest_center
+
+    def _send(self, packet: bytes, address: Address):
+        if self._transport is not None:
+            self._transport.sendto(packet, address)
+
+            self._sent_bytes_count += len(packet)
+
+    @property
+    def tick_rate(self) -> float:
+        return self._scheduler.tick_rate
+
+    @property
+    def clients_count(self) -> int:
+        return len(self._clients)
+
+    def get_report(self) -> Dict[str, Any]:
+        """JSON-compatible summary. Durations are in milliseconds"""
+        return {
+            'ticks': self._ticks_count,
+            'failed_ticks': self._failed_ticks_count,
+            'dropped_ticks': self._scheduler.dropped_ticks_count,
+            'clients': len(self._clients),
+            'received_packets': self._received_packets_count,
+            'wrong_packets': self._wrong_packets_count,
+            'sent_bytes': self._sent_bytes_count,
+            'tick_ms': self._get_summary_ms(self._ticks_histogram),
+            'broadcast_ms': self._get_summary_ms(self._broadcasts_histogram)}
+
+    @staticmethod
+    def _get_summary_ms(histogram: RollingHistogram) -> Dict[str, float]:
+        return {
+            summary_key: (
+                summary_value if summary_key == 'count'
+                else summary_value * 1000)
+            for summary_key, summary_value
+            in histogram.get_summary().items()}
+
+
+async def _serve(
+        game_server: GameServer,
+        host: str,
+        port: int,
+        ticks_count: Optional[int],
+        with_loopback_client: bool,
+        loopback_client_game_map: Optional[GameMap]):
+    server_address: Address = await game_server.start(host, port)
+
+    print('Server is listening on {}:{}'.format(*server_address))
+
+    try:
+        if with_loopback_client:
+            # Imported here because client is needed only for this demo
+            from network.client import run_loopback_client
+
+            await asyncio_gather(
+                game_server.run(ticks_count),
+                run_loopback_client(
+                    server_address,
+                    (ticks_count or 600) / game_server.tick_rate,
+                    loopback_client_game_map))
+        else:
+            await game_server.run(ticks_count)
+    finally:
+        game_server.close()
+
+
+def run_server_logic():
+    parser = ArgumentParser(
+        description='Runs authoritative game server over UDP')
+
+    parser.add_argument(
+        'map_name',
+        help='raw map name in format "raw <name>" or map file name from '
+             '"maps" folder')
+
+    parser.add_argument(
+        '--host',
+        help='address to listen on (default: 127.0.0.1)',
+        default='127.0.0.1')
+
+    parser.add_argument(
+        '-p', '--port',
+        help='UDP port to listen on (default: 5005)',
+        type=int,
+        default=5005)
+
+    parser.add_argument(
+        '-r', '--tick-rate',
+        help='game map updates per second (default: 60)',
+        type=float,
+        default=60)
+
+    parser.add_argument(
+        '-t', '--ticks',
+        help='number of game map updates (default: run until interrupted)',
+        type=int)
+
+    parser.add_argument(
+        '--seed',
+        help="random seed of game (default: random)",
+        type=int)
+
+    parser.add_argument(
+        '--projectile-store',
+        help="process projectiles with NumPy arrays (NumPy is required)",
+        action='store_true')
+
+    parser.add_argument(
+        '--loopback-client',
+        help="run client that holds 'D' key in the same process",
+        action='store_true')
+
+    parser.add_argument(
+        '--predict',
+        help="loopback client predicts movement of its player: sends input "
+             "every tick and corrects prediction by server's states",
+        action='store_true')
+
+    parser.add_argument(
+        '--whole-world',
+        help="send every client whole world, not only objects around view",
+        action='store_true')
+
+    arguments: Namespace = parser.parse_args()
+
+    try:
+        game_map: GameMap = load_game_map(arguments.map_name)
+
+        game_server: GameServer = GameServer(
+            GameEngine(game_map, arguments.projectile_store, arguments.seed),
+            arguments.tick_rate,
+            input_interest_view_size=(
+                None if arguments.whole_world else DEFAULT_RESOLUTION))
+
+        asyncio_run(
+            _serve(
+                game_server,
+                arguments.host,
+                arguments.port,
+                arguments.ticks,
+                arguments.loopback_client or arguments.predict,
+                # Client must not share game objects with server
+                load_game_map(arguments.map_name) if arguments.predict
+                else None))
+
+    except (ApplicationException, OSError) as occurred_exc:
+        sys_exit(
+            "\n"
+            + occurred_exc.__class__.__name__
+            + ": "
+            + str(occurred_exc))
+
+    except KeyboardInterrupt:
+        pass
+
+    print(json_dumps(game_server.get_report(), indent=2))
+
+
+class GameServerException(ApplicationException):
+    pass
+
+
+if __name__ == '__main__':
+    run_server_logic()
@@ -0,0 +1,11 @@
+from sys import version_info as sys_version_info, exit as sys_exit
+
+try:
+    from network.server import run_server_logic
+finally:
+    if sys_version_info[:3] < (3, 7, 4):
+        print('Python version 3.7.4 or greater is required')
+        sys_exit('Python version error: ' + str(sys_version_info))
+
+if __name__ == '__main__':
+    run_server_logic()
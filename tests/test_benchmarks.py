@@ -0,0 +1,58 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from json import dumps as json_dumps
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from benchmarks.scenarios import Scenario, ScenariosContainer
+from benchmarks.run_benchmarks import run_benchmarks, get_percentile
+from engine.game_objects import *
+from maps import GameMap
+
+
+class ScenariosTests(TestCase):
+    def test_objects_counts(self):
+        game_map: GameMap = ScenariosContainer.get_map(
+            Scenario('test', 10, 20, 4, 3))
+
+        self.assertEqual(14, len(game_map.immovable_objects))
+        self.assertEqual(23, len(game_map.movable_objects))
+        self.assertIsInstance(game_map.movable_objects[0], Player)
+
+    def test_same_seed_gives_same_map(self):
+        scenario: Scenario = Scenario('test', 5, 5, 0, 1, 123)
+
+        self.assertEqual(
+            [game_object.location
+             for game_object in ScenariosContainer.get_map(
+                 scenario).movable_objects],
+            [game_object.location
+             for game_object in ScenariosContainer.get_map(
+                 scenario).movable_objects])
+
+
+class RunBenchmarksTests(TestCase):
+    def test_report_is_json_compatible(self):
+        report: dict = run_benchmarks(
+            ['update_map', 'get_collisions'],
+            [ScenariosContainer.get_scenario('mixed')],
+            1,
+            2)
+
+        self.assertEqual(2, len(report['results']))
+        self.assertEqual(2, report['results'][0]['calls'])
+        self.assertIsInstance(json_dumps(report), str)
+
+    def test_percentile(self):
+        self.assertEqual(95, get_percentile(list(range(1, 101)), 95))
+        self.assertEqual(1, get_percentile([1], 99))
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,173 @@
+from unittest import TestCase, main as unittest_main
+from io import BytesIO
+from struct import pack, pack_into, unpack_from
+from tempfile import TemporaryDirectory
+from pickle import dump as pickle_dump, load as pickle_load
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap, RawMapsContainer
+from maps.binary_map import (
+    save_binary_map,
+    read_binary_map,
+    load_binary_map,
+    convert_pickle_to_binary_map,
+    convert_binary_to_pickle_map,
+    BinaryMapException)
+from engine.engine import GameEngine
+from engine.collisions_processor import CollisionsProcessor
+from engine.spatial_grid import SpatialGrid
+from engine.game_objects import *
+
+
+def get_map_bytes(game_map: GameMap) -> bytes:
+    map_stream: BytesIO = BytesIO()
+
+    save_binary_map(game_map, map_stream)
+
+    return map_stream.getvalue()
+
+
+class BinaryMapTests(TestCase):
+    def test_objects_are_restored(self):
+        game_map: GameMap = GameMap(
+            Vector2D(4000, 1400),
+            [BasicPlatform(200, 30, Vector2D(400, 600)),
+             SpeedUpBuff(Vector2D(10, 20), recharge_time=50),
+             JumpHeightUpBuff(Vector2D(30, 40))],
+            [Player(Vector2D(101, 101)),
+             MachineGunProjectile(Vector2D(5, -5), Vector2D(7, 8))])
+
+        read_map: GameMap = read_binary_map(
+            memoryview(get_map_bytes(game_map)))
+
+        self.assertEqual(Vector2D(4000, 1400), read_map.game_field_size)
+        self.assertEqual(
+            [BasicPlatform, SpeedUpBuff, JumpHeightUpBuff],
+            [immovable_object.__class__
+             for immovable_object in read_map.immovable_objects])
+        self.assertEqual(200, read_map.immovable_objects[0].width)
+        self.assertEqual(30, read_map.immovable_objects[0].height)
+        self.assertEqual(
+            Vector2D(10, 20), read_map.immovable_objects[1].location)
+        self.assertEqual(50, read_map.immovable_objects[1]._recharge_time)
+
+        player, projectile = list(read_map.movable_objects)
+
+        self.assertEqual(Vector2D(101, 101), player.location)
+        self.assertIs(MachineGunProjectile, projectile.__class__)
+        self.assertEqual(Vector2D(5, -5), projectile.moving_vector)
+        self.assertEqual(Vector2D(7, 8), projectile.location)
+
+    def test_embedded_index_is_used_by_collisions_processor(self):
+        game_map: GameMap = RawMapsContainer.get_map_5()
+
+        read_map: GameMap = read_binary_map(
+            memoryview(get_map_bytes(game_map)))
+
+        self.assertEqual(
+            SpatialGrid(game_map.immovable_objects).cells,
+            read_map.spatial_grid.cells)
+        self.assertIs(
+            read_map.spatial_grid,
+            CollisionsProcessor(read_map)._spatial_grid)
+
+        # Replaced objects are not indexed by embedded grid anymore
+        read_map.immovable_objects = list(read_map.immovable_objects)
+
+        self.assertIsNot(
+            read_map.spatial_grid,
+            CollisionsProcessor(read_map)._spatial_grid)
+
+    def test_game_goes_the_same(self):
+        game_map: GameMap = RawMapsContainer.get_map_2()
+        read_map: GameMap = read_binary_map(
+            memoryview(get_map_bytes(game_map)))
+
+        game_engine: GameEngine = GameEngine(game_map)
+        read_map_engine: GameEngine = GameEngine(read_map)
+
+        for _ in range(100):
+            game_engine.update_map()
+            read_map_engine.update_map()
+
+        self.assertEqual(
+            game_engine.get_main_player().location,
+            read_map_engine.get_main_player().location)
+
+    def test_wrong_bytes(self):
+        map_bytes: bytes = get_map_bytes(RawMapsContainer.get_map_2())
+
+        with self.assertRaises(BinaryMapException):
+            read_binary_map(memoryview(b'SQBM'))
+
+        with self.assertRaises(BinaryMapException):
+            read_binary_map(memoryview(b'XXXX' + map_bytes[4:]))
+
+        with self.assertRaises(BinaryMapException):
+            read_binary_map(memoryview(map_bytes[:-1]))
+
+        # The last index points out of immovable objects
+        with self.assertRaises(BinaryMapException):
+            read_binary_map(memoryview(map_bytes[:-4] + pack('<I', 10 ** 6)))
+
+        # Indexes count of the last grid cell is out of indexes. Indexes
+        # count is the last header's field before reserved one
+        cells_indexes_count, = unpack_from('<I', map_bytes, 40)
+        corrupted_map_bytes: bytearray = bytearray(map_bytes)
+        pack_into(
+            '<I',
+            corrupted_map_bytes,
+            len(map_bytes) - cells_indexes_count * 4 - 4,
+            cells_indexes_count + 1)
+
+        with self.assertRaises(BinaryMapException):
+            read_binary_map(memoryview(corrupted_map_bytes))
+
+    def test_files_and_converters(self):
+        with TemporaryDirectory() as temporary_directory:
+            pickle_map_path: str = os_path_join(
+                temporary_directory, 'map.pickle')
+            binary_map_path: str = os_path_join(
+                temporary_directory, 'map.sqbm')
+            converted_map_path: str = os_path_join(
+                temporary_directory, 'converted.pickle')
+
+            with open(pickle_map_path, 'wb') as pickle_map_file:
+                pickle_dump(RawMapsContainer.get_map_3(), pickle_map_file)
+
+            convert_pickle_to_binary_map(pickle_map_path, binary_map_path)
+
+            binary_map: GameMap = load_binary_map(binary_map_path)
+
+            self.assertEqual(2, len(binary_map.immovable_objects))
+
+            convert_binary_to_pickle_map(binary_map_path, converted_map_path)
+
+            with open(converted_map_path, 'rb') as converted_map_file:
+                converted_map: GameMap = pickle_load(converted_map_file)
+
+            self.assertIsNone(converted_map.spatial_grid)
+            self.assertEqual(
+                Vector2D(0, 0),
+                list(converted_map.movable_objects)[0].location)
+
+            with open(binary_map_path, 'wb'):
+                pass
+
+            with self.assertRaises(BinaryMapException):
+                load_binary_map(binary_map_path)
+
+        with self.assertRaises(BinaryMapException):
+            load_binary_map(binary_map_path)
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,48 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from user_interface.camera import Camera, CameraException
+
+
+class CameraTests(TestCase):
+    def test_follow_centers_viewport(self):
+        camera: Camera = Camera((1000, 700), (4000, 1400))
+
+        camera.follow(2000, 700)
+
+        self.assertEqual((1500, 350), camera.location)
+        self.assertEqual(
+            (1450, 300, 2550, 1100), camera.get_visible_bounds(50))
+
+    def test_viewport_stays_inside_game_field(self):
+        camera: Camera = Camera((1000, 700), (4000, 1400))
+
+        camera.follow(0, 0)
+        self.assertEqual((0, 0), camera.location)
+
+        camera.follow(4000, 1400)
+        self.assertEqual((3000, 700), camera.location)
+
+    def test_viewport_is_not_bigger_than_game_field(self):
+        camera: Camera = Camera((1000, 700), (500, 1400))
+
+        camera.follow(400, 100)
+
+        self.assertEqual((500, 700), camera.viewport_size)
+        self.assertEqual((0, 0), camera.location)
+
+    def test_non_positive_viewport_size(self):
+        with self.assertRaises(CameraException):
+            Camera((0, 700), (1000, 700))
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,175 @@
+from unittest import TestCase, main as unittest_main
+from tempfile import TemporaryDirectory
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap, RawMapsContainer
+from maps.chunked_map import (
+    save_chunked_map, load_chunked_map, ChunkedMapException)
+from engine.engine import GameEngine
+from engine.game_objects import *
+
+
+def get_world_map() -> GameMap:
+    """10x10 chunks of 100 pixels with one platform in every chunk"""
+    return GameMap(
+        Vector2D(1000, 1000),
+        [BasicPlatform(50, 10, Vector2D(100 * chunk_x, 100 * chunk_y + 80))
+         for chunk_x in range(10)
+         for chunk_y in range(10)],
+        [Player(Vector2D(0, 0))])
+
+
+class ChunkedMapTests(TestCase):
+    _temporary_directory: TemporaryDirectory
+
+    def setUp(self):
+        self._temporary_directory = TemporaryDirectory()
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def _save(self, game_map: GameMap, chunk_size: int) -> str:
+        map_path: str = os_path_join(
+            self._temporary_directory.name, 'map.sqcm')
+
+        with open(map_path, 'wb') as map_file:
+            save_chunked_map(game_map, map_file, chunk_size)
+
+        return map_path
+
+    def test_only_chunks_around_players_are_resident(self):
+        game_map: GameMap = load_chunked_map(
+            self._save(get_world_map(), 100), 1, 9)
+
+        self.assertEqual(100, game_map.chunks_streamer.chunks_count)
+        self.assertEqual(
+            [(0, 0), (0, 1), (1, 0), (1, 1)],
+            game_map.chunks_streamer.resident_chunks)
+        self.assertEqual(4, len(game_map.immovable_objects))
+        self.assertIs(
+            game_map.immovable_objects, game_map.spatial_grid.objects)
+
+        # Player goes to the other corner: chunks around it are loaded and
+        # old ones stay until limit is reached
+        player: Player = list(game_map.movable_objects)[0]
+        player.location = Vector2D(880, 880)
+        static_layer_version: int = game_map.static_layer_version
+
+        self.assertTrue(game_map.chunks_streamer.update(game_map))
+        self.assertEqual(
+            {(8, 8), (8, 9), (9, 8), (9, 9)},
+            set(game_map.chunks_streamer.resident_chunks[-4:]))
+        self.assertEqual(8, len(game_map.immovable_objects))
+        self.assertLess(static_layer_version, game_map.static_layer_version)
+
+        player.location = Vector2D(480, 480)
+        game_map.chunks_streamer.update(game_map)
+
+        # 9 needed chunks, least recently needed ones are evicted
+        self.assertEqual(9, len(game_map.chunks_streamer.resident_chunks))
+        self.assertEqual(8, game_map.chunks_streamer.evicted_chunks_count)
+        self.assertEqual(17, game_map.chunks_streamer.loaded_chunks_count)
+
+        # Nothing happens while player stays in the same chunk
+        player.location = Vector2D(490, 490)
+
+        self.assertFalse(game_map.chunks_streamer.update(game_map))
+
+        game_map.chunks_streamer.close()
+
+    def test_immovable_objects_ids_are_stable(self):
+        game_map: GameMap = load_chunked_map(
+            self._save(get_world_map(), 100), 1, 4)
+
+        def get_locations_ids() -> Dict[Tuple[float, float], int]:
+            return {
+                (immovable_object.location.x, immovable_object.location.y):
+                    immovable_object_id
+                for immovable_object, immovable_object_id in zip(
+                    game_map.immovable_objects,
+                    game_map.immovable_objects_ids)}
+
+        locations_ids: Dict[Tuple[float, float], int] = get_locations_ids()
+
+        # Chunks around player are evicted and loaded again
+        player: Player = list(game_map.movable_objects)[0]
+        player.location = Vector2D(880, 880)
+        game_map.chunks_streamer.update(game_map)
+        player.location = Vector2D(0, 0)
+        game_map.chunks_streamer.update(game_map)
+
+        self.assertEqual(8, game_map.chunks_streamer.evicted_chunks_count)
+        self.assertEqual(locations_ids, get_locations_ids())
+
+        # Objects of different chunks never share id
+        player.location = Vector2D(880, 880)
+        game_map.chunks_streamer.update(game_map)
+
+        self.assertEqual(
+            8,
+            len(set(locations_ids.values())
+                | set(game_map.immovable_objects_ids)))
+
+    def test_big_objects_reach_other_chunks(self):
+        # Floor starts in the first chunk and goes through all of them
+        game_map: GameMap = GameMap(
+            Vector2D(1000, 200),
+            [BasicPlatform(1000, 10, Vector2D(0, 150))],
+            [Player(Vector2D(900, 100))])
+
+        loaded_map: GameMap = load_chunked_map(
+            self._save(game_map, 100), 0, 4)
+
+        self.assertEqual(1, len(loaded_map.immovable_objects))
+
+        loaded_map.chunks_streamer.close()
+
+    def test_chunked_game_goes_the_same(self):
+        game_map: GameMap = RawMapsContainer.get_map_5()
+        chunked_map: GameMap = load_chunked_map(
+            self._save(game_map, 512), 1, 9)
+
+        self.assertLess(
+            len(chunked_map.immovable_objects),
+            len(game_map.immovable_objects))
+
+        game_engine: GameEngine = GameEngine(game_map)
+        chunked_map_engine: GameEngine = GameEngine(chunked_map)
+
+        for _ in range(100):
+            game_engine.update_map()
+            chunked_map_engine.update_map()
+
+        self.assertEqual(
+            game_engine.get_main_player().location,
+            chunked_map_engine.get_main_player().location)
+
+        chunked_map.chunks_streamer.close()
+
+    def test_wrong_files(self):
+        map_path: str = os_path_join(
+            self._temporary_directory.name, 'map.sqcm')
+
+        with open(map_path, 'wb') as map_file:
+            map_file.write(b'SQBM' + bytes(100))
+
+        with self.assertRaises(ChunkedMapException):
+            load_chunked_map(map_path)
+
+        with self.assertRaises(ChunkedMapException):
+            load_chunked_map(map_path + '.absent')
+
+        with self.assertRaises(ChunkedMapException):
+            save_chunked_map(get_world_map(), None, 0)
+
+
+if __name__ == '__main__':
+    unittest_main()
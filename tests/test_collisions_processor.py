@@ -6,15 +6,18 @@ from os.path import (
     abspath as os_path_abspath)
 from os import pardir as os_pardir
 from sys import path as sys_path
+from math import sqrt
 
 sys_path.append(os_path_join(
     os_path_dirname(os_path_abspath(__file__)), os_pardir))
 
 from engine.collisions_processor import (
-    CollisionsProcessor, Collision, GameEvent, CollisionsProcessorException)
+    CollisionsProcessor, Collision, CollisionsBuffer, GameEvent,
+    CollisionsProcessorException)
 from maps import GameMap
 from engine.game_objects import (
-    Vector2D, Player, MovableObject, SpeedUpBuff, BasicPlatform)
+    Vector2D, Player, MovableObject, SpeedUpBuff, BasicPlatform,
+    HandgunProjectile)
 
 
 test_map_1: GameMap = GameMap(
@@ -32,6 +35,20 @@ test_map_3: GameMap = GameMap(
     [BasicPlatform(10, 10, Vector2D(30, 30))],
     [Player(Vector2D(0, 0))])
 
+test_map_4: GameMap = GameMap(
+    Vector2D(1000, 1000),
+    [BasicPlatform(10, 10, Vector2D(900, 900)),
+     BasicPlatform(10, 10, Vector2D(30, 30))],
+    [Player(Vector2D(0, 0))])
+
+# Thin platform between projectile and its location in the next iteration
+test_map_5: GameMap = GameMap(
+    Vector2D(100, 100),
+    [SpeedUpBuff(Vector2D(20, 0)),
+     BasicPlatform(2, 100, Vector2D(50, 0)),
+     BasicPlatform(2, 100, Vector2D(45, 0))],
+    [HandgunProjectile(Vector2D(20, 0), Vector2D(35, 10))])
+
 
 class ExceptionsTests(TestCase):
     def test_unknown_moving_object_exception(self):
@@ -135,6 +152,101 @@ class PlayerCollisionsTests(TestCase):
         self.assertEqual(
             test_map_3.immovable_objects[0], collisions[0].collided_object)
 
+    def test_broad_phase_skips_far_objects(self):
+        collisions_processor: CollisionsProcessor = (
+            CollisionsProcessor(test_map_4))
+
+        self.assertEqual(
+            [1],
+            collisions_processor._get_potentially_collided_indexes(
+                test_map_4.movable_objects[0].location,
+                Player.SIDE_LENGTH,
+                Vector2D(20, 20)))
+
+        collisions: List[Collision] = collisions_processor.get_collisions(
+            test_map_4.movable_objects[0], Vector2D(20, 20))
+
+        self.assertEqual(1, len(collisions))
+        self.assertEqual(
+            test_map_4.immovable_objects[1], collisions[0].collided_object)
+
+    def test_collisions_buffer_is_reused(self):
+        collisions_processor: CollisionsProcessor = (
+            CollisionsProcessor(test_map_3))
+
+        collisions_buffer: CollisionsBuffer = (
+            collisions_processor.fill_collisions_buffer(
+                test_map_3.movable_objects[0], Vector2D(20, 20), 0))
+
+        self.assertEqual(1, collisions_buffer.length)
+        self.assertEqual(
+            GameEvent.PLAYER_TOP_BASIC_PLATFORM,
+            collisions_buffer.game_events[0])
+        self.assertEqual(0, collisions_buffer.mover_indexes[0])
+        self.assertEqual(0, collisions_buffer.collided_indexes[0])
+
+        self.assertIs(
+            collisions_buffer,
+            collisions_processor.fill_collisions_buffer(
+                test_map_3.movable_objects[0], Vector2D(200, 0), 0))
+        self.assertEqual(1, collisions_buffer.length)
+        self.assertEqual(
+            GameEvent.PLAYER_BORDERS_RIGHT, collisions_buffer.game_events[0])
+        self.assertEqual(-1, collisions_buffer.collided_indexes[0])
+
+    def test_collisions_buffer_growth(self):
+        collisions_buffer: CollisionsBuffer = CollisionsBuffer()
+
+        for i in range(100):
+            collisions_buffer.append(GameEvent.PLAYER_BUFF, 0, i)
+
+        self.assertEqual(100, collisions_buffer.length)
+        self.assertEqual(99, collisions_buffer.collided_indexes[99])
+
+
+class ProjectileCollisionsTests(TestCase):
+    def test_fast_projectile_does_not_tunnel_through_platform(self):
+        collisions: List[Collision] = (
+            CollisionsProcessor(test_map_5).get_collisions(
+                test_map_5.movable_objects[0],
+                test_map_5.movable_objects[0].moving_vector))
+
+        # Only first hit platform is reported, buff is ignored
+        self.assertEqual(1, len(collisions))
+        self.assertEqual(
+            GameEvent.PROJECTILE_BASIC_PLATFORM, collisions[0].game_event)
+        self.assertIs(
+            test_map_5.immovable_objects[2], collisions[0].collided_object)
+
+    def test_projectile_misses_platform(self):
+        collisions: List[Collision] = (
+            CollisionsProcessor(test_map_5).get_collisions(
+                test_map_5.movable_objects[0], Vector2D(-20, 0)))
+
+        self.assertEqual(0, len(collisions))
+
+    def test_impact_time(self):
+        # Circle with radius 5 moves to the right onto rectangle's left side
+        self.assertEqual(
+            0.5,
+            CollisionsProcessor._get_moving_circle_rectangle_impact_time(
+                0, 0, 5, Vector2D(20, 0), 15, -10, 20, 10))
+
+    def test_impact_time_with_rectangle_corner(self):
+        # Diagonal move straight into top left corner
+        impact_time: float = (
+            CollisionsProcessor._get_moving_circle_rectangle_impact_time(
+                0, 0, 5, Vector2D(20, 20), 20, 20, 30, 30))
+
+        self.assertAlmostEqual((20 - 5 / sqrt(2)) / 20, impact_time)
+
+    def test_no_impact_near_rectangle_corner(self):
+        # Center passes near corner: inside expanded rectangle but farther
+        # than radius from the corner
+        self.assertIsNone(
+            CollisionsProcessor._get_moving_circle_rectangle_impact_time(
+                5, 26, 5, Vector2D(20, -20), 20, 20, 30, 30))
+
 
 if __name__ == '__main__':
     unittest_main()
@@ -0,0 +1,293 @@
+from unittest import TestCase, main as unittest_main, skipIf
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap
+from engine.engine import GameEngine
+from engine.player_controls import LmbEvent, LmbEventType
+from engine.projectile_store import numpy
+from engine.game_objects import *
+from engine.entity_store import EntityHandle
+from network.delta_encoding import (
+    NO_BASELINE_TICK,
+    OBJECT_TYPES,
+    NetworkSnapshot,
+    NetworkSnapshotMaker,
+    ServerState,
+    PlayerMovement,
+    ObjectState,
+    DeltaEncoder,
+    DeltaDecoder,
+    DeltaEncodingException,
+    encode_state,
+    decode_state,
+    get_state_baseline_tick,
+    get_movable_entity_id)
+
+_KEY_CODE_2: int = 50
+_KEY_CODE_D: int = 68
+
+
+def get_shooting_engine(
+        is_projectile_store_used: bool = False) -> GameEngine:
+    """Player runs right through buff and shoots from machine gun"""
+    game_engine: GameEngine = GameEngine(
+        GameMap(
+            Vector2D(1000, 300),
+            [BasicPlatform(1000, 20, Vector2D(0, 200)),
+             SpeedUpBuff(Vector2D(200, 170), recharge_time=20)],
+            [Player(Vector2D(100, 100))],
+            False),
+        is_projectile_store_used)
+
+    game_engine.key_pressed(_KEY_CODE_D)
+
+    for listener in game_engine.get_event_listeners():
+        listener.key_pressed(_KEY_CODE_2)
+        listener.lmb_event_happened(
+            LmbEvent(900, 100, LmbEventType.ButtonPress))
+
+    return game_engine
+
+
+def get_states_by_types(
+        server_state: ServerState) -> Dict[type, List[ObjectState]]:
+    states_by_types: Dict[type, List[ObjectState]] = {}
+
+    for object_state in server_state.get_objects_states():
+        states_by_types.setdefault(
+            object_state.object_type, []).append(object_state)
+
+    return states_by_types
+
+
+class DeltaEncodingTests(TestCase):
+    def test_state_roundtrip(self):
+        snapshot: NetworkSnapshot = {
+            # Player
+            1: (0, 800, -16),
+            # Buff
+            1 << 30: (3, 1600, 1360, 1)}
+
+        state_packet: bytes = encode_state(7, 3, snapshot)
+
+        self.assertEqual(
+            NO_BASELINE_TICK, get_state_baseline_tick(state_packet))
+        self.assertEqual(
+            ServerState(7, 3, snapshot), decode_state(state_packet, {}))
+
+        # Input repeats and movement state of client's player
+        self.assertEqual(
+            ServerState(7, 3, snapshot, 2, PlayerMovement(-7.5, True)),
+            decode_state(
+                encode_state(
+                    7,
+                    3,
+                    snapshot,
+                    NO_BASELINE_TICK,
+                    None,
+                    2,
+                    PlayerMovement(-7.5, True)),
+                {}))
+
+    def test_only_difference_is_sent(self):
+        baseline: NetworkSnapshot = {
+            1: (0, 800, 800),
+            2: (0, 0, 0),
+            3: (0, 10, 10)}
+        snapshot: NetworkSnapshot = {
+            # Only y is changed
+            1: (0, 800, 808),
+            2: (0, 0, 0),
+            # Type is changed, so entity is spawned again
+            3: (3, 10, 10, 0),
+            4: (0, 5, 5)}
+
+        delta_packet: bytes = encode_state(8, 0, snapshot, 7, baseline)
+
+        self.assertLess(
+            len(delta_packet), len(encode_state(8, 0, snapshot)))
+        self.assertEqual(7, get_state_baseline_tick(delta_packet))
+        self.assertEqual(
+            snapshot, decode_state(delta_packet, baseline).snapshot)
+
+        # Despawns
+        self.assertEqual(
+            {2: (0, 0, 0)},
+            decode_state(
+                encode_state(9, 0, {2: (0, 0, 0)}, 8, snapshot),
+                snapshot).snapshot)
+
+        # Nothing is changed
+        self.assertEqual(
+            len(encode_state(9, 0, {}, 8, {})),
+            len(encode_state(9, 0, snapshot, 8, snapshot)))
+
+    def test_wrong_state_packets(self):
+        state_packet: bytes = encode_state(1, 0, {1: (0, 1, 1)}, 0, {})
+
+        with self.assertRaises(DeltaEncodingException):
+            decode_state(state_packet[:-1], {})
+
+        with self.assertRaises(DeltaEncodingException):
+            decode_state(state_packet + b'\x00', {})
+
+        with self.assertRaises(DeltaEncodingException):
+            get_state_baseline_tick(b'\x05')
+
+        # Changed entity is not in baseline
+        with self.assertRaises(DeltaEncodingException):
+            decode_state(
+                encode_state(1, 0, {1: (0, 1, 2)}, 0, {1: (0, 1, 1)}), {})
+
+    def test_entities_ids(self):
+        game_map: GameMap = GameMap(
+            Vector2D(1000, 300),
+            [BasicPlatform(1000, 20, Vector2D(0, 200)),
+             SpeedUpBuff(Vector2D(200, 170))],
+            [Player(Vector2D(100, 100))])
+        snapshot_maker: NetworkSnapshotMaker = NetworkSnapshotMaker(game_map)
+
+        buff_entity_id: int = max(snapshot_maker.make_snapshot(0))
+
+        # Buff keeps its id, not index, when immovable objects are replaced
+        game_map.replace_immovable_objects(
+            game_map.immovable_objects[1:], None, [1])
+
+        self.assertEqual(
+            buff_entity_id, max(snapshot_maker.make_snapshot(1)))
+
+        game_map.replace_immovable_objects(
+            list(game_map.immovable_objects), None, [1 << 30])
+
+        with self.assertRaises(DeltaEncodingException):
+            snapshot_maker.make_snapshot(2)
+
+        # Slots that do not fit would alias other entities
+        self.assertEqual(
+            (1 << 16) - 1, get_movable_entity_id(EntityHandle(65535, 0)))
+
+        with self.assertRaises(DeltaEncodingException):
+            get_movable_entity_id(EntityHandle(65536, 0))
+
+    def test_encoder_uses_acknowledged_baseline(self):
+        delta_encoder: DeltaEncoder = DeltaEncoder()
+        delta_decoder: DeltaDecoder = DeltaDecoder()
+
+        first_packet: bytes = delta_encoder.encode(1, 0, {1: (0, 1, 1)})
+
+        # Nothing is acknowledged yet
+        self.assertEqual(
+            NO_BASELINE_TICK,
+            get_state_baseline_tick(
+                delta_encoder.encode(2, 0, {1: (0, 1, 2)})))
+
+        delta_decoder.decode(first_packet)
+        delta_encoder.acknowledge(1)
+
+        # Unknown and old ticks are ignored
+        delta_encoder.acknowledge(100)
+        delta_encoder.acknowledge(0)
+
+        self.assertEqual(1, delta_encoder.acknowledged_tick)
+
+        third_packet: bytes = delta_encoder.encode(3, 0, {1: (0, 1, 3)})
+
+        self.assertEqual(1, get_state_baseline_tick(third_packet))
+        self.assertEqual(
+            {1: (0, 1, 3)}, delta_decoder.decode(third_packet).snapshot)
+
+        # Baseline is not known by other decoder
+        self.assertIsNone(DeltaDecoder().decode(third_packet))
+
+    def test_snapshots_of_game(self):
+        game_engine: GameEngine = get_shooting_engine()
+
+        self._check_snapshots_of_game(game_engine)
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_snapshots_of_game_with_projectile_store(self):
+        game_engine: GameEngine = get_shooting_engine(True)
+
+        self._check_snapshots_of_game(game_engine)
+
+        self.assertGreater(
+            len(game_engine.get_game_map().projectile_store), 0)
+
+    def _check_snapshots_of_game(self, game_engine: GameEngine):
+        snapshot_maker: NetworkSnapshotMaker = NetworkSnapshotMaker(
+            game_engine.get_game_map())
+        delta_encoder: DeltaEncoder = DeltaEncoder()
+        delta_decoder: DeltaDecoder = DeltaDecoder()
+
+        projectiles_records: Dict[int, Tuple[int, ...]] = {}
+
+        for tick in range(1, 26):
+            game_engine.update_map()
+
+            server_state: ServerState = delta_decoder.decode(
+                delta_encoder.encode(
+                    tick, 0, snapshot_maker.make_snapshot(tick)))
+            delta_encoder.acknowledge(tick)
+
+            player_state: ObjectState = (
+                get_states_by_types(server_state)[Player][0])
+
+            self.assertAlmostEqual(
+                game_engine.get_main_player().location.x,
+                player_state.x,
+                delta=1 / 16)
+
+            for entity_id, record in server_state.snapshot.items():
+                if issubclass(OBJECT_TYPES[record[0]], ProjectileObject):
+                    # Records of projectiles are never changed
+                    self.assertEqual(
+                        record,
+                        projectiles_records.setdefault(entity_id, record))
+
+        states_by_types: Dict[type, List[ObjectState]] = (
+            get_states_by_types(server_state))
+
+        self.assertTrue(states_by_types[SpeedUpBuff][0].is_charging)
+
+        # Extrapolated projectiles are where they are in game
+        projectiles_locations: List[Vector2D] = (
+            get_projectiles_locations(game_engine))
+
+        self.assertEqual(
+            len(projectiles_locations),
+            len(states_by_types[MachineGunProjectile]))
+
+        for projectile_state in states_by_types[MachineGunProjectile]:
+            self.assertLess(
+                min(
+                    abs(location.x - projectile_state.x)
+                    + abs(location.y - projectile_state.y)
+                    for location in projectiles_locations),
+                0.5)
+
+
+def get_projectiles_locations(game_engine: GameEngine) -> List[Vector2D]:
+    game_map: GameMap = game_engine.get_game_map()
+    locations: List[Vector2D] = [
+        movable_object.location
+        for movable_object in game_map.movable_objects
+        if isinstance(movable_object, ProjectileObject)]
+
+    if game_map.projectile_store is not None:
+        locations.extend(
+            Vector2D(x, y)
+            for x, y in game_map.projectile_store.get_rows()[0].tolist())
+
+    return locations
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -13,7 +13,8 @@ sys_path.append(os_path_join(
 
 from engine.game_objects import *
 from engine.engine import GameEngine
-from maps import GameMap
+from engine.player_controls import PlayerControls, LmbEvent, LmbEventType
+from maps import GameMap, RawMapsContainer
 
 
 class StateUpdaterTests(TestCase):
@@ -24,37 +25,43 @@ class StateUpdaterTests(TestCase):
         self.assertEqual(
             -self._state_updater._PLAYER_MOVE_SPEED,
             self._state_updater._get_horizontal_velocity(
-                {self._state_updater._KEY_CODE_A}))
+                PlayerControls(), {self._state_updater._KEY_CODE_A}))
 
     def test_velocity_to_the_right(self):
         self.assertEqual(
             self._state_updater._PLAYER_MOVE_SPEED,
             self._state_updater._get_horizontal_velocity(
-                {self._state_updater._KEY_CODE_D}))
+                PlayerControls(), {self._state_updater._KEY_CODE_D}))
 
     def test_no_horizontal_velocity_with_both_keys_pressed(self):
         assert (self._state_updater._get_horizontal_velocity(
+            PlayerControls(),
             {self._state_updater._KEY_CODE_A,
              self._state_updater._KEY_CODE_D}) == 0)
 
     def test_no_horizontal_velocity_with_no_keys_pressed(self):
-        assert self._state_updater._get_horizontal_velocity(set()) == 0
+        assert self._state_updater._get_horizontal_velocity(
+            PlayerControls(), set()) == 0
 
     def test_initial_jump_velocity(self):
-        self._state_updater._player_is_on_the_ground = True
+        player_controls: PlayerControls = PlayerControls()
+        player_controls.is_on_the_ground = True
 
         assert self._state_updater._get_vertical_velocity(
-            {self._state_updater._KEY_CODE_SPACE}) == (
+            player_controls, {self._state_updater._KEY_CODE_SPACE}) == (
                 self._state_updater._INITIAL_JUMP_VELOCITY)
 
     def test_gravity_acceleration(self):
-        assert self._state_updater._get_vertical_velocity(set()) == (
-            self._state_updater._GRAVITY_ACCELERATION.y)
+        assert self._state_updater._get_vertical_velocity(
+            PlayerControls(), set()) == (
+                self._state_updater._GRAVITY_ACCELERATION.y)
 
     def test_max_vertical_velocity(self):
-        self._state_updater._vertical_velocity = 100
+        player_controls: PlayerControls = PlayerControls()
+        player_controls.vertical_velocity = 100
 
-        assert self._state_updater._get_vertical_velocity(set()) == 12
+        assert self._state_updater._get_vertical_velocity(
+            player_controls, set()) == 12
 
     def test_buffs_processing(self):
         # noinspection PyTypeChecker
@@ -67,21 +74,29 @@ class StateUpdaterTests(TestCase):
             0,
             player)
 
-        self._state_updater._check_player_buffs(player)
+        player_controls: PlayerControls = PlayerControls()
+
+        self._state_updater._check_player_buffs(player, player_controls)
 
-        self.assertEqual(2, self._state_updater._PMS_gb_multiplier)
-        self.assertEqual(1.5, self._state_updater._IJV_gb_multiplier)
+        self.assertEqual(2, player_controls.move_speed_multiplier)
+        self.assertEqual(1.5, player_controls.jump_velocity_multiplier)
 
         player.current_buffs = []
 
-        self._state_updater._PMS_gb_multiplier = 1
-        self._state_updater._IJV_gb_multiplier = 1
+        # Expired buffs do not act anymore
+        self._state_updater._check_player_buffs(player, player_controls)
+
+        self.assertEqual(1, player_controls.move_speed_multiplier)
+        self.assertEqual(1, player_controls.jump_velocity_multiplier)
 
 
 class GameObjectsSpawnerTests(TestCase):
+    _game_engine: GameEngine = GameEngine(
+        GameMap(Vector2D(100, 100), [], []))
     _game_objects_spawner: GameEngine._GameObjectsSpawner = (
-        GameEngine._GameObjectsSpawner(
-            GameEngine(GameMap(Vector2D(100, 100), [], []))))
+        GameEngine._GameObjectsSpawner(_game_engine))
+    _player_controls: PlayerControls = _game_engine.get_player_controls(
+        _game_engine.get_players_handles()[0])
 
     def test_player_hand_cursor_unit_vector_getter(self):
         cursor_location: Vector2D = Vector2D(100, 100)
@@ -97,10 +112,34 @@ class GameObjectsSpawnerTests(TestCase):
                 non_unit_vector.x / non_unit_vector_length,
                 non_unit_vector.y / non_unit_vector_length),
             self._game_objects_spawner._get_player_hand_cursor_unit_vector(
-                cursor_location))
+                self._game_engine.get_main_player(), cursor_location))
+
+    def test_cursor_on_player_hand(self):
+        game_engine: GameEngine = GameEngine(
+            RawMapsContainer.get_map_1(), input_random_seed=0)
+
+        # Player lands and stays
+        for _ in range(100):
+            game_engine.update_map()
+
+        player: Player = game_engine.get_main_player()
+        cursor_location: Vector2D = player.location + Player.HAND_LOCATION
+
+        self.assertIsNone(
+            GameEngine._GameObjectsSpawner._get_player_hand_cursor_unit_vector(
+                player, cursor_location))
+
+        game_engine.lmb_event_happened(
+            LmbEvent(
+                cursor_location.x,
+                cursor_location.y,
+                LmbEventType.ButtonPress))
+        game_engine.update_map()
+
+        self.assertEqual(1, len(game_engine.get_game_map().movable_objects))
 
     def test_spawn_player_projectiles(self):
-        self.assertEqual(True, self._game_objects_spawner._handgun_can_fire)
+        self.assertEqual(True, self._player_controls.handgun_can_fire)
 
         class ButtonStateEnum(Enum):
             ButtonRelease = object()
@@ -111,24 +150,24 @@ class GameObjectsSpawnerTests(TestCase):
             x = 0
             y = 0
 
-        self._game_objects_spawner._lmb_event = MouseEvent()
+        self._player_controls.lmb_event_happened(MouseEvent())
 
-        self._game_objects_spawner._lmb_event.type = (
+        self._player_controls.get_lmb_event().type = (
             ButtonStateEnum.ButtonPress)
 
         self._game_objects_spawner.spawn_player_projectiles()
 
-        self.assertEqual(False, self._game_objects_spawner._handgun_can_fire)
+        self.assertEqual(False, self._player_controls.handgun_can_fire)
         self.assertEqual(
             2,
             len(self._game_objects_spawner._game_map.movable_objects))
 
-        self._game_objects_spawner._lmb_event.type = (
+        self._player_controls.get_lmb_event().type = (
             ButtonStateEnum.ButtonRelease)
 
         self._game_objects_spawner.spawn_player_projectiles()
 
-        self.assertEqual(True, self._game_objects_spawner._handgun_can_fire)
+        self.assertEqual(True, self._player_controls.handgun_can_fire)
 
 
 if __name__ == '__main__':
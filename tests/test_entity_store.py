@@ -0,0 +1,103 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from pickle import dumps as pickle_dumps, loads as pickle_loads
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.entity_store import GenerationalStore, EntityHandle
+from engine.engine import GameEngine
+from engine.game_objects import (
+    Vector2D, Player, HandgunProjectile)
+from maps import GameMap
+
+
+class GenerationalStoreTests(TestCase):
+    def test_handles_are_stable_after_swap_remove(self):
+        generational_store: GenerationalStore[str] = GenerationalStore(
+            ['a', 'b', 'c'])
+
+        a_handle: EntityHandle = generational_store.get_handle(0)
+        c_handle: EntityHandle = generational_store.get_handle(2)
+
+        generational_store.remove(a_handle)
+
+        self.assertEqual(['c', 'b'], list(generational_store))
+        self.assertEqual('c', generational_store.get(c_handle))
+        self.assertIsNone(generational_store.get(a_handle))
+
+    def test_reused_slot_does_not_revive_old_handle(self):
+        generational_store: GenerationalStore[str] = GenerationalStore(['a'])
+
+        a_handle: EntityHandle = generational_store.get_handle(0)
+
+        generational_store.remove(a_handle)
+
+        d_handle: EntityHandle = generational_store.add('d')
+
+        self.assertEqual(a_handle.slot, d_handle.slot)
+        self.assertIsNone(generational_store.get(a_handle))
+        self.assertEqual('d', generational_store.get(d_handle))
+
+    def test_scheduled_removals(self):
+        generational_store: GenerationalStore[int] = GenerationalStore(
+            range(10))
+
+        for dense_index in range(len(generational_store)):
+            if generational_store[dense_index] % 3 == 0:
+                generational_store.schedule_removal(dense_index)
+
+        # Twice scheduled object is removed once
+        generational_store.schedule_removal(0)
+
+        self.assertEqual(4, generational_store.compact())
+        self.assertEqual(
+            [1, 2, 4, 5, 7, 8], sorted(generational_store))
+
+    def test_clear(self):
+        generational_store: GenerationalStore[int] = GenerationalStore(
+            range(10))
+
+        generational_store.clear()
+
+        self.assertEqual(0, len(generational_store))
+
+
+class GameMapMovableObjectsTests(TestCase):
+    def test_main_player_survives_despawning(self):
+        game_map: GameMap = GameMap(
+            Vector2D(100, 100),
+            [],
+            [Player(Vector2D(0, 0)),
+             HandgunProjectile(Vector2D(0, 0), Vector2D(10, 10)),
+             HandgunProjectile(Vector2D(0, 0), Vector2D(20, 20))])
+        game_engine: GameEngine = GameEngine(game_map)
+        main_player: Player = game_engine.get_main_player()
+
+        game_map.movable_objects.schedule_removal(1)
+        game_map.movable_objects.compact()
+
+        self.assertIs(main_player, game_engine.get_main_player())
+        self.assertEqual(2, len(game_map.movable_objects))
+
+    def test_pickled_list_of_movable_objects(self):
+        game_map: GameMap = GameMap(
+            Vector2D(100, 100), [], [Player(Vector2D(0, 0))])
+
+        # Map pickled before generational store
+        game_map.movable_objects = list(game_map.movable_objects)
+
+        unpickled_game_map: GameMap = pickle_loads(pickle_dumps(game_map))
+
+        self.assertIsInstance(
+            unpickled_game_map.movable_objects, GenerationalStore)
+        self.assertEqual(1, len(unpickled_game_map.movable_objects))
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,118 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from typing import List
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.fixed_step_scheduler import (
+    FixedStepScheduler, FixedStepSchedulerException)
+
+
+class FakeClock:
+    """Time moves only by sleeps and by explicit [advance] calls"""
+    current_time: float
+
+    def __init__(self):
+        self.current_time = 100.0
+
+    def __call__(self) -> float:
+        return self.current_time
+
+    def advance(self, seconds: float):
+        self.current_time += seconds
+
+
+class FixedStepSchedulerTests(TestCase):
+    def test_due_ticks(self):
+        fake_clock: FakeClock = FakeClock()
+        scheduler: FixedStepScheduler = FixedStepScheduler(
+            10, 5, fake_clock, fake_clock.advance)
+
+        # The first tick is due right away
+        self.assertEqual(1, scheduler.get_due_ticks())
+        self.assertEqual(0, scheduler.get_due_ticks())
+        self.assertAlmostEqual(0.1, scheduler.get_time_to_next_tick())
+
+        fake_clock.advance(0.25)
+
+        self.assertEqual(2, scheduler.get_due_ticks())
+        self.assertAlmostEqual(0.05, scheduler.get_time_to_next_tick())
+
+    def test_bounded_catch_up(self):
+        fake_clock: FakeClock = FakeClock()
+        scheduler: FixedStepScheduler = FixedStepScheduler(
+            10, 5, fake_clock, fake_clock.advance)
+
+        scheduler.get_due_ticks()
+        fake_clock.advance(10.05)
+
+        self.assertEqual(5, scheduler.get_due_ticks())
+        self.assertEqual(95, scheduler.dropped_ticks_count)
+
+        # Backlog is dropped together with part of tick
+        self.assertAlmostEqual(0.1, scheduler.get_time_to_next_tick())
+
+    def test_slow_render_does_not_slow_simulation(self):
+        fake_clock: FakeClock = FakeClock()
+        scheduler: FixedStepScheduler = FixedStepScheduler(
+            60, 5, fake_clock, fake_clock.advance)
+        updates_times: List[float] = []
+
+        def update():
+            updates_times.append(fake_clock())
+
+        # Every render takes 2.5 ticks
+        def render():
+            fake_clock.advance(2.5 / 60)
+
+        scheduler.run(update, render, 600)
+
+        # 600 ticks at 60 Hz take 10 seconds no matter how slow rendering is
+        self.assertEqual(600, scheduler.ticks_count)
+        self.assertAlmostEqual(
+            10, updates_times[-1] - updates_times[0], delta=3 / 60)
+        self.assertLess(scheduler.rendered_frames_count, 300)
+        self.assertEqual(0, scheduler.dropped_ticks_count)
+
+    def test_slow_updates_do_not_spiral(self):
+        fake_clock: FakeClock = FakeClock()
+        scheduler: FixedStepScheduler = FixedStepScheduler(
+            60, 5, fake_clock, fake_clock.advance)
+        updates_times: List[float] = []
+        batches_sizes: List[int] = []
+
+        # The first 300 updates take 1.5 ticks each, then updates are free
+        def update():
+            updates_times.append(fake_clock())
+
+            if len(updates_times) <= 300:
+                fake_clock.advance(1.5 / 60)
+
+        def render():
+            batches_sizes.append(len(updates_times) - sum(batches_sizes))
+
+        scheduler.run(update, render, 600)
+
+        self.assertEqual(600, sum(batches_sizes))
+        self.assertLessEqual(max(batches_sizes), 5)
+        self.assertGreater(scheduler.dropped_ticks_count, 0)
+
+        # No catching up in bursts after slow updates are over
+        self.assertEqual([1] * 100, batches_sizes[-100:])
+
+    def test_wrong_arguments(self):
+        with self.assertRaises(FixedStepSchedulerException):
+            FixedStepScheduler(0)
+
+        with self.assertRaises(FixedStepSchedulerException):
+            FixedStepScheduler(60, 0)
+
+
+if __name__ == '__main__':
+    unittest_main()
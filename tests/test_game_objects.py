@@ -0,0 +1,105 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from pickle import dumps as pickle_dumps, loads as pickle_loads
+from copy import deepcopy
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.game_objects import *
+
+
+class Vector2DTests(TestCase):
+    def test_in_place_addition(self):
+        vector: Vector2D = Vector2D(1, 2)
+        same_vector: Vector2D = vector
+
+        vector += Vector2D(10, 20)
+
+        self.assertIs(same_vector, vector)
+        self.assertEqual(Vector2D(11, 22), vector)
+
+    def test_in_place_subtraction(self):
+        vector: Vector2D = Vector2D(1, 2)
+        same_vector: Vector2D = vector
+
+        vector -= Vector2D(10, 20)
+
+        self.assertIs(same_vector, vector)
+        self.assertEqual(Vector2D(-9, -18), vector)
+
+    def test_addition_creates_new_vector(self):
+        vector: Vector2D = Vector2D(1, 2)
+
+        self.assertIsNot(vector, vector + Vector2D(0, 0))
+        self.assertEqual(Vector2D(1, 2), vector)
+
+
+class SlotsTests(TestCase):
+    def test_no_instance_dict(self):
+        for game_object in (
+                Vector2D(0, 0),
+                BasicPlatform(1, 1, Vector2D(0, 0)),
+                SpeedUpBuff(Vector2D(0, 0)),
+                Player(Vector2D(0, 0)),
+                HandgunProjectile(Vector2D(0, 0), Vector2D(0, 0))):
+            self.assertFalse(hasattr(game_object, '__dict__'))
+
+    def test_pickling(self):
+        player: Player = Player(Vector2D(1, 2))
+        buff: JumpHeightUpBuff = JumpHeightUpBuff(Vector2D(3, 4))
+
+        buff.capture_this_buff(10, player)
+
+        unpickled_player: Player = pickle_loads(pickle_dumps(player))
+
+        self.assertEqual(Vector2D(1, 2), unpickled_player.location)
+        self.assertIs(
+            unpickled_player,
+            unpickled_player.current_buffs[0]._player_captor)
+        self.assertTrue(unpickled_player.current_buffs[0].is_charging())
+
+    def test_deep_copying(self):
+        platform: BasicPlatform = BasicPlatform(5, 6, Vector2D(1, 2))
+        platform_copy: BasicPlatform = deepcopy(platform)
+
+        self.assertIsNot(platform.location, platform_copy.location)
+        self.assertEqual(platform.location, platform_copy.location)
+        self.assertEqual((5, 6), (platform_copy.width, platform_copy.height))
+
+    def test_copying(self):
+        player: Player = Player(Vector2D(1, 2))
+        player_copy: Player = player.copy()
+
+        player_copy.location += Vector2D(1, 1)
+        player_copy.current_buffs.append(SpeedUpBuff(Vector2D(0, 0)))
+
+        self.assertEqual(Vector2D(1, 2), player.location)
+        self.assertEqual([], player.current_buffs)
+        self.assertIs(Player, player_copy.__class__)
+
+    def test_state_from_dataclasses_times(self):
+        buff: SpeedUpBuff = SpeedUpBuff.__new__(SpeedUpBuff)
+
+        # [SIDE_LENGTH] was dataclass field so it is in old pickled maps
+        buff.__setstate__({
+            'location': Vector2D(1, 2),
+            'should_be_despawned': False,
+            'SIDE_LENGTH': 25,
+            '_recharge_time': 200,
+            '_is_charging': False,
+            '_charge_time_start': 0,
+            '_player_captor': None})
+
+        self.assertEqual(Vector2D(1, 2), buff.location)
+        self.assertFalse(buff.is_charging())
+        self.assertFalse(hasattr(buff, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,226 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from user_interface.game_ui import GameGUI
+from user_interface.camera import Camera
+from user_interface.render_snapshot import make_render_snapshot
+from engine.engine import GameEngine
+from engine.game_objects import *
+from maps import GameMap
+
+
+class RecordingCanvas:
+    """Counts canvas calls of drawer. Real canvas needs display"""
+    items: Dict[int, Tuple[str, tuple]]
+    calls_counts: Dict[str, int]
+
+    # Fractions given to [xview_moveto] and [yview_moveto]
+    view: List[float]
+
+    _next_item_id: int
+
+    def __init__(self):
+        self.items = dict()
+        self.calls_counts = dict.fromkeys(
+            ['create', 'coords', 'delete', 'tag_lower'], 0)
+
+        self.view = [0.0, 0.0]
+
+        self._next_item_id = 1
+
+    def _create(self, item_type: str, *coordinates, **_) -> int:
+        self.calls_counts['create'] += 1
+
+        item_id: int = self._next_item_id
+        self._next_item_id += 1
+
+        self.items[item_id] = (item_type, coordinates)
+
+        return item_id
+
+    def create_rectangle(self, *coordinates, **options) -> int:
+        return self._create('rectangle', *coordinates, **options)
+
+    def create_oval(self, *coordinates, **options) -> int:
+        return self._create('oval', *coordinates, **options)
+
+    def coords(self, item_id: int, *coordinates):
+        self.calls_counts['coords'] += 1
+
+        self.items[item_id] = (self.items[item_id][0], coordinates)
+
+    def delete(self, item_id: int):
+        self.calls_counts['delete'] += 1
+
+        del self.items[item_id]
+
+    def tag_lower(self, _: int):
+        self.calls_counts['tag_lower'] += 1
+
+    def configure(self, **_):
+        pass
+
+    def xview_moveto(self, fraction: float):
+        self.view[0] = fraction
+
+    def yview_moveto(self, fraction: float):
+        self.view[1] = fraction
+
+
+class RetainedDrawingTests(TestCase):
+    def test_only_changes_reach_canvas(self):
+        game_map: GameMap = GameMap(
+            Vector2D(1000, 1000),
+            [BasicPlatform(100, 10, Vector2D(0, 990)),
+             BasicPlatform(100, 10, Vector2D(200, 990))],
+            [Player(Vector2D(0, 944)),
+             HandgunProjectile(Vector2D(400, 0), Vector2D(100, 100))])
+        game_engine: GameEngine = GameEngine(game_map)
+        recording_canvas: RecordingCanvas = RecordingCanvas()
+        game_objects_drawer: GameGUI.GameObjectsDrawer = (
+            GameGUI.GameObjectsDrawer(recording_canvas, game_map))
+
+        game_objects_drawer.draw_all_game_objects()
+
+        self.assertEqual(4, recording_canvas.calls_counts['create'])
+        self.assertEqual(2, recording_canvas.calls_counts['tag_lower'])
+
+        # Player stands still, projectile moves
+        game_engine.update_map()
+        game_objects_drawer.draw_all_game_objects()
+
+        self.assertEqual(4, recording_canvas.calls_counts['create'])
+        self.assertEqual(1, recording_canvas.calls_counts['coords'])
+        self.assertIn(
+            ('oval', (500, 100, 500 + HandgunProjectile.CIRCLE_DIAMETER,
+                      100 + HandgunProjectile.CIRCLE_DIAMETER)),
+            recording_canvas.items.values())
+
+        # Projectile flies out of game field
+        for _ in range(3):
+            game_engine.update_map()
+        game_objects_drawer.draw_all_game_objects()
+
+        self.assertEqual(1, recording_canvas.calls_counts['delete'])
+        self.assertEqual(3, len(recording_canvas.items))
+
+    def test_replaced_object_gets_new_item(self):
+        game_map: GameMap = GameMap(
+            Vector2D(1000, 1000), [SpeedUpBuff(Vector2D(0, 0))], [])
+        recording_canvas: RecordingCanvas = RecordingCanvas()
+        game_objects_drawer: GameGUI.GameObjectsDrawer = (
+            GameGUI.GameObjectsDrawer(recording_canvas, game_map))
+
+        game_objects_drawer.draw_all_game_objects()
+
+        # Map editor replaces object with the same index
+        game_map.immovable_objects[0] = BasicPlatform(
+            10, 10, Vector2D(0, 0))
+        game_map.invalidate_static_layer()
+        game_objects_drawer.draw_all_game_objects()
+
+        self.assertEqual(2, recording_canvas.calls_counts['create'])
+        self.assertEqual(1, recording_canvas.calls_counts['delete'])
+        self.assertEqual(1, len(recording_canvas.items))
+
+    def test_static_layer_is_skipped_until_invalidated(self):
+        game_map: GameMap = GameMap(
+            Vector2D(1000, 1000),
+            [BasicPlatform(10, 10, Vector2D(10 * index, 0))
+             for index in range(100)],
+            [])
+        recording_canvas: RecordingCanvas = RecordingCanvas()
+        game_objects_drawer: GameGUI.GameObjectsDrawer = (
+            GameGUI.GameObjectsDrawer(recording_canvas, game_map))
+
+        game_objects_drawer.draw_all_game_objects()
+
+        # Not invalidated change is not seen
+        game_map.immovable_objects[0].width = 20
+        game_objects_drawer.draw_all_game_objects()
+
+        self.assertEqual(0, recording_canvas.calls_counts['coords'])
+
+        game_map.invalidate_static_layer()
+        game_objects_drawer.draw_all_game_objects()
+
+        self.assertEqual(100, recording_canvas.calls_counts['create'])
+        self.assertEqual(1, recording_canvas.calls_counts['coords'])
+
+
+class CullingTests(TestCase):
+    def test_only_objects_around_viewport_are_drawn(self):
+        # 40 platforms in a row, 100 pixels apart, and two players far away
+        # from each other
+        game_map: GameMap = GameMap(
+            Vector2D(4000, 700),
+            [BasicPlatform(50, 10, Vector2D(100 * index, 600))
+             for index in range(40)],
+            [Player(Vector2D(3500, 500)), Player(Vector2D(200, 500))])
+        recording_canvas: RecordingCanvas = RecordingCanvas()
+        game_objects_drawer: GameGUI.GameObjectsDrawer = (
+            GameGUI.GameObjectsDrawer(
+                recording_canvas, game_map, Camera((1000, 700), (4000, 700))))
+
+        game_objects_drawer.draw_snapshot(
+            make_render_snapshot(game_map, 1, None, (3500, 500)))
+
+        self.assertEqual((3000, 0), game_objects_drawer._camera.location)
+        self.assertEqual([0.75, 0.0], recording_canvas.view)
+
+        drawn_xs: List[float] = [
+            coordinates[0]
+            for _, coordinates in recording_canvas.items.values()]
+
+        self.assertIn(3500, drawn_xs)
+        self.assertNotIn(200, drawn_xs)
+        self.assertNotIn(0, drawn_xs)
+        # Viewport with margin and cells of grid cover much less than map
+        self.assertLess(len(drawn_xs), 20)
+
+        # Camera moves to other player: far objects are deleted
+        game_objects_drawer.draw_snapshot(
+            make_render_snapshot(game_map, 2, None, (200, 500)))
+
+        drawn_xs = [
+            coordinates[0]
+            for _, coordinates in recording_canvas.items.values()]
+
+        self.assertIn(200, drawn_xs)
+        self.assertIn(0, drawn_xs)
+        self.assertNotIn(3500, drawn_xs)
+        self.assertEqual([0.0, 0.0], recording_canvas.view)
+
+    def test_static_layer_is_kept_while_camera_is_in_the_same_cells(self):
+        game_map: GameMap = GameMap(
+            Vector2D(4000, 700),
+            [BasicPlatform(50, 10, Vector2D(100 * index, 600))
+             for index in range(40)],
+            [])
+        recording_canvas: RecordingCanvas = RecordingCanvas()
+        game_objects_drawer: GameGUI.GameObjectsDrawer = (
+            GameGUI.GameObjectsDrawer(
+                recording_canvas, game_map, Camera((1000, 700), (4000, 700))))
+        first_snapshot = make_render_snapshot(game_map, 1, None, (2010, 350))
+
+        game_objects_drawer.draw_snapshot(first_snapshot)
+        created_count: int = recording_canvas.calls_counts['create']
+
+        game_objects_drawer.draw_snapshot(
+            make_render_snapshot(game_map, 2, first_snapshot, (2020, 350)))
+
+        self.assertEqual(
+            created_count, recording_canvas.calls_counts['create'])
+        self.assertEqual(0, recording_canvas.calls_counts['delete'])
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,107 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from io import StringIO
+from contextlib import redirect_stderr
+from unittest.mock import patch
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.headless_runner import (
+    HeadlessRunner,
+    HeadlessRunnerException,
+    ScriptedInput,
+    RunReport,
+    parse_scripted_inputs,
+    run_headless_logic)
+from engine.player_controls import LmbEvent, LmbEventType
+from engine.engine import GameEngine
+from engine.game_objects import *
+from maps import GameMap, GameMapException, load_game_map
+
+
+class HeadlessRunnerTests(TestCase):
+    def test_ticks_are_counted(self):
+        game_engine: GameEngine = GameEngine(load_game_map('raw 1'))
+
+        run_report: RunReport = HeadlessRunner(game_engine).run(30)
+
+        self.assertEqual(30, run_report.ticks_count)
+        self.assertEqual(30, game_engine.get_map_updates_count())
+        self.assertGreater(run_report.ticks_per_second, 0)
+
+    def test_scripted_keys_move_player(self):
+        game_engine: GameEngine = GameEngine(
+            GameMap(Vector2D(1000, 100), [], [Player(Vector2D(0, 0))]))
+
+        # 'D' key is pressed for ticks 5..14
+        HeadlessRunner(
+            game_engine,
+            [ScriptedInput(15, 'key_released', 68),
+             ScriptedInput(5, 'key_pressed', 68)]).run(30)
+
+        self.assertEqual(
+            10 * GameEngine._StateUpdater._PLAYER_MOVE_SPEED,
+            game_engine.get_main_player().location.x)
+
+    def test_scripted_lmb_event_spawns_projectile(self):
+        game_map: GameMap = GameMap(
+            Vector2D(1000, 1000), [], [Player(Vector2D(500, 500))])
+
+        HeadlessRunner(
+            GameEngine(game_map),
+            [ScriptedInput(
+                0,
+                'lmb_event_happened',
+                LmbEvent(900, 100, LmbEventType.ButtonPress))]).run(1)
+
+        self.assertEqual(
+            1,
+            sum(isinstance(movable_object, HandgunProjectile)
+                for movable_object in game_map.movable_objects))
+
+    def test_unknown_listener_method(self):
+        with self.assertRaises(HeadlessRunnerException):
+            HeadlessRunner(
+                GameEngine(load_game_map('raw 1')),
+                [ScriptedInput(0, 'update_map', None)])
+
+    def test_scripted_inputs_parsing(self):
+        self.assertEqual(
+            [ScriptedInput(3, 'key_pressed', 32),
+             ScriptedInput(
+                 4,
+                 'lmb_event_happened',
+                 LmbEvent(10, 20.5, LmbEventType.Motion))],
+            parse_scripted_inputs(StringIO(
+                '# Jump and shoot\n'
+                '3 key_pressed 32\n'
+                '\n'
+                '4 lmb_event_happened Motion 10 20.5  # machine gun\n')))
+
+        with self.assertRaises(HeadlessRunnerException):
+            parse_scripted_inputs(StringIO('3 key_pressed\n'))
+
+    def test_wrong_raw_map_name(self):
+        with self.assertRaises(GameMapException):
+            load_game_map('raw no_such_map')
+
+    def test_inputs_and_replay_are_exclusive(self):
+        with patch(
+                'sys.argv',
+                ['headless.py', 'raw 1', '-i', 'inputs', '--replay', 'rec']):
+            with redirect_stderr(StringIO()):
+                with self.assertRaises(SystemExit) as exit_context:
+                    run_headless_logic()
+
+        # Usage error, files are not even opened
+        self.assertEqual(2, exit_context.exception.code)
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,142 @@
+from unittest import TestCase, main as unittest_main
+from argparse import ArgumentTypeError
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from io import BytesIO
+from types import SimpleNamespace
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.input_recording import (
+    InputRecorder,
+    InputRecording,
+    InputRecordingException,
+    MAX_RANDOM_SEED,
+    parse_random_seed,
+    read_input_recording)
+from engine.headless_runner import HeadlessRunner
+from engine.player_controls import LmbEventType
+from engine.engine import GameEngine
+from engine.game_objects import *
+from maps import GameMap, load_game_map
+
+
+def get_tkinter_like_lmb_event(x: int, y: int, type_name: str):
+    return SimpleNamespace(x=x, y=y, type=SimpleNamespace(name=type_name))
+
+
+def get_movable_objects_locations(game_map: GameMap) -> List[Vector2D]:
+    return [movable_object.location
+            for movable_object in game_map.movable_objects]
+
+
+class InputRecordingTests(TestCase):
+    def test_replay_gives_the_same_game(self):
+        recording_stream: BytesIO = BytesIO()
+        recorded_game_map: GameMap = load_game_map('raw 2')
+        recorded_game_engine: GameEngine = GameEngine(
+            recorded_game_map, False, 42)
+        input_recorder: InputRecorder = InputRecorder(
+            recorded_game_engine, recording_stream, 42, 'raw 2')
+
+        # Machine gun fire while running to the right and jumping
+        input_recorder.key_pressed(50)
+        input_recorder.key_pressed(68)
+        input_recorder.lmb_event_happened(
+            get_tkinter_like_lmb_event(900, 100, 'ButtonPress'))
+
+        for tick in range(120):
+            if tick == 30:
+                input_recorder.key_pressed(32)
+
+            elif tick == 40:
+                input_recorder.key_released(32)
+                input_recorder.lmb_event_happened(
+                    get_tkinter_like_lmb_event(100, 600, 'Motion'))
+
+            elif tick == 110:
+                input_recorder.lmb_event_happened(
+                    get_tkinter_like_lmb_event(100, 600, 'ButtonRelease'))
+
+            input_recorder.update_map()
+
+        input_recorder.close()
+
+        recording_stream.seek(0)
+        input_recording: InputRecording = read_input_recording(
+            recording_stream)
+
+        self.assertEqual(42, input_recording.random_seed)
+        self.assertEqual('raw 2', input_recording.map_name)
+        self.assertEqual(120, input_recording.ticks_count)
+        self.assertEqual(7, len(input_recording.scripted_inputs))
+        self.assertIs(
+            LmbEventType.Motion,
+            input_recording.scripted_inputs[5].argument.type)
+
+        replayed_game_map: GameMap = load_game_map(input_recording.map_name)
+
+        HeadlessRunner(
+            GameEngine(
+                replayed_game_map, False, input_recording.random_seed),
+            input_recording.scripted_inputs).run(
+                input_recording.ticks_count)
+
+        # Scatter of machine gun is random so equality means seeded replay
+        self.assertGreater(len(recorded_game_map.movable_objects), 10)
+        self.assertEqual(
+            get_movable_objects_locations(recorded_game_map),
+            get_movable_objects_locations(replayed_game_map))
+
+    def test_truncated_recording(self):
+        recording_stream: BytesIO = BytesIO()
+        input_recorder: InputRecorder = InputRecorder(
+            GameEngine(load_game_map('raw 1')), recording_stream, 7, 'raw 1')
+
+        input_recorder.key_pressed(68)
+        input_recorder.update_map()
+        input_recorder.key_pressed(32)
+        input_recorder.update_map()
+
+        input_recording: InputRecording = read_input_recording(
+            BytesIO(recording_stream.getvalue()[:-1]))
+
+        self.assertIsNone(input_recording.ticks_count)
+        self.assertEqual(1, len(input_recording.scripted_inputs))
+
+    def test_not_a_recording(self):
+        with self.assertRaises(InputRecordingException):
+            read_input_recording(BytesIO(b'not a recording at all'))
+
+    def test_random_seed_range(self):
+        recording_stream: BytesIO = BytesIO()
+
+        InputRecorder(
+            GameEngine(load_game_map('raw 1')),
+            recording_stream,
+            MAX_RANDOM_SEED,
+            'raw 1').close()
+
+        self.assertEqual(
+            MAX_RANDOM_SEED,
+            read_input_recording(
+                BytesIO(recording_stream.getvalue())).random_seed)
+
+        with self.assertRaises(InputRecordingException):
+            InputRecorder(
+                GameEngine(load_game_map('raw 1')), BytesIO(), -1, 'raw 1')
+
+        self.assertEqual(0, parse_random_seed('0'))
+
+        for wrong_seed in ('-1', str(MAX_RANDOM_SEED + 1), 'seed'):
+            with self.assertRaises(ArgumentTypeError):
+                parse_random_seed(wrong_seed)
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,103 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from io import StringIO
+from json import loads as json_loads
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.instrumentation import (
+    RollingHistogram, TickInstrumentation, InstrumentationException)
+from engine.engine import GameEngine
+from engine.player_controls import LmbEvent, LmbEventType
+from engine.game_objects import *
+from maps import GameMap
+
+
+class RollingHistogramTests(TestCase):
+    def test_percentiles(self):
+        rolling_histogram: RollingHistogram = RollingHistogram(100)
+
+        for value in range(1, 101):
+            rolling_histogram.add(value)
+
+        self.assertEqual(50, rolling_histogram.get_percentile(50))
+        self.assertEqual(95, rolling_histogram.get_percentile(95))
+        self.assertEqual(99, rolling_histogram.get_percentile(99))
+
+    def test_only_last_values_are_kept(self):
+        rolling_histogram: RollingHistogram = RollingHistogram(3)
+
+        for value in [100, 100, 1, 2, 3]:
+            rolling_histogram.add(value)
+
+        self.assertEqual(5, rolling_histogram.count)
+        self.assertEqual(
+            [1, 2, 3], sorted(rolling_histogram.get_kept_values()))
+        self.assertEqual(3, rolling_histogram.get_summary()['max'])
+
+    def test_empty_histogram(self):
+        self.assertEqual(0, RollingHistogram(3).get_percentile(99))
+
+        with self.assertRaises(InstrumentationException):
+            RollingHistogram(0)
+
+
+class GameEngineInstrumentationTests(TestCase):
+    def test_phases_and_counters(self):
+        game_map: GameMap = GameMap(
+            Vector2D(100, 100),
+            [BasicPlatform(100, 10, Vector2D(0, 90))],
+            [Player(Vector2D(0, 0)),
+             HandgunProjectile(Vector2D(50, 0), Vector2D(10, 10))])
+        game_engine: GameEngine = GameEngine(game_map)
+
+        self.assertIsNone(game_engine.get_instrumentation())
+
+        # Snapshot capture is a phase of tick too
+        game_engine.enable_world_snapshots(4)
+
+        tick_instrumentation: TickInstrumentation = (
+            game_engine.enable_instrumentation())
+
+        game_engine.lmb_event_happened(
+            LmbEvent(90, 0, LmbEventType.ButtonPress))
+
+        for _ in range(10):
+            game_engine.update_map()
+
+        for phase_name in TickInstrumentation.PHASES:
+            self.assertEqual(
+                10,
+                tick_instrumentation.get_phase_histogram(phase_name).count)
+
+        # Both projectiles fly out of game field in few updates
+        self.assertEqual(
+            1, tick_instrumentation.get_counter('spawned_objects'))
+        self.assertEqual(
+            2, tick_instrumentation.get_counter('despawned_objects'))
+        self.assertGreater(
+            tick_instrumentation.get_counter('collision_checks'), 10)
+        self.assertGreater(tick_instrumentation.get_counter('collisions'), 0)
+
+        dumped_report: StringIO = StringIO()
+        tick_instrumentation.dump(dumped_report)
+
+        self.assertEqual(
+            10,
+            json_loads(dumped_report.getvalue())['phases_ms']['tick']['count'])
+
+        game_engine.disable_instrumentation()
+        game_engine.update_map()
+
+        self.assertEqual(
+            10, tick_instrumentation.get_phase_histogram('tick').count)
+
+
+if __name__ == '__main__':
+    unittest_main()
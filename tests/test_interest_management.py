@@ -0,0 +1,98 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.game_objects import *
+from network.delta_encoding import (
+    POSITION_QUANTUM, MOVING_VECTOR_QUANTUM, NetworkSnapshot)
+from network.interest_management import (
+    InterestGrid, AreaOfInterest, InterestManagementException)
+
+
+def get_player_record(x: float, y: float) -> Tuple[int, ...]:
+    return 0, round(x / POSITION_QUANTUM), round(y / POSITION_QUANTUM)
+
+
+class InterestGridTests(TestCase):
+    def test_query_gives_entities_inside_rectangle(self):
+        interest_grid: InterestGrid = InterestGrid(
+            {1: get_player_record(10, 10),
+             2: get_player_record(300, 10),
+             3: get_player_record(50, 50)},
+            0)
+
+        self.assertEqual([1, 3], sorted(interest_grid.query(0, 0, 50, 50)))
+        self.assertEqual([], interest_grid.query(60, 0, 299, 100))
+
+    def test_projectiles_are_extrapolated(self):
+        # Projectile flies right by 20 per tick since tick 5
+        interest_grid: InterestGrid = InterestGrid(
+            {7: (2,
+                 round(100 / POSITION_QUANTUM),
+                 0,
+                 round(20 / MOVING_VECTOR_QUANTUM),
+                 0,
+                 5)},
+            15)
+
+        self.assertEqual((300, 0), interest_grid.get_location(7))
+        self.assertEqual([7], interest_grid.query(290, 0, 310, 0))
+
+
+class AreaOfInterestTests(TestCase):
+    def test_far_entities_are_filtered(self):
+        snapshot: NetworkSnapshot = {
+            1: get_player_record(500, 500),
+            2: get_player_record(5000, 500)}
+
+        area_of_interest: AreaOfInterest = AreaOfInterest((400, 200), 50, 0)
+
+        self.assertEqual(
+            {1: snapshot[1]},
+            area_of_interest.filter_snapshot(
+                InterestGrid(snapshot, 0), 500, 500))
+
+        # Half width of view with margin is 250
+        self.assertEqual(
+            {2: snapshot[2]},
+            area_of_interest.filter_snapshot(
+                InterestGrid(snapshot, 0), 4750, 500))
+
+    def test_hysteresis(self):
+        area_of_interest: AreaOfInterest = AreaOfInterest((200, 200), 0, 20)
+
+        def filter_entity(x: float) -> NetworkSnapshot:
+            return area_of_interest.filter_snapshot(
+                InterestGrid({1: get_player_record(x, 0)}, 0), 0, 0)
+
+        # Entity does not enter until it is in view
+        self.assertEqual({}, filter_entity(110))
+        self.assertEqual(1, len(filter_entity(100)))
+
+        # And does not leave until it is further than hysteresis
+        self.assertEqual(1, len(filter_entity(115)))
+        self.assertEqual(1, len(filter_entity(120)))
+        self.assertEqual({}, filter_entity(121))
+        self.assertEqual({}, filter_entity(115))
+        self.assertEqual(0, len(area_of_interest))
+
+    def test_wrong_areas(self):
+        with self.assertRaises(InterestManagementException):
+            AreaOfInterest((0, 100))
+
+        with self.assertRaises(InterestManagementException):
+            AreaOfInterest((100, 100), -1)
+
+        with self.assertRaises(InterestManagementException):
+            AreaOfInterest((100, 100), 0, -1)
+
+
+if __name__ == '__main__':
+    unittest_main()
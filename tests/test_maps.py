@@ -0,0 +1,95 @@
+from unittest import TestCase, main as unittest_main
+from pickle import dumps as pickle_dumps, loads as pickle_loads
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap, GameMapTemplate, RawMapsContainer
+from engine.engine import GameEngine
+from engine.collisions_processor import CollisionsProcessor
+from engine.game_objects import *
+
+
+class GameMapTemplateTests(TestCase):
+    def test_static_geometry_is_shared(self):
+        game_map_template: GameMapTemplate = GameMapTemplate(
+            RawMapsContainer.get_map_5())
+
+        first_map: GameMap = game_map_template.make_game_map()
+        second_map: GameMap = game_map_template.make_game_map()
+
+        self.assertIs(
+            first_map.immovable_objects, second_map.immovable_objects)
+        self.assertIs(first_map.spatial_grid, second_map.spatial_grid)
+        self.assertIs(
+            first_map.spatial_grid,
+            CollisionsProcessor(first_map)._spatial_grid)
+
+        # Movers are own
+        self.assertIsNot(
+            list(first_map.movable_objects)[0],
+            list(second_map.movable_objects)[0])
+
+    def test_buff_is_copied_on_capture(self):
+        # Player falls on buff
+        game_map_template: GameMapTemplate = GameMapTemplate(
+            GameMap(
+                Vector2D(1000, 700),
+                [BasicPlatform(100, 10, Vector2D(0, 600)),
+                 SpeedUpBuff(Vector2D(0, 550))],
+                [Player(Vector2D(0, 400))]))
+
+        game_map: GameMap = game_map_template.make_game_map()
+        untouched_map: GameMap = game_map_template.make_game_map()
+        game_engine: GameEngine = GameEngine(game_map)
+
+        for _ in range(30):
+            game_engine.update_map()
+
+        self.assertTrue(game_map.immovable_objects[1].is_charging())
+        self.assertFalse(
+            game_map_template.immovable_objects[1].is_charging())
+        self.assertIs(
+            game_map_template.immovable_objects[0],
+            game_map.immovable_objects[0])
+        self.assertIs(
+            untouched_map.immovable_objects,
+            game_map_template.immovable_objects)
+
+        # Grid is shared by cells only
+        self.assertIs(
+            game_map.immovable_objects, game_map.spatial_grid.objects)
+        self.assertIs(
+            game_map_template.spatial_grid.cells,
+            game_map.spatial_grid.cells)
+
+    def test_pickled_map_shares_nothing(self):
+        game_map_template: GameMapTemplate = GameMapTemplate(
+            RawMapsContainer.get_map_3())
+
+        unpickled_map: GameMap = pickle_loads(
+            pickle_dumps(game_map_template.make_game_map()))
+        buff: AbstractBuff = unpickled_map.immovable_objects[0]
+
+        self.assertIs(buff, unpickled_map.get_writable_immovable_object(buff))
+
+    def test_set_takes_objects(self):
+        game_map: GameMap = RawMapsContainer.get_map_1()
+        other_map: GameMap = RawMapsContainer.get_map_2()
+        static_layer_version: int = game_map.static_layer_version
+
+        game_map.set(other_map)
+
+        self.assertIs(other_map.immovable_objects, game_map.immovable_objects)
+        self.assertIs(other_map.movable_objects, game_map.movable_objects)
+        self.assertLess(static_layer_version, game_map.static_layer_version)
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,217 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap
+from engine.engine import GameEngine, GameEngineException
+from engine.game_objects import *
+from engine.entity_store import EntityHandle
+from engine.world_snapshot import WorldSnapshot, WorldSnapshotException
+from engine.player_controls import (
+    LmbEvent,
+    LmbEventType,
+    Weapon,
+    PlayerControls,
+    pack_players_controls,
+    unpack_players_controls)
+
+_KEY_CODE_A: int = 65
+_KEY_CODE_D: int = 68
+_KEY_CODE_SPACE: int = 32
+_KEY_CODE_2: int = 50
+
+
+def get_two_players_engine() -> GameEngine:
+    return GameEngine(
+        GameMap(
+            Vector2D(1000, 300),
+            [BasicPlatform(1000, 20, Vector2D(0, 200))],
+            [Player(Vector2D(300, 100)), Player(Vector2D(600, 100))]),
+        input_random_seed=0)
+
+
+class PlayerControlsTests(TestCase):
+    def test_set_input(self):
+        player_controls: PlayerControls = PlayerControls()
+
+        player_controls.set_input(
+            [_KEY_CODE_D, _KEY_CODE_2],
+            LmbEvent(10, 20, LmbEventType.ButtonPress))
+        player_controls.set_input([_KEY_CODE_A], None)
+
+        self.assertEqual({_KEY_CODE_A}, player_controls.keys_pressed)
+        self.assertIs(Weapon.MachineGun, player_controls.selected_weapon)
+
+        # [None] keeps lmb event
+        self.assertEqual(
+            LmbEvent(10, 20, LmbEventType.ButtonPress),
+            player_controls.get_lmb_event())
+
+    def test_packing(self):
+        player_controls: PlayerControls = PlayerControls()
+        player_controls.set_input(
+            [_KEY_CODE_D, _KEY_CODE_SPACE],
+            LmbEvent(10.5, 20, LmbEventType.Motion))
+        player_controls.vertical_velocity = -25
+        player_controls.is_on_the_ground = True
+        player_controls.handgun_can_fire = False
+
+        packed_controls: bytes = pack_players_controls(
+            {EntityHandle(3, 7): player_controls,
+             EntityHandle(0, 0): PlayerControls()})
+
+        players_controls, offset = unpack_players_controls(
+            memoryview(b'\x00' + packed_controls), 1)
+
+        self.assertEqual(len(packed_controls) + 1, offset)
+        self.assertEqual(
+            [EntityHandle(3, 7), EntityHandle(0, 0)], list(players_controls))
+
+        unpacked_controls: PlayerControls = players_controls[
+            EntityHandle(3, 7)]
+
+        self.assertEqual(
+            {_KEY_CODE_D, _KEY_CODE_SPACE}, unpacked_controls.keys_pressed)
+        self.assertEqual(-25, unpacked_controls.vertical_velocity)
+        self.assertTrue(unpacked_controls.is_on_the_ground)
+        self.assertFalse(unpacked_controls.handgun_can_fire)
+        self.assertEqual(
+            LmbEvent(10.5, 20, LmbEventType.Motion),
+            unpacked_controls.get_lmb_event())
+        self.assertIsNone(
+            players_controls[EntityHandle(0, 0)].get_lmb_event())
+
+        with self.assertRaises(WorldSnapshotException):
+            unpack_players_controls(memoryview(packed_controls[:-1]), 0)
+
+
+class MultiplePlayersTests(TestCase):
+    def test_players_move_independently(self):
+        game_engine: GameEngine = get_two_players_engine()
+        first_handle, second_handle = game_engine.get_players_handles()
+
+        game_engine.get_player_controls(first_handle).set_input(
+            [_KEY_CODE_D], None)
+        game_engine.get_player_controls(second_handle).set_input(
+            [_KEY_CODE_A], None)
+
+        # Both land
+        for _ in range(20):
+            game_engine.update_map()
+
+        game_engine.get_player_controls(second_handle).set_input(
+            [_KEY_CODE_A, _KEY_CODE_SPACE], None)
+
+        game_engine.update_map()
+
+        first_player: Player = game_engine.get_game_map().movable_objects.get(
+            first_handle)
+        second_player: Player = game_engine.get_game_map().movable_objects.get(
+            second_handle)
+
+        self.assertEqual(300 + 21 * 6, first_player.location.x)
+        self.assertEqual(600 - 21 * 6, second_player.location.x)
+
+        # Only the second one jumps
+        self.assertEqual(200 - Player.SIDE_LENGTH - 1, first_player.location.y)
+        self.assertLess(second_player.location.y, first_player.location.y)
+        self.assertTrue(
+            game_engine.get_player_controls(first_handle).is_on_the_ground)
+        self.assertFalse(
+            game_engine.get_player_controls(second_handle).is_on_the_ground)
+
+    def test_every_player_fires(self):
+        game_engine: GameEngine = get_two_players_engine()
+
+        for player_handle in game_engine.get_players_handles():
+            game_engine.get_player_controls(player_handle).set_input(
+                [], LmbEvent(500, 0, LmbEventType.ButtonPress))
+
+        game_engine.update_map()
+
+        projectiles_xs: List[float] = sorted(
+            movable_object.location.x
+            for movable_object in game_engine.get_game_map().movable_objects
+            if isinstance(movable_object, HandgunProjectile))
+
+        self.assertEqual(2, len(projectiles_xs))
+        self.assertLess(projectiles_xs[0], 500)
+        self.assertGreater(projectiles_xs[1], 500)
+
+    def test_world_snapshot_keeps_players_controls(self):
+        game_engine: GameEngine = get_two_players_engine()
+        added_handle: EntityHandle = game_engine.add_player(
+            Vector2D(900, 100))
+
+        game_engine.get_player_controls(added_handle).set_input(
+            [_KEY_CODE_A], LmbEvent(0, 0, LmbEventType.ButtonPress))
+
+        for _ in range(5):
+            game_engine.update_map()
+
+        world_snapshot: WorldSnapshot = game_engine.capture_world_snapshot()
+
+        for _ in range(5):
+            game_engine.update_map()
+
+        game_engine.restore_world_snapshot(world_snapshot)
+
+        self.assertEqual(
+            world_snapshot.data, game_engine.capture_world_snapshot().data)
+        self.assertEqual(
+            {_KEY_CODE_A},
+            game_engine.get_player_controls(added_handle).keys_pressed)
+
+    def test_despawned_players_controls_are_dropped(self):
+        game_engine: GameEngine = get_two_players_engine()
+        other_player_handle: EntityHandle = (
+            game_engine.get_players_handles()[1])
+
+        for player_handle in game_engine.get_players_handles():
+            game_engine.get_game_map().movable_objects.get(
+                player_handle).should_be_despawned = True
+
+        game_engine.update_map()
+
+        self.assertEqual([], game_engine.get_players_handles())
+
+        with self.assertRaises(GameEngineException):
+            game_engine.get_player_controls(other_player_handle)
+
+        # Input for despawned main player is ignored
+        game_engine.key_pressed(_KEY_CODE_A)
+        game_engine.lmb_event_happened(
+            LmbEvent(0, 0, LmbEventType.ButtonPress))
+        game_engine.update_map()
+
+        self.assertEqual(
+            0, len(game_engine.get_game_map().movable_objects))
+
+    def test_players_handles(self):
+        game_engine: GameEngine = get_two_players_engine()
+
+        # Player that is added not by engine gets controls on update
+        player_handle: EntityHandle = (
+            game_engine.get_game_map().movable_objects.add(
+                Player(Vector2D(0, 0))))
+
+        with self.assertRaises(GameEngineException):
+            game_engine.get_player_controls(player_handle)
+
+        game_engine.update_map()
+
+        self.assertEqual(
+            player_handle, game_engine.get_players_handles()[-1])
+        self.assertIsInstance(
+            game_engine.get_player_controls(player_handle), PlayerControls)
+
+
+if __name__ == '__main__':
+    unittest_main()
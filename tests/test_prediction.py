@@ -0,0 +1,229 @@
+from unittest import TestCase, main as unittest_main
+from typing import FrozenSet
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap
+from engine.engine import GameEngine
+from engine.game_objects import *
+from engine.player_controls import PlayerControls
+from network.delta_encoding import POSITION_QUANTUM, PlayerMovement
+from network.prediction import InputPredictor, InputPredictorException
+
+_KEY_CODE_D: int = 68
+_KEY_CODE_SPACE: int = 32
+
+
+def get_platform_map() -> GameMap:
+    return GameMap(
+        Vector2D(1000, 300),
+        [BasicPlatform(1000, 20, Vector2D(0, 200)),
+         BasicPlatform(20, 100, Vector2D(500, 100))],
+        [Player(Vector2D(100, 100))])
+
+
+def get_inputs() -> List[FrozenSet[int]]:
+    """Player runs right, jumps and stops at wall"""
+    return (
+        [frozenset([_KEY_CODE_D])] * 10
+        + [frozenset([_KEY_CODE_D, _KEY_CODE_SPACE])] * 3
+        + [frozenset([_KEY_CODE_D])] * 60
+        + [frozenset()] * 10)
+
+
+# Player stands on platform of platform map
+_ON_THE_GROUND: PlayerMovement = PlayerMovement(2.5, True)
+
+
+def quantize(coordinate: float) -> float:
+    return round(coordinate / POSITION_QUANTUM) * POSITION_QUANTUM
+
+
+def update_server_engine(
+        server_engine: GameEngine,
+        keys_pressed: FrozenSet[int]) -> Tuple[float, float, PlayerMovement]:
+    """Gives server's state of player after update with given input"""
+    player_controls: PlayerControls = server_engine.get_player_controls(
+        server_engine.get_players_handles()[0])
+
+    player_controls.set_input(keys_pressed, None)
+    server_engine.update_map()
+
+    server_player: Player = server_engine.get_main_player()
+
+    return (
+        quantize(server_player.location.x),
+        quantize(server_player.location.y),
+        PlayerMovement(
+            player_controls.vertical_velocity,
+            player_controls.is_on_the_ground))
+
+
+class InputPredictorTests(TestCase):
+    def test_prediction_matches_server(self):
+        server_engine: GameEngine = GameEngine(get_platform_map())
+        input_predictor: InputPredictor = InputPredictor(get_platform_map())
+
+        # Server's states come 5 ticks late
+        latency_ticks: int = 5
+        server_states: List[Tuple[int, int, float, float, PlayerMovement]] = []
+
+        for keys_pressed in get_inputs():
+            input_sequence: int = input_predictor.apply_input(keys_pressed)
+
+            server_states.append(
+                (input_sequence, 0)
+                + update_server_engine(server_engine, keys_pressed))
+
+            if len(server_states) > latency_ticks:
+                self.assertFalse(
+                    input_predictor.reconcile(*server_states.pop(0)))
+
+        self.assertEqual(latency_ticks, input_predictor.pending_inputs_count)
+        self.assertEqual(
+            (server_engine.get_main_player().location.x,
+             server_engine.get_main_player().location.y),
+            input_predictor.predicted_location)
+        self.assertEqual(0, input_predictor.corrections_count)
+
+    def test_misprediction_is_corrected(self):
+        input_predictor: InputPredictor = InputPredictor(get_platform_map())
+
+        for _ in range(20):
+            input_predictor.apply_input([_KEY_CODE_D])
+
+        predicted_x, predicted_y = input_predictor.predicted_location
+
+        # Server's player of tick 15 is pushed left. Pending inputs are
+        # replayed from there
+        self.assertTrue(
+            input_predictor.reconcile(
+                15, 0, predicted_x - 5 * 6 - 30, predicted_y, _ON_THE_GROUND))
+
+        self.assertEqual(
+            (predicted_x - 30, predicted_y),
+            input_predictor.predicted_location)
+        self.assertEqual(1, input_predictor.corrections_count)
+        self.assertEqual(5, input_predictor.replayed_inputs_count)
+        self.assertEqual(5, input_predictor.pending_inputs_count)
+
+        # Old and unknown sequences are ignored
+        self.assertFalse(
+            input_predictor.reconcile(10, 0, 0, 0, _ON_THE_GROUND))
+        self.assertFalse(
+            input_predictor.reconcile(100, 0, 0, 0, _ON_THE_GROUND))
+
+        # Released key is restored by rollback too
+        input_predictor.apply_input([])
+
+        self.assertTrue(
+            input_predictor.reconcile(18, 0, 0, predicted_y, _ON_THE_GROUND))
+        self.assertEqual(
+            (2 * 6, predicted_y), input_predictor.predicted_location)
+
+    def test_window_limits_pending_inputs(self):
+        input_predictor: InputPredictor = InputPredictor(
+            get_platform_map(), 8)
+
+        for _ in range(20):
+            input_predictor.apply_input([_KEY_CODE_D])
+
+        self.assertEqual(8, input_predictor.pending_inputs_count)
+
+        _, predicted_y = input_predictor.predicted_location
+
+        # Forgotten input
+        self.assertFalse(
+            input_predictor.reconcile(12, 0, 0, 0, _ON_THE_GROUND))
+        self.assertTrue(
+            input_predictor.reconcile(13, 0, 0, predicted_y, _ON_THE_GROUND))
+        self.assertEqual(7, input_predictor.replayed_inputs_count)
+
+        with self.assertRaises(InputPredictorException):
+            InputPredictor(get_platform_map(), 0)
+
+    def test_movement_state_is_corrected(self):
+        input_predictor: InputPredictor = InputPredictor(get_platform_map())
+        server_engine: GameEngine = GameEngine(get_platform_map())
+        inputs: List[FrozenSet[int]] = get_inputs()[:20]
+
+        for keys_pressed in inputs:
+            input_predictor.apply_input(keys_pressed)
+
+        # Player jumps on input 11. Server's player of input 12 is in the
+        # air at the same place but already falls
+        for keys_pressed in inputs[:12]:
+            server_x, server_y, server_movement = update_server_engine(
+                server_engine, keys_pressed)
+
+        self.assertFalse(server_movement.is_on_the_ground)
+        self.assertLess(server_movement.vertical_velocity, 0)
+
+        server_movement = PlayerMovement(5.0, False)
+
+        server_player: Player = server_engine.get_main_player()
+        server_player.location.x = server_x
+        server_player.location.y = server_y
+
+        player_controls: PlayerControls = server_engine.get_player_controls(
+            server_engine.get_players_handles()[0])
+        player_controls.vertical_velocity = server_movement.vertical_velocity
+
+        for keys_pressed in inputs[12:]:
+            update_server_engine(server_engine, keys_pressed)
+
+        self.assertTrue(
+            input_predictor.reconcile(
+                12, 0, server_x, server_y, server_movement))
+        self.assertEqual(
+            (server_player.location.x, server_player.location.y),
+            input_predictor.predicted_location)
+
+    def test_server_repeats_are_inserted(self):
+        input_predictor: InputPredictor = InputPredictor(get_platform_map())
+        server_engine: GameEngine = GameEngine(get_platform_map())
+        inputs: List[FrozenSet[int]] = get_inputs()[:20]
+
+        for keys_pressed in inputs:
+            input_predictor.apply_input(keys_pressed)
+
+        # Input 11 is late: server repeats input 10 on two ticks
+        for keys_pressed in inputs[:10]:
+            update_server_engine(server_engine, keys_pressed)
+
+        for repeats_count in (1, 2):
+            self.assertFalse(
+                input_predictor.reconcile(
+                    10,
+                    repeats_count,
+                    *update_server_engine(server_engine, inputs[9])))
+
+        # Repeats are not inserted again
+        self.assertFalse(
+            input_predictor.reconcile(10, 1, 0, 0, _ON_THE_GROUND))
+
+        for input_sequence, keys_pressed in enumerate(inputs[10:], 11):
+            self.assertFalse(
+                input_predictor.reconcile(
+                    input_sequence,
+                    0,
+                    *update_server_engine(server_engine, keys_pressed)))
+
+        server_player: Player = server_engine.get_main_player()
+
+        self.assertEqual(
+            (server_player.location.x, server_player.location.y),
+            input_predictor.predicted_location)
+        self.assertEqual(0, input_predictor.corrections_count)
+        self.assertEqual(2, input_predictor.repeated_inputs_count)
+
+
+if __name__ == '__main__':
+    unittest_main()
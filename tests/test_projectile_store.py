@@ -0,0 +1,143 @@
+from unittest import TestCase, skipIf, main as unittest_main
+from typing import List
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from random import Random
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.projectile_store import (
+    ProjectileStore, ProjectileView, numpy)
+from engine.collisions_processor import CollisionsProcessor
+from engine.engine import GameEngine
+from engine.game_objects import (
+    Vector2D, Player, BasicPlatform, SpeedUpBuff, HandgunProjectile,
+    MachineGunProjectile, ProjectileObject)
+from maps import GameMap
+
+
+@skipIf(numpy is None, 'NumPy is not installed')
+class ProjectileStoreTests(TestCase):
+    def test_movement(self):
+        projectile_store: ProjectileStore = ProjectileStore(
+            Vector2D(100, 100), [])
+
+        projectile_store.add(
+            HandgunProjectile(Vector2D(3, 4), Vector2D(10, 10)))
+        projectile_store.update()
+
+        projectile_views: List[ProjectileView] = projectile_store.get_views()
+
+        self.assertEqual(1, len(projectile_views))
+        self.assertEqual(Vector2D(13, 14), projectile_views[0].location)
+        self.assertIs(HandgunProjectile, projectile_views[0].projectile_type)
+
+    def test_borders_despawning_keeps_order(self):
+        projectile_store: ProjectileStore = ProjectileStore(
+            Vector2D(100, 100), [])
+
+        projectile_store.add(
+            HandgunProjectile(Vector2D(0, 0), Vector2D(10, 10)))
+        projectile_store.add(
+            HandgunProjectile(Vector2D(0, 0), Vector2D(100, 10)))
+        projectile_store.add(
+            MachineGunProjectile(Vector2D(0, 0), Vector2D(20, 20)))
+        projectile_store.update()
+
+        self.assertEqual(2, len(projectile_store))
+        self.assertEqual(
+            [0, 2],
+            [projectile_view.view_id
+             for projectile_view in projectile_store.get_views()])
+
+    def test_fast_projectile_hits_thin_platform(self):
+        projectile_store: ProjectileStore = ProjectileStore(
+            Vector2D(100, 100),
+            [SpeedUpBuff(Vector2D(20, 0)),
+             BasicPlatform(2, 100, Vector2D(50, 0))])
+
+        projectile_store.add(
+            HandgunProjectile(Vector2D(20, 0), Vector2D(35, 10)))
+        projectile_store.add(
+            HandgunProjectile(Vector2D(-20, 0), Vector2D(35, 10)))
+        projectile_store.update()
+
+        self.assertEqual(
+            [1],
+            [projectile_view.view_id
+             for projectile_view in projectile_store.get_views()])
+
+    def test_capacity_growth(self):
+        projectile_store: ProjectileStore = ProjectileStore(
+            Vector2D(100, 100), [])
+
+        for _ in range(200):
+            projectile_store.add(
+                HandgunProjectile(Vector2D(0, 0), Vector2D(10, 10)))
+
+        self.assertEqual(200, len(projectile_store))
+
+    def test_same_hits_as_collisions_processor(self):
+        random_generator: Random = Random(0)
+
+        game_map: GameMap = GameMap(
+            Vector2D(500, 500),
+            [BasicPlatform(
+                random_generator.randint(1, 60),
+                random_generator.randint(1, 60),
+                Vector2D(
+                    random_generator.uniform(0, 500),
+                    random_generator.uniform(0, 500)))
+             for _ in range(40)],
+            [HandgunProjectile(
+                Vector2D(
+                    random_generator.uniform(-20, 20),
+                    random_generator.uniform(-20, 20)),
+                Vector2D(
+                    random_generator.uniform(-10, 500),
+                    random_generator.uniform(-10, 500)))
+             for _ in range(300)])
+
+        collisions_processor: CollisionsProcessor = CollisionsProcessor(
+            game_map)
+        projectile_store: ProjectileStore = ProjectileStore(
+            game_map.game_field_size, game_map.immovable_objects)
+
+        expected_alive_ids: List[int] = []
+
+        for i in range(len(game_map.movable_objects)):
+            projectile: ProjectileObject = game_map.movable_objects[i]
+
+            projectile_store.add(projectile)
+
+            if len(collisions_processor.get_collisions(
+                    projectile, projectile.moving_vector)) == 0:
+                expected_alive_ids.append(i)
+
+        projectile_store.update()
+
+        self.assertEqual(
+            expected_alive_ids,
+            [projectile_view.view_id
+             for projectile_view in projectile_store.get_views()])
+
+    def test_game_engine_moves_projectiles_into_store(self):
+        game_map: GameMap = GameMap(
+            Vector2D(100, 100),
+            [],
+            [Player(Vector2D(0, 0)),
+             HandgunProjectile(Vector2D(0, 0), Vector2D(10, 10))])
+
+        GameEngine(game_map, True)
+
+        self.assertEqual(1, len(game_map.movable_objects))
+        self.assertEqual(1, len(game_map.projectile_store))
+
+
+if __name__ == '__main__':
+    unittest_main()
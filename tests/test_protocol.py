@@ -0,0 +1,70 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.player_controls import LmbEvent, LmbEventType
+from network.protocol import (
+    INPUT_PACKET,
+    ClientInput,
+    ServerAccept,
+    ProtocolException,
+    get_packet_kind,
+    pack_input,
+    unpack_input,
+    pack_accept,
+    unpack_accept,
+    pack_acknowledgement,
+    unpack_acknowledgement)
+
+
+class ProtocolTests(TestCase):
+    def test_input_packet(self):
+        client_input: ClientInput = ClientInput(
+            7,
+            frozenset({65, 32}),
+            LmbEvent(10.5, 20, LmbEventType.ButtonPress))
+        packet: bytes = pack_input(client_input)
+
+        self.assertEqual(INPUT_PACKET, get_packet_kind(packet))
+        self.assertEqual(client_input, unpack_input(packet))
+        self.assertEqual(
+            ClientInput(1, frozenset(), None),
+            unpack_input(pack_input(ClientInput(1, frozenset(), None))))
+
+        with self.assertRaises(ProtocolException):
+            unpack_input(packet[:-1])
+
+        with self.assertRaises(ProtocolException):
+            pack_input(ClientInput(1, frozenset(range(100)), None))
+
+        for lmb_x in (float('nan'), float('inf')):
+            with self.assertRaises(ProtocolException):
+                unpack_input(pack_input(ClientInput(
+                    1,
+                    frozenset(),
+                    LmbEvent(lmb_x, 0, LmbEventType.ButtonPress))))
+
+    def test_accept_packet(self):
+        self.assertEqual(
+            ServerAccept(60, 70000),
+            unpack_accept(pack_accept(ServerAccept(60, 70000))))
+
+    def test_acknowledgement_packet(self):
+        self.assertEqual(
+            70000, unpack_acknowledgement(pack_acknowledgement(70000)))
+
+        with self.assertRaises(ProtocolException):
+            unpack_acknowledgement(b'\x06')
+
+        self.assertEqual(0, get_packet_kind(b''))
+
+
+if __name__ == '__main__':
+    unittest_main()
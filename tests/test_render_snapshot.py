@@ -0,0 +1,144 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+from threading import Thread
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from user_interface.render_snapshot import (
+    RenderSnapshot, SnapshotExchange, make_render_snapshot)
+from engine.engine import GameEngine
+from engine.game_objects import *
+from maps import GameMap
+
+
+def get_test_map() -> GameMap:
+    return GameMap(
+        Vector2D(1000, 1000),
+        [BasicPlatform(100, 10, Vector2D(0, 900)),
+         SpeedUpBuff(Vector2D(500, 500))],
+        [Player(Vector2D(10, 20)),
+         HandgunProjectile(Vector2D(10, 0), Vector2D(100, 100))])
+
+
+class RenderSnapshotTests(TestCase):
+    def test_drawn_objects(self):
+        render_snapshot: RenderSnapshot = make_render_snapshot(
+            get_test_map(), 1)
+
+        self.assertEqual((1000, 1000), render_snapshot.game_field_size)
+        self.assertEqual(
+            (BasicPlatform, 0, 0, 900, 100, 10),
+            render_snapshot.immovable_objects[0])
+        self.assertEqual(
+            (Player, 10, 20, Player.SIDE_LENGTH, Player.SIDE_LENGTH),
+            (render_snapshot.movable_objects[0].object_type,)
+            + render_snapshot.movable_objects[0][2:])
+        self.assertEqual(
+            HandgunProjectile.CIRCLE_DIAMETER,
+            render_snapshot.movable_objects[1].width)
+
+    def test_charging_buffs_are_not_drawn(self):
+        game_map: GameMap = get_test_map()
+
+        game_map.immovable_objects[1].capture_this_buff(
+            0, game_map.movable_objects[0])
+
+        self.assertEqual(
+            1, len(make_render_snapshot(game_map, 1).immovable_objects))
+
+    def test_snapshot_does_not_change_with_map(self):
+        game_map: GameMap = get_test_map()
+        game_engine: GameEngine = GameEngine(game_map)
+        render_snapshot: RenderSnapshot = make_render_snapshot(game_map, 1)
+
+        game_engine.update_map()
+
+        self.assertEqual(100, render_snapshot.movable_objects[1].x)
+        self.assertEqual(
+            110, make_render_snapshot(game_map, 2).movable_objects[1].x)
+
+    def test_ids_are_stable(self):
+        game_map: GameMap = get_test_map()
+        game_engine: GameEngine = GameEngine(game_map)
+        first_snapshot: RenderSnapshot = make_render_snapshot(game_map, 1)
+
+        for _ in range(3):
+            game_engine.update_map()
+
+        self.assertEqual(
+            [drawn_object.object_id
+             for drawn_object in first_snapshot.movable_objects],
+            [drawn_object.object_id
+             for drawn_object in make_render_snapshot(
+                 game_map, 2).movable_objects])
+
+    def test_static_layer_is_shared(self):
+        game_map: GameMap = get_test_map()
+        first_snapshot: RenderSnapshot = make_render_snapshot(game_map, 1)
+
+        self.assertIs(
+            first_snapshot.immovable_objects,
+            make_render_snapshot(
+                game_map, 2, first_snapshot).immovable_objects)
+
+        game_map.invalidate_static_layer()
+
+        self.assertIsNot(
+            first_snapshot.immovable_objects,
+            make_render_snapshot(
+                game_map, 3, first_snapshot).immovable_objects)
+
+    def test_buff_capture_invalidates_static_layer(self):
+        game_map: GameMap = GameMap(
+            Vector2D(1000, 1000),
+            [SpeedUpBuff(Vector2D(0, 0))],
+            [Player(Vector2D(0, 0))])
+        game_engine: GameEngine = GameEngine(game_map)
+
+        game_engine.update_map()
+
+        self.assertTrue(game_map.immovable_objects[0].is_charging())
+        self.assertEqual(1, game_map.static_layer_version)
+        self.assertEqual(
+            (), make_render_snapshot(game_map, 1).immovable_objects)
+
+
+class SnapshotExchangeTests(TestCase):
+    def test_only_latest_snapshot_is_taken_once(self):
+        game_map: GameMap = get_test_map()
+        snapshot_exchange: SnapshotExchange = SnapshotExchange()
+
+        self.assertIsNone(snapshot_exchange.take_latest())
+
+        snapshot_exchange.publish_map(game_map)
+        snapshot_exchange.publish_map(game_map)
+
+        self.assertEqual(2, snapshot_exchange.take_latest().version)
+        self.assertIsNone(snapshot_exchange.take_latest())
+
+    def test_publisher_does_not_wait_for_reader(self):
+        game_map: GameMap = get_test_map()
+        game_engine: GameEngine = GameEngine(game_map)
+        snapshot_exchange: SnapshotExchange = SnapshotExchange()
+
+        def game_loop():
+            for _ in range(100):
+                game_engine.update_map()
+                snapshot_exchange.publish_map(game_map)
+
+        game_thread: Thread = Thread(target=game_loop)
+        game_thread.start()
+        game_thread.join(5)
+
+        self.assertFalse(game_thread.is_alive())
+        self.assertEqual(100, snapshot_exchange.take_latest().version)
+
+
+if __name__ == '__main__':
+    unittest_main()
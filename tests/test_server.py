@@ -0,0 +1,400 @@
+from unittest import TestCase, main as unittest_main
+from asyncio import (
+    run as asyncio_run, sleep as asyncio_sleep, ensure_future, Future)
+from socket import socket, AF_INET, SOCK_DGRAM
+from contextlib import redirect_stderr
+from io import StringIO
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap
+from engine.engine import GameEngine
+from engine.game_objects import *
+from engine.player_controls import LmbEvent, LmbEventType
+from network.protocol import ServerAccept, ClientInput, pack_input
+from network.delta_encoding import (
+    ServerState, PlayerMovement, get_movable_entity_id)
+from network.server import GameServer, GameServerException
+from network.client import (
+    GameClient, GameClientException, get_player_location)
+from network.prediction import InputPredictor
+
+_KEY_CODE_D: int = 68
+
+
+def get_server() -> GameServer:
+    return GameServer(
+        GameEngine(
+            GameMap(
+                Vector2D(1000, 300),
+                [BasicPlatform(1000, 20, Vector2D(0, 200))],
+                [Player(Vector2D(100, 100))])),
+        200)
+
+
+def get_player_x(server_state: ServerState, player_entity_id: int) -> float:
+    return get_player_location(server_state, player_entity_id)[0]
+
+
+async def run_with_server(game_server: GameServer, client_coroutine):
+    """Runs server until client coroutine is done. Gives its result"""
+    server_future: Future = ensure_future(game_server.run())
+
+    try:
+        return await client_coroutine
+    finally:
+        server_future.cancel()
+
+
+class GameServerTests(TestCase):
+    def test_clients_control_own_players(self):
+        async def play():
+            game_server: GameServer = get_server()
+            server_address = await game_server.start()
+
+            # The first client gets player of game map
+            player_entity_id: int = get_movable_entity_id(
+                game_server._game_engine.get_players_handles()[0])
+
+            async def run_client():
+                game_client: GameClient = GameClient()
+                other_game_client: GameClient = GameClient()
+
+                self.assertEqual(
+                    ServerAccept(200, player_entity_id),
+                    await game_client.connect(server_address))
+
+                other_player_entity_id: int = (
+                    await other_game_client.connect(
+                        server_address)).player_entity_id
+
+                self.assertNotEqual(player_entity_id, other_player_entity_id)
+
+                first_state: ServerState = (
+                    await game_client.wait_for_state())
+
+                input_sequence: int = game_client.send_input([_KEY_CODE_D])
+
+                # State with applied input
+                while game_client.latest_state.input_sequence < (
+                        input_sequence):
+                    await game_client.wait_for_state(
+                        game_client.latest_state.tick + 1)
+
+                await game_client.wait_for_state(
+                    game_client.latest_state.tick + 10)
+
+                self.assertLess(
+                    get_player_x(first_state, player_entity_id),
+                    get_player_x(
+                        game_client.latest_state, player_entity_id))
+
+                # Other clients see the same world, their players stay
+                other_state: ServerState = (
+                    await other_game_client.wait_for_state(
+                        game_client.latest_state.tick))
+
+                self.assertLess(
+                    get_player_x(first_state, player_entity_id),
+                    get_player_x(other_state, player_entity_id))
+                self.assertEqual(
+                    get_player_x(first_state, other_player_entity_id),
+                    get_player_x(other_state, other_player_entity_id))
+
+                game_client.close()
+                other_game_client.close()
+
+                await asyncio_sleep(0.05)
+
+            await run_with_server(game_server, run_client())
+
+            self.assertEqual(0, game_server.clients_count)
+
+            # Players of gone clients stay for next ones
+            self.assertEqual(
+                2, len(game_server._game_engine.get_players_handles()))
+            self.assertEqual(
+                game_server.get_report()['ticks'],
+                game_server.get_report()['tick_ms']['count'])
+
+            game_server.close()
+
+        asyncio_run(play())
+
+    def test_far_objects_are_not_sent(self):
+        async def get_objects_types(
+                interest_view_size: Optional[Tuple[float, float]]):
+            game_server: GameServer = GameServer(
+                GameEngine(
+                    GameMap(
+                        Vector2D(5000, 300),
+                        [BasicPlatform(5000, 20, Vector2D(0, 200)),
+                         SpeedUpBuff(Vector2D(200, 170)),
+                         SpeedUpBuff(Vector2D(4500, 170))],
+                        [Player(Vector2D(100, 100))])),
+                200,
+                input_interest_view_size=interest_view_size)
+            server_address = await game_server.start()
+
+            async def run_client() -> ServerState:
+                game_client: GameClient = GameClient()
+
+                await game_client.connect(server_address)
+
+                server_state: ServerState = (
+                    await game_client.wait_for_state())
+
+                game_client.close()
+
+                return server_state
+
+            client_future: Future = ensure_future(run_client())
+
+            await run_with_server(game_server, client_future)
+
+            game_server.close()
+
+            return sorted(
+                object_state.object_type.__name__
+                for object_state
+                in client_future.result().get_objects_states())
+
+        self.assertEqual(
+            ['Player', 'SpeedUpBuff'],
+            asyncio_run(get_objects_types((1000, 700))))
+        self.assertEqual(
+            ['Player', 'SpeedUpBuff', 'SpeedUpBuff'],
+            asyncio_run(get_objects_types(None)))
+
+    def test_despawned_player_keeps_view(self):
+        async def play() -> ServerState:
+            game_server: GameServer = GameServer(
+                GameEngine(
+                    GameMap(
+                        Vector2D(5000, 300),
+                        [BasicPlatform(5000, 20, Vector2D(0, 200)),
+                         SpeedUpBuff(Vector2D(200, 170)),
+                         SpeedUpBuff(Vector2D(4500, 170))],
+                        [Player(Vector2D(100, 100))])),
+                200,
+                input_interest_view_size=(1000, 700))
+            server_address = await game_server.start()
+
+            async def run_client() -> ServerState:
+                game_client: GameClient = GameClient()
+
+                await game_client.connect(server_address)
+
+                server_state: ServerState = (
+                    await game_client.wait_for_state())
+
+                player: Player = game_server._game_engine.get_main_player()
+                player.should_be_despawned = True
+
+                server_state = await game_client.wait_for_state(
+                    server_state.tick + 5)
+
+                game_client.close()
+
+                return server_state
+
+            try:
+                return await run_with_server(game_server, run_client())
+            finally:
+                game_server.close()
+
+        self.assertEqual(
+            ['SpeedUpBuff'],
+            [object_state.object_type.__name__
+             for object_state in asyncio_run(play()).get_objects_states()])
+
+    def test_predicting_client(self):
+        async def play() -> Tuple[InputPredictor, ServerState, int]:
+            game_server: GameServer = get_server()
+            server_address = await game_server.start()
+
+            input_predictor: InputPredictor = InputPredictor(
+                game_server._game_engine.get_game_map())
+            game_client: GameClient = GameClient(input_predictor)
+
+            async def run_client() -> ServerState:
+                await game_client.connect(server_address)
+
+                start_x: float = input_predictor.predicted_location[0]
+                input_sequence: int = 0
+
+                # Player moves before any state comes
+                game_client.send_input([_KEY_CODE_D])
+
+                self.assertLess(start_x, input_predictor.predicted_location[0])
+
+                # Input is sent every tick
+                for tick in range(60):
+                    input_sequence = game_client.send_input(
+                        [_KEY_CODE_D] if tick < 40 else [])
+
+                    await asyncio_sleep(1 / 200)
+
+                while game_client.latest_state.input_sequence < (
+                        input_sequence):
+                    await game_client.wait_for_state(
+                        game_client.latest_state.tick + 1)
+
+                # Server repeats the last input when no newer one comes
+                return await game_client.wait_for_state(
+                    game_client.latest_state.tick + 3)
+
+            try:
+                return (
+                    input_predictor,
+                    await run_with_server(game_server, run_client()),
+                    game_client.server_accept.player_entity_id)
+            finally:
+                game_client.close()
+                game_server.close()
+
+        input_predictor, server_state, player_entity_id = asyncio_run(play())
+
+        # Prediction of the last input is checked by server's state
+        self.assertEqual(0, input_predictor.pending_inputs_count)
+        self.assertLessEqual(3, server_state.input_repeats_count)
+        self.assertLessEqual(
+            server_state.input_repeats_count,
+            input_predictor.repeated_inputs_count)
+        self.assertEqual(
+            PlayerMovement(2.5, True), server_state.player_movement)
+
+        for predicted_coordinate, server_coordinate in zip(
+                input_predictor.predicted_location,
+                get_player_location(server_state, player_entity_id)):
+            self.assertAlmostEqual(
+                server_coordinate, predicted_coordinate, delta=1 / 16)
+
+    def test_wrong_packets_are_counted(self):
+        async def send_wrong_packets():
+            game_server: GameServer = get_server()
+            server_address = await game_server.start()
+
+            with socket(AF_INET, SOCK_DGRAM) as client_socket:
+                # Input before connect, unknown packet kind and input with
+                # not finite lmb coordinates
+                client_socket.sendto(b'\x03', server_address)
+                client_socket.sendto(b'\x01', server_address)
+                client_socket.sendto(b'\x03', server_address)
+                client_socket.sendto(b'\xff', server_address)
+                client_socket.sendto(
+                    pack_input(ClientInput(
+                        1,
+                        frozenset(),
+                        LmbEvent(
+                            float('nan'), 0, LmbEventType.ButtonPress))),
+                    server_address)
+
+                await game_server.run(5)
+
+            self.assertEqual(5, game_server.get_report()['received_packets'])
+            self.assertEqual(4, game_server.get_report()['wrong_packets'])
+            self.assertEqual(1, game_server.clients_count)
+
+            game_server.close()
+
+        asyncio_run(send_wrong_packets())
+
+    def test_lmb_on_player_hand(self):
+        async def send_lmb_on_player_hand():
+            game_server: GameServer = get_server()
+            server_address = await game_server.start()
+
+            with socket(AF_INET, SOCK_DGRAM) as client_socket:
+                client_socket.sendto(b'\x01', server_address)
+
+                # Player lands and stays
+                await game_server.run(60)
+
+                player: Player = game_server._game_engine.get_main_player()
+
+                # Cursor right on player's hand gives no direction to fire
+                client_socket.sendto(
+                    pack_input(ClientInput(
+                        1,
+                        frozenset(),
+                        LmbEvent(
+                            player.location.x + Player.HAND_LOCATION.x,
+                            player.location.y + Player.HAND_LOCATION.y,
+                            LmbEventType.ButtonPress))),
+                    server_address)
+
+                await game_server.run(5)
+
+            self.assertEqual(65, game_server.get_report()['ticks'])
+            self.assertEqual(0, game_server.get_report()['failed_ticks'])
+
+            # Input is applied, not dropped
+            game_engine: GameEngine = game_server._game_engine
+            self.assertIs(
+                LmbEventType.ButtonPress,
+                game_engine.get_player_controls(
+                    game_engine.get_players_handles()[0]).get_lmb_event().type)
+
+            game_server.close()
+
+        asyncio_run(send_lmb_on_player_hand())
+
+    def test_failed_ticks_are_counted(self):
+        class FailingGameEngine(GameEngine):
+            def update_map(self):
+                if self.get_map_updates_count() == 1:
+                    self._map_updates_count += 1
+
+                    raise RuntimeError('Failed update')
+
+                super().update_map()
+
+        async def run_failing_server():
+            game_server: GameServer = GameServer(
+                FailingGameEngine(
+                    GameMap(Vector2D(100, 100), [], [])),
+                200)
+            await game_server.start()
+
+            with redirect_stderr(StringIO()):
+                self.assertEqual(3, await game_server.run(3))
+
+            self.assertEqual(2, game_server.get_report()['ticks'])
+            self.assertEqual(1, game_server.get_report()['failed_ticks'])
+
+            game_server.close()
+
+        asyncio_run(run_failing_server())
+
+    def test_not_started_server(self):
+        with self.assertRaises(GameServerException):
+            asyncio_run(get_server().run(1))
+
+    def test_no_server(self):
+        async def connect():
+            game_server: GameServer = get_server()
+            server_address = await game_server.start()
+
+            # Nobody listens on this address after closing
+            game_server.close()
+
+            game_client: GameClient = GameClient()
+            game_client.CONNECT_ATTEMPTS_COUNT = 2
+            game_client.CONNECT_ATTEMPT_TIMEOUT_SECONDS = 0.01
+
+            await game_client.connect(server_address)
+
+        with self.assertRaises(GameClientException):
+            asyncio_run(connect())
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,71 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.spatial_grid import (
+    SpatialGrid, SpatialGridException, get_immovable_object_bounds)
+from engine.game_objects import (
+    Vector2D, BasicPlatform, SpeedUpBuff, ImmovableObject)
+
+
+class SpatialGridTests(TestCase):
+    _platforms = [
+        BasicPlatform(10, 10, Vector2D(0, 0)),
+        BasicPlatform(200, 10, Vector2D(0, 100)),
+        BasicPlatform(10, 10, Vector2D(500, 500))]
+
+    def test_query_finds_only_near_objects(self):
+        spatial_grid: SpatialGrid = SpatialGrid(self._platforms)
+
+        self.assertEqual([0], spatial_grid.query_indexes(0, 0, 5, 5))
+        self.assertEqual(
+            [self._platforms[2]], spatial_grid.query(490, 490, 495, 495))
+        self.assertEqual([], spatial_grid.query_indexes(300, 300, 310, 310))
+
+    def test_query_keeps_source_order_without_duplicates(self):
+        spatial_grid: SpatialGrid = SpatialGrid(self._platforms, 16)
+
+        self.assertEqual([0, 1], spatial_grid.query_indexes(0, 0, 190, 105))
+
+    def test_touching_objects_are_found(self):
+        spatial_grid: SpatialGrid = SpatialGrid(self._platforms, 10)
+
+        # Right border of first platform is exactly 10
+        self.assertEqual([0], spatial_grid.query_indexes(10, 0, 15, 5))
+
+    def test_points_grid(self):
+        spatial_grid: SpatialGrid = SpatialGrid.from_points(
+            [(5, 5), (-5, 70), (100, 100), (10, 10)], 16)
+
+        self.assertEqual([0, 3], spatial_grid.query_indexes(0, 0, 12, 12))
+        self.assertEqual([1], spatial_grid.query_indexes(-5, 70, -5, 70))
+        self.assertEqual([0, 2, 3], spatial_grid.query_indexes(0, 0, 100, 100))
+
+        with self.assertRaises(SpatialGridException):
+            SpatialGrid.from_points([], 0)
+
+    def test_negative_sized_platform_bounds(self):
+        self.assertEqual(
+            (5, 0, 10, 10),
+            get_immovable_object_bounds(
+                BasicPlatform(-5, 10, Vector2D(10, 0))))
+
+    def test_buff_bounds(self):
+        self.assertEqual(
+            (0, 0, 25, 25),
+            get_immovable_object_bounds(SpeedUpBuff(Vector2D(0, 0))))
+
+    def test_unknown_object_exception(self):
+        with self.assertRaises(SpatialGridException):
+            SpatialGrid([ImmovableObject(Vector2D(0, 0))])
+
+
+if __name__ == '__main__':
+    unittest_main()
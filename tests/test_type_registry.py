@@ -0,0 +1,103 @@
+from unittest import TestCase, main as unittest_main
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from engine.type_registry import TypeRegistry
+from engine.engine import GameEngine
+from engine.collisions_processor import CollisionsProcessor
+from engine.spatial_grid import IMMOVABLE_OBJECTS_BOUNDS
+from engine.game_objects import *
+
+
+class TypeRegistryTests(TestCase):
+    def test_closest_registered_class_wins(self):
+        type_registry: TypeRegistry = TypeRegistry('test')
+
+        type_registry.add(GameObject, 'game object')
+        type_registry.add(AbstractBuff, 'buff')
+
+        self.assertEqual('buff', type_registry.get(SpeedUpBuff))
+        self.assertEqual('game object', type_registry.get(Player))
+        self.assertIsNone(type_registry.get(Vector2D))
+
+    def test_registration_after_lookup(self):
+        type_registry: TypeRegistry = TypeRegistry('test')
+
+        type_registry.add(AbstractBuff, 'buff')
+
+        self.assertEqual('buff', type_registry.get(SpeedUpBuff))
+
+        # Cached resolution of subclass must not hide new handler
+        type_registry.add(SpeedUpBuff, 'speed up buff')
+
+        self.assertEqual('speed up buff', type_registry.get(SpeedUpBuff))
+        self.assertEqual('buff', type_registry.get(JumpHeightUpBuff))
+
+    def test_decorator_returns_handler(self):
+        type_registry: TypeRegistry = TypeRegistry('test')
+
+        @type_registry.register(Player)
+        def handler():
+            pass
+
+        self.assertIs(handler, type_registry.get(Player))
+
+
+class StateUpdaterRegistriesTests(TestCase):
+    def test_all_game_objects_are_handled(self):
+        state_updater_class = GameEngine._StateUpdater
+
+        for movable_object_class in (
+                Player, HandgunProjectile, MachineGunProjectile):
+            self.assertIsNotNone(
+                state_updater_class.MOVABLE_OBJECTS_UPDATERS.get(
+                    movable_object_class))
+
+        for collided_object_class in (
+                type(None), SpeedUpBuff, JumpHeightUpBuff, BasicPlatform):
+            self.assertIsNotNone(
+                state_updater_class.PLAYER_COLLISIONS_PROCESSORS.get(
+                    collided_object_class))
+
+        for collided_object_class in (type(None), BasicPlatform):
+            self.assertIsNotNone(
+                state_updater_class.PROJECTILE_COLLISIONS_PROCESSORS.get(
+                    collided_object_class))
+
+        # Projectiles fly through buffs, so buffs never collide with them
+        self.assertIsNone(
+            state_updater_class.PROJECTILE_COLLISIONS_PROCESSORS.get(
+                SpeedUpBuff))
+
+        for buff_class in (SpeedUpBuff, JumpHeightUpBuff):
+            self.assertIsNotNone(
+                state_updater_class.BUFFS_EFFECTS.get(buff_class))
+
+        # Platforms are static
+        self.assertIsNone(
+            state_updater_class.IMMOVABLE_OBJECTS_UPDATERS.get(BasicPlatform))
+
+
+class CollisionsRegistriesTests(TestCase):
+    def test_all_immovable_objects_are_handled(self):
+        for immovable_object_class in (
+                BasicPlatform, SpeedUpBuff, JumpHeightUpBuff):
+            self.assertIsNotNone(
+                IMMOVABLE_OBJECTS_BOUNDS.get(immovable_object_class))
+
+        # Projectiles fly through buffs
+        self.assertIsNotNone(
+            CollisionsProcessor.PROJECTILE_IMPACTS_CHECKS.get(BasicPlatform))
+        self.assertIsNone(
+            CollisionsProcessor.PROJECTILE_IMPACTS_CHECKS.get(SpeedUpBuff))
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,201 @@
+from unittest import TestCase, main as unittest_main, skipIf
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from os import pardir as os_pardir
+from sys import path as sys_path
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)), os_pardir))
+
+from maps import GameMap, GameMapTemplate
+from engine.engine import GameEngine, GameEngineException
+from engine.player_controls import LmbEvent, LmbEventType
+from engine.projectile_store import numpy
+from engine.world_snapshot import (
+    WorldSnapshot, WorldSnapshotsRing, WorldSnapshotException)
+from engine.game_objects import *
+
+_KEY_CODE_2: int = 50
+_KEY_CODE_D: int = 68
+
+
+def get_buff_map() -> GameMap:
+    """Player falls on floor and runs to the right through buff"""
+    return GameMap(
+        Vector2D(1000, 300),
+        [BasicPlatform(1000, 20, Vector2D(0, 200)),
+         SpeedUpBuff(Vector2D(200, 170), recharge_time=20)],
+        [Player(Vector2D(100, 100))],
+        False)
+
+
+def play(game_engine: GameEngine, ticks_count: int):
+    """Runs right and shoots from machine gun"""
+    game_engine.key_pressed(_KEY_CODE_D)
+
+    for listener in game_engine.get_event_listeners():
+        listener.key_pressed(_KEY_CODE_2)
+        listener.lmb_event_happened(
+            LmbEvent(900, 100, LmbEventType.ButtonPress))
+
+    for _ in range(ticks_count):
+        game_engine.update_map()
+
+
+class WorldSnapshotTests(TestCase):
+    def _check_rollback_replays_game(self, game_engine: GameEngine):
+        play(game_engine, 10)
+
+        snapshot: WorldSnapshot = game_engine.capture_world_snapshot()
+
+        play(game_engine, 30)
+
+        final_snapshot: WorldSnapshot = game_engine.capture_world_snapshot()
+
+        game_engine.restore_world_snapshot(snapshot)
+
+        self.assertEqual(10, game_engine.get_map_updates_count())
+        self.assertEqual(snapshot, game_engine.capture_world_snapshot())
+
+        # Same inputs after restoring give the same game
+        play(game_engine, 30)
+
+        self.assertEqual(final_snapshot, game_engine.capture_world_snapshot())
+
+    def test_rollback_replays_game(self):
+        game_engine: GameEngine = GameEngine(
+            get_buff_map(), input_random_seed=1)
+
+        self._check_rollback_replays_game(game_engine)
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_rollback_replays_game_with_projectile_store(self):
+        game_engine: GameEngine = GameEngine(
+            get_buff_map(), True, input_random_seed=1)
+
+        self._check_rollback_replays_game(game_engine)
+
+        self.assertGreater(len(game_engine._game_map.projectile_store), 0)
+
+    def test_buffs_state_is_restored(self):
+        game_map_template: GameMapTemplate = GameMapTemplate(get_buff_map())
+        game_map: GameMap = game_map_template.make_game_map()
+        game_engine: GameEngine = GameEngine(game_map)
+
+        snapshot: WorldSnapshot = game_engine.capture_world_snapshot()
+
+        # Player runs through buff
+        play(game_engine, 25)
+
+        buff: AbstractBuff = game_map.immovable_objects[1]
+
+        self.assertTrue(buff.is_charging())
+
+        charging_snapshot: WorldSnapshot = (
+            game_engine.capture_world_snapshot())
+        static_layer_version: int = game_map.static_layer_version
+
+        game_engine.restore_world_snapshot(snapshot)
+
+        self.assertFalse(game_map.immovable_objects[1].is_charging())
+        self.assertEqual([], game_engine.get_main_player().current_buffs)
+        self.assertLess(static_layer_version, game_map.static_layer_version)
+
+        game_engine.restore_world_snapshot(charging_snapshot)
+
+        self.assertEqual(
+            [game_map.immovable_objects[1]],
+            game_engine.get_main_player().current_buffs)
+        self.assertIs(
+            game_engine.get_main_player(),
+            game_map.immovable_objects[1].get_charging_state()[2])
+
+        # Template's buff is never changed
+        self.assertFalse(
+            game_map_template.immovable_objects[1].is_charging())
+
+    def test_wrong_snapshots(self):
+        game_engine: GameEngine = GameEngine(get_buff_map())
+        snapshot: WorldSnapshot = game_engine.capture_world_snapshot()
+
+        with self.assertRaises(WorldSnapshotException):
+            game_engine.restore_world_snapshot(
+                WorldSnapshot(0, snapshot.data[:-1]))
+
+        with self.assertRaises(WorldSnapshotException):
+            game_engine.restore_world_snapshot(WorldSnapshot(0, b'SQ'))
+
+        # Snapshot of other game map
+        with self.assertRaises(WorldSnapshotException):
+            GameEngine(
+                GameMap(Vector2D(100, 100), [], [])).restore_world_snapshot(
+                snapshot)
+
+    def test_engine_rollback(self):
+        game_engine: GameEngine = GameEngine(
+            get_buff_map(), input_random_seed=1)
+
+        with self.assertRaises(GameEngineException):
+            game_engine.rollback(0)
+
+        snapshots_ring: WorldSnapshotsRing = (
+            game_engine.enable_world_snapshots(8))
+
+        play(game_engine, 10)
+
+        self.assertEqual(8, len(snapshots_ring))
+        self.assertEqual(10, snapshots_ring.get_latest().tick)
+
+        main_player_location: Vector2D = (
+            game_engine.get_main_player().location)
+
+        game_engine.rollback(5)
+
+        self.assertEqual(5, game_engine.get_map_updates_count())
+        self.assertEqual(5, snapshots_ring.get_latest().tick)
+
+        play(game_engine, 5)
+
+        self.assertEqual(
+            main_player_location, game_engine.get_main_player().location)
+
+        # Snapshot is too old
+        with self.assertRaises(GameEngineException):
+            game_engine.rollback(1)
+
+
+class WorldSnapshotsRingTests(TestCase):
+    def test_oldest_snapshots_are_dropped(self):
+        snapshots_ring: WorldSnapshotsRing = WorldSnapshotsRing(3)
+
+        self.assertIsNone(snapshots_ring.get_latest())
+
+        for tick in range(5):
+            snapshots_ring.add(WorldSnapshot(tick, bytes(tick)))
+
+        self.assertEqual(3, len(snapshots_ring))
+        self.assertIsNone(snapshots_ring.get(1))
+        self.assertEqual(WorldSnapshot(2, bytes(2)), snapshots_ring.get(2))
+        self.assertEqual(4, snapshots_ring.get_latest().tick)
+
+    def test_older_snapshot_discards_newer_ones(self):
+        snapshots_ring: WorldSnapshotsRing = WorldSnapshotsRing(10)
+
+        for tick in range(5):
+            snapshots_ring.add(WorldSnapshot(tick, b''))
+
+        snapshots_ring.add(WorldSnapshot(2, b'other game'))
+
+        self.assertEqual(3, len(snapshots_ring))
+        self.assertEqual(b'other game', snapshots_ring.get(2).data)
+        self.assertIsNone(snapshots_ring.get(3))
+
+    def test_non_positive_capacity(self):
+        with self.assertRaises(WorldSnapshotException):
+            WorldSnapshotsRing(0)
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,70 @@
+from typing import Tuple
+
+from engine import ApplicationException
+
+
+class Camera:
+    """Viewport over game field that follows some target
+
+    Viewport is never bigger than game field and never goes out of it. All
+    coordinates are game field's ones
+    """
+    _viewport_width: float
+    _viewport_height: float
+
+    _game_field_width: float
+    _game_field_height: float
+
+    # Left top corner of viewport
+    _left: float
+    _top: float
+
+    def __init__(
+            self,
+            input_viewport_size: Tuple[float, float],
+            input_game_field_size: Tuple[float, float]):
+        if input_viewport_size[0] <= 0 or input_viewport_size[1] <= 0:
+            raise CameraException(
+                'Got non-positive viewport size in process of camera init: '
+                + str(input_viewport_size))
+
+        self._game_field_width, self._game_field_height = (
+            input_game_field_size)
+
+        self._viewport_width = min(
+            input_viewport_size[0], self._game_field_width)
+        self._viewport_height = min(
+            input_viewport_size[1], self._game_field_height)
+
+        self._left = 0
+        self._top = 0
+
+    def follow(self, target_x: float, target_y: float):
+        """Centers viewport on target as much as game field allows"""
+        self._left = min(
+            max(0, target_x - self._viewport_width / 2),
+            self._game_field_width - self._viewport_width)
+        self._top = min(
+            max(0, target_y - self._viewport_height / 2),
+            self._game_field_height - self._viewport_height)
+
+    def get_visible_bounds(
+            self, margin: float = 0) -> Tuple[float, float, float, float]:
+        """Gives (left, top, right, bottom) of viewport expanded by margin"""
+        return (
+            self._left - margin,
+            self._top - margin,
+            self._left + self._viewport_width + margin,
+            self._top + self._viewport_height + margin)
+
+    @property
+    def viewport_size(self) -> Tuple[float, float]:
+        return self._viewport_width, self._viewport_height
+
+    @property
+    def location(self) -> Tuple[float, float]:
+        return self._left, self._top
+
+
+class CameraException(ApplicationException):
+    pass
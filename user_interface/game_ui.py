@@ -3,138 +3,325 @@ from tkinter import (
     Tk as tk_Tk,
     mainloop as tk_mainloop,
     NSEW as TK_NSEW)
-from threading import Event
+from math import floor
+from typing import Callable, Hashable
 
-from maps import GameMap
+from maps import GameMap, DEFAULT_RESOLUTION
 from engine.game_objects import *
 from engine import ApplicationException
+from engine.type_registry import TypeRegistry
+from engine.spatial_grid import SpatialGrid
 from user_interface import EventListener
+from user_interface.camera import Camera
+from user_interface.render_snapshot import (
+    DrawnObject,
+    RenderSnapshot,
+    SnapshotExchange,
+    make_render_snapshot,
+    get_drawn_object_bounds)
 
 
 class GameGUI(Canvas):
     class GameObjectsDrawer:
-        """Accumulates all painting methods"""
+        """Accumulates all painting methods
+
+        Draws render snapshots, not game map itself, so drawing is safe
+        while game map is updated in another thread.
+
+        Canvas items are retained between frames: every drawn object keeps
+        its item, which is moved only if object is moved. Items are created
+        and deleted only when objects appear and disappear.
+
+        With camera only objects around its viewport are drawn and canvas is
+        scrolled to the viewport. Visible immovable objects are taken from
+        spatial grid, so drawing cost depends on viewport size, not on game
+        map size
+        """
+        # Game object's class -> method(self, drawn_object) that creates
+        # canvas item and gives its id
+        DRAWERS: TypeRegistry = TypeRegistry('game objects drawers')
+
         _rendering_map: GameMap
-        # Improvement: Create second canvas for double buffering
         _game_canvas: Canvas
 
-        def __init__(self, input_gui: Canvas, input_map: GameMap):
+        # Object id -> (canvas item id, object as it is drawn now). Layers
+        # are separate so immovable objects are always under movable ones
+        _immovable_items: Dict[Hashable, Tuple[int, DrawnObject]]
+        _movable_items: Dict[Hashable, Tuple[int, DrawnObject]]
+
+        # Immovable objects are not even compared while snapshots give the
+        # same static layer
+        _drawn_static_layer: Optional[Tuple[DrawnObject, ...]]
+
+        # For reusing static layer in [draw_all_game_objects]
+        _last_made_snapshot: Optional[RenderSnapshot]
+
+        # Objects are culled by its viewport. [None] means no culling
+        _camera: Optional[Camera]
+
+        # Objects around viewport are drawn too, so they do not pop up on
+        # its borders
+        CULLING_MARGIN: int = 64
+        STATIC_LAYER_CELL_SIZE: int = 256
+
+        # Grid over [_drawn_static_layer]. Only with camera
+        _static_layer_grid: Optional[SpatialGrid]
+
+        # Grid cells range (left, top, right, bottom) of drawn part of
+        # static layer. Static layer is redrawn only when it changes
+        _drawn_static_cells: Optional[Tuple[int, int, int, int]]
+
+        _scrolled_location: Optional[Tuple[float, float]]
+        _scroll_region_size: Optional[Tuple[float, float]]
+
+        def __init__(
+                self,
+                input_gui: Canvas,
+                input_map: GameMap,
+                input_camera: Optional[Camera] = None):
             self._game_canvas = input_gui
             self._rendering_map = input_map
+            self._camera = input_camera
+
+            self._immovable_items = dict()
+            self._movable_items = dict()
+
+            self._drawn_static_layer = None
+            self._last_made_snapshot = None
+
+            self._static_layer_grid = None
+            self._drawn_static_cells = None
+
+            self._scrolled_location = None
+            self._scroll_region_size = None
 
         def draw_all_game_objects(self):
+            """Draws current state of game map right away
+
+            Must be called from the thread that updates game map
+            """
+            self._last_made_snapshot = make_render_snapshot(
+                self._rendering_map, 0, self._last_made_snapshot)
+
+            self.draw_snapshot(self._last_made_snapshot)
+
+        def draw_snapshot(self, render_snapshot: RenderSnapshot):
             """Accumulates all painting"""
-            self._game_canvas.delete('all')
             # Improvement: Paint interface objects
 
-            self._draw_immovable_objects()
-
-            self._draw_movable_objects()
-
-        def _draw_immovable_objects(self):
-            for immovable_object in self._rendering_map.immovable_objects:
-                if isinstance(immovable_object, SpeedUpBuff):
-                    self._draw_speed_up_buff(immovable_object)
-
-                elif isinstance(immovable_object, JumpHeightUpBuff):
-                    self._draw_jump_height_up_buff(immovable_object)
-
-                elif isinstance(immovable_object, BasicPlatform):
-                    self._draw_basic_platform(immovable_object)
-
-                else:
-                    GameUIException(
-                        "While processing [_paint_immovable_objects] method, "
-                        "got [immovable_object] with unknown type: "
-                        + immovable_object.__class__.__name__)
-
-        def _draw_speed_up_buff(self, speed_buff: SpeedUpBuff):
-            if not speed_buff.is_charging():
-                self._game_canvas.create_rectangle(
-                    speed_buff.location.x,
-                    speed_buff.location.y,
-                    speed_buff.location.x + AbstractBuff.SIDE_LENGTH,
-                    speed_buff.location.y + AbstractBuff.SIDE_LENGTH,
-                    fill='green',
-                    outline='green')
-
-        def _draw_jump_height_up_buff(self, jump_buff: JumpHeightUpBuff):
-            if not jump_buff.is_charging():
-                self._game_canvas.create_rectangle(
-                    jump_buff.location.x,
-                    jump_buff.location.y,
-                    jump_buff.location.x + AbstractBuff.SIDE_LENGTH,
-                    jump_buff.location.y + AbstractBuff.SIDE_LENGTH,
-                    fill='yellow',
-                    outline='yellow')
-
-        def _draw_basic_platform(self, basic_platform: BasicPlatform):
-            self._game_canvas.create_rectangle(
-                basic_platform.location.x,
-                basic_platform.location.y,
-                basic_platform.location.x
-                + basic_platform.width,
-                basic_platform.location.y
-                + basic_platform.height,
-                fill='brown',
-                outline='brown')
-
-        def _draw_movable_objects(self):
-            for movable_object in self._rendering_map.movable_objects:
-                if isinstance(movable_object, Player):
-                    self._draw_player(movable_object)
-
-                elif isinstance(movable_object, HandgunProjectile):
-                    self._draw_handgun_projectile(movable_object)
-
-                elif isinstance(movable_object, MachineGunProjectile):
-                    self._draw_machine_gun_projectile(movable_object)
-
-                else:
-                    GameUIException(
-                        "While processing [_paint_movable_objects] method, "
-                        "got [movable_object] with unknown type: "
-                        + movable_object.__class__.__name__)
-
-        def _draw_player(self, player: Player):
-            self._game_canvas.create_rectangle(
-                player.location.x,
-                player.location.y,
-                player.location.x
-                + Player.SIDE_LENGTH,
-                player.location.y
-                + Player.SIDE_LENGTH,
-                fill='blue',
-                outline='blue')
-
-        def _draw_handgun_projectile(self, projectile: HandgunProjectile):
-            self._game_canvas.create_oval(
-                projectile.location.x,
-                projectile.location.y,
-                projectile.location.x
-                + HandgunProjectile.CIRCLE_DIAMETER,
-                projectile.location.y
-                + HandgunProjectile.CIRCLE_DIAMETER,
-                fill='white',
-                outline='white')
-
-        def _draw_machine_gun_projectile(
-                self, projectile: MachineGunProjectile):
-            self._game_canvas.create_oval(
-                projectile.location.x,
-                projectile.location.y,
-                projectile.location.x
-                + MachineGunProjectile.CIRCLE_DIAMETER,
-                projectile.location.y
-                + MachineGunProjectile.CIRCLE_DIAMETER,
-                fill='white',
-                outline='white')
+            if self._camera is None:
+                self._draw_whole_snapshot(render_snapshot)
+            else:
+                self._draw_visible_part_of_snapshot(render_snapshot)
+
+        def _draw_whole_snapshot(self, render_snapshot: RenderSnapshot):
+            if render_snapshot.immovable_objects is not (
+                    self._drawn_static_layer):
+                self._immovable_items = self._update_layer(
+                    render_snapshot.immovable_objects,
+                    self._immovable_items,
+                    True)
+
+                self._drawn_static_layer = render_snapshot.immovable_objects
+
+            self._movable_items = self._update_layer(
+                render_snapshot.movable_objects, self._movable_items, False)
+
+        def _draw_visible_part_of_snapshot(
+                self, render_snapshot: RenderSnapshot):
+            if render_snapshot.camera_target is not None:
+                self._camera.follow(*render_snapshot.camera_target)
+
+            self._scroll_to_camera(render_snapshot.game_field_size)
+
+            left, top, right, bottom = self._camera.get_visible_bounds(
+                self.CULLING_MARGIN)
+
+            if render_snapshot.immovable_objects is not (
+                    self._drawn_static_layer):
+                self._static_layer_grid = SpatialGrid(
+                    list(render_snapshot.immovable_objects),
+                    self.STATIC_LAYER_CELL_SIZE,
+                    get_drawn_object_bounds)
+
+                self._drawn_static_layer = render_snapshot.immovable_objects
+                self._drawn_static_cells = None
+
+            # Grid gives the same objects for the same cells, so static layer
+            # is not even compared while viewport stays in the same cells
+            visible_cells: Tuple[int, int, int, int] = (
+                floor(left / self.STATIC_LAYER_CELL_SIZE),
+                floor(top / self.STATIC_LAYER_CELL_SIZE),
+                floor(right / self.STATIC_LAYER_CELL_SIZE),
+                floor(bottom / self.STATIC_LAYER_CELL_SIZE))
+
+            if visible_cells != self._drawn_static_cells:
+                self._immovable_items = self._update_layer(
+                    tuple(self._static_layer_grid.query(
+                        left, top, right, bottom)),
+                    self._immovable_items,
+                    True)
+
+                self._drawn_static_cells = visible_cells
+
+            visible_movable_objects: List[DrawnObject] = []
+
+            for drawn_object in render_snapshot.movable_objects:
+                object_left, object_top, object_right, object_bottom = (
+                    get_drawn_object_bounds(drawn_object))
+
+                if (object_right >= left and object_left <= right
+                        and object_bottom >= top and object_top <= bottom):
+                    visible_movable_objects.append(drawn_object)
+
+            self._movable_items = self._update_layer(
+                tuple(visible_movable_objects), self._movable_items, False)
+
+        def _scroll_to_camera(self, game_field_size: Tuple[float, float]):
+            """Canvas items stay in game field coordinates, canvas view is
+            moved instead
+            """
+            if game_field_size != self._scroll_region_size:
+                self._game_canvas.configure(
+                    scrollregion=(0, 0, *game_field_size))
+
+                self._scroll_region_size = game_field_size
+                self._scrolled_location = None
+
+            if self._camera.location != self._scrolled_location:
+                self._game_canvas.xview_moveto(
+                    self._camera.location[0] / game_field_size[0])
+                self._game_canvas.yview_moveto(
+                    self._camera.location[1] / game_field_size[1])
+
+                self._scrolled_location = self._camera.location
+
+        def _update_layer(
+                self,
+                drawn_objects: Tuple[DrawnObject, ...],
+                previous_items: Dict[Hashable, Tuple[int, DrawnObject]],
+                is_bottom_layer: bool) -> Dict[
+                    Hashable, Tuple[int, DrawnObject]]:
+            """Brings canvas items of layer to given objects. Gives new items
+
+            [previous_items] are consumed: items of objects that are gone
+            are deleted from canvas
+            """
+            current_items: Dict[Hashable, Tuple[int, DrawnObject]] = dict()
+
+            for drawn_object in drawn_objects:
+                previous_item: Optional[Tuple[int, DrawnObject]] = (
+                    previous_items.pop(drawn_object.object_id, None))
+
+                if previous_item is not None:
+                    item_id, previous_drawn_object = previous_item
+
+                    if previous_drawn_object == drawn_object:
+                        current_items[drawn_object.object_id] = previous_item
+
+                        continue
+
+                    if (previous_drawn_object.object_type
+                            is drawn_object.object_type):
+                        self._game_canvas.coords(
+                            item_id,
+                            drawn_object.x,
+                            drawn_object.y,
+                            drawn_object.x + drawn_object.width,
+                            drawn_object.y + drawn_object.height)
+
+                        current_items[drawn_object.object_id] = (
+                            item_id, drawn_object)
+
+                        continue
+
+                    # Other object took the same id (e.g. in map editor)
+                    self._game_canvas.delete(item_id)
+
+                created_item_id: Optional[int] = self._create_item(
+                    drawn_object)
+
+                if created_item_id is not None:
+                    if is_bottom_layer:
+                        self._game_canvas.tag_lower(created_item_id)
+
+                    current_items[drawn_object.object_id] = (
+                        created_item_id, drawn_object)
+
+            for item_id, _ in previous_items.values():
+                self._game_canvas.delete(item_id)
+
+            return current_items
+
+        def _create_item(self, drawn_object: DrawnObject) -> Optional[int]:
+            drawer: Optional[Callable] = self.DRAWERS.get(
+                drawn_object.object_type)
+
+            if drawer is not None:
+                return drawer(self, drawn_object)
+
+            else:
+                GameUIException(
+                    "While processing [_create_item] method, "
+                    "got [drawn_object] with unknown type: "
+                    + drawn_object.object_type.__name__)
+
+                return None
+
+        def _draw_rectangle(
+                self, drawn_object: DrawnObject, color: str) -> int:
+            return self._game_canvas.create_rectangle(
+                drawn_object.x,
+                drawn_object.y,
+                drawn_object.x + drawn_object.width,
+                drawn_object.y + drawn_object.height,
+                fill=color,
+                outline=color)
+
+        def _draw_oval(self, drawn_object: DrawnObject, color: str) -> int:
+            return self._game_canvas.create_oval(
+                drawn_object.x,
+                drawn_object.y,
+                drawn_object.x + drawn_object.width,
+                drawn_object.y + drawn_object.height,
+                fill=color,
+                outline=color)
+
+        @DRAWERS.register(SpeedUpBuff)
+        def _draw_speed_up_buff(self, speed_buff: DrawnObject) -> int:
+            return self._draw_rectangle(speed_buff, 'green')
+
+        @DRAWERS.register(JumpHeightUpBuff)
+        def _draw_jump_height_up_buff(self, jump_buff: DrawnObject) -> int:
+            return self._draw_rectangle(jump_buff, 'yellow')
+
+        @DRAWERS.register(BasicPlatform)
+        def _draw_basic_platform(self, basic_platform: DrawnObject) -> int:
+            return self._draw_rectangle(basic_platform, 'brown')
+
+        @DRAWERS.register(Player)
+        def _draw_player(self, player: DrawnObject) -> int:
+            return self._draw_rectangle(player, 'blue')
+
+        @DRAWERS.register(HandgunProjectile)
+        def _draw_handgun_projectile(self, projectile: DrawnObject) -> int:
+            return self._draw_oval(projectile, 'white')
+
+        @DRAWERS.register(MachineGunProjectile)
+        def _draw_machine_gun_projectile(self, projectile: DrawnObject) -> int:
+            return self._draw_oval(projectile, 'white')
 
     _widgets_root: tk_Tk
 
     _game_objects_painter: GameObjectsDrawer
 
-    _render_is_done: Event
+    _rendering_map: GameMap
+
+    # Game thread publishes snapshots here, GUI thread draws the latest one
+    _snapshot_exchange: SnapshotExchange
+
+    # Camera follows this player. [None] keeps camera in place
+    _get_followed_player: Optional[Callable[[], Player]]
 
     def __init__(
             self, input_widgets_root: Optional[tk_Tk] = None, *args, **kwargs):
@@ -151,11 +338,23 @@ class GameGUI(Canvas):
     def init(
             self,
             input_map: GameMap,
-            input_event_listeners: List['EventListener']):
-        self._game_objects_painter = self.GameObjectsDrawer(self, input_map)
+            input_event_listeners: List['EventListener'],
+            input_get_followed_player: Optional[Callable[[], Player]] = None):
+        """Game field bigger than default resolution is seen through camera
+
+        [input_get_followed_player] is called from game thread on every
+        render
+        """
+        self._game_objects_painter = self.GameObjectsDrawer(
+            self,
+            input_map,
+            Camera(
+                DEFAULT_RESOLUTION,
+                (input_map.game_field_size.x, input_map.game_field_size.y)))
 
-        self._render_is_done = Event()
-        self._render_is_done.set()
+        self._rendering_map = input_map
+        self._snapshot_exchange = SnapshotExchange()
+        self._get_followed_player = input_get_followed_player
 
         self._init_appearance(input_map)
         self._init_bindings(input_event_listeners)
@@ -174,8 +373,11 @@ class GameGUI(Canvas):
         #  outer Frame that will serve as user_interface's colored borders with
         #  deletion root's padding at all
 
-        self.configure(width=input_map.game_field_size.x)
-        self.configure(height=input_map.game_field_size.y)
+        # Canvas is as big as camera's viewport
+        self.configure(
+            width=min(input_map.game_field_size.x, DEFAULT_RESOLUTION[0]))
+        self.configure(
+            height=min(input_map.game_field_size.y, DEFAULT_RESOLUTION[1]))
         self.configure(bg='deep sky blue')
 
         # Spawn game window at the screen center based on screen size
@@ -191,6 +393,11 @@ class GameGUI(Canvas):
     def _init_bindings(self, input_event_listeners: List['EventListener']):
         """Player's firing and moving bindings"""
         def notify_listeners_about_lmb_event(event):
+            # Canvas may be scrolled by camera, engine needs game field
+            # coordinates
+            event.x = self.canvasx(event.x)
+            event.y = self.canvasy(event.y)
+
             for event_listener in input_event_listeners:
                 event_listener.lmb_event_happened(event)
 
@@ -217,19 +424,35 @@ class GameGUI(Canvas):
             '<KeyRelease>', notify_listeners_about_key_released)
 
     def render(self):
-        """Called by GameEngine when game field render is needed"""
+        """Called by game loop when game field render is needed
+
+        Does NOT wait for drawing: snapshot of game map is published and
+        game loop goes on. Map editor draws right away in its own thread
+        """
         if self.master.__class__.__name__ != 'MapEditor':
-            self._render_is_done.clear()
-            self._render_is_done.wait()
+            camera_target: Optional[Tuple[float, float]] = None
+
+            if self._get_followed_player is not None:
+                followed_player: Optional[Player] = (
+                    self._get_followed_player())
+
+                if followed_player is not None:
+                    camera_target = (
+                        followed_player.location.x + Player.SIDE_LENGTH / 2,
+                        followed_player.location.y + Player.SIDE_LENGTH / 2)
+
+            self._snapshot_exchange.publish_map(
+                self._rendering_map, camera_target)
         else:
             self._game_objects_painter.draw_all_game_objects()
 
     def _check_render(self):
-        """Every 2 milliseconds checking if rendering is needed"""
-        if not self._render_is_done.is_set():
-            self._game_objects_painter.draw_all_game_objects()
+        """Every 2 milliseconds drawing the latest snapshot if it is new"""
+        render_snapshot: Optional[RenderSnapshot] = (
+            self._snapshot_exchange.take_latest())
 
-            self._render_is_done.set()
+        if render_snapshot is not None:
+            self._game_objects_painter.draw_snapshot(render_snapshot)
 
         self.after(2, self._check_render)
 
@@ -1,22 +1,16 @@
-from time import (
-    time as current_time_in_seconds,
-    sleep as time_sleep)
 from threading import Thread
 from argparse import ArgumentParser, Namespace
-from typing import TextIO, Optional
+from typing import TextIO, Optional, BinaryIO, Union
 from sys import exit as sys_exit
-from pickle import load as pickle_load
-from os import pardir as os_pardir
-from os.path import (
-    join as os_path_join,
-    dirname as os_path_dirname,
-    abspath as os_path_abspath)
+from random import randrange
 
 from engine import ApplicationException
 from engine.engine import GameEngine
-from maps import RawMapsContainer
+from engine.input_recording import InputRecorder, parse_random_seed
+from engine.fixed_step_scheduler import (
+    FixedStepScheduler, FixedStepSchedulerException)
 from user_interface.game_ui import GameGUI
-from maps import GameMap
+from maps import GameMap, GameMapException, load_game_map
 
 
 def exit_with_exception(
@@ -83,6 +77,34 @@ def run_launcher_logic():
         help="turn on debug info printing",
         action='store_true')
 
+    parser.add_argument(
+        '--projectile-store',
+        help="process projectiles with NumPy arrays (NumPy is required)",
+        action='store_true')
+
+    parser.add_argument(
+        '--record',
+        help="record all inputs into given file for replaying with "
+             "'headless.py --replay'",
+        metavar='FILE')
+
+    parser.add_argument(
+        '--seed',
+        help="random seed of game, non-negative (default: random)",
+        type=parse_random_seed)
+
+    parser.add_argument(
+        '--tick-rate',
+        help="game map updates per second (default: 60)",
+        type=float,
+        default=60)
+
+    parser.add_argument(
+        '--stats',
+        help="time game map updates and dump statistics into given JSON "
+             "file on exit",
+        metavar='FILE')
+
     arguments: Namespace = parser.parse_args()
 
     # Improvement: make GUI version of launcher. For now launcher just loads
@@ -94,32 +116,14 @@ def run_launcher_logic():
 
     game_map: Optional[GameMap] = None
 
-    if map_name.startswith('raw '):
-        try:
-            game_map = getattr(
-                RawMapsContainer, 'get_map_' + map_name.split(' ')[1])()
-
-        except AttributeError:
-            exit_with_exception(
-                'Wrong raw map name',
-                LauncherException('Wrong raw map name: ' + map_name),
-                arguments.debug)
-    else:
-        try:
-            map_path: str = os_path_join(
-                os_path_dirname(os_path_abspath(__file__)),
-                os_pardir,
-                'maps',
-                map_name)
-
-            with open(map_path, 'rb') as map_file_handle:
-                game_map = pickle_load(map_file_handle)
+    try:
+        game_map = load_game_map(map_name)
 
-        except OSError as occurred_err:
-            exit_with_exception(
-                'Cannot open file: ' + map_name,
-                LauncherException(*occurred_err.args),
-                arguments.debug)
+    except GameMapException as occurred_exc:
+        exit_with_exception(
+            occurred_exc.args[0],
+            LauncherException(*occurred_exc.args),
+            arguments.debug)
 
     if game_map is None:
         exit_with_exception(
@@ -127,56 +131,89 @@ def run_launcher_logic():
             ApplicationException('[game_map] is [None]'),
             arguments.debug)
 
-    game_engine: GameEngine = GameEngine(game_map)
-    gui: GameGUI = GameGUI()
+    random_seed: Optional[int] = arguments.seed
+
+    if random_seed is None and arguments.record is not None:
+        # Replay needs to know the seed
+        random_seed = randrange(2 ** 63)
 
     try:
-        gui.init(game_map, game_engine.get_event_listeners())
-
-        def game_loop(game_engine_: GameEngine, gui_: GameGUI):
-            def time_alignment():
-                """Time alignment for CPU power saving
-
-                Игра работает в режиме 60 итераций игрового цикла (обновление И
-                рендер уровня в одной итерации) в секунду.
-
-                По сути, секунда разбита на 60 частей. Выравнивание происходит
-                таким образом, что в начале каждой 1\60 части секунды должна
-                начинаться КАЖДАЯ итерация игрового цикла. НЕТ гарантии, что
-                при таком подходе не будет потеряна одна из 1\60-ой частей
-                секунды
-
-                Таким образом, каждое обновление уровня происходит с рассчетом
-                ТОЛЬКО на текущую 1/60 часть секунды. Это позволяет избавиться
-                от дробных величин при модификации позиции движущихся объектов.
-                """
-                # All time below in milliseconds
-                #
-                # one_iteration_time = 1000 / 60 = 16.666666666666668
-                # millis_in_current_second = (
-                #     current_time_in_seconds() * 1000 % 1000)
-                time_sleep(
-                    (16.666666666666668
-                     - ((current_time_in_seconds() * 1000 % 1000)
-                        % 16.666666666666668))
-                    / 1000)
+        game_engine: GameEngine = GameEngine(
+            game_map, arguments.projectile_store, random_seed)
+    except ApplicationException as occurred_exc:
+        exit_with_exception(
+            "Cannot start game engine", occurred_exc, arguments.debug)
 
-            # Game loop locates in a daemon thread so it will proceed until
-            # user interface thread is closed
-            while True:
-                game_engine_.update_map()
+    if arguments.stats is not None:
+        game_engine.enable_instrumentation()
+
+    try:
+        game_loop_scheduler: FixedStepScheduler = FixedStepScheduler(
+            arguments.tick_rate)
+    except FixedStepSchedulerException as occurred_exc:
+        exit_with_exception(
+            "Wrong tick rate", occurred_exc, arguments.debug)
+
+    # Game loop updates map through recorder if inputs are recorded
+    map_updater: Union[GameEngine, InputRecorder] = game_engine
+    recording_file: Optional[BinaryIO] = None
+
+    if arguments.record is not None:
+        try:
+            recording_file = open(arguments.record, 'wb')
 
-                gui_.render()
+        except OSError as occurred_err:
+            exit_with_exception(
+                'Cannot open file: ' + arguments.record,
+                LauncherException(*occurred_err.args),
+                arguments.debug)
+
+        map_updater = InputRecorder(
+            game_engine, recording_file, random_seed, map_name)
+
+    gui: GameGUI = GameGUI()
 
-                time_alignment()
+    try:
+        if recording_file is None:
+            gui.init(
+                game_map,
+                game_engine.get_event_listeners(),
+                game_engine.get_main_player)
+        else:
+            gui.init(game_map, [map_updater], game_engine.get_main_player)
+
+        def game_loop(
+                game_engine_: Union[GameEngine, InputRecorder],
+                gui_: GameGUI):
+            # Game loop locates in a daemon thread so it will proceed until
+            # user interface thread is closed.
+            #
+            # Game model runs at constant tick rate on monotonic clock. If
+            # rendering is slow then several updates go before one render
+            game_loop_scheduler.run(game_engine_.update_map, gui_.render)
 
         Thread(
             target=game_loop,
-            args=(game_engine, gui),
+            args=(map_updater, gui),
             daemon=True).start()
         # Right here several renderings CANNOT be lost
         gui.run_gui_loop()
 
+        if recording_file is not None:
+            map_updater.close()
+            recording_file.close()
+
+        if arguments.stats is not None:
+            try:
+                with open(arguments.stats, 'w') as stats_file:
+                    game_engine.get_instrumentation().dump(stats_file)
+
+            except OSError as occurred_err:
+                exit_with_exception(
+                    'Cannot write file: ' + arguments.stats,
+                    LauncherException(*occurred_err.args),
+                    arguments.debug)
+
     except ApplicationException as occurred_exc:
         # Improvement: Different messages for user. Switch only message!
         exit_with_exception(
@@ -0,0 +1,242 @@
+from threading import Lock
+from typing import Tuple, Optional, Hashable, NamedTuple, Callable
+
+from maps import GameMap
+from engine.game_objects import *
+from engine.type_registry import TypeRegistry
+
+
+class DrawnObject(NamedTuple):
+    """Everything that is needed to draw one game object
+
+    [object_id] is the same for the same game object in all snapshots
+    """
+    object_type: type
+    object_id: Hashable
+    x: float
+    y: float
+    width: float
+    height: float
+
+
+class RenderSnapshot(NamedTuple):
+    """Immutable drawable state of game map at the end of some tick
+
+    Snapshot shares nothing mutable with game map, so GUI thread can draw it
+    while game thread updates the map
+    """
+    # Increases with every published snapshot
+    version: int
+
+    game_field_size: Tuple[float, float]
+
+    # Static layer. Snapshots with the same static layer version share the
+    # same tuple of immovable objects, so renderers can compare it by
+    # identity and skip it
+    static_layer_version: int
+    immovable_objects: Tuple[DrawnObject, ...]
+
+    movable_objects: Tuple[DrawnObject, ...]
+
+    # Game field point that camera follows. [None] keeps camera in place
+    camera_target: Optional[Tuple[float, float]] = None
+
+
+def get_drawn_object_bounds(
+        drawn_object: DrawnObject) -> Tuple[float, float, float, float]:
+    """Gives (left, top, right, bottom). Sizes can be negative in editor"""
+    return (
+        min(drawn_object.x, drawn_object.x + drawn_object.width),
+        min(drawn_object.y, drawn_object.y + drawn_object.height),
+        max(drawn_object.x, drawn_object.x + drawn_object.width),
+        max(drawn_object.y, drawn_object.y + drawn_object.height))
+
+
+# Game object's class -> function(game_object) that gives its size or [None]
+# if object is not drawn now
+DRAWN_SIZES: TypeRegistry = TypeRegistry('drawn sizes')
+
+
+@DRAWN_SIZES.register(BasicPlatform)
+def _get_basic_platform_size(
+        basic_platform: BasicPlatform) -> Tuple[float, float]:
+    return basic_platform.width, basic_platform.height
+
+
+@DRAWN_SIZES.register(AbstractBuff)
+def _get_buff_size(buff: AbstractBuff) -> Optional[Tuple[float, float]]:
+    # Charging buffs are invisible
+    if buff.is_charging():
+        return None
+
+    return AbstractBuff.SIDE_LENGTH, AbstractBuff.SIDE_LENGTH
+
+
+@DRAWN_SIZES.register(Player)
+def _get_player_size(_: Player) -> Tuple[float, float]:
+    return Player.SIDE_LENGTH, Player.SIDE_LENGTH
+
+
+@DRAWN_SIZES.register(HandgunProjectile)
+def _get_handgun_projectile_size(_) -> Tuple[float, float]:
+    return (
+        HandgunProjectile.CIRCLE_DIAMETER, HandgunProjectile.CIRCLE_DIAMETER)
+
+
+@DRAWN_SIZES.register(MachineGunProjectile)
+def _get_machine_gun_projectile_size(_) -> Tuple[float, float]:
+    return (
+        MachineGunProjectile.CIRCLE_DIAMETER,
+        MachineGunProjectile.CIRCLE_DIAMETER)
+
+
+def _get_drawn_object(
+        game_object_type: type,
+        object_id: Hashable,
+        game_object) -> Optional[DrawnObject]:
+    get_size: Optional[Callable] = DRAWN_SIZES.get(game_object_type)
+
+    if get_size is None:
+        return None
+
+    drawn_size: Optional[Tuple[float, float]] = get_size(game_object)
+
+    if drawn_size is None:
+        return None
+
+    return DrawnObject(
+        game_object_type,
+        object_id,
+        game_object.location.x,
+        game_object.location.y,
+        drawn_size[0],
+        drawn_size[1])
+
+
+def _get_drawn_immovable_objects(
+        game_map: GameMap) -> Tuple[DrawnObject, ...]:
+    immovable_objects: List[DrawnObject] = []
+
+    for immovable_index, immovable_object in enumerate(
+            game_map.immovable_objects):
+        drawn_object: Optional[DrawnObject] = _get_drawn_object(
+            immovable_object.__class__, immovable_index, immovable_object)
+
+        if drawn_object is not None:
+            immovable_objects.append(drawn_object)
+
+    return tuple(immovable_objects)
+
+
+def make_render_snapshot(
+        game_map: GameMap,
+        version: int,
+        previous_snapshot: Optional[RenderSnapshot] = None,
+        camera_target: Optional[Tuple[float, float]] = None) -> RenderSnapshot:
+    """Copies drawable state of game map
+
+    Immovable objects are copied only if static layer version of game map
+    differs from [previous_snapshot]'s one. Ids are: index for immovable
+    objects, generational handle for movable objects and
+    ('projectile_store', view id) for stored projectiles
+    """
+    if (previous_snapshot is not None
+            and previous_snapshot.static_layer_version
+            == game_map.static_layer_version):
+        immovable_objects: Tuple[DrawnObject, ...] = (
+            previous_snapshot.immovable_objects)
+    else:
+        immovable_objects = _get_drawn_immovable_objects(game_map)
+
+    movable_objects: List[DrawnObject] = []
+
+    for dense_index, movable_object in enumerate(game_map.movable_objects):
+        drawn_object: Optional[DrawnObject] = _get_drawn_object(
+            movable_object.__class__,
+            game_map.movable_objects.get_handle(dense_index),
+            movable_object)
+
+        if drawn_object is not None:
+            movable_objects.append(drawn_object)
+
+    if game_map.projectile_store is not None:
+        for projectile_view in game_map.projectile_store.get_views():
+            drawn_object = _get_drawn_object(
+                projectile_view.projectile_type,
+                ('projectile_store', projectile_view.view_id),
+                projectile_view)
+
+            if drawn_object is not None:
+                movable_objects.append(drawn_object)
+
+    return RenderSnapshot(
+        version,
+        (game_map.game_field_size.x, game_map.game_field_size.y),
+        game_map.static_layer_version,
+        immovable_objects,
+        tuple(movable_objects),
+        camera_target)
+
+
+class SnapshotExchange:
+    """Hands the latest render snapshot from game thread to GUI thread
+
+    Snapshots are immutable, so swapping one reference is enough instead of
+    copying into double or triple buffer: publisher never waits for reader
+    and reader always gets the newest complete snapshot. Snapshots that are
+    replaced before reading are just skipped
+    """
+    _latest_snapshot: Optional[RenderSnapshot]
+    _published_count: int
+
+    # Static layer of the next snapshot is taken from it if map's static
+    # layer is not changed
+    _last_made_snapshot: Optional[RenderSnapshot]
+
+    # Version of the last snapshot that was taken by reader
+    _taken_version: int
+
+    _lock: Lock
+
+    def __init__(self):
+        self._latest_snapshot = None
+        self._published_count = 0
+        self._last_made_snapshot = None
+        self._taken_version = 0
+
+        self._lock = Lock()
+
+    def publish_map(
+            self,
+            game_map: GameMap,
+            camera_target: Optional[Tuple[float, float]] = None):
+        """Makes snapshot of game map and publishes it
+
+        There must be only one publishing thread: the one that updates map
+        """
+        self._published_count += 1
+
+        self._last_made_snapshot = make_render_snapshot(
+            game_map,
+            self._published_count,
+            self._last_made_snapshot,
+            camera_target)
+
+        self.publish(self._last_made_snapshot)
+
+    def publish(self, render_snapshot: RenderSnapshot):
+        with self._lock:
+            self._latest_snapshot = render_snapshot
+
+    def take_latest(self) -> Optional[RenderSnapshot]:
+        """Gives snapshot that is newer than previous taken one or [None]"""
+        with self._lock:
+            latest_snapshot: Optional[RenderSnapshot] = self._latest_snapshot
+
+        if (latest_snapshot is None
+                or latest_snapshot.version <= self._taken_version):
+            return None
+
+        self._taken_version = latest_snapshot.version
+
+        return latest_snapshot